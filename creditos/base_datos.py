@@ -0,0 +1,74 @@
+"""
+Perfil de conexión a la base de datos según el entorno.
+
+Todo se ajusta con variables de entorno (valores por defecto entre paréntesis):
+
+- ``DB_CONN_MAX_AGE`` (60): segundos que una conexión se reutiliza entre
+  peticiones; 0 = abrir y cerrar una por petición (comportamiento anterior).
+- ``DB_CONN_HEALTH_CHECKS`` (true): verificar la conexión reutilizada antes de
+  usarla, así un corte del servidor no se convierte en un 500.
+- ``DB_POOL`` (false): pool de conexiones de psycopg 3 (``pip install
+  "psycopg[pool]"``); con pool, Django exige ``CONN_MAX_AGE = 0``. Si psycopg 3
+  no está instalado se ignora y se usan conexiones persistentes.
+  ``DB_POOL_MIN`` (1), ``DB_POOL_MAX`` (4), ``DB_POOL_TIMEOUT`` (10 s).
+- ``DB_ROL``: ``web`` o ``batch``. Si no se define, ``manage.py <comando>``
+  es batch (cron, migraciones) y el resto (gunicorn, runserver) es web.
+- ``DB_STATEMENT_TIMEOUT_WEB_MS`` (30000) / ``DB_STATEMENT_TIMEOUT_BATCH_MS``
+  (900000): ``statement_timeout`` de PostgreSQL por rol; 0 = sin límite.
+"""
+import os
+import sys
+
+import dj_database_url
+
+
+def _bool(nombre, defecto):
+    return os.getenv(nombre, defecto).lower() in ['true', '1', 'yes']
+
+
+def rol_proceso(argv=None):
+    """'web' o 'batch' (ver ``DB_ROL``)."""
+    rol = os.getenv('DB_ROL', '').strip().lower()
+    if rol in ('web', 'batch'):
+        return rol
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1 and os.path.basename(argv[0]) == 'manage.py' and argv[1] != 'runserver':
+        return 'batch'
+    return 'web'
+
+
+def _psycopg3_con_pool():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def configuracion_bd(url, rol=None):
+    """Entrada ``DATABASES['default']`` para ``url`` con el perfil del rol."""
+    rol = rol or rol_proceso()
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        conn_health_checks=_bool('DB_CONN_HEALTH_CHECKS', 'true'),
+    )
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+
+    opciones = config.setdefault('OPTIONS', {})
+    timeout = int(os.getenv(f'DB_STATEMENT_TIMEOUT_{rol.upper()}_MS', '30000' if rol == 'web' else '900000'))
+    if timeout > 0:
+        opciones['options'] = f"{opciones.get('options', '')} -c statement_timeout={timeout}".strip()
+    opciones.setdefault('application_name', f'creditos-{rol}')
+
+    if _bool('DB_POOL', 'false') and _psycopg3_con_pool():
+        opciones['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN', '1')),
+            'max_size': int(os.getenv('DB_POOL_MAX', '4')),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+        # El pool reemplaza a las conexiones persistentes de Django
+        config['CONN_MAX_AGE'] = 0
+    return config
@@ -0,0 +1,43 @@
+"""
+Clases de tiempo límite por ruta.
+
+Gunicorn tiene un solo ``timeout`` por worker (y con ``gthread`` solo vigila
+el hilo principal, no cada petición), así que el límite por tipo de
+petición se reparte así:
+
+- ``normal``: todo lo interactivo (cobros, listados, formularios). En
+  PostgreSQL rige el ``statement_timeout`` del rol web
+  (``DB_STATEMENT_TIMEOUT_WEB_MS``, ver ``creditos/base_datos.py``).
+- ``larga``: exportaciones a Excel, PDF y reportes (``RUTAS_LARGAS``).
+  ``LimiteTiempoPorRutaMiddleware`` sube el ``statement_timeout`` a
+  ``TIMEOUT_LARGAS_S`` solo durante esa petición.
+
+``gunicorn.conf.py`` usa el mismo presupuesto para avisar en el log de las
+peticiones que lo exceden. Este módulo no importa Django: lo carga el
+proceso maestro de gunicorn antes que la aplicación.
+"""
+import os
+
+RUTAS_LARGAS = (
+    '/exportar-',
+    '/generar-pdf-cronograma/',
+    '/generar-recibo-pdf/',
+    '/reporte-',
+    '/pagare/descargar/',
+    '/renovacion/descargar/',
+    '/retanqueo-documento/descargar/',
+    '/habeas-data/descargar/',
+)
+
+TIMEOUT_NORMAL_S = int(os.getenv('TIMEOUT_NORMAL_S', '30'))
+TIMEOUT_LARGAS_S = int(os.getenv('TIMEOUT_LARGAS_S', '120'))
+
+
+def clase_de_ruta(ruta):
+    """'larga' para exportaciones/PDF/reportes, 'normal' para el resto."""
+    return 'larga' if ruta.startswith(RUTAS_LARGAS) else 'normal'
+
+
+def limite_de_ruta(ruta):
+    """Segundos de presupuesto de la clase de ``ruta``."""
+    return TIMEOUT_LARGAS_S if clase_de_ruta(ruta) == 'larga' else TIMEOUT_NORMAL_S
@@ -52,4 +52,35 @@ class MediaFilesMiddleware:
             )
             
         except (OSError, ValueError):
-            raise Http404("Error al servir archivo media")
\ No newline at end of file
+            raise Http404("Error al servir archivo media")
+
+class LimiteTiempoPorRutaMiddleware:
+    """
+    Sube el ``statement_timeout`` de PostgreSQL durante las peticiones de
+    clase 'larga' (ver ``creditos.clases_tiempo``) y lo restaura al terminar:
+    con conexiones persistentes un ``SET`` sin restaurar quedaría para las
+    peticiones siguientes del mismo hilo.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.db import DatabaseError, connection
+
+        from .clases_tiempo import TIMEOUT_LARGAS_S, clase_de_ruta
+
+        if connection.vendor != 'postgresql' or clase_de_ruta(request.path_info) != 'larga':
+            return self.get_response(request)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET statement_timeout = %s', [TIMEOUT_LARGAS_S * 1000])
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                with connection.cursor() as cursor:
+                    # Vuelve al valor de arranque de la sesión (-c statement_timeout del rol)
+                    cursor.execute('RESET statement_timeout')
+            except DatabaseError:
+                connection.close()
@@ -12,7 +12,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -67,12 +66,15 @@ except ImportError:
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para archivos estáticos y media
+    'main.perfilado.PerfiladoMiddleware',  # Solo con PERFILADO=true (ver PERFILADO_* más abajo)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.autorizacion.AutorizacionMiddleware',  # Rol/cobrador del usuario resueltos una vez por petición
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'creditos.middleware.LimiteTiempoPorRutaMiddleware',  # Exportaciones/PDF con su propio statement_timeout
 ]
 
 ROOT_URLCONF = 'creditos.urls'
@@ -102,9 +104,11 @@ WSGI_APPLICATION = 'creditos.wsgi.application'
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
 if DATABASE_URL:
-    # Producción: PostgreSQL u otro (según DATABASE_URL)
+    # Producción: PostgreSQL u otro (según DATABASE_URL), con conexiones persistentes,
+    # health checks, pool opcional y statement_timeout por rol (ver creditos/base_datos.py)
+    from .base_datos import configuracion_bd
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': configuracion_bd(DATABASE_URL)
     }
 else:
     # Desarrollo - SQLite
@@ -163,6 +167,13 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Entrega de media protegida por el servidor web (Django solo valida permisos):
+#   '' (por defecto): Django envía el archivo
+#   'X-Accel-Redirect': nginx, con una location interna MEDIA_SENDFILE_PREFIX -> MEDIA_ROOT
+#   'X-Sendfile': Apache (mod_xsendfile) / lighttpd
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_SENDFILE_PREFIX = os.getenv('MEDIA_SENDFILE_PREFIX', '/protected-media/')
+
 # WhiteNoise para servir archivos media en producción
 WHITENOISE_USE_FINDERS = True
 WHITENOISE_AUTOREFRESH = True
@@ -202,6 +213,49 @@ else:
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
     DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'noreply@creditos.local')
 
+# ===== RECORDATORIOS DE PAGO (main/recordatorios.py) =====
+# Canales activos: EMAIL (implementado); WHATSAPP y SMS quedan como stub hasta tener proveedor.
+RECORDATORIOS_CANALES = [c.strip() for c in os.getenv('RECORDATORIOS_CANALES', 'EMAIL').split(',') if c.strip()]
+RECORDATORIOS_DIAS_ANTES = [1]                   # recordar 1 día antes del vencimiento
+RECORDATORIOS_DIAS_VENCIDO = [1, 3, 7, 15, 30]   # días de mora en que se vuelve a recordar
+RECORDATORIOS_HORARIO_SILENCIO = ('21:00', '07:00')
+RECORDATORIOS_ZONA_HORARIA = 'America/Bogota'
+RECORDATORIOS_MAX_INTENTOS = 3
+
+# ===== CACHÉ (main/cache_dominio.py) =====
+# CACHE_URL: redis://host:6379/0 (requiere el paquete redis), locmem:// (solo este proceso) o
+# file:///ruta. Por defecto archivos en el temporal del sistema, compartidos por los workers del contenedor.
+import tempfile
+
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('locmem://'):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL[len('file://'):] if CACHE_URL.startswith('file://')
+        else os.path.join(tempfile.gettempdir(), 'creditos_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }}
+CACHE_DOMINIO_SEGUNDOS = int(os.getenv('CACHE_DOMINIO_SEGUNDOS', '600'))  # tope si un cambio no pasa por señales
+CACHE_DOMINIO_FLUSH_SEGUNDOS = 60      # cada cuánto cada proceso suma sus aciertos/fallos al caché
+
+# ===== PERFILADO DE PETICIONES (main/perfilado.py) =====
+# Tiempo, consultas y SQL más lento/repetido por vista. Página /rendimiento/ y comando perf_report.
+PERFILADO_ACTIVO = os.getenv('PERFILADO', 'false').lower() in ['true', '1', 'yes']
+PERFILADO_MUESTREO = float(os.getenv('PERFILADO_MUESTREO', '1'))  # fracción de peticiones perfiladas
+PERFILADO_TOP_SQL = 5              # consultas más lentas / repetidas que se guardan por petición
+PERFILADO_BUFFER = 2000            # muestras en memoria por proceso
+PERFILADO_FLUSH_SEGUNDOS = 60      # cada cuánto el hilo de guardado de cada worker escribe en MuestraRendimiento
+PERFILADO_RETENCION_DIAS = 7       # las purga perf_report (cron diario --solo-purgar)
+
+# ===== BENCHMARKS DE RUTAS CALIENTES (main/benchmarks.py) =====
+# Historial JSON de benchmark_rutas_calientes / main.tests y regresión tolerada (0.25 = 25 % peor que la mediana)
+BENCHMARK_HISTORIAL = os.getenv('BENCHMARK_HISTORIAL', str(BASE_DIR / 'benchmarks' / 'historial.json'))
+BENCHMARK_UMBRAL = float(os.getenv('BENCHMARK_UMBRAL', '0.25'))
+
 # ===== AUTOMATIZACIÓN DE TAREAS DIARIAS =====
 # Configuración de tareas programadas para producción
 # Solo se configura si django_crontab está disponible
@@ -209,8 +263,20 @@ if 'django_crontab' in INSTALLED_APPS:
     CRONJOBS = [
         # Generar tareas de cobro diarias (Lunes a Viernes a las 6:00 AM)
         ('0 6 * * 1-5', 'django.core.management.call_command', ['ejecutar_tareas_automaticas', '--solo-tareas']),
-        # Recordatorios de cuotas por correo (todos los días a las 7:00 AM)
-        ('0 7 * * *', 'django.core.management.call_command', ['enviar_recordatorios_cuotas']),
+        # Cerrar créditos con saldo residual por redondeo (diario, 5:30 AM)
+        ('30 5 * * *', 'django.core.management.call_command', ['cerrar_creditos_saldados']),
+        # Auditoría operativa en JSON (diario, 5:45 AM, después del cierre de saldados)
+        ('45 5 * * *', 'django.core.management.call_command', ['auditar_operacion', '--json']),
+        # Recordatorios de pago (cada hora de 7:00 AM a 8:00 PM; cada ejecución solo envía lo nuevo)
+        ('0 7-20 * * *', 'django.core.management.call_command', ['procesar_recordatorios']),
+        # Invariantes de cartera sobre los créditos tocados desde la última corrida (cada 10 minutos)
+        ('*/10 * * * *', 'django.core.management.call_command', ['verificar_invariantes']),
+        # Revisión completa semanal: cubre cambios hechos con update() que no mueven la marca (Domingos 5:50 AM)
+        ('50 5 * * 0', 'django.core.management.call_command', ['verificar_invariantes', '--completo']),
+        # Inventario de archivos media para /media-status/ (cada hora)
+        ('15 * * * *', 'django.core.management.call_command', ['inventario_media']),
+        # Purga de muestras del perfilado más viejas que PERFILADO_RETENCION_DIAS (diario, 5:55 AM)
+        ('55 5 * * *', 'django.core.management.call_command', ['perf_report', '--solo-purgar']),
         # Verificación completa del sistema (Domingos a las 8:00 AM)
         ('0 8 * * 0', 'django.core.management.call_command', ['ejecutar_tareas_automaticas']),
     ]
@@ -27,6 +27,11 @@ urlpatterns = [
     path('media-status/', media_views.media_status, name='media_status'),
 ]
 
+# Derivados de fotos (thumb/card/full): también en desarrollo, para generarlos si faltan
+urlpatterns += [
+    re_path(r'^media/(?P<path>.+__(?:thumb|card|full)\.jpg)$', media_views.serve_derivado_imagen, name='media_derivado'),
+]
+
 # Servir archivos media
 if settings.DEBUG:
     # En desarrollo, usar el método estándar de Django
@@ -0,0 +1,145 @@
+"""
+Configuración de gunicorn (``gunicorn creditos.wsgi:application -c gunicorn.conf.py``).
+
+Workers ``gthread``: cada proceso atiende varias peticiones en hilos, así una
+exportación a Excel o un PDF lento no deja esperando los cobros del resto de
+cobradores. Todo se ajusta con variables de entorno (por defecto entre paréntesis):
+
+- ``WEB_CONCURRENCY``: número de workers. Si no se define se calcula como
+  ``2 * CPU + 1`` limitado por la memoria del contenedor
+  (``GUNICORN_MEMORIA_WORKER_MB`` (200) por worker, dejando
+  ``GUNICORN_MEMORIA_RESERVA_MB`` (150) libres) y por ``GUNICORN_MAX_WORKERS`` (6).
+- ``GUNICORN_THREADS`` (4): hilos por worker. Cada hilo puede tener su
+  conexión persistente a la BD: workers × hilos no debe superar las
+  conexiones que permite el plan de PostgreSQL.
+- ``GUNICORN_MAX_REQUESTS`` (1000) / ``GUNICORN_MAX_REQUESTS_JITTER`` (100):
+  reciclado de workers para acotar el crecimiento de memoria (pandas,
+  ReportLab); el jitter evita que todos se reinicien a la vez.
+- ``GUNICORN_PRELOAD`` (true): carga Django en el maestro antes de bifurcar.
+- ``TIMEOUT_NORMAL_S`` (30) / ``TIMEOUT_LARGAS_S`` (120): clases de tiempo
+  por ruta, ver ``creditos/clases_tiempo.py``.
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from creditos.clases_tiempo import TIMEOUT_LARGAS_S, clase_de_ruta, limite_de_ruta  # noqa: E402
+
+
+def _entero(nombre, defecto):
+    return int(os.getenv(nombre, defecto))
+
+
+def _cpus():
+    """CPU disponibles para el proceso, respetando la cuota del contenedor (cgroup v2)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            cuota, periodo = f.read().split()
+        if cuota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(cuota) / int(periodo))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _memoria_mb():
+    """Límite de memoria del contenedor (cgroup v2 / v1) o, si no hay, la RAM total."""
+    for ruta in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(ruta) as f:
+                valor = f.read().strip()
+        except OSError:
+            continue
+        if valor.isdigit() and int(valor) < 1 << 50:
+            return int(valor) // 2**20
+    try:
+        with open('/proc/meminfo') as f:
+            for linea in f:
+                if linea.startswith('MemTotal:'):
+                    return int(linea.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _workers():
+    if os.getenv('WEB_CONCURRENCY'):
+        return max(1, _entero('WEB_CONCURRENCY', '1'))
+    workers = 2 * _cpus() + 1
+    memoria = _memoria_mb()
+    if memoria is not None:
+        disponible = memoria - _entero('GUNICORN_MEMORIA_RESERVA_MB', '150')
+        workers = min(workers, disponible // _entero('GUNICORN_MEMORIA_WORKER_MB', '200'))
+    return max(1, min(workers, _entero('GUNICORN_MAX_WORKERS', '6')))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = 'gthread'
+workers = _workers()
+threads = max(1, _entero('GUNICORN_THREADS', '4'))
+
+# El maestro mata un worker cuyo hilo principal no responde en `timeout`; con
+# gthread eso no corta peticiones lentas en otros hilos, así que basta con el
+# presupuesto de la clase más larga. Al reciclar (max_requests) o redesplegar,
+# graceful_timeout deja terminar las exportaciones en curso.
+timeout = TIMEOUT_LARGAS_S
+graceful_timeout = TIMEOUT_LARGAS_S
+keepalive = 5
+
+max_requests = _entero('GUNICORN_MAX_REQUESTS', '1000')
+max_requests_jitter = _entero('GUNICORN_MAX_REQUESTS_JITTER', '100')
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ['true', '1', 'yes']
+
+# Latido de los workers en memoria: en contenedores /tmp puede ser disco lento
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(
+        'gthread: %s workers x %s hilos (CPU=%s, memoria=%s MB), max_requests=%s±%s, preload=%s',
+        workers, threads, _cpus(), _memoria_mb(), max_requests, max_requests_jitter, preload_app,
+    )
+
+
+def post_fork(server, worker):
+    # Con preload_app, una conexión abierta en el maestro quedaría compartida
+    # entre procesos: cada worker abre las suyas.
+    if 'django' in sys.modules:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def worker_exit(server, worker):
+    # Muestras del perfilado (PERFILADO=true) que aún no se guardaron
+    if 'main.perfilado' in sys.modules:
+        sys.modules['main.perfilado'].guardar_pendientes(forzar=True)
+
+
+def pre_request(worker, req):
+    req.inicio_peticion = time.monotonic()
+
+
+def post_request(worker, req, environ, resp):
+    inicio = getattr(req, 'inicio_peticion', None)
+    if inicio is None:
+        return
+    duracion = time.monotonic() - inicio
+    limite = limite_de_ruta(req.path)
+    if duracion > limite:
+        worker.log.warning(
+            'Petición %s %s (clase %s) tardó %.1f s, por encima de su límite de %s s',
+            req.method, req.path, clase_de_ruta(req.path), duracion, limite,
+        )
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Cliente, Credito, Pago, Codeudor
+from .models import (
+    Cliente, Credito, Pago, Codeudor, Recordatorio, InventarioMedia, EjecucionInvariantes, ViolacionInvariante,
+    PasoDespliegue, MuestraRendimiento,
+)
 
 @admin.register(Cliente)
 class ClienteAdmin(admin.ModelAdmin):
@@ -61,3 +64,44 @@ class PagoAdmin(admin.ModelAdmin):
     list_filter = ['fecha_pago']
     search_fields = ['credito__cliente__nombres', 'credito__cliente__apellidos']
     readonly_fields = ['fecha_pago']
+
+@admin.register(Recordatorio)
+class RecordatorioAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'canal', 'tipo', 'fecha_programada', 'estado', 'intentos', 'fecha_envio']
+    list_filter = ['estado', 'canal', 'tipo', 'fecha_programada']
+    search_fields = ['cliente__nombres', 'cliente__apellidos', 'cliente__cedula', 'destino']
+    readonly_fields = ['fecha_creacion', 'fecha_envio']
+    raw_id_fields = ['cliente', 'cuotas']
+
+@admin.register(InventarioMedia)
+class InventarioMediaAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'total_archivos', 'total_bytes', 'total_referencias', 'total_faltantes', 'duracion_segundos']
+    readonly_fields = [f.name for f in InventarioMedia._meta.fields]
+
+@admin.register(ViolacionInvariante)
+class ViolacionInvarianteAdmin(admin.ModelAdmin):
+    list_display = ['invariante', 'credito', 'detectada_en', 'ultima_deteccion', 'resuelta_en']
+    list_filter = ['invariante', ('resuelta_en', admin.EmptyFieldListFilter), 'detectada_en']
+    search_fields = ['=credito__id', 'credito__cliente__cedula', 'credito__cliente__nombres', 'credito__cliente__apellidos']
+    list_select_related = ['credito__cliente']
+    readonly_fields = [f.name for f in ViolacionInvariante._meta.fields]
+
+@admin.register(EjecucionInvariantes)
+class EjecucionInvariantesAdmin(admin.ModelAdmin):
+    list_display = ['inicio', 'completa', 'creditos_revisados', 'violaciones_nuevas', 'violaciones_resueltas',
+                    'violaciones_abiertas', 'duracion_segundos']
+    list_filter = ['completa']
+    readonly_fields = [f.name for f in EjecucionInvariantes._meta.fields]
+
+@admin.register(PasoDespliegue)
+class PasoDespliegueAdmin(admin.ModelAdmin):
+    list_display = ['paso', 'fecha', 'ok', 'inicio', 'duracion_segundos']
+    list_filter = ['paso', 'ok']
+    readonly_fields = [f.name for f in PasoDespliegue._meta.fields]
+
+@admin.register(MuestraRendimiento)
+class MuestraRendimientoAdmin(admin.ModelAdmin):
+    list_display = ['vista', 'fecha', 'metodo', 'estado', 'duracion_ms', 'consultas', 'consultas_duplicadas']
+    list_filter = ['vista', 'metodo']
+    date_hierarchy = 'fecha'
+    readonly_fields = [f.name for f in MuestraRendimiento._meta.fields]
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .busqueda import asegurar_fts
+
+        post_migrate.connect(asegurar_fts, sender=self)
@@ -0,0 +1,111 @@
+"""
+Contexto de autorización de la petición: rol, cobrador asociado y alcance de
+créditos del usuario, resueltos una sola vez.
+
+``AutorizacionMiddleware`` deja en ``request.autorizacion`` un
+``ContextoAutorizacion`` perezoso (no consulta nada hasta que se usa). Los
+helpers de permisos de ``main.views`` (``_rol_usuario``,
+``_usuario_admin_operativo``, ``_usuario_cobrador_activo``,
+``_usuario_puede_ver_credito``...) lo reutilizan cuando reciben el mismo
+``request.user``: una vista que pregunta varias veces por el rol o el
+cobrador los resuelve una vez (BD o ``main.cache_dominio``). Para otro
+usuario (p. ej. el listado de usuarios) se resuelve sin memorizar.
+"""
+from contextvars import ContextVar
+
+from django.utils.functional import cached_property
+
+from . import cache_dominio
+
+ROLE_GERENTE = 'GERENTE'
+ROLE_ADMIN = 'ADMIN'
+ROLE_SUPERVISOR = 'SUPERVISOR'
+ROLE_COBRADOR = 'COBRADOR'
+ROLE_OPERADOR = 'OPERADOR'
+ROLES_SISTEMA = [ROLE_GERENTE, ROLE_ADMIN, ROLE_SUPERVISOR, ROLE_COBRADOR, ROLE_OPERADOR]
+
+# Contexto de la petición que atiende este hilo (gthread) o tarea
+_actual = ContextVar('autorizacion', default=None)
+
+
+class ContextoAutorizacion:
+    """Permisos de un usuario; cada dato se resuelve la primera vez que se pide."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def autenticado(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @cached_property
+    def rol(self):
+        if not self.autenticado:
+            return None
+        if self.user.is_superuser:
+            return ROLE_GERENTE
+        return cache_dominio.rol_de_usuario(self.user) or ROLE_OPERADOR
+
+    @cached_property
+    def es_admin(self):
+        """Permisos mínimos para operaciones críticas de crédito/cobranza."""
+        return self.autenticado and bool(self.user.is_staff or self.user.is_superuser)
+
+    @cached_property
+    def cobrador(self):
+        """Cobrador activo asociado al usuario, si existe."""
+        if not self.autenticado:
+            return None
+        return cache_dominio.cobrador_de_usuario(self.user)
+
+    @property
+    def cobrador_id(self):
+        return self.cobrador.id if self.cobrador else None
+
+    def alcance_creditos(self, creditos):
+        """Filtra un queryset de ``Credito``: admin ve todo, cobrador su cartera, el resto nada."""
+        if self.es_admin:
+            return creditos
+        if self.cobrador_id:
+            return creditos.filter(cobrador_id=self.cobrador_id)
+        return creditos.none()
+
+    def puede_ver_credito(self, credito):
+        if self.es_admin:
+            return True
+        return bool(self.cobrador_id and credito and credito.cobrador_id == self.cobrador_id)
+
+    def olvidar(self):
+        """Descarta lo resuelto (p. ej. tras cambiar el rol del propio usuario)."""
+        for campo in ('autenticado', 'rol', 'es_admin', 'cobrador'):
+            self.__dict__.pop(campo, None)
+
+
+def contexto_de(user):
+    """El contexto de la petición en curso si ``user`` es su usuario; si no, uno nuevo."""
+    contexto = _actual.get()
+    if contexto is not None and contexto.user is user:
+        return contexto
+    return ContextoAutorizacion(user)
+
+
+def olvidar_usuario(user):
+    """Si ``user`` es el de la petición en curso, vuelve a resolver sus permisos la próxima vez."""
+    contexto = _actual.get()
+    if contexto is not None and user is not None and contexto.autenticado and contexto.user.pk == user.pk:
+        contexto.olvidar()
+
+
+class AutorizacionMiddleware:
+    """Adjunta ``request.autorizacion`` (después de ``AuthenticationMiddleware``)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.autorizacion = ContextoAutorizacion(request.user)
+        token = _actual.set(request.autorizacion)
+        try:
+            return self.get_response(request)
+        finally:
+            _actual.reset(token)
@@ -0,0 +1,304 @@
+"""
+Benchmarks de las rutas calientes sobre una cartera sintética.
+
+Cada caso (registrado con ``@caso``) recibe el ``Contexto`` y retorna la
+función a medir; lo que prepara queda fuera del tiempo. ``medir`` ejecuta
+cada caso dentro de una transacción que se revierte, así repetirlo no
+cambia los datos (``generar_tareas_diarias`` o un cobro no se acumulan):
+
+- ``ms``: mediana de ``repeticiones`` ejecuciones (reloj de pared).
+- ``consultas``: consultas SQL de la primera ejecución.
+- ``memoria_kb``: pico de memoria de Python (``tracemalloc``, en una
+  pasada aparte porque ralentiza mucho la ejecución).
+
+Los resultados se agregan a un historial JSON (``BENCHMARK_HISTORIAL``) y
+``comparar`` marca como regresión la métrica que supera en más de
+``umbral`` (fracción, por defecto ``BENCHMARK_UMBRAL``) a la mediana de
+las últimas corridas con la misma etiqueta (motor de BD) y tamaño. Lo usan
+el comando ``benchmark_rutas_calientes`` y ``main/tests/test_benchmarks.py``.
+"""
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+CASOS = []
+METRICAS = ('ms', 'consultas', 'memoria_kb')
+# Diferencia absoluta mínima para hablar de regresión (ruido en casos muy rápidos)
+HOLGURA = {'ms': 20, 'consultas': 2, 'memoria_kb': 256}
+
+Caso = namedtuple('Caso', 'nombre descripcion preparar')
+
+
+class ErrorDeCaso(Exception):
+    """La ruta medida respondió con error."""
+
+
+def caso(nombre, descripcion):
+    """Registra un caso de benchmark en ``CASOS``."""
+    def registrar(preparar):
+        CASOS.append(Caso(nombre, descripcion, preparar))
+        return preparar
+    return registrar
+
+
+class Contexto:
+    """
+    Cartera sobre la que se mide: fecha, cliente HTTP con un superusuario y
+    las tareas de hoy ya generadas (las usan la agenda y el cobro).
+    """
+
+    def __init__(self, hoy=None):
+        from django.contrib.auth.models import User
+        from django.test import Client
+
+        from .models import TareaCobro
+
+        self.hoy = hoy or date.today()
+        if not TareaCobro.objects.filter(fecha_asignacion=self.hoy).exists():
+            TareaCobro.generar_tareas_diarias(fecha=self.hoy)
+        usuario = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if usuario is None:
+            usuario = User.objects.create_superuser('benchmark', 'benchmark@sintetica.invalid', None)
+        self.cliente = Client()
+        self.cliente.force_login(usuario)
+
+    def get(self, ruta):
+        return lambda: _leer(self.cliente.get(ruta))
+
+    def post(self, ruta, datos):
+        return lambda: _leer(self.cliente.post(ruta, datos))
+
+
+def _leer(respuesta):
+    # Las exportaciones en streaming generan el archivo al consumirlas
+    if getattr(respuesta, 'streaming', False):
+        for _ in respuesta.streaming_content:
+            pass
+    if respuesta.status_code >= 400:
+        raise ErrorDeCaso(f'HTTP {respuesta.status_code}')
+    return respuesta
+
+
+@caso('generar_tareas_diarias', 'TareaCobro.generar_tareas_diarias(hoy) sin tareas previas de hoy')
+def _generar_tareas_diarias(ctx):
+    from .models import TareaCobro
+
+    TareaCobro.objects.filter(fecha_asignacion=ctx.hoy).delete()
+    return lambda: TareaCobro.generar_tareas_diarias(fecha=ctx.hoy)
+
+
+@caso('generar_analisis_diario', 'CarteraAnalisis.generar_analisis_diario()')
+def _generar_analisis_diario(ctx):
+    from .models import CarteraAnalisis
+
+    return CarteraAnalisis.generar_analisis_diario
+
+
+@caso('procesar_cobro_completo', 'POST de cobro por el saldo de una cuota con tarea pendiente hoy')
+def _procesar_cobro_completo(ctx):
+    from .models import TareaCobro
+
+    tarea = (
+        TareaCobro.objects.filter(fecha_asignacion=ctx.hoy, estado='PENDIENTE', cuota__estado='PENDIENTE')
+        .select_related('cuota').order_by('pk').first()
+    )
+    if tarea is None:
+        raise ErrorDeCaso('No hay tareas pendientes hoy')
+    return ctx.post(f'/tareas/cobrar/{tarea.pk}/', {'monto_recibido': str(tarea.cuota.saldo_pendiente())})
+
+
+@caso('agenda_cobrador', 'Agenda de hoy del cobrador con más tareas')
+def _agenda_cobrador(ctx):
+    from django.db.models import Count
+
+    from .models import TareaCobro
+
+    mayor = (
+        TareaCobro.objects.filter(fecha_asignacion=ctx.hoy).values('cobrador')
+        .annotate(n=Count('id')).order_by('-n').first()
+    )
+    if mayor is None:
+        raise ErrorDeCaso('No hay tareas hoy')
+    return ctx.get(f'/tareas/agenda/{mayor["cobrador"]}/')
+
+
+@caso('generar_cronogramas', 'Credito.generar_cronogramas() de 100 créditos desembolsados sin pagos')
+def _generar_cronogramas(ctx):
+    from .models import Credito
+
+    creditos = list(Credito.objects.filter(estado='DESEMBOLSADO', pago__isnull=True).order_by('pk')[:100])
+    if not creditos:
+        raise ErrorDeCaso('No hay créditos desembolsados sin pagos')
+    return lambda: Credito.generar_cronogramas(creditos)
+
+
+@caso('dashboard', 'GET /dashboard/')
+def _dashboard(ctx):
+    return ctx.get('/dashboard/')
+
+
+@caso('dashboard_negocio', 'GET /dashboard-negocio/')
+def _dashboard_negocio(ctx):
+    return ctx.get('/dashboard-negocio/')
+
+
+@caso('kpis_cobradores', 'GET /kpis-cobradores/ (últimos 30 días)')
+def _kpis_cobradores(ctx):
+    return ctx.get('/kpis-cobradores/')
+
+
+@caso('exportar_clientes_excel', 'Exportación de clientes activos')
+def _exportar_clientes_excel(ctx):
+    return ctx.get('/exportar-clientes-excel/')
+
+
+@caso('exportar_creditos_excel', 'Exportación de todos los créditos')
+def _exportar_creditos_excel(ctx):
+    return ctx.get('/exportar-creditos-excel/')
+
+
+@caso('exportar_pagos_excel', 'Exportación de todos los pagos')
+def _exportar_pagos_excel(ctx):
+    return ctx.get('/exportar-pagos-excel/')
+
+
+@caso('exportar_cartera_excel', 'Exportación de cartera vencida')
+def _exportar_cartera_excel(ctx):
+    return ctx.get('/exportar-cartera-excel/')
+
+
+@caso('exportar_recaudacion_excel', 'Exportación de recaudación por cobrador (período por defecto)')
+def _exportar_recaudacion_excel(ctx):
+    return ctx.get('/exportar-recaudacion-excel/')
+
+
+@caso('exportar_tareas_pendientes', 'Exportación de tareas pendientes sin gestionar')
+def _exportar_tareas_pendientes(ctx):
+    return ctx.get('/reporte-tareas-pendientes/?dias=1&export=xlsx')
+
+
+def _ejecutar(caso_, ctx, con_memoria=False):
+    """Una ejecución del caso, revertida al terminar; retorna (ms, consultas, pico de memoria en bytes)."""
+    consultas = [0]
+
+    def contar(execute, sql, params, many, context):
+        consultas[0] += 1
+        return execute(sql, params, many, context)
+
+    with transaction.atomic():
+        funcion = caso_.preparar(ctx)
+        # Sin CaptureQueriesContext: guarda como máximo 9000 consultas y el registro suma tiempo
+        with connection.execute_wrapper(contar):
+            if con_memoria:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            try:
+                funcion()
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                pico = tracemalloc.get_traced_memory()[1] if con_memoria else None
+                if con_memoria:
+                    tracemalloc.stop()
+        transaction.set_rollback(True)
+    return ms, consultas[0], pico
+
+
+def medir(caso_, ctx, repeticiones=3, memoria=True):
+    """Métricas del caso: ``{'ms', 'consultas', 'memoria_kb'}`` o ``{'error': ...}``."""
+    try:
+        tiempos = []
+        consultas = None
+        for _ in range(max(1, repeticiones)):
+            ms, n, _pico = _ejecutar(caso_, ctx)
+            tiempos.append(ms)
+            consultas = n if consultas is None else consultas
+        resultado = {'ms': round(statistics.median(tiempos), 1), 'consultas': consultas}
+        if memoria:
+            resultado['memoria_kb'] = round(_ejecutar(caso_, ctx, con_memoria=True)[2] / 1024)
+        return resultado
+    except ErrorDeCaso as e:
+        return {'error': str(e)}
+    except Exception as e:
+        return {'error': f'{type(e).__name__}: {e}'}
+
+
+def ruta_historial():
+    return str(getattr(settings, 'BENCHMARK_HISTORIAL', os.path.join(settings.BASE_DIR, 'benchmarks', 'historial.json')))
+
+
+def cargar_historial(ruta=None):
+    ruta = ruta or ruta_historial()
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'corridas': []}
+
+
+def guardar_corrida(corrida, ruta=None):
+    ruta = ruta or ruta_historial()
+    historial = cargar_historial(ruta)
+    historial['corridas'].append(corrida)
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(historial, f, indent=1, ensure_ascii=False)
+
+
+def nueva_corrida(etiqueta, tamano, semilla, resultados):
+    """Entrada del historial: fecha, revisión de git, motor de BD, tamaño y métricas por caso."""
+    from django.utils import timezone
+
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True,
+        ).stdout.strip()
+    except OSError:
+        revision = ''
+    return {
+        'fecha': timezone.now().isoformat(timespec='seconds'),
+        'revision': revision,
+        'etiqueta': etiqueta,
+        'motor': connection.vendor,
+        'creditos': tamano,
+        'semilla': semilla,
+        'resultados': resultados,
+    }
+
+
+def comparar(resultados, historial, etiqueta, tamano, umbral=None, ventana=5):
+    """
+    Regresiones de ``resultados`` frente a la mediana de las últimas
+    ``ventana`` corridas con la misma etiqueta y tamaño. Retorna una lista de
+    ``(caso, metrica, base, valor)``; ``metrica`` es ``'error'`` si el caso
+    falla y antes no fallaba.
+    """
+    if umbral is None:
+        umbral = getattr(settings, 'BENCHMARK_UMBRAL', 0.25)
+    previas = [
+        c['resultados'] for c in historial['corridas']
+        if c.get('etiqueta') == etiqueta and c.get('creditos') == tamano
+    ][-ventana:]
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anteriores = [p[nombre] for p in previas if nombre in p and 'error' not in p[nombre]]
+        if not anteriores:
+            continue
+        if 'error' in actual:
+            regresiones.append((nombre, 'error', None, actual['error']))
+            continue
+        for metrica in METRICAS:
+            valores = [a[metrica] for a in anteriores if metrica in a]
+            if metrica not in actual or not valores:
+                continue
+            base = statistics.median(valores)
+            if actual[metrica] > base * (1 + umbral) and actual[metrica] - base > HOLGURA[metrica]:
+                regresiones.append((nombre, metrica, base, actual[metrica]))
+    return regresiones
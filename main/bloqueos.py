@@ -0,0 +1,79 @@
+"""
+Bloqueo asesor entre procesos para tareas de una sola ejecución.
+
+En PostgreSQL usa ``pg_try_advisory_lock`` (de sesión: se libera solo si el
+proceso muere). En otros motores (SQLite en desarrollo o en un VPS de un
+solo host) usa ``flock`` sobre un archivo en el directorio temporal; donde
+no existe ``fcntl`` (Windows) no bloquea.
+"""
+import os
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+
+
+class BloqueoOcupado(Exception):
+    """Otro proceso tiene el bloqueo y no se liberó dentro de la espera."""
+
+
+def _clave(nombre):
+    # pg_advisory_lock recibe un bigint; crc32 es estable entre procesos (hash() no)
+    return zlib.crc32(f'creditos:{nombre}'.encode())
+
+
+@contextmanager
+def _bloqueo_postgres(nombre, espera, intervalo):
+    from django.db import connection
+
+    clave = _clave(nombre)
+    limite = time.monotonic() + espera
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [clave])
+            if cursor.fetchone()[0]:
+                break
+            if time.monotonic() >= limite:
+                raise BloqueoOcupado(nombre)
+            time.sleep(intervalo)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [clave])
+
+
+@contextmanager
+def _bloqueo_archivo(nombre, espera, intervalo):
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    limite = time.monotonic() + espera
+    with open(os.path.join(tempfile.gettempdir(), f'creditos-{nombre}.lock'), 'w') as archivo:
+        while True:
+            try:
+                fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= limite:
+                    raise BloqueoOcupado(nombre)
+                time.sleep(intervalo)
+        try:
+            yield
+        finally:
+            fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+def bloqueo_asesor(nombre, espera=600, intervalo=2):
+    """
+    Context manager exclusivo por ``nombre``. Espera hasta ``espera``
+    segundos a que otro proceso lo libere; si no, lanza ``BloqueoOcupado``.
+    """
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        return _bloqueo_postgres(nombre, espera, intervalo)
+    return _bloqueo_archivo(nombre, espera, intervalo)
@@ -0,0 +1,187 @@
+"""
+Búsqueda de clientes por nombres, apellidos, cédula y barrio.
+
+Cada cliente guarda en ``texto_busqueda`` esos campos en minúsculas y sin
+tildes (se recalcula en ``Cliente.save``; ``reindexar_busqueda_clientes``
+lo reconstruye tras cargas masivas). Sobre esa columna:
+
+- PostgreSQL: índice GIN ``gin_trgm_ops`` (pg_trgm), así el ``LIKE '%x%'``
+  de cada palabra usa el índice; la relevancia suma ``similarity()``.
+- SQLite: tabla FTS5 ``main_cliente_fts`` sincronizada por triggers, con
+  búsqueda por prefijo de cada palabra. No se ordena por ``bm25``: como
+  subconsulta correlacionada repite el MATCH por cada fila y una búsqueda
+  amplia pasa de milisegundos a segundos.
+- Otro motor (o sin la tabla FTS): ``LIKE`` sobre la columna normalizada.
+
+Las vistas solo llaman a ``buscar(queryset, q, ruta_cliente)``; ``ruta_cliente``
+es el camino hasta el cliente (``''`` para Cliente, ``'cliente'`` para
+Crédito, ``'credito__cliente'`` para Pago).
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import Func, RawSQL
+
+TABLA_FTS = 'main_cliente_fts'
+CAMPOS_BUSQUEDA = ('nombres', 'apellidos', 'cedula', 'barrio')
+
+_NO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+_fts_disponible = None
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni signos: ``'José  Núñez-Peña'`` -> ``'jose nunez pena'``."""
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(_NO_ALFANUMERICO.sub(' ', texto).split())
+
+
+def texto_busqueda_cliente(cliente):
+    """Valor de ``Cliente.texto_busqueda``."""
+    return normalizar(' '.join(str(getattr(cliente, campo) or '') for campo in CAMPOS_BUSQUEDA))
+
+
+def fts_disponible():
+    """True si la BD es SQLite y existe la tabla FTS5 (la migración la omite si SQLite no trae FTS5)."""
+    global _fts_disponible
+    if connection.vendor != 'sqlite':
+        return False
+    if _fts_disponible is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLA_FTS])
+            _fts_disponible = cursor.fetchone() is not None
+    return _fts_disponible
+
+
+def asegurar_fts(using='default', **kwargs):
+    """
+    Crea (si faltan) la tabla FTS5 y sus triggers en SQLite. Se ejecuta en
+    ``post_migrate``: una migración que reconstruya ``main_cliente`` en
+    SQLite borra los triggers, y aquí se recrean y se reindexa la tabla.
+    """
+    global _fts_disponible
+    from django.db import DatabaseError, connections
+
+    conexion = connections[using]
+    if conexion.vendor != 'sqlite':
+        return
+    with conexion.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE %s", [f'{TABLA_FTS}%'])
+        existentes = {fila[0] for fila in cursor.fetchall()}
+        triggers = {f'{TABLA_FTS}_ai', f'{TABLA_FTS}_ad', f'{TABLA_FTS}_au'}
+        if TABLA_FTS in existentes and triggers <= existentes:
+            return
+        columnas = {c.name for c in conexion.introspection.get_table_description(cursor, 'main_cliente')} \
+            if 'main_cliente' in conexion.introspection.table_names(cursor) else set()
+        if 'texto_busqueda' not in columnas:
+            return
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5("
+                f"texto_busqueda, content='main_cliente', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+            )
+        except DatabaseError:
+            # SQLite compilado sin FTS5: buscar() usa LIKE sobre texto_busqueda
+            _fts_disponible = False
+            return
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ai AFTER INSERT ON main_cliente BEGIN "
+            f"INSERT INTO {TABLA_FTS}(rowid, texto_busqueda) VALUES (new.id, new.texto_busqueda); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ad AFTER DELETE ON main_cliente BEGIN "
+            f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, texto_busqueda) "
+            f"VALUES ('delete', old.id, old.texto_busqueda); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_au AFTER UPDATE OF texto_busqueda ON main_cliente BEGIN "
+            f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, texto_busqueda) "
+            f"VALUES ('delete', old.id, old.texto_busqueda); "
+            f"INSERT INTO {TABLA_FTS}(rowid, texto_busqueda) VALUES (new.id, new.texto_busqueda); END"
+        )
+        cursor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+    _fts_disponible = True
+
+
+def _expresion_fts(palabras):
+    # Cada palabra como frase con prefijo: "juan"* "per"*  (las comillas evitan operadores FTS)
+    return ' '.join(f'"{p}"*' for p in palabras)
+
+
+class _Similitud(Func):
+    function = 'similarity'
+    output_field = FloatField()
+
+
+def _ids_clientes(palabras):
+    """Subconsulta de ids de clientes que contienen todas las palabras."""
+    from .models import Cliente
+
+    if fts_disponible():
+        return RawSQL(f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', [_expresion_fts(palabras)])
+    filtro = Q()
+    for palabra in palabras:
+        filtro &= Q(texto_busqueda__contains=palabra)
+    return Cliente.objects.filter(filtro).values('id')
+
+
+def buscar(queryset, q, ruta_cliente='', extra=None, ordenar=False):
+    """
+    Filtra ``queryset`` por los clientes que coinciden con ``q`` (todas las
+    palabras, sin importar tildes ni mayúsculas; prefijo de cédula incluido).
+    ``extra`` es un ``Q`` adicional que también cuenta como coincidencia
+    (p. ej. ``Q(id=123)``). Con ``ordenar=True`` (solo sobre Cliente) anota
+    ``relevancia`` y ordena por ella: cédula exacta, prefijo de cédula,
+    nombre que empieza por la búsqueda y, en PostgreSQL, la similitud
+    de trigramas.
+    """
+    palabras = normalizar(q).split()
+    if not palabras:
+        return queryset
+
+    campo_id = f'{ruta_cliente}__id' if ruta_cliente else 'id'
+    filtro = Q(**{f'{campo_id}__in': _ids_clientes(palabras)})
+    if extra is not None:
+        filtro |= extra
+    queryset = queryset.filter(filtro)
+    if not ordenar or ruta_cliente:
+        return queryset
+
+    cedula = q.strip()
+    relevancia = Case(
+        When(cedula=cedula, then=Value(300.0)),
+        When(cedula__startswith=cedula, then=Value(200.0)),
+        When(texto_busqueda__startswith=palabras[0], then=Value(100.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    if connection.vendor == 'postgresql':
+        relevancia = relevancia + _Similitud(F('texto_busqueda'), Value(' '.join(palabras))) * 10
+    return queryset.annotate(relevancia=relevancia).order_by('-relevancia', *queryset.query.order_by)
+
+
+def reindexar(lote=2000):
+    """Recalcula ``texto_busqueda`` de todos los clientes (y la tabla FTS). Retorna los actualizados."""
+    from .models import Cliente
+
+    actualizados = 0
+    pendientes = []
+    for cliente in Cliente.objects.only('id', 'texto_busqueda', *CAMPOS_BUSQUEDA).iterator(chunk_size=lote):
+        texto = texto_busqueda_cliente(cliente)
+        if texto != cliente.texto_busqueda:
+            cliente.texto_busqueda = texto
+            pendientes.append(cliente)
+        if len(pendientes) >= lote:
+            Cliente.objects.bulk_update(pendientes, ['texto_busqueda'])
+            actualizados += len(pendientes)
+            pendientes = []
+    if pendientes:
+        Cliente.objects.bulk_update(pendientes, ['texto_busqueda'])
+        actualizados += len(pendientes)
+    if fts_disponible():
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+    return actualizados
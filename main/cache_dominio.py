@@ -0,0 +1,218 @@
+"""
+Caché de las consultas de dominio que se repiten en casi todas las
+peticiones: rol del usuario, cobrador asociado al usuario, cobradores
+activos (filtros de los listados) y barrio → rutas activas (sugerencia de
+cobrador).
+
+Los valores viven en el caché de Django (``CACHES``: archivos compartidos
+por los workers o Redis, ver settings) con claves por base de datos y por
+versión de espacio. Las señales de ``main.signals`` llaman a ``invalidar``
+cuando cambian grupos, usuarios, cobradores o rutas; ``CACHE_DOMINIO_SEGUNDOS``
+acota lo que dura un valor viejo si alguna escritura no pasa por señales
+(``update()``, ``bulk_create``, SQL directo).
+
+Dentro de una transacción que invalidó un espacio, las lecturas de ese
+espacio van directo a la BD hasta que termine (lo leído allí podría
+revertirse) y la invalidación se repite al confirmar, para descartar lo que
+otros procesos hayan cacheado mientras tanto.
+
+``estadisticas()`` da aciertos, fallos y tasa de acierto por espacio,
+sumando todos los workers: cada proceso acumula sus contadores en el mismo
+caché cada ``CACHE_DOMINIO_FLUSH_SEGUNDOS``.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+ESPACIOS = {
+    'rol': 'Rol del usuario',
+    'cobrador_usuario': 'Cobrador activo del usuario',
+    'cobradores_activos': 'Cobradores activos',
+    'rutas_por_barrio': 'Barrio → rutas activas',
+}
+
+_AUSENTE = object()
+_local = threading.local()
+_lock = threading.Lock()
+_contadores = {}           # espacio -> [aciertos, fallos] aún no acumulados en el caché
+_ultimo_flush = [time.monotonic()]
+
+
+def _prefijo():
+    # La BD de tests (u otra DATABASE_URL) no debe leer lo cacheado para la de desarrollo
+    nombre = str(connection.settings_dict.get('NAME', ''))
+    return 'dominio:' + hashlib.md5(nombre.encode()).hexdigest()[:8]
+
+
+def _clave_version(espacio):
+    return f'{_prefijo()}:{espacio}:version'
+
+
+def _version(espacio):
+    clave = _clave_version(espacio)
+    version = cache.get(clave)
+    if version is None:
+        # Marca de tiempo, no 1: si el caché descartó la versión, no se reusan claves viejas
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+
+def _clave(espacio, clave=''):
+    return f'{_prefijo()}:{espacio}:{_version(espacio)}:{clave}'
+
+
+def _sucios():
+    """Espacios invalidados en la transacción en curso de este hilo."""
+    sucios = getattr(_local, 'sucios', None)
+    if sucios and not connection.in_atomic_block:
+        sucios.clear()
+    return sucios or set()
+
+
+def _contar(espacio, acierto):
+    with _lock:
+        contador = _contadores.setdefault(espacio, [0, 0])
+        contador[0 if acierto else 1] += 1
+        if time.monotonic() - _ultimo_flush[0] < getattr(settings, 'CACHE_DOMINIO_FLUSH_SEGUNDOS', 60):
+            return
+    acumular_estadisticas()
+
+
+def _obtener(espacio, clave, calcular):
+    if espacio in _sucios():
+        return calcular()
+    k = _clave(espacio, clave)
+    valor = cache.get(k, _AUSENTE)
+    if valor is not _AUSENTE:
+        _contar(espacio, True)
+        return valor
+    _contar(espacio, False)
+    valor = calcular()
+    cache.set(k, valor, getattr(settings, 'CACHE_DOMINIO_SEGUNDOS', 600))
+    return valor
+
+
+def _invalidar_ahora(espacio, clave=None):
+    if clave is None:
+        cache.set(_clave_version(espacio), time.time_ns(), None)
+    else:
+        cache.delete(_clave(espacio, clave))
+
+
+def invalidar(espacio, clave=None):
+    """Descarta ``clave`` del espacio, o el espacio completo si no se indica."""
+    _invalidar_ahora(espacio, clave)
+    if connection.in_atomic_block:
+        if not hasattr(_local, 'sucios'):
+            _local.sucios = set()
+        _local.sucios.add(espacio)
+        transaction.on_commit(lambda: _invalidar_ahora(espacio, clave))
+
+
+def invalidar_todo():
+    for espacio in ESPACIOS:
+        invalidar(espacio)
+
+
+# ---------------------------------------------------------------------------
+# Lecturas
+# ---------------------------------------------------------------------------
+
+def rol_de_usuario(user):
+    """Grupo de rol del usuario (uno de ``ROLES_SISTEMA``) o ``''`` si no tiene ninguno."""
+    from .autorizacion import ROLES_SISTEMA
+
+    return _obtener(
+        'rol', user.pk,
+        lambda: user.groups.filter(name__in=ROLES_SISTEMA).values_list('name', flat=True).first() or '',
+    )
+
+
+def cobrador_de_usuario(user):
+    """``Cobrador`` activo asociado al usuario, o ``None``."""
+    from .models import Cobrador
+
+    return _obtener('cobrador_usuario', user.pk, lambda: Cobrador.objects.filter(usuario=user, activo=True).first())
+
+
+def cobradores_activos():
+    """Lista de cobradores activos ordenada por nombre (para filtros y selectores)."""
+    from .models import Cobrador
+
+    return _obtener(
+        'cobradores_activos', '',
+        lambda: list(Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos')),
+    )
+
+
+def rutas_por_barrio():
+    """``{barrio en minúsculas: [ids de rutas activas que lo incluyen, por nombre]}``."""
+    from .models import Ruta
+
+    def calcular():
+        mapa = {}
+        for ruta in Ruta.objects.filter(activa=True).only('id', 'nombre', 'barrios').order_by('nombre', 'id'):
+            for barrio in ruta.get_barrios_lista():
+                ids = mapa.setdefault(barrio.lower(), [])
+                if ruta.id not in ids:
+                    ids.append(ruta.id)
+        return mapa
+
+    return _obtener('rutas_por_barrio', '', calcular)
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+def _clave_metrica(espacio, campo):
+    return f'{_prefijo()}:metricas:{espacio}:{campo}'
+
+
+def acumular_estadisticas():
+    """Suma los contadores de este proceso a los del caché compartido."""
+    with _lock:
+        pendientes = {e: c for e, c in _contadores.items() if any(c)}
+        _contadores.clear()
+        _ultimo_flush[0] = time.monotonic()
+    for espacio, (aciertos, fallos) in pendientes.items():
+        for campo, n in (('aciertos', aciertos), ('fallos', fallos)):
+            if not n:
+                continue
+            clave = _clave_metrica(espacio, campo)
+            if not cache.add(clave, n, None):
+                try:
+                    cache.incr(clave, n)
+                except ValueError:
+                    cache.set(clave, n, None)
+
+
+def estadisticas():
+    """Por espacio: ``{'descripcion', 'aciertos', 'fallos', 'tasa'}`` (``tasa`` en %, ``None`` sin lecturas)."""
+    acumular_estadisticas()
+    claves = {(e, c): _clave_metrica(e, c) for e in ESPACIOS for c in ('aciertos', 'fallos')}
+    valores = cache.get_many(list(claves.values()))
+    filas = []
+    for espacio, descripcion in ESPACIOS.items():
+        aciertos = valores.get(claves[(espacio, 'aciertos')], 0)
+        fallos = valores.get(claves[(espacio, 'fallos')], 0)
+        total = aciertos + fallos
+        filas.append({
+            'espacio': espacio,
+            'descripcion': descripcion,
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa': round(100 * aciertos / total, 1) if total else None,
+        })
+    return filas
+
+
+def reiniciar_estadisticas():
+    with _lock:
+        _contadores.clear()
+    cache.delete_many([_clave_metrica(e, c) for e in ESPACIOS for c in ('aciertos', 'fallos')])
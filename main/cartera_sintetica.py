@@ -0,0 +1,411 @@
+"""
+Cartera sintética para pruebas de carga y benchmarks.
+
+``generar_cartera_sintetica`` crea con ``bulk_create`` rutas, cobradores,
+clientes y créditos de todos los ``Credito.TIPOS_PLAZO``, con su cronograma
+(fechas de ``generar_cronograma_fechas``), pagos y meses de historial de
+``TareaCobro``. Todo sale de un ``random.Random(semilla)`` y de la fecha
+``hoy``: la misma semilla sobre una BD vacía produce la misma cartera.
+
+Cada crédito sigue un perfil de pago que fija su mora a la fecha ``hoy``:
+
+- ``puntual``: paga casi siempre el día del vencimiento (mora 0-3 días).
+- ``atrasado``: paga con 0-20 días de retraso (mora temprana).
+- ``moroso``: dejó de pagar hace 31-90 días (mora alta).
+- ``critico``: dejó de pagar hace más de 90 días (mora crítica).
+
+Los datos quedan coherentes con ``main.invariantes``: la suma de
+``monto_pagado`` de las cuotas es la de los pagos, ``monto_total`` es
+``valor_cuota × cuotas`` y no hay tareas abiertas sobre cuotas pagadas.
+Los clientes se marcan con un correo ``@sintetica.invalid`` para poder
+borrarlos con ``borrar_cartera_sintetica``.
+"""
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+DOMINIO_CORREO = 'sintetica.invalid'
+PREFIJO_COBRADOR = 'SINT-COB-'
+
+NOMBRES = ['José', 'María', 'Andrés', 'Lucía', 'Óscar', 'Ángela', 'Julián', 'Sofía', 'Camilo', 'Valentina',
+           'Sebastián', 'Natalia', 'Iván', 'Mónica', 'Hernán', 'Daniela', 'Ramón', 'Paula', 'Germán', 'Inés']
+APELLIDOS = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'Pérez', 'Sánchez', 'Ramírez', 'Muñoz', 'Díaz', 'Peña',
+             'Castaño', 'Cárdenas', 'Giraldo', 'Ospina', 'Zuluaga', 'Agudelo', 'Suárez', 'Nuñez', 'Ríos', 'Vélez']
+ZONAS = ['Norte', 'Sur', 'Oriente', 'Occidente', 'Centro']
+
+# Participación de cada plazo en la cartera y cuotas habituales de cada uno
+PLAZOS = {
+    'DIARIO': (0.45, (20, 24, 30, 40, 45, 60)),
+    'SEMANAL': (0.25, (8, 10, 12, 16, 20, 24)),
+    'QUINCENAL': (0.15, (4, 6, 8, 10, 12)),
+    'MENSUAL': (0.15, (3, 4, 6, 9, 12)),
+}
+DIAS_POR_CUOTA = {'DIARIO': 1, 'SEMANAL': 7, 'QUINCENAL': 15, 'MENSUAL': 30}
+PERFILES = {'puntual': 0.62, 'atrasado': 0.20, 'moroso': 0.12, 'critico': 0.06}
+PROPORCION_SOLICITADOS = 0.03
+ESTADOS_SIN_PAGO = ['NO_ESTABA', 'NO_PUDO_PAGAR', 'NO_ENCONTRADO', 'REPROGRAMADO']
+PESOS_SIN_PAGO = [0.4, 0.35, 0.1, 0.15]
+
+
+@contextmanager
+def _fechas_explicitas(*campos):
+    """Desactiva ``auto_now_add`` en ``campos`` para que ``bulk_create`` respete las fechas históricas."""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+def _prioridad(dias_mora):
+    # Mismos cortes que TareaCobro.generar_tareas_diarias
+    if dias_mora > 15:
+        return 'ALTA'
+    if dias_mora > 5:
+        return 'MEDIA'
+    return 'BAJA'
+
+
+def _estado_mora(dias):
+    # Mismos cortes que Credito.calcular_mora
+    if dias <= 0:
+        return 'AL_DIA'
+    if dias <= 30:
+        return 'MORA_TEMPRANA'
+    if dias <= 90:
+        return 'MORA_ALTA'
+    return 'MORA_CRITICA'
+
+
+class _Generador:
+    def __init__(self, semilla, hoy, dias_historia, dias_tareas, batch):
+        self.rnd = random.Random(semilla)
+        self.hoy = hoy
+        self.dias_historia = dias_historia
+        self.inicio_tareas = hoy - timedelta(days=dias_tareas)
+        self.batch = batch
+        self._calculos = {}
+        self._fechas = {}
+        self.conteo = Counter()
+        self.mora = Counter()
+
+    def momento(self, dia):
+        """Fecha y hora (08:00-17:59) de ``dia`` en la zona del proyecto."""
+        return timezone.make_aware(datetime.combine(dia, dt_time(self.rnd.randint(8, 17), self.rnd.randint(0, 59))))
+
+    def calculo(self, monto, tasa, cuotas, tipo):
+        clave = (monto, tasa, cuotas, tipo)
+        if clave not in self._calculos:
+            from .creditos_utils import calcular_credito_informal, calcular_plazo_en_meses, generar_descripcion_credito
+
+            resultado = calcular_credito_informal(monto, tasa, cuotas, tipo)
+            valor_cuota = Decimal(str(resultado['calculos']['valor_cuota'])).quantize(Decimal('0.01'), ROUND_DOWN)
+            self._calculos[clave] = {
+                'valor_cuota': valor_cuota,
+                'monto_total': valor_cuota * cuotas,
+                'total_interes': valor_cuota * cuotas - monto,
+                'plazo_meses': round(calcular_plazo_en_meses(cuotas, tipo), 1),
+                'descripcion_pago': generar_descripcion_credito(resultado),
+            }
+        return self._calculos[clave]
+
+    def fechas(self, cuotas, tipo, inicio):
+        clave = (cuotas, tipo, inicio)
+        if clave not in self._fechas:
+            from .creditos_utils import generar_cronograma_fechas
+
+            self._fechas[clave] = [c['fecha_objeto'] for c in generar_cronograma_fechas(cuotas, tipo, inicio)]
+        return self._fechas[clave]
+
+    def plan_pagos(self, fechas, perfil, valor_cuota):
+        """Lista ``(monto_pagado, fecha_pago)`` por cuota según el perfil (``(0, None)`` si no pagó)."""
+        rnd, hoy = self.rnd, self.hoy
+        corte = None
+        if perfil == 'moroso':
+            corte = hoy - timedelta(days=rnd.randint(31, 90))
+        elif perfil == 'critico':
+            corte = hoy - timedelta(days=rnd.randint(91, 240))
+        plan = []
+        abono_hecho = False
+        for fecha in fechas:
+            if fecha >= hoy:
+                plan.append((Decimal('0'), None))
+                continue
+            if perfil == 'puntual':
+                retraso = 0 if rnd.random() < 0.85 else rnd.randint(1, 3)
+            elif perfil == 'atrasado':
+                retraso = rnd.randint(0, 20)
+            else:
+                retraso = rnd.randint(0, 5)
+            pago = fecha + timedelta(days=retraso)
+            if pago < hoy and (corte is None or pago < corte):
+                plan.append((valor_cuota, pago))
+            elif not abono_hecho and rnd.random() < 0.3:
+                # Abono parcial a la primera cuota que quedó sin pagar
+                abono_hecho = True
+                abono = (valor_cuota * Decimal(rnd.choice(('0.3', '0.5')))).quantize(Decimal('0.01'))
+                plan.append((abono, min(fecha, hoy - timedelta(days=1))))
+            else:
+                plan.append((Decimal('0'), None))
+        return plan
+
+
+def _crear_estructura(gen, n_rutas, n_cobradores):
+    from . import cache_dominio
+    from .models import Cobrador, Ruta
+
+    rnd = gen.rnd
+    existentes = Cobrador.objects.filter(numero_documento__startswith=PREFIJO_COBRADOR).count()
+    rutas = Ruta.objects.bulk_create([
+        Ruta(
+            nombre=f'Sintética {existentes + i + 1:03d}',
+            zona=ZONAS[i % len(ZONAS)],
+            barrios=', '.join(f'Barrio S{existentes + i + 1}-{j}' for j in range(1, rnd.randint(3, 6) + 1)),
+        )
+        for i in range(n_rutas)
+    ])
+    cobradores = Cobrador.objects.bulk_create([
+        Cobrador(
+            nombres=rnd.choice(NOMBRES),
+            apellidos=f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}',
+            numero_documento=f'{PREFIJO_COBRADOR}{existentes + i + 1:05d}',
+            celular='3000000000',
+            direccion='Sintética',
+            fecha_ingreso=gen.hoy - timedelta(days=rnd.randint(200, 900)),
+            meta_diaria=Decimal(rnd.choice((300000, 500000, 800000))),
+        )
+        for i in range(n_cobradores)
+    ])
+    # Cada ruta tiene al menos un cobrador; algunos cobradores cubren dos rutas
+    por_ruta = defaultdict(list)
+    enlaces = []
+    for i, cobrador in enumerate(cobradores):
+        asignadas = {rutas[i % n_rutas]}
+        if rnd.random() < 0.3:
+            asignadas.add(rnd.choice(rutas))
+        for ruta in asignadas:
+            por_ruta[ruta.pk].append(cobrador)
+            enlaces.append(Cobrador.rutas.through(cobrador_id=cobrador.pk, ruta_id=ruta.pk))
+    Cobrador.rutas.through.objects.bulk_create(enlaces)
+    # bulk_create no dispara las señales que invalidan el caché de dominio
+    cache_dominio.invalidar('cobradores_activos')
+    cache_dominio.invalidar('rutas_por_barrio')
+    gen.conteo.update(rutas=len(rutas), cobradores=len(cobradores))
+    return [(ruta, ruta.get_barrios_lista(), por_ruta[ruta.pk]) for ruta in rutas]
+
+
+def _crear_clientes(gen, n_clientes, rutas):
+    from .busqueda import texto_busqueda_cliente
+    from .models import Cliente
+
+    rnd = gen.rnd
+    base = 8_000_000_000 + Cliente.objects.filter(email__endswith='@' + DOMINIO_CORREO).count()
+    clientes = []
+    with _fechas_explicitas(Cliente._meta.get_field('fecha_registro')):
+        for inicio in range(0, n_clientes, gen.batch):
+            lote = []
+            for i in range(inicio, min(inicio + gen.batch, n_clientes)):
+                ruta = rnd.choice(rutas)
+                cliente = Cliente(
+                    nombres=f'{rnd.choice(NOMBRES)} {rnd.choice(NOMBRES)}',
+                    apellidos=f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}',
+                    cedula=str(base + i),
+                    celular=f'3{rnd.randint(0, 999999999):09d}',
+                    email=f'c{base + i}@{DOMINIO_CORREO}',
+                    direccion=f'Calle {rnd.randint(1, 120)} # {rnd.randint(1, 90)}-{rnd.randint(1, 99)}',
+                    barrio=rnd.choice(ruta[1]),
+                    fecha_registro=gen.momento(gen.hoy - timedelta(days=gen.dias_historia + rnd.randint(1, 60))),
+                )
+                # bulk_create no pasa por save()
+                cliente.texto_busqueda = texto_busqueda_cliente(cliente)
+                cliente.ruta_sintetica = ruta
+                lote.append(cliente)
+            Cliente.objects.bulk_create(lote, batch_size=gen.batch)
+            clientes.extend(lote)
+    gen.conteo['clientes'] = len(clientes)
+    return clientes
+
+
+def _crear_lote_creditos(gen, clientes):
+    """Créditos de ``clientes`` con cuotas, pagos y tareas; una transacción por lote."""
+    from .models import CronogramaPago, Credito, Pago, TareaCobro
+
+    rnd, hoy = gen.rnd, gen.hoy
+    ayer = hoy - timedelta(days=1)
+    tipos = list(PLAZOS)
+    pesos_tipo = [PLAZOS[t][0] for t in tipos]
+
+    creditos, planes = [], []
+    for cliente in clientes:
+        tipo = rnd.choices(tipos, pesos_tipo)[0]
+        cuotas = rnd.choice(PLAZOS[tipo][1])
+        monto = Decimal(rnd.randint(4, 60) * 50000)
+        tasa = Decimal(rnd.choice((10, 12, 15, 18, 20)))
+        calculo = gen.calculo(monto, tasa, cuotas, tipo)
+        credito = Credito(
+            cliente=cliente, cobrador=rnd.choice(cliente.ruta_sintetica[2]), monto=monto, tasa_interes=tasa,
+            tipo_plazo=tipo, cantidad_cuotas=cuotas, **calculo,
+        )
+        if rnd.random() < PROPORCION_SOLICITADOS:
+            credito.estado = 'SOLICITADO'
+            credito.fecha_solicitud = gen.momento(hoy - timedelta(days=rnd.randint(0, 10)))
+            creditos.append(credito)
+            planes.append(None)
+            continue
+        # Desembolsos dentro de 1,3 veces el plazo: la mayoría de la cartera sigue vigente
+        plazo_dias = int(cuotas * DIAS_POR_CUOTA[tipo] * 1.3)
+        desembolso = hoy - timedelta(days=rnd.randint(1, max(1, min(gen.dias_historia, plazo_dias))))
+        credito.fecha_solicitud = gen.momento(desembolso - timedelta(days=rnd.randint(1, 3)))
+        credito.fecha_aprobacion = gen.momento(desembolso - timedelta(days=1))
+        credito.fecha_desembolso = gen.momento(desembolso)
+        fechas = gen.fechas(cuotas, tipo, desembolso)
+        perfil = rnd.choices(list(PERFILES), list(PERFILES.values()))[0]
+        plan = gen.plan_pagos(fechas, perfil, calculo['valor_cuota'])
+
+        vencidas = [f for f, (pagado, _) in zip(fechas, plan) if f < hoy and pagado < calculo['valor_cuota']]
+        if all(pagado == calculo['valor_cuota'] for pagado, _ in plan):
+            credito.estado = 'PAGADO'
+        else:
+            credito.estado = 'DESEMBOLSADO'
+            if vencidas:
+                credito.fecha_vencimiento = vencidas[0]
+                credito.dias_mora = (hoy - vencidas[0]).days
+            credito.estado_mora = _estado_mora(credito.dias_mora)
+        gen.mora[credito.estado_mora if credito.estado == 'DESEMBOLSADO' else credito.estado] += 1
+        creditos.append(credito)
+        planes.append((fechas, plan))
+
+    with transaction.atomic():
+        with _fechas_explicitas(Credito._meta.get_field('fecha_solicitud')):
+            Credito.objects.bulk_create(creditos, batch_size=gen.batch)
+
+        cuotas = []
+        for credito, plan in zip(creditos, planes):
+            if plan is None:
+                continue
+            for numero, (fecha, (pagado, fecha_pago)) in enumerate(zip(*plan), start=1):
+                if pagado == credito.valor_cuota:
+                    estado = 'PAGADA'
+                elif pagado:
+                    estado = 'PARCIAL'
+                else:
+                    estado = 'PENDIENTE'
+                cuotas.append(CronogramaPago(
+                    credito=credito, numero_cuota=numero, fecha_vencimiento=fecha, monto_cuota=credito.valor_cuota,
+                    monto_pagado=pagado, estado=estado, fecha_pago=fecha_pago,
+                ))
+        CronogramaPago.objects.bulk_create(cuotas, batch_size=gen.batch)
+
+        pagos, tareas = [], []
+        orden = Counter()
+
+        def tarea(cuota, dia, estado, **extra):
+            cobrador_id = cuota.credito.cobrador_id
+            orden[(cobrador_id, dia)] += 1
+            tareas.append(TareaCobro(
+                cobrador_id=cobrador_id, cuota=cuota, fecha_asignacion=dia, estado=estado,
+                prioridad=_prioridad((dia - cuota.fecha_vencimiento).days), orden_visita=orden[(cobrador_id, dia)],
+                intentos_cobro=0 if estado == 'PENDIENTE' else 1, **extra,
+            ))
+
+        for cuota in cuotas:
+            pago = None
+            if cuota.fecha_pago:
+                pago = Pago(
+                    credito=cuota.credito, cuota=cuota, monto=cuota.monto_pagado, numero_cuota=cuota.numero_cuota,
+                    fecha_pago=gen.momento(cuota.fecha_pago),
+                )
+                pagos.append(pago)
+            vence = cuota.fecha_vencimiento
+            if vence >= hoy:
+                continue
+            # Visita del día del vencimiento (dentro de la ventana de historial de tareas)
+            if vence >= gen.inicio_tareas:
+                if pago and cuota.fecha_pago == vence:
+                    tarea(cuota, vence, 'COBRADO', monto_cobrado=pago.monto, fecha_visita=pago.fecha_pago)
+                elif vence == ayer and cuota.estado != 'PAGADA':
+                    tarea(cuota, vence, 'PENDIENTE')
+                elif cuota.estado == 'PAGADA':
+                    # Al pagarse la cuota, la app cancela sus tareas abiertas
+                    tarea(cuota, vence, 'CANCELADO', fecha_visita=gen.momento(vence),
+                          observaciones='Cancelada automáticamente: cuota ya pagada.')
+                else:
+                    estado = rnd.choices(ESTADOS_SIN_PAGO, PESOS_SIN_PAGO)[0]
+                    extra = {'fecha_visita': gen.momento(vence)}
+                    if estado == 'REPROGRAMADO':
+                        extra['fecha_reprogramacion'] = vence + timedelta(days=rnd.randint(1, 3))
+                    tarea(cuota, vence, estado, **extra)
+            # Cobro posterior al vencimiento
+            if pago and cuota.fecha_pago != vence and gen.inicio_tareas <= cuota.fecha_pago < hoy:
+                tarea(cuota, cuota.fecha_pago, 'COBRADO', monto_cobrado=pago.monto, fecha_visita=pago.fecha_pago)
+            # Lo que sigue sin pagar estaba en la agenda de ayer (arrastre de generar_tareas_diarias)
+            if cuota.estado != 'PAGADA' and vence != ayer and cuota.fecha_pago != ayer:
+                tarea(cuota, ayer, 'PENDIENTE')
+
+        with _fechas_explicitas(Pago._meta.get_field('fecha_pago')):
+            Pago.objects.bulk_create(pagos, batch_size=gen.batch)
+        TareaCobro.objects.bulk_create(tareas, batch_size=gen.batch)
+
+    gen.conteo.update(creditos=len(creditos), cuotas=len(cuotas), pagos=len(pagos), tareas=len(tareas))
+
+
+def generar_cartera_sintetica(creditos, clientes=None, cobradores=None, rutas=None, semilla=42, hoy=None,
+                              meses=8, meses_tareas=2, lote=2000, batch=1000, progreso=None):
+    """
+    Crea una cartera sintética de ``creditos`` créditos y retorna un dict con
+    lo creado por tabla, la distribución de mora y los segundos empleados.
+
+    Por defecto hay un cliente por crédito (con ``clientes`` menor, algunos
+    clientes tienen varios), un cobrador por cada 400 créditos (mínimo 3) y
+    una ruta por cobrador. Los desembolsos se reparten en los últimos
+    ``meses`` y las tareas cubren los últimos ``meses_tareas``. Los créditos
+    se crean por lotes de ``lote`` (una transacción cada uno); ``progreso``
+    se llama tras cada lote con el conteo acumulado.
+    """
+    hoy = hoy or date.today()
+    clientes = clientes or creditos
+    cobradores = cobradores or max(3, creditos // 400)
+    rutas = rutas or cobradores
+    gen = _Generador(semilla, hoy, dias_historia=meses * 30, dias_tareas=meses_tareas * 30, batch=batch)
+
+    t0 = time.perf_counter()
+    with transaction.atomic():
+        estructura = _crear_estructura(gen, rutas, cobradores)
+        lista_clientes = _crear_clientes(gen, clientes, estructura)
+    for inicio in range(0, creditos, lote):
+        _crear_lote_creditos(gen, [lista_clientes[i % clientes] for i in range(inicio, min(inicio + lote, creditos))])
+        if progreso:
+            progreso(dict(gen.conteo))
+
+    return {
+        'semilla': semilla,
+        'hoy': hoy.isoformat(),
+        'creados': dict(gen.conteo),
+        'mora': dict(gen.mora),
+        'segundos': round(time.perf_counter() - t0, 1),
+    }
+
+
+def borrar_cartera_sintetica():
+    """Borra la cartera sintética (en cascada créditos, cuotas, pagos y tareas); retorna filas por modelo."""
+    from .models import Cliente, Cobrador, Ruta
+
+    borrados = Counter()
+    with transaction.atomic():
+        cobradores = Cobrador.objects.filter(numero_documento__startswith=PREFIJO_COBRADOR)
+        rutas = list(Ruta.objects.filter(cobradores__in=cobradores).values_list('pk', flat=True).distinct())
+        for consulta in (
+            Cliente.objects.filter(email__endswith='@' + DOMINIO_CORREO),
+            Ruta.objects.filter(pk__in=rutas),
+            cobradores,
+        ):
+            borrados.update(consulta.delete()[1])
+    return {modelo.split('.')[-1]: n for modelo, n in borrados.items() if n}
@@ -0,0 +1,451 @@
+"""
+Vistas de gestión de cartera: resumen, cartera vencida, clientes en mora y exportación.
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from .models import Cliente, Credito, Pago
+from .paginacion import PARAMETRO_CURSOR, paginar_keyset
+from . import cache_dominio
+from .views import _forbidden_operacion, _usuario_admin_operativo
+
+
+# Reportes de recaudación por cobrador
+# ========================================
+# VISTAS PARA GESTIÓN DE CARTERA
+# ========================================
+
+@login_required
+def gestion_cartera(request):
+    """Vista principal de gestión de cartera - Calcula datos reales"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, timedelta
+    from django.db.models import Sum, Count, Avg
+    from decimal import Decimal
+    
+    hoy = date.today()
+    
+    # ===== CALCULAR MÉTRICAS REALES DESDE LA BASE DE DATOS =====
+    
+    # Todos los créditos activos
+    creditos_activos = Credito.objects.filter(estado__in=['DESEMBOLSADO', 'VENCIDO']).with_saldos()
+    
+    # Cartera total (suma de saldos pendientes)
+    cartera_total = sum([credito.saldo_pendiente() for credito in creditos_activos]) or Decimal('0')
+    cartera_total = Decimal(str(cartera_total))
+    
+    # Créditos por estado
+    creditos_al_dia = creditos_activos.filter(dias_mora=0)
+    creditos_en_mora = creditos_activos.filter(dias_mora__gt=0)
+    
+    # Cartera al día y vencida
+    cartera_al_dia_monto = sum([credito.saldo_pendiente() for credito in creditos_al_dia]) or Decimal('0')
+    cartera_vencida_monto = sum([credito.saldo_pendiente() for credito in creditos_en_mora]) or Decimal('0')
+    
+    cartera_al_dia_monto = Decimal(str(cartera_al_dia_monto))
+    cartera_vencida_monto = Decimal(str(cartera_vencida_monto))
+    
+    # Porcentaje de cartera vencida
+    porcentaje_cartera_vencida = float(cartera_vencida_monto / cartera_total * 100) if cartera_total > 0 else 0
+    
+    # Créditos por rango de mora
+    creditos_mora_temprana = creditos_activos.filter(dias_mora__range=(1, 30))
+    creditos_mora_alta = creditos_activos.filter(dias_mora__range=(31, 90))
+    creditos_mora_critica = creditos_activos.filter(dias_mora__gt=90)
+    
+    # Pagos del día
+    pagos_del_dia = Pago.objects.filter(fecha_pago__date=hoy)
+    monto_pagos_del_dia = pagos_del_dia.aggregate(total=Sum('monto'))['total'] or Decimal('0')
+    
+    # Meta diaria (ejemplo: 5% de la cartera total)
+    meta_cobranza_diaria = cartera_total * Decimal('0.05')
+    porcentaje_cumplimiento_meta = float(monto_pagos_del_dia / meta_cobranza_diaria * 100) if meta_cobranza_diaria > 0 else 0
+    
+    # Días de mora promedio
+    dias_mora_promedio = creditos_en_mora.aggregate(promedio=Avg('dias_mora'))['promedio'] or 0
+    
+    # Crear objeto con datos reales
+    analisis_hoy = type('AnalisisBasico', (), {
+        'cartera_total': float(cartera_total),
+        'cartera_al_dia': float(cartera_al_dia_monto),
+        'cartera_vencida': float(cartera_vencida_monto),
+        'porcentaje_cartera_vencida': porcentaje_cartera_vencida,
+        'creditos_al_dia': creditos_al_dia.count(),
+        'creditos_mora_temprana': creditos_mora_temprana.count(),
+        'creditos_mora_alta': creditos_mora_alta.count(),
+        'creditos_mora_critica': creditos_mora_critica.count(),
+        'pagos_del_dia': float(monto_pagos_del_dia),
+        'meta_cobranza_diaria': float(meta_cobranza_diaria),
+        'porcentaje_cumplimiento_meta': porcentaje_cumplimiento_meta,
+        'dias_mora_promedio': float(dias_mora_promedio or 0),
+    })()
+    
+    # Usar las variables ya calculadas arriba (no recalcular)
+    
+    # Créditos más críticos (por días de mora)
+    creditos_criticos = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO'],
+        dias_mora__gt=0
+    ).select_related('cliente', 'cobrador').with_saldos().order_by('-dias_mora')[:10]
+    
+    # Evolución de cartera - lista vacía por ahora para evitar errores
+    analisis_historico = []
+    
+    context = {
+        'analisis_hoy': analisis_hoy,
+        'creditos_al_dia': creditos_al_dia,
+        'creditos_mora_temp': creditos_mora_temprana,
+        'creditos_mora_alta': creditos_mora_alta,
+        'creditos_mora_critica': creditos_mora_critica,
+        'creditos_criticos': creditos_criticos,
+        'analisis_historico': analisis_historico,
+    }
+    
+    return render(request, 'cartera/gestion_cartera.html', context)
+
+
+@login_required
+def resumen_dinero(request):
+    """Resumen del dinero: desembolsado, cobrado, saldo en cartera. Ecuación de conciliación."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from decimal import Decimal
+    from django.db.models import Sum
+
+    # Créditos que alguna vez fueron desembolsados (tienen fecha_desembolso)
+    creditos_desembolsados = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO', 'PAGADO'],
+        fecha_desembolso__isnull=False
+    )
+    total_desembolsado = creditos_desembolsados.aggregate(t=Sum('monto'))['t'] or Decimal('0')
+    total_desembolsado = Decimal(str(total_desembolsado))
+
+    # Total cobrado histórico (todos los pagos)
+    total_cobrado_raw = Pago.objects.aggregate(t=Sum('monto'))['t'] or Decimal('0')
+    total_cobrado = Decimal(str(total_cobrado_raw))
+
+    # Saldo en cartera = suma de saldo_pendiente() de créditos con saldo > 0
+    creditos_con_saldo = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO']
+    ).with_saldos()
+    saldo_cartera = sum(c.saldo_pendiente() for c in creditos_con_saldo)
+    if not isinstance(saldo_cartera, Decimal):
+        saldo_cartera = Decimal(str(saldo_cartera))
+
+    # Ecuación: desembolsado ≈ cobrado + saldo (puede haber pequeña diferencia por redondeos)
+    diferencia = total_desembolsado - (total_cobrado + saldo_cartera)
+    # Tolerancia 1 peso por posibles redondeos
+    cuadra = abs(diferencia) <= Decimal('1')
+    if not isinstance(diferencia, Decimal):
+        diferencia = Decimal(str(diferencia))
+
+    context = {
+        'total_desembolsado': total_desembolsado,
+        'total_cobrado': total_cobrado,
+        'saldo_cartera': saldo_cartera,
+        'diferencia': diferencia,
+        'cuadra': cuadra,
+    }
+    return render(request, 'cartera/resumen_dinero.html', context)
+
+
+@login_required
+def cartera_vencida(request):
+    """Vista de cartera vencida con filtros"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.db.models import Count, Max, Q, Sum
+    
+    # Filtros
+    estado_mora = request.GET.get('estado_mora', '')
+    dias_mora_min = request.GET.get('dias_mora_min', '')
+    cobrador_id = request.GET.get('cobrador_id', '')
+    cliente_id = request.GET.get('cliente_id', '')
+    
+    # Base query
+    creditos_vencidos_list = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO'],
+        dias_mora__gt=0
+    ).select_related('cliente', 'cobrador').with_saldos()
+    
+    # Aplicar filtros
+    if estado_mora:
+        creditos_vencidos_list = creditos_vencidos_list.filter(estado_mora=estado_mora)
+    
+    if dias_mora_min:
+        try:
+            dias_min = int(dias_mora_min)
+            creditos_vencidos_list = creditos_vencidos_list.filter(dias_mora__gte=dias_min)
+        except ValueError:
+            pass
+    
+    if cobrador_id:
+        try:
+            cobrador_id = int(cobrador_id)
+            creditos_vencidos_list = creditos_vencidos_list.filter(cobrador_id=cobrador_id)
+        except ValueError:
+            pass
+    
+    cliente_filtro = None
+    if cliente_id:
+        try:
+            creditos_vencidos_list = creditos_vencidos_list.filter(cliente_id=int(cliente_id))
+            cliente_filtro = Cliente.objects.filter(id=int(cliente_id)).first()
+        except ValueError:
+            pass
+    
+    # Resumen del conjunto filtrado (no solo de la página) en una consulta
+    stats = creditos_vencidos_list.aggregate(
+        total=Count('id'),
+        saldo_total=Sum('saldo_pendiente_anotado'),
+        dias_mora_max=Max('dias_mora'),
+    )
+    
+    # Ordenar por días de mora descendente; paginación por cursor sobre (dias_mora, id)
+    per_page_str = request.GET.get('per_page', '10').strip()
+    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
+    creditos_vencidos = paginar_keyset(
+        creditos_vencidos_list, request.GET.get(PARAMETRO_CURSOR), per_page,
+        ('-dias_mora', '-id'), total=stats['total'],
+    )
+    
+    # Para los filtros en el template
+    cobradores = cache_dominio.cobradores_activos()
+    
+    context = {
+        'creditos_vencidos': creditos_vencidos,
+        'cobradores': cobradores,
+        'estado_mora': estado_mora,
+        'dias_mora_min': dias_mora_min,
+        'cobrador_id': cobrador_id,
+        'cliente_id': cliente_id,
+        'cliente_filtro': cliente_filtro,
+        'per_page': per_page,
+        'total_creditos_vencidos': stats['total'],
+        'saldo_total_vencido': stats['saldo_total'] or 0,
+        'dias_mora_max': stats['dias_mora_max'] or 0,
+    }
+    
+    return render(request, 'cartera/cartera_vencida.html', context)
+
+
+@login_required
+def clientes_en_mora(request):
+    """Listado de clientes que tienen al menos un crédito en mora (agrupado por cliente)."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from collections import defaultdict
+    from decimal import Decimal
+
+    # Filtros (mismos que cartera_vencida)
+    estado_mora = request.GET.get('estado_mora', '')
+    dias_mora_min = request.GET.get('dias_mora_min', '')
+    cobrador_id = request.GET.get('cobrador_id', '')
+
+    creditos_mora = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO'],
+        dias_mora__gt=0
+    ).select_related('cliente', 'cobrador').with_saldos()
+
+    if estado_mora:
+        creditos_mora = creditos_mora.filter(estado_mora=estado_mora)
+    if dias_mora_min:
+        try:
+            creditos_mora = creditos_mora.filter(dias_mora__gte=int(dias_mora_min))
+        except ValueError:
+            pass
+    if cobrador_id:
+        try:
+            creditos_mora = creditos_mora.filter(cobrador_id=int(cobrador_id))
+        except ValueError:
+            pass
+
+    creditos_mora = creditos_mora.order_by('cliente__apellidos', 'cliente__nombres', '-dias_mora')
+
+    # Agrupar por cliente
+    por_cliente = defaultdict(lambda: {'cliente': None, 'creditos': [], 'saldo_total': Decimal('0'), 'max_dias_mora': 0})
+    for c in creditos_mora:
+        por_cliente[c.cliente_id]['cliente'] = c.cliente
+        por_cliente[c.cliente_id]['creditos'].append(c)
+        por_cliente[c.cliente_id]['saldo_total'] += c.saldo_pendiente()
+        por_cliente[c.cliente_id]['max_dias_mora'] = max(
+            por_cliente[c.cliente_id]['max_dias_mora'],
+            c.dias_mora or 0
+        )
+
+    # Lista ordenada por días de mora (mayor primero)
+    lista_clientes = sorted(
+        por_cliente.values(),
+        key=lambda x: (-x['max_dias_mora'], x['cliente'].apellidos or '', x['cliente'].nombres or '')
+    )
+
+    cobradores = cache_dominio.cobradores_activos()
+
+    context = {
+        'lista_clientes': lista_clientes,
+        'cobradores': cobradores,
+        'estado_mora': estado_mora,
+        'dias_mora_min': dias_mora_min,
+        'cobrador_id': cobrador_id,
+        'total_clientes': len(lista_clientes),
+    }
+    return render(request, 'cartera/clientes_en_mora.html', context)
+
+@login_required
+def actualizar_cartera(request):
+    """Actualiza el estado de cartera de todos los créditos"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method == 'POST':
+        # Actualizar todos los créditos activos
+        creditos_activos = Credito.objects.filter(estado__in=['DESEMBOLSADO', 'VENCIDO'])
+        cantidad_actualizados = 0
+        
+        for credito in creditos_activos:
+            credito.actualizar_estado_cartera()
+            cantidad_actualizados += 1
+        
+        # Generar nuevo análisis
+        from .models import CarteraAnalisis
+        CarteraAnalisis.generar_analisis_diario()
+        
+        messages.success(request, f'Se actualizó el estado de cartera de {cantidad_actualizados} créditos.')
+    
+    return redirect('gestion_cartera')
+
+@login_required
+def exportar_cartera_excel(request):
+    """Exporta la cartera vencida a un archivo Excel"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.http import HttpResponse
+    from django.db.models import Q
+    import pandas as pd
+    from datetime import datetime
+    import io
+    
+    # Aplicar los mismos filtros que en cartera_vencida
+    estado_mora = request.GET.get('estado_mora', '')
+    dias_mora_min = request.GET.get('dias_mora_min', '')
+    cobrador_id = request.GET.get('cobrador_id', '')
+    
+    # Base query
+    creditos_vencidos = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO'],
+        dias_mora__gt=0
+    ).select_related('cliente', 'cobrador').with_saldos()
+    
+    # Aplicar filtros
+    if estado_mora:
+        creditos_vencidos = creditos_vencidos.filter(estado_mora=estado_mora)
+    
+    if dias_mora_min:
+        try:
+            dias_min = int(dias_mora_min)
+            creditos_vencidos = creditos_vencidos.filter(dias_mora__gte=dias_min)
+        except ValueError:
+            pass
+    
+    if cobrador_id:
+        try:
+            cobrador_id = int(cobrador_id)
+            creditos_vencidos = creditos_vencidos.filter(cobrador_id=cobrador_id)
+        except ValueError:
+            pass
+    
+    # Ordenar por días de mora descendente
+    creditos_vencidos = creditos_vencidos.order_by('-dias_mora')
+    
+    # Preparar datos para Excel
+    data = []
+    for credito in creditos_vencidos:
+        data.append({
+            'ID Crédito': credito.id,
+            'Cliente': credito.cliente.nombre_completo,
+            'Cédula': credito.cliente.cedula,
+            'Teléfono': credito.cliente.celular,
+            'Dirección': credito.cliente.direccion,
+            'Barrio': credito.cliente.barrio,
+            'Monto Original': float(credito.monto),
+            'Monto Total': float(credito.monto_total) if credito.monto_total else float(credito.monto),
+            'Saldo Pendiente': float(credito.saldo_pendiente()),
+            'Total Pagado': float(credito.total_pagado()),
+            'Días Mora': credito.dias_mora,
+            'Estado Mora': credito.get_estado_mora_display(),
+            'Interés Moratorio': float(credito.interes_moratorio),
+            'Tasa Mora (%)': float(credito.tasa_mora),
+            'Tipo Plazo': credito.get_tipo_plazo_display(),
+            'Cantidad Cuotas': credito.cantidad_cuotas,
+            'Cobrador': credito.cobrador.nombre_completo if credito.cobrador else 'Sin asignar',
+            'Teléfono Cobrador': credito.cobrador.celular if credito.cobrador else '',
+            'Fecha Desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else '',
+            'Estado Crédito': credito.get_estado_display()
+        })
+    
+    # Crear DataFrame
+    df = pd.DataFrame(data)
+    
+    # Crear archivo Excel
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # Hoja principal con datos
+        df.to_excel(writer, sheet_name='Cartera Vencida', index=False)
+        
+        # Obtener la hoja para formatear
+        worksheet = writer.sheets['Cartera Vencida']
+        
+        # Ajustar ancho de columnas
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                if cell.value:
+                    max_length = max(max_length, len(str(cell.value)))
+            adjusted_width = min(max_length + 2, 50)
+            worksheet.column_dimensions[column_letter].width = adjusted_width
+        
+        # Agregar hoja de resúmenes
+        if data:
+            resumen_data = []
+            total_creditos = len(data)
+            total_saldo = sum([item['Saldo Pendiente'] for item in data])
+            total_intereses = sum([item['Interés Moratorio'] for item in data])
+            mora_promedio = sum([item['Días Mora'] for item in data]) / total_creditos if total_creditos > 0 else 0
+            
+            resumen_data.append(['RESUMEN DE CARTERA VENCIDA', ''])
+            resumen_data.append(['Fecha del Reporte', datetime.now().strftime('%d/%m/%Y %H:%M')])
+            resumen_data.append(['', ''])
+            resumen_data.append(['Total Créditos Vencidos', total_creditos])
+            resumen_data.append(['Saldo Total Vencido', f'${total_saldo:,.2f}'])
+            resumen_data.append(['Intereses Moratorios', f'${total_intereses:,.2f}'])
+            resumen_data.append(['Días Mora Promedio', f'{mora_promedio:.1f}'])
+            resumen_data.append(['', ''])
+            
+            # Por estado de mora
+            estados = {}
+            for item in data:
+                estado = item['Estado Mora']
+                if estado not in estados:
+                    estados[estado] = 0
+                estados[estado] += 1
+            
+            resumen_data.append(['DISTRIBUCIÓN POR ESTADO DE MORA', ''])
+            for estado, cantidad in estados.items():
+                resumen_data.append([estado, cantidad])
+            
+            # Crear hoja de resumen
+            df_resumen = pd.DataFrame(resumen_data, columns=['Concepto', 'Valor'])
+            df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
+    
+    output.seek(0)
+    
+    # Preparar respuesta
+    filename = f'cartera_vencida_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
+    response = HttpResponse(
+        output.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    return response
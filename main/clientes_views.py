@@ -0,0 +1,398 @@
+"""
+Vistas de clientes y codeudores: listado, alta/edición, detalle y búsqueda por cédula.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+from django.http import JsonResponse, HttpResponse
+from .models import Cliente, Credito, Codeudor
+from .forms import ClienteForm, CodeudorForm
+from .busqueda import buscar
+from .paginacion import PARAMETRO_CURSOR, paginar_keyset
+from .views import (
+    ROLE_COBRADOR,
+    _forbidden_operacion,
+    _rol_usuario,
+    _usuario_admin_operativo,
+    _usuario_cobrador_activo,
+    _usuario_puede_registrar_cliente_credito,
+)
+
+
+@login_required
+def clientes(request):
+    if not _usuario_puede_registrar_cliente_credito(request.user):
+        return _forbidden_operacion(request)
+    es_admin_operativo = _usuario_admin_operativo(request.user)
+    from django.core.paginator import Paginator
+    from django.db.models import Q
+    
+    # Filtro: activos por defecto; ver_inactivos=1 para ver desactivados
+    ver_inactivos = request.GET.get('ver_inactivos') == '1'
+    activo_filter = False if ver_inactivos else True
+
+    base_queryset = Cliente.objects.filter(activo=activo_filter).select_related('codeudor').order_by('-fecha_registro')
+
+    # Filtro funcional: clientes con/sin crédito activo (no confundir con cliente desactivado)
+    cartera_estado = request.GET.get('cartera_estado', 'todos').strip()
+    if cartera_estado not in ('todos', 'con_credito_activo', 'sin_credito_activo'):
+        cartera_estado = 'todos'
+    credito_activo_subquery = Credito.objects.filter(
+        cliente_id=OuterRef('pk'),
+        estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
+    )
+    base_queryset = base_queryset.annotate(tiene_credito_activo=Exists(credito_activo_subquery))
+    if cartera_estado == 'con_credito_activo':
+        base_queryset = base_queryset.filter(tiene_credito_activo=True)
+    elif cartera_estado == 'sin_credito_activo':
+        base_queryset = base_queryset.filter(tiene_credito_activo=False)
+
+    # Búsqueda en servidor: q (cédula, nombres, apellidos, barrio)
+    q = request.GET.get('q', '').strip()
+    if q:
+        base_queryset = buscar(base_queryset, q, ordenar=True)
+    
+    # Estadísticas sobre el conjunto filtrado (antes de paginar), en una sola consulta
+    stats = base_queryset.aggregate(
+        total=Count('id'),
+        con_codeudor=Count('id', filter=Q(codeudor__isnull=False)),
+    )
+    total_clientes = stats['total']
+    clientes_con_codeudor = stats['con_codeudor']
+    clientes_sin_codeudor = total_clientes - clientes_con_codeudor
+    
+    # Paginación configurable: por cursor sobre (fecha_registro, id); con búsqueda el
+    # orden es por relevancia y se mantiene el paginador por número de página
+    per_page_str = request.GET.get('per_page', '10').strip()
+    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
+    if q:
+        clientes = Paginator(base_queryset, per_page).get_page(request.GET.get('page'))
+    else:
+        clientes = paginar_keyset(
+            base_queryset, request.GET.get(PARAMETRO_CURSOR), per_page,
+            ('-fecha_registro', '-id'), total=total_clientes,
+        )
+    
+    context = {
+        'clientes': clientes,
+        'total_clientes': total_clientes,
+        'clientes_con_codeudor': clientes_con_codeudor,
+        'clientes_sin_codeudor': clientes_sin_codeudor,
+        'q': q,
+        'ver_inactivos': ver_inactivos,
+        'cartera_estado': cartera_estado,
+        'per_page': per_page,
+        'es_admin_operativo': es_admin_operativo,
+    }
+    
+    return render(request, 'clientes.html', context)
+
+
+@login_required
+def exportar_clientes_excel(request):
+    """Exporta el listado de clientes aplicando los mismos filtros de la vista clientes."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+
+    import io
+    import pandas as pd
+
+    ver_inactivos = request.GET.get('ver_inactivos') == '1'
+    activo_filter = False if ver_inactivos else True
+    cartera_estado = request.GET.get('cartera_estado', 'todos').strip()
+    if cartera_estado not in ('todos', 'con_credito_activo', 'sin_credito_activo'):
+        cartera_estado = 'todos'
+    q = request.GET.get('q', '').strip()
+
+    queryset = Cliente.objects.filter(activo=activo_filter).select_related('codeudor').order_by('-fecha_registro')
+    credito_activo_subquery = Credito.objects.filter(
+        cliente_id=OuterRef('pk'),
+        estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
+    )
+    queryset = queryset.annotate(tiene_credito_activo=Exists(credito_activo_subquery))
+    if cartera_estado == 'con_credito_activo':
+        queryset = queryset.filter(tiene_credito_activo=True)
+    elif cartera_estado == 'sin_credito_activo':
+        queryset = queryset.filter(tiene_credito_activo=False)
+
+    if q:
+        queryset = buscar(queryset, q, ordenar=True)
+
+    rows = []
+    for cliente in queryset:
+        # Relación inversa 1-1: sin codeudor, el acceso lanza RelatedObjectDoesNotExist (un AttributeError)
+        codeudor = getattr(cliente, 'codeudor', None)
+        rows.append({
+            'ID': cliente.id,
+            'Estado registro': 'Desactivado' if not cliente.activo else 'Activo',
+            'Estado cartera': 'Con crédito activo' if cliente.tiene_credito_activo else 'Sin crédito activo',
+            'Nombres': cliente.nombres,
+            'Apellidos': cliente.apellidos,
+            'Nombre completo': cliente.nombre_completo,
+            'Cédula': cliente.cedula,
+            'Celular': cliente.celular or '',
+            'Teléfono fijo': cliente.telefono_fijo or '',
+            'Email': cliente.email or '',
+            'Dirección': cliente.direccion or '',
+            'Barrio': cliente.barrio or '',
+            'Fecha registro': cliente.fecha_registro.strftime('%d/%m/%Y %H:%M') if cliente.fecha_registro else '',
+            'Codeudor asignado': 'Sí' if codeudor else 'No',
+            'Nombre codeudor': codeudor.nombre_completo if codeudor else '',
+            'Cédula codeudor': codeudor.cedula if codeudor else '',
+        })
+
+    df = pd.DataFrame(rows)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Clientes', index=False)
+    output.seek(0)
+
+    stamp = timezone.now().strftime('%Y%m%d_%H%M')
+    response = HttpResponse(
+        output.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+    response['Content-Disposition'] = f'attachment; filename="clientes_{stamp}.xlsx"'
+    return response
+
+# CRUD Clientes
+@login_required
+def nuevo_cliente(request):
+    if not _usuario_puede_registrar_cliente_credito(request.user):
+        return _forbidden_operacion(request)
+    if request.method == 'POST':
+        form = ClienteForm(request.POST, request.FILES)
+        if form.is_valid():
+            cliente = form.save()
+            messages.success(request, f'Cliente {cliente.nombre_completo} creado exitosamente')
+            if _rol_usuario(request.user) == ROLE_COBRADOR and _usuario_cobrador_activo(request.user):
+                return redirect(f"{reverse('nuevo_credito')}?cliente_id={cliente.id}")
+            return redirect('detalle_cliente', cliente_id=cliente.id)  # Redirigir al detalle para ver los documentos
+        else:
+            # Mostrar errores de validación
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = ClienteForm()
+    return render(request, 'nuevo_cliente.html', {'form': form})
+
+@login_required
+def editar_cliente(request, cliente_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cliente = get_object_or_404(Cliente, id=cliente_id)
+    if request.method == 'POST':
+        form = ClienteForm(request.POST, request.FILES, instance=cliente)
+        if form.is_valid():
+            cliente_actualizado = form.save()
+            messages.success(request, f'Cliente {cliente_actualizado.nombre_completo} actualizado exitosamente')
+            return redirect('detalle_cliente', cliente_id=cliente.id)
+        else:
+            # Mostrar errores de validación
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = ClienteForm(instance=cliente)
+    return render(request, 'editar_cliente.html', {'form': form, 'cliente': cliente})
+
+@login_required
+def eliminar_cliente(request, cliente_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cliente = get_object_or_404(Cliente, id=cliente_id)
+    if request.method == 'POST':
+        cliente.activo = False
+        cliente.save()
+        messages.success(request, f'Cliente {cliente.nombre_completo} desactivado exitosamente')
+        return redirect('clientes')
+    return render(request, 'confirmar_eliminar_cliente.html', {'cliente': cliente})
+
+@login_required
+def reactivar_cliente(request, cliente_id):
+    """Reactivar un cliente que estaba inactivo."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cliente = get_object_or_404(Cliente, id=cliente_id)
+    if request.method == 'POST':
+        cliente.activo = True
+        cliente.save()
+        messages.success(request, f'Cliente {cliente.nombre_completo} reactivado exitosamente')
+        return redirect('detalle_cliente', cliente_id=cliente.id)
+    # GET: redirigir a lista de inactivos
+    return redirect(reverse('clientes') + '?ver_inactivos=1')
+
+# Vistas para Codeudores
+@login_required
+def detalle_cliente(request, cliente_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cliente = get_object_or_404(Cliente, id=cliente_id)
+    try:
+        codeudor = cliente.codeudor
+    except Codeudor.DoesNotExist:
+        codeudor = None
+    
+    creditos = cliente.credito_set.all().order_by('-fecha_solicitud')
+    creditos_con_pagare = [c for c in creditos if c.tiene_pagare_firmado()]
+    creditos_con_renovacion = [c for c in creditos if c.tiene_documento_renovacion_firmado()]
+    creditos_para_renovacion = [
+        c for c in creditos
+        if c.es_renovacion and c.estado in ('SOLICITADO', 'APROBADO') and not c.tiene_documento_renovacion_firmado()
+    ]
+    
+    context = {
+        'cliente': cliente,
+        'codeudor': codeudor,
+        'creditos': creditos,
+        'creditos_con_pagare': creditos_con_pagare,
+        'creditos_con_renovacion': creditos_con_renovacion,
+        'creditos_para_renovacion': creditos_para_renovacion,
+    }
+    return render(request, 'detalle_cliente.html', context)
+
+
+@login_required
+def nuevo_codeudor(request, cliente_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cliente = get_object_or_404(Cliente, id=cliente_id)
+    
+    # Verificar si ya tiene codeudor
+    try:
+        cliente.codeudor
+        messages.error(request, f'El cliente {cliente.nombre_completo} ya tiene un codeudor asignado')
+        return redirect('detalle_cliente', cliente_id=cliente.id)
+    except Codeudor.DoesNotExist:
+        pass
+    
+    if request.method == 'POST':
+        form = CodeudorForm(request.POST, request.FILES, cliente=cliente)
+        if form.is_valid():
+            codeudor = form.save(commit=False)
+            codeudor.cliente = cliente
+            codeudor.save()
+            messages.success(request, f'Codeudor {codeudor.nombre_completo} creado exitosamente para {cliente.nombre_completo}')
+            return redirect('detalle_cliente', cliente_id=cliente.id)
+    else:
+        form = CodeudorForm(cliente=cliente)
+    
+    return render(request, 'nuevo_codeudor.html', {'form': form, 'cliente': cliente})
+
+@login_required
+def editar_codeudor(request, codeudor_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    codeudor = get_object_or_404(Codeudor, id=codeudor_id)
+    
+    if request.method == 'POST':
+        form = CodeudorForm(request.POST, request.FILES, instance=codeudor)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'Codeudor {codeudor.nombre_completo} actualizado exitosamente')
+            return redirect('detalle_cliente', cliente_id=codeudor.cliente.id)
+    else:
+        form = CodeudorForm(instance=codeudor)
+    
+    return render(request, 'editar_codeudor.html', {'form': form, 'codeudor': codeudor})
+
+@login_required
+def eliminar_codeudor(request, codeudor_id):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    codeudor = get_object_or_404(Codeudor, id=codeudor_id)
+    cliente = codeudor.cliente
+    
+    if request.method == 'POST':
+        codeudor.delete()
+        messages.success(request, f'Codeudor {codeudor.nombre_completo} eliminado exitosamente')
+        return redirect('detalle_cliente', cliente_id=cliente.id)
+    
+    return render(request, 'confirmar_eliminar_codeudor.html', {'codeudor': codeudor})
+
+# API para búsqueda de clientes
+@login_required
+def buscar_cliente(request):
+    """Vista AJAX para buscar cliente por cédula"""
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
+    cedula = request.GET.get('cedula', '').strip()
+    
+    if not cedula:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cédula no proporcionada'
+        })
+    
+    try:
+        cliente = Cliente.objects.get(cedula=cedula, activo=True)
+        
+        # Obtener URL de la foto si existe
+        foto_rostro_url = None
+        if cliente.foto_rostro:
+            foto_rostro_url = cliente.foto_rostro.url
+        
+        return JsonResponse({
+            'success': True,
+            'cliente': {
+                'id': cliente.id,
+                'nombres': cliente.nombres,
+                'apellidos': cliente.apellidos,
+                'cedula': cliente.cedula,
+                'celular': cliente.celular,
+                'direccion': cliente.direccion,
+                'barrio': cliente.barrio,
+                'foto_rostro': foto_rostro_url,
+            }
+        })
+    except Cliente.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
+        })
+
+# Vista para búsqueda AJAX de clientes en formulario de crédito
+@login_required
+def buscar_cliente_credito(request):
+    """Vista AJAX para buscar cliente por cédula en el formulario de crédito"""
+    if not _usuario_puede_registrar_cliente_credito(request.user):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
+    cedula = request.GET.get('cedula', '').strip()
+    
+    if not cedula:
+        return JsonResponse({
+            'success': False,
+            'error': 'Debe proporcionar una cédula'
+        })
+    
+    try:
+        cliente = Cliente.objects.get(cedula=cedula, activo=True)
+        
+        # Preparar URL de la foto (si existe)
+        foto_url = None
+        if cliente.foto_rostro:
+            try:
+                foto_url = cliente.foto_rostro.url
+            except ValueError:
+                foto_url = None
+        
+        return JsonResponse({
+            'success': True,
+            'cliente': {
+                'id': cliente.id,
+                'nombre_completo': cliente.nombre_completo,
+                'cedula': cliente.cedula,
+                'celular': cliente.celular,
+                'direccion': cliente.direccion,
+                'foto_url': foto_url
+            }
+        })
+    except Cliente.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
+        })
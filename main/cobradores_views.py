@@ -0,0 +1,200 @@
+"""
+Vistas de cobradores y rutas.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from .models import Cobrador, Ruta, asignar_total_clientes
+from .views import _forbidden_operacion, _usuario_admin_operativo
+
+
+# ========================================
+# VISTAS PARA COBRADORES Y RUTAS
+# ========================================
+
+# Vista principal del módulo de cobradores
+@login_required
+def cobradores(request):
+    """Lista principal de cobradores"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cobradores = Cobrador.objects.with_carga().order_by('nombres', 'apellidos')
+    
+    # Estadísticas básicas
+    total_cobradores = cobradores.count()
+    cobradores_activos = cobradores.filter(activo=True).count()
+    
+    context = {
+        'cobradores': cobradores,
+        'total_cobradores': total_cobradores,
+        'cobradores_activos': cobradores_activos,
+    }
+    
+    return render(request, 'cobradores/lista_cobradores.html', context)
+
+# CRUD Cobradores
+@login_required
+def nuevo_cobrador(request):
+    """Crear nuevo cobrador"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from .forms import CobradorForm
+    
+    if request.method == 'POST':
+        form = CobradorForm(request.POST)
+        if form.is_valid():
+            cobrador = form.save()
+            messages.success(request, f'Cobrador {cobrador.nombre_completo} creado exitosamente')
+            return redirect('detalle_cobrador', cobrador_id=cobrador.id)
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = CobradorForm()
+    
+    return render(request, 'cobradores/nuevo_cobrador.html', {'form': form})
+
+@login_required
+def detalle_cobrador(request, cobrador_id):
+    """Ver detalle completo de un cobrador"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
+    
+    # Estadísticas del cobrador
+    creditos_asignados = cobrador.creditos_activos().select_related('cliente').with_saldos()
+    monto_por_cobrar_hoy = cobrador.monto_por_cobrar_hoy()
+    creditos_hoy = cobrador.creditos_por_cobrar_hoy()
+    
+    # Rutas asignadas
+    rutas = cobrador.rutas.all()
+    
+    context = {
+        'cobrador': cobrador,
+        'creditos_asignados': creditos_asignados,
+        'monto_por_cobrar_hoy': monto_por_cobrar_hoy,
+        'creditos_hoy': creditos_hoy,
+        'rutas': rutas,
+    }
+    
+    return render(request, 'cobradores/detalle_cobrador.html', context)
+
+@login_required
+def editar_cobrador(request, cobrador_id):
+    """Editar un cobrador existente"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from .forms import CobradorForm
+    
+    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
+    
+    if request.method == 'POST':
+        form = CobradorForm(request.POST, instance=cobrador)
+        if form.is_valid():
+            cobrador_actualizado = form.save()
+            messages.success(request, f'Cobrador {cobrador_actualizado.nombre_completo} actualizado exitosamente')
+            return redirect('detalle_cobrador', cobrador_id=cobrador.id)
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = CobradorForm(instance=cobrador)
+    
+    return render(request, 'cobradores/editar_cobrador.html', {
+        'form': form,
+        'cobrador': cobrador
+    })
+
+# Vista principal del módulo de rutas
+@login_required
+def rutas(request):
+    """Lista principal de rutas"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    rutas = asignar_total_clientes(list(Ruta.objects.with_totales().order_by('nombre')))
+    
+    # Estadísticas básicas (sobre la lista ya cargada)
+    total_rutas = len(rutas)
+    rutas_activas = sum(1 for ruta in rutas if ruta.activa)
+    
+    context = {
+        'rutas': rutas,
+        'total_rutas': total_rutas,
+        'rutas_activas': rutas_activas,
+    }
+    
+    return render(request, 'cobradores/lista_rutas.html', context)
+
+# CRUD Rutas
+@login_required
+def nueva_ruta(request):
+    """Crear nueva ruta"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from .forms import RutaForm
+    
+    if request.method == 'POST':
+        form = RutaForm(request.POST)
+        if form.is_valid():
+            ruta = form.save()
+            messages.success(request, f'Ruta "{ruta.nombre}" creada exitosamente')
+            return redirect('detalle_ruta', ruta_id=ruta.id)
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = RutaForm()
+    
+    return render(request, 'cobradores/nueva_ruta.html', {'form': form})
+
+@login_required
+def detalle_ruta(request, ruta_id):
+    """Ver detalle completo de una ruta"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    ruta = get_object_or_404(Ruta, id=ruta_id)
+    
+    # Estadísticas de la ruta
+    cobradores_asignados = ruta.cobradores.with_carga()
+    total_clientes = ruta.total_clientes()
+    creditos_activos = ruta.total_creditos_activos()
+    
+    context = {
+        'ruta': ruta,
+        'cobradores_asignados': cobradores_asignados,
+        'total_clientes': total_clientes,
+        'creditos_activos': creditos_activos,
+        'barrios_lista': ruta.get_barrios_lista(),
+    }
+    
+    return render(request, 'cobradores/detalle_ruta.html', context)
+
+@login_required
+def editar_ruta(request, ruta_id):
+    """Editar una ruta existente"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from .forms import RutaForm
+    
+    ruta = get_object_or_404(Ruta, id=ruta_id)
+    
+    if request.method == 'POST':
+        form = RutaForm(request.POST, instance=ruta)
+        if form.is_valid():
+            ruta_actualizada = form.save()
+            messages.success(request, f'Ruta "{ruta_actualizada.nombre}" actualizada exitosamente')
+            return redirect('detalle_ruta', ruta_id=ruta.id)
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f'{field}: {error}')
+    else:
+        form = RutaForm(instance=ruta)
+    
+    return render(request, 'cobradores/editar_ruta.html', {
+        'form': form,
+        'ruta': ruta
+    })
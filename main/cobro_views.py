@@ -0,0 +1,1172 @@
+"""
+Cobro diario: gestión del día, agenda y cobro del cobrador, panel de supervisor y cierre de caja.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.utils import timezone
+from django.http import JsonResponse
+from .models import Credito, Pago, CronogramaPago, Cobrador, TareaCobro, TareaCobroLog, CierreCobroDiario
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+from .pagos_views import _recibo_pdf_cacheado
+from .views import (
+    _cancelar_tareas_abiertas_de_cuota,
+    _forbidden_operacion,
+    _resumen_soporte_pago,
+    _usuario_admin_operativo,
+    _usuario_cobrador_activo,
+)
+
+
+# Dashboard de gestión diaria de cobros
+@login_required
+def gestion_diaria_cobros(request):
+    """Dashboard de Control de Cobranza Diaria - Vista Administrador"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    import logging
+    logger = logging.getLogger(__name__)
+    from datetime import date, timedelta
+    from django.db.models import Sum, Count, Q
+    from decimal import Decimal
+    
+    hoy = date.today()
+    
+    # ===== OBTENER TODOS LOS PAGOS DEL DÍA =====
+    pagos_recibidos_hoy = Pago.objects.filter(fecha_pago__date=hoy)
+    monto_recaudado_hoy = pagos_recibidos_hoy.aggregate(total=Sum('monto'))['total'] or Decimal('0')
+    total_pagos_hoy = pagos_recibidos_hoy.count()
+    
+    # ===== LISTA DE CRÉDITOS ACTIVOS PARA GESTIÓN =====
+    # Todos los créditos activos (no se limita solo a los que vencen hoy)
+    creditos_activos = Credito.objects.filter(
+        estado__in=['DESEMBOLSADO', 'VENCIDO']
+    ).select_related('cliente', 'cobrador').with_saldos().order_by('-dias_mora', 'fecha_vencimiento')
+    
+    # Total de la cartera activa (todos los créditos pendientes)
+    try:
+        total_cartera_activa = sum(
+            (credito.saldo_pendiente() if hasattr(credito, 'saldo_pendiente') else 0)
+            for credito in creditos_activos
+        )
+    except Exception as e:
+        logger.warning('Error sumando cartera activa: %s', e)
+        total_cartera_activa = 0
+    
+    # Créditos que requieren gestión urgente (en mora o que vencen hoy)
+    creditos_urgentes = creditos_activos.filter(
+        Q(fecha_vencimiento__lte=hoy, fecha_vencimiento__isnull=False) | Q(dias_mora__gt=0)
+    )
+    
+    # Total a gestionar (créditos urgentes)
+    try:
+        total_a_gestionar = sum(
+            (credito.saldo_pendiente() if hasattr(credito, 'saldo_pendiente') else 0)
+            for credito in creditos_urgentes
+        )
+    except Exception as e:
+        logger.warning('Error sumando total a gestionar: %s', e)
+        total_a_gestionar = 0
+    
+    # Convertir a Decimal
+    total_cartera_activa = Decimal(str(total_cartera_activa)) if total_cartera_activa else Decimal('0')
+    total_a_gestionar = Decimal(str(total_a_gestionar)) if total_a_gestionar else Decimal('0')
+    monto_recaudado_hoy = Decimal(str(monto_recaudado_hoy)) if monto_recaudado_hoy else Decimal('0')
+    
+    # ===== MÉTRICAS PRINCIPALES =====
+    # Cobradores activos
+    cobradores_activos = Cobrador.objects.filter(activo=True).count()
+    
+    # Créditos que han recibido pago hoy
+    creditos_ids_pagados_hoy = set(pagos_recibidos_hoy.values_list('credito_id', flat=True))
+    
+    # Créditos urgentes sin pago hoy
+    creditos_sin_pago = creditos_urgentes.exclude(id__in=creditos_ids_pagados_hoy).count()
+    
+    # Meta diaria (ejemplo: 10% de la cartera activa)
+    meta_diaria = total_cartera_activa * Decimal('0.10')
+    try:
+        porcentaje_meta = float(monto_recaudado_hoy / meta_diaria * 100) if meta_diaria and float(meta_diaria) > 0 else 0
+    except (TypeError, ZeroDivisionError, ValueError):
+        porcentaje_meta = 0
+    
+    # ===== PREPARAR DATOS DE LA TABLA PRINCIPAL (SOLO CRÉDITOS URGENTES) =====
+    # Primer pago de hoy por crédito (mismo orden por id que .first()), en una sola consulta
+    primer_pago_hoy = {}
+    for pago in pagos_recibidos_hoy.order_by('id'):
+        primer_pago_hoy.setdefault(pago.credito_id, pago)
+
+    tareas_cobro = []
+    for credito in creditos_urgentes:
+        try:
+            if getattr(credito, 'cliente', None) is None:
+                continue
+        except Exception:
+            continue
+        # Verificar si ya fue pagado hoy
+        pago_hoy = primer_pago_hoy.get(credito.id)
+        
+        estado_pago = 'PAGADO' if pago_hoy else 'PENDIENTE'
+        monto_pagado = pago_hoy.monto if pago_hoy else 0
+        try:
+            hora_pago = pago_hoy.fecha_pago.time() if pago_hoy and getattr(pago_hoy, 'fecha_pago', None) else None
+        except (AttributeError, ValueError):
+            hora_pago = None
+        
+        # Determinar prioridad (dias_mora puede ser None en datos legacy)
+        dias_mora = getattr(credito, 'dias_mora', 0) or 0
+        if dias_mora > 90:
+            prioridad = 'CRITICA'
+            color_prioridad = 'danger'
+        elif dias_mora > 30:
+            prioridad = 'ALTA'
+            color_prioridad = 'warning'
+        elif dias_mora > 0:
+            prioridad = 'MEDIA'
+            color_prioridad = 'info'
+        else:
+            prioridad = 'NORMAL'
+            color_prioridad = 'success'
+        
+        try:
+            monto_a_cobrar = credito.saldo_pendiente()
+        except Exception:
+            monto_a_cobrar = Decimal('0')
+        
+        tareas_cobro.append({
+            'credito': credito,
+            'cliente': credito.cliente,
+            'cobrador': getattr(credito, 'cobrador', None),
+            'monto_a_cobrar': monto_a_cobrar,
+            'estado_pago': estado_pago,
+            'monto_pagado': monto_pagado,
+            'hora_pago': hora_pago,
+            'prioridad': prioridad,
+            'color_prioridad': color_prioridad,
+            'dias_mora': dias_mora,
+        })
+    
+    # ===== ESTADÍSTICAS POR COBRADOR =====
+    resumen_cobradores = []
+    total_creditos_pendientes_por_cobradores = 0
+    
+    cobradores_con_carga = Cobrador.objects.filter(activo=True).annotate(
+        creditos_cartera=Count('credito', filter=Q(credito__estado__in=['DESEMBOLSADO', 'VENCIDO']))
+    )
+    for cobrador in cobradores_con_carga:
+        # Créditos urgentes asignados a este cobrador
+        creditos_asignados = [t for t in tareas_cobro if t['cobrador'] == cobrador]
+        pagos_cobrador = [t for t in creditos_asignados if t['estado_pago'] == 'PAGADO']
+        pendientes_cobrador = [t for t in creditos_asignados if t['estado_pago'] == 'PENDIENTE']
+        
+        # Contar todos los créditos activos del cobrador (no solo urgentes)
+        todos_creditos_cobrador = cobrador.creditos_cartera
+        
+        monto_asignado = sum([t['monto_a_cobrar'] for t in creditos_asignados])
+        monto_recaudado = sum([t['monto_pagado'] for t in pagos_cobrador])
+        
+        # Convertir a Decimal para evitar errores de tipo
+        monto_asignado = Decimal(str(monto_asignado)) if monto_asignado else Decimal('0')
+        monto_recaudado = Decimal(str(monto_recaudado)) if monto_recaudado else Decimal('0')
+        
+        if monto_asignado > 0 or monto_recaudado > 0 or todos_creditos_cobrador > 0:
+            total_creditos_pendientes_por_cobradores += todos_creditos_cobrador
+            resumen_cobradores.append({
+                'cobrador': cobrador,
+                'creditos_asignados': len(creditos_asignados),  # Solo urgentes
+                'creditos_cobrados': len(pagos_cobrador),
+                'creditos_pendientes': len(pendientes_cobrador),  # Urgentes pendientes
+                'total_creditos_activos': todos_creditos_cobrador,  # Todos los créditos
+                'monto_asignado': monto_asignado,
+                'monto_recaudado': monto_recaudado,
+                'efectividad': float(monto_recaudado / monto_asignado * 100) if monto_asignado > 0 else 0,
+            })
+    
+    # ===== COMPARACIÓN CON DÍA ANTERIOR =====
+    ayer = hoy - timedelta(days=1)
+    monto_ayer = Pago.objects.filter(fecha_pago__date=ayer).aggregate(total=Sum('monto'))['total'] or Decimal('0')
+    monto_ayer = Decimal(str(monto_ayer)) if monto_ayer else Decimal('0')
+    variacion_diaria = float((monto_recaudado_hoy - monto_ayer) / monto_ayer * 100) if monto_ayer > 0 else 0
+    
+    # ===== RECAUDADO HOY POR COBRADOR (real: pesos, cuotas, créditos con pago) =====
+    recaudado_hoy_por_cobrador = []
+    try:
+        pagos_hoy_por_cobrador = {
+            fila['credito__cobrador']: fila
+            for fila in pagos_recibidos_hoy.order_by().values('credito__cobrador').annotate(
+                total=Sum('monto'), cantidad=Count('id'), creditos=Count('credito', distinct=True)
+            )
+        }
+        for cobrador in cobradores_con_carga:
+            totales_hoy = pagos_hoy_por_cobrador.get(cobrador.id, {})
+            monto_hoy = totales_hoy.get('total') or Decimal('0')
+            monto_hoy = Decimal(str(monto_hoy)) if monto_hoy else Decimal('0')
+            cantidad_pagos_hoy = totales_hoy.get('cantidad', 0)
+            creditos_con_pago_hoy = totales_hoy.get('creditos', 0)
+            meta_cobrador = getattr(cobrador, 'meta_diaria', None) or Decimal('0')
+            try:
+                pct_meta = round(float(monto_hoy / meta_cobrador * 100), 0) if meta_cobrador and float(meta_cobrador) > 0 else None
+            except (TypeError, ZeroDivisionError, ValueError):
+                pct_meta = None
+            recaudado_hoy_por_cobrador.append({
+                'cobrador': cobrador,
+                'monto_recaudado_hoy': monto_hoy,
+                'cuotas_cobradas_hoy': cantidad_pagos_hoy,
+                'creditos_con_pago_hoy': creditos_con_pago_hoy,
+                'porcentaje_meta': pct_meta,
+            })
+        recaudado_hoy_por_cobrador.sort(key=lambda x: x['monto_recaudado_hoy'], reverse=True)
+    except Exception as e:
+        logger.exception('Error en recaudado_hoy_por_cobrador: %s', e)
+        recaudado_hoy_por_cobrador = []
+    
+    context = {
+        'fecha_hoy': hoy,
+        # Métricas principales
+        'total_a_cobrar_hoy': total_a_gestionar,  # Ahora muestra solo créditos urgentes
+        'total_cartera_activa': total_cartera_activa,  # Nueva métrica
+        'monto_recaudado_hoy': monto_recaudado_hoy,
+        'cobradores_activos': cobradores_activos,
+        'clientes_pendientes': creditos_sin_pago,
+        'total_pagos_hoy': total_pagos_hoy,
+        'meta_diaria': meta_diaria,
+        'porcentaje_meta': porcentaje_meta,
+        # Tabla principal
+        'tareas_cobro': tareas_cobro,
+        'total_tareas': len(tareas_cobro),
+        # Resumen por cobrador
+        'resumen_cobradores': resumen_cobradores,
+        'total_creditos_por_cobradores': total_creditos_pendientes_por_cobradores,
+        # Comparaciones
+        'monto_ayer': monto_ayer,
+        'variacion_diaria': variacion_diaria,
+        # Recaudado hoy por cobrador (pesos, cuotas, créditos con pago)
+        'recaudado_hoy_por_cobrador': recaudado_hoy_por_cobrador,
+    }
+    
+    return render(request, 'cobradores/gestion_diaria.html', context)
+
+# ========================================
+# SISTEMA DE TAREAS DE COBRO DIARIAS
+# ========================================
+
+@login_required
+def acceso_cobrador(request):
+    """Vista de acceso optimizada para cobradores móviles"""
+    if _usuario_admin_operativo(request.user):
+        return render(request, 'tareas/acceso_cobrador.html')
+    cobrador = _usuario_cobrador_activo(request.user)
+    if cobrador:
+        return redirect('agenda_cobrador_especifico', cobrador_id=cobrador.id)
+    return _forbidden_operacion(request)
+
+@login_required
+def agenda_cobrador(request, cobrador_id=None):
+    """Vista de agenda diaria para cobradores"""
+    from datetime import date, timedelta
+    from django.db.models import Count, Sum
+    from .models import TareaCobro
+
+    es_admin = _usuario_admin_operativo(request.user)
+    cobrador_usuario = _usuario_cobrador_activo(request.user)
+
+    # Reglas de acceso:
+    # - Admin: puede ver selector o cualquier agenda.
+    # - Cobrador: solo su propia agenda, incluso si manipula cobrador_id por URL.
+    if es_admin:
+        if not cobrador_id:
+            cobradores = Cobrador.objects.filter(activo=True)
+            return render(request, 'tareas/selector_cobrador.html', {
+                'cobradores': cobradores
+            })
+        cobrador = get_object_or_404(Cobrador, id=cobrador_id, activo=True)
+    else:
+        if not cobrador_usuario:
+            return _forbidden_operacion(request)
+        if cobrador_id and int(cobrador_id) != cobrador_usuario.id:
+            return _forbidden_operacion(request, 'No tiene permisos para ver la agenda de otro cobrador.')
+        cobrador = cobrador_usuario
+    
+    # Fecha a consultar (por defecto hoy)
+    fecha_str = request.GET.get('fecha')
+    if fecha_str:
+        try:
+            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = date.today()
+    else:
+        fecha = date.today()
+    
+    # Saneo preventivo: cancelar tareas abiertas cuya cuota ya está pagada.
+    cuotas_pagadas_estado = ['PAGADA', 'PAGADO']
+    tareas_huerfanas = TareaCobro.objects.filter(
+        cobrador=cobrador,
+        fecha_asignacion=fecha,
+        estado__in=['PENDIENTE', 'EN_PROCESO', 'NO_ENCONTRADO', 'NO_ESTABA', 'NO_PUDO_PAGAR', 'REPROGRAMADO'],
+        cuota__estado__in=cuotas_pagadas_estado
+    ).select_related('cuota')
+    cuotas_huerfanas_ids = set(tareas_huerfanas.values_list('cuota_id', flat=True))
+    if cuotas_huerfanas_ids:
+        for cuota in CronogramaPago.objects.filter(id__in=cuotas_huerfanas_ids):
+            _cancelar_tareas_abiertas_de_cuota(cuota)
+
+    # Obtener tareas del cobrador para la fecha (sin canceladas)
+    tareas = TareaCobro.objects.filter(
+        cobrador=cobrador,
+        fecha_asignacion=fecha
+    ).exclude(
+        estado='CANCELADO'
+    ).select_related(
+        'cuota__credito__cliente'
+    ).order_by('orden_visita', 'prioridad')
+
+    # Red de seguridad operativa:
+    # Si hoy no hay tareas para el cobrador, intentar generar automáticamente una vez.
+    # La generación usa deduplicación por cuota/fecha, evitando tareas duplicadas.
+    if fecha == date.today() and not tareas.exists():
+        tiene_cuotas_hoy = CronogramaPago.objects.filter(
+            credito__cobrador=cobrador,
+            estado__in=['PENDIENTE', 'PARCIAL'],
+            credito__estado__in=['DESEMBOLSADO', 'VENCIDO'],
+            fecha_vencimiento=fecha
+        ).exists()
+        tiene_reprogramadas_hoy = TareaCobro.objects.filter(
+            cobrador=cobrador,
+            fecha_reprogramacion=fecha
+        ).exists()
+        if tiene_cuotas_hoy or tiene_reprogramadas_hoy:
+            TareaCobro.generar_tareas_diarias(fecha, verbose=False)
+            tareas = TareaCobro.objects.filter(
+                cobrador=cobrador,
+                fecha_asignacion=fecha
+            ).exclude(
+                estado='CANCELADO'
+            ).select_related(
+                'cuota__credito__cliente'
+            ).order_by('orden_visita', 'prioridad')
+            if tareas.exists():
+                messages.info(
+                    request,
+                    'Se generaron automáticamente las tareas del día para evitar omisiones operativas.'
+                )
+    
+    # Estadísticas del día
+    total_tareas = tareas.count()
+    tareas_completadas = tareas.filter(estado='COBRADO').count()
+    monto_total_cobrar = sum(tarea.monto_a_cobrar for tarea in tareas)
+    monto_cobrado = tareas.filter(estado='COBRADO').aggregate(
+        total=Sum('monto_cobrado')
+    )['total'] or 0
+    
+    porcentaje_completado = (tareas_completadas / total_tareas * 100) if total_tareas > 0 else 0
+    
+    # Agrupar tareas por estado para estadísticas
+    tareas_por_estado = tareas.values('estado').annotate(cantidad=Count('id'))
+    estadisticas_estado = {item['estado']: item['cantidad'] for item in tareas_por_estado}
+
+    # Enriquecer tarjetas: total pendiente del cliente en el día (para priorización en móvil)
+    tareas_list = list(tareas)
+    total_cliente_hoy = {}
+    cuotas_cliente_hoy = {}
+    for tarea in tareas_list:
+        if tarea.estado == 'COBRADO':
+            continue
+        saldo_tarea = tarea.monto_a_cobrar
+        if saldo_tarea <= 0:
+            continue
+        cliente_id = tarea.cuota.credito.cliente_id
+        total_cliente_hoy[cliente_id] = total_cliente_hoy.get(cliente_id, 0) + saldo_tarea
+        cuotas_cliente_hoy[cliente_id] = cuotas_cliente_hoy.get(cliente_id, 0) + 1
+
+    for tarea in tareas_list:
+        cliente_id = tarea.cuota.credito.cliente_id
+        tarea.total_cliente_hoy = total_cliente_hoy.get(cliente_id, 0)
+        tarea.cuotas_cliente_hoy = cuotas_cliente_hoy.get(cliente_id, 0)
+    
+    # Fechas para navegación (anterior/siguiente día)
+    fecha_anterior = (fecha - timedelta(days=1)).strftime('%Y-%m-%d')
+    fecha_siguiente = (fecha + timedelta(days=1)).strftime('%Y-%m-%d')
+    es_hoy = (fecha == date.today())
+    
+    # Agrupar visualmente por cliente para evitar doble gestión (parcial + cuota del día).
+    grupos = []
+    tareas_por_cliente = {}
+    for tarea in tareas:
+        cliente_id = tarea.cuota.credito.cliente_id
+        tareas_por_cliente.setdefault(cliente_id, []).append(tarea)
+
+    for _, tareas_cliente in tareas_por_cliente.items():
+        tareas_cliente.sort(key=lambda t: (t.cuota.fecha_vencimiento, t.cuota.numero_cuota))
+        principal = tareas_cliente[0]
+        total_cliente = sum((t.monto_a_cobrar for t in tareas_cliente if t.estado != 'COBRADO'), Decimal('0'))
+        cuotas_pendientes = [t.cuota.numero_cuota for t in tareas_cliente if t.estado != 'COBRADO']
+        if not cuotas_pendientes:
+            cuotas_pendientes = [t.cuota.numero_cuota for t in tareas_cliente]
+        estado_grupo = 'COBRADO' if all(t.estado == 'COBRADO' for t in tareas_cliente) else 'PENDIENTE'
+        color_estado = 'success' if estado_grupo == 'COBRADO' else 'secondary'
+        prioridad_grupo = 'ALTA' if any(t.prioridad == 'ALTA' for t in tareas_cliente) else ('MEDIA' if any(t.prioridad == 'MEDIA' for t in tareas_cliente) else 'BAJA')
+
+        grupos.append({
+            'id': principal.id,
+            'task_ids': [t.id for t in tareas_cliente],
+            'cliente_nombre': principal.cuota.credito.cliente.nombre_completo,
+            'cliente_celular': principal.cuota.credito.cliente.celular,
+            'cliente_direccion': principal.cuota.credito.cliente.direccion,
+            'monto_a_cobrar': total_cliente if total_cliente > 0 else principal.monto_a_cobrar,
+            'cuotas_resumen': ', '.join([str(n) for n in cuotas_pendientes]),
+            'cuota_referencia': cuotas_pendientes[0] if cuotas_pendientes else principal.cuota.numero_cuota,
+            'cuotas_count': len(cuotas_pendientes),
+            'estado': estado_grupo,
+            'estado_display': 'Cobrado' if estado_grupo == 'COBRADO' else 'Pendiente',
+            'color_estado': color_estado,
+            'prioridad': prioridad_grupo,
+            'intentos_cobro': sum((t.intentos_cobro for t in tareas_cliente)),
+            'observaciones': principal.observaciones,
+            'puede_cobrar': any(t.estado != 'COBRADO' for t in tareas_cliente),
+        })
+
+    context = {
+        'cobrador': cobrador,
+        'fecha': fecha,
+        'fecha_anterior': fecha_anterior,
+        'fecha_siguiente': fecha_siguiente,
+        'es_hoy': es_hoy,
+        'tareas': grupos,
+        'total_tareas': total_tareas,
+        'tareas_completadas': tareas_completadas,
+        'monto_total_cobrar': monto_total_cobrar,
+        'monto_cobrado': monto_cobrado,
+        'porcentaje_completado': porcentaje_completado,
+        'estadisticas_estado': estadisticas_estado,
+        'puede_editar': request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == cobrador)
+    }
+    
+    return render(request, 'tareas/agenda_cobrador.html', context)
+
+@login_required
+def procesar_cobro_completo(request, tarea_id):
+    """Vista para procesar cobro completo - MISMA LÓGICA que nuevo_pago"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'})
+    
+    try:
+        tarea = get_object_or_404(TareaCobro, id=tarea_id)
+        
+        # Verificar permisos
+        if not (request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == tarea.cobrador)):
+            return JsonResponse({'success': False, 'error': 'Sin permisos'})
+        
+        # Obtener datos del formulario
+        monto_cobrado = request.POST.get('monto_recibido')
+        observaciones = request.POST.get('observaciones', '')
+        latitud = request.POST.get('latitud')
+        longitud = request.POST.get('longitud')
+        
+        if not monto_cobrado:
+            return JsonResponse({'success': False, 'error': 'Debe especificar el monto cobrado'})
+        
+        # Limpiar el monto de forma más inteligente
+        monto_str = str(monto_cobrado).strip()
+        
+        # Si tiene coma como último separador (formato europeo), rechazar
+        if ',' in monto_str and monto_str.rindex(',') > monto_str.rindex('.') if '.' in monto_str else True:
+            # Verificar si es formato europeo (coma decimal)
+            parts_comma = monto_str.split(',')
+            if len(parts_comma) == 2 and len(parts_comma[1]) <= 2 and '.' not in parts_comma[1]:
+                return JsonResponse({
+                    'success': False, 
+                    'error': f'Use punto (.) como separador decimal, no coma (,). Ejemplo: {monto_str.replace(",", ".")}'
+                })
+        
+        # Limpiar comas de miles y espacios, pero conservar punto decimal
+        monto_limpio = monto_str.replace(' ', '')  # Quitar espacios
+        # Solo quitar comas si están en posición de miles (no al final)
+        if ',' in monto_limpio:
+            # Si hay punto, las comas antes del punto son separadores de miles
+            if '.' in monto_limpio:
+                parte_entera, parte_decimal = monto_limpio.split('.', 1)
+                parte_entera = parte_entera.replace(',', '')
+                monto_limpio = f"{parte_entera}.{parte_decimal}"
+            else:
+                # Si no hay punto, solo quitar comas de miles (no al final)
+                if not monto_limpio.endswith(',') and len(monto_limpio.split(',')[-1]) >= 3:
+                    monto_limpio = monto_limpio.replace(',', '')
+        
+        # Validación directa con Decimal (más preciso)
+        try:
+            from decimal import Decimal, InvalidOperation
+            monto_decimal = Decimal(monto_limpio)
+            
+            if monto_decimal <= Decimal('0'):
+                return JsonResponse({'success': False, 'error': 'El monto debe ser mayor que cero'})
+                
+            # Validar que no sea un monto absurdamente pequeño o grande para pesos colombianos
+            # Permitir montos desde $50 para casos excepcionales (pagos parciales, etc.)
+            if monto_decimal < Decimal('50'):  # Menos de $50 COP
+                return JsonResponse({
+                    'success': False, 
+                    'error': f'El monto ${monto_decimal} parece muy bajo para un pago en pesos colombianos.'
+                })
+            
+            if monto_decimal > Decimal('50000000'):  # Más de $50 millones COP
+                return JsonResponse({
+                    'success': False,
+                    'error': f'El monto ${monto_decimal} parece muy alto. Verifique el valor.'
+                })
+                
+        except (ValueError, InvalidOperation):
+            return JsonResponse({'success': False, 'error': f'Monto inválido: "{monto_cobrado}". Use solo números y punto decimal.'})
+        
+        from decimal import Decimal
+        
+        # Cobro agrupado por cliente/día: aplicar primero a cuotas más antiguas.
+        tareas_cliente = TareaCobro.objects.filter(
+            cobrador=tarea.cobrador,
+            fecha_asignacion=tarea.fecha_asignacion,
+            cuota__credito__cliente=tarea.cuota.credito.cliente
+        ).exclude(estado='COBRADO').select_related('cuota', 'cuota__credito').order_by(
+            'cuota__fecha_vencimiento', 'cuota__numero_cuota'
+        )
+        saldo_total_cliente = sum((t.cuota.saldo_pendiente() for t in tareas_cliente), Decimal('0'))
+        if monto_decimal > saldo_total_cliente:
+            return JsonResponse({
+                'success': False,
+                'error': f'El monto (${monto_decimal:,.0f}) supera el saldo pendiente total del cliente (${saldo_total_cliente:,.0f}).'
+            })
+        
+        pagos_creados = []
+        restante = monto_decimal
+        fecha_manana = timezone.now().date() + timedelta(days=1)
+        for t in tareas_cliente:
+            if restante <= 0:
+                break
+            saldo_cuota = t.cuota.saldo_pendiente()
+            if saldo_cuota <= 0:
+                continue
+            aplicado = min(restante, saldo_cuota)
+
+            pago = Pago.objects.create(
+                credito=t.cuota.credito,
+                cuota=t.cuota,
+                monto=aplicado,
+                numero_cuota=t.cuota.numero_cuota,
+                observaciones=f"📱 Cobro agrupado por {t.cobrador.nombre_completo}\n{observaciones}".strip()
+            )
+            pagos_creados.append(pago)
+
+            t.cuota.monto_pagado += aplicado
+            if t.cuota.monto_pagado >= t.cuota.monto_cuota:
+                t.cuota.monto_pagado = t.cuota.monto_cuota
+                t.cuota.estado = 'PAGADA'
+                t.cuota.fecha_pago = timezone.now().date()
+                t.estado = 'COBRADO'
+                t.fecha_reprogramacion = None
+            else:
+                t.cuota.estado = 'PARCIAL'
+                t.estado = 'REPROGRAMADO'
+                t.fecha_reprogramacion = fecha_manana
+
+            t.cuota.save()
+
+            t.fecha_visita = timezone.now()
+            t.monto_cobrado = aplicado
+            t.observaciones = observaciones
+            if latitud:
+                t.latitud = float(latitud)
+            if longitud:
+                t.longitud = float(longitud)
+            t.usuario_ultima_accion = request.user
+            t.save()
+
+            TareaCobroLog.objects.create(
+                tarea=t,
+                usuario=request.user,
+                accion='COBRADO' if t.estado == 'COBRADO' else 'REPROGRAMADO',
+                observaciones=observaciones,
+                monto_registrado=aplicado,
+            )
+
+            credito_tmp = t.cuota.credito
+            if credito_tmp.esta_al_dia():
+                credito_tmp.estado = 'PAGADO'
+                credito_tmp.save()
+
+            restante -= aplicado
+
+        if not pagos_creados:
+            return JsonResponse({'success': False, 'error': 'No se pudo aplicar el pago a cuotas pendientes del cliente.'})
+        pago = pagos_creados[-1]
+        
+        # Enviar comprobante por correo (del último pago aplicado) si hay email
+        credito = pago.credito
+        cliente = credito.cliente
+        email_cliente = (cliente.email or '').strip()
+        email_enviado = False
+        if email_cliente:
+            try:
+                from django.core.mail import EmailMessage
+                from django.conf import settings
+                pdf_buffer = _recibo_pdf_cacheado(pago)
+                nombre_pdf = f'recibo_pago_{pago.id:05d}.pdf'
+                asunto = f'Comprobante de pago #{pago.id:05d} - Crédito #{credito.id}'
+                soporte_pago = _resumen_soporte_pago(pago)
+                saldo_cuota_txt = (
+                    f"${soporte_pago['saldo_cuota']:,.0f}"
+                    if soporte_pago['saldo_cuota'] is not None else 'N/A'
+                )
+                if soporte_pago['proxima_cuota']:
+                    siguiente_txt = (
+                        f"Cuota #{soporte_pago['proxima_cuota'].numero_cuota} "
+                        f"por ${soporte_pago['proxima_cuota'].saldo_pendiente():,.0f}"
+                    )
+                else:
+                    siguiente_txt = 'Sin cuotas pendientes'
+                cuerpo = (
+                    f'Hola {cliente.nombre_completo},\n\n'
+                    f'Adjunto encontrará el comprobante de su pago por ${pago.monto:,.0f} '
+                    f'(cuota #{pago.numero_cuota}, crédito #{credito.id}).\n\n'
+                    f'Tipo de aplicación: {soporte_pago["tipo_pago"]}\n'
+                    f'Saldo pendiente de esa cuota: {saldo_cuota_txt}\n'
+                    f'Siguiente obligación sugerida: {siguiente_txt}\n'
+                    f'Saldo pendiente del crédito: ${credito.saldo_pendiente():,.0f}\n\n'
+                    f'Conserve este recibo para sus registros.\n\n'
+                    f'Atentamente,\nSistema de Créditos'
+                )
+                email = EmailMessage(
+                    asunto,
+                    cuerpo,
+                    getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
+                    [email_cliente],
+                )
+                email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
+                email.send(fail_silently=True)
+                email_enviado = True
+            except Exception:
+                pass
+        
+        # 🎯 REDIRIGIR AL MISMO FLUJO QUE nuevo_pago
+        return JsonResponse({
+            'success': True,
+            'mensaje': f'Cobro aplicado correctamente. Se registraron {len(pagos_creados)} pago(s) para el cliente.',
+            'pago_id': pago.id,
+            'redirect_url': f'/confirmacion-pago/{pago.id}/',
+            'email_enviado': email_enviado,
+            'tiene_email': bool(email_cliente),
+            'es_parcial': any(t.estado == 'REPROGRAMADO' for t in tareas_cliente),
+            'fecha_reprogramacion': fecha_manana.strftime('%Y-%m-%d') if any(t.estado == 'REPROGRAMADO' for t in tareas_cliente) else None,
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error: {str(e)}'
+        })
+
+@login_required
+def actualizar_tarea(request, tarea_id):
+    """Vista AJAX para actualizar estado de una tarea"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'})
+    
+    try:
+        tarea = get_object_or_404(TareaCobro, id=tarea_id)
+        
+        # Verificar permisos
+        if not (request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == tarea.cobrador)):
+            return JsonResponse({'success': False, 'error': 'Sin permisos'})
+        
+        nuevo_estado = request.POST.get('estado')
+        observaciones = request.POST.get('observaciones', '')
+        motivo_reprogramacion = request.POST.get('motivo_reprogramacion', '').strip()
+        if nuevo_estado == 'REPROGRAMADO' and motivo_reprogramacion:
+            observaciones = motivo_reprogramacion  # guardar motivo también en observaciones
+        monto_cobrado = request.POST.get('monto_cobrado')
+        latitud = request.POST.get('latitud')
+        longitud = request.POST.get('longitud')
+        fecha_reprogramacion = request.POST.get('fecha_reprogramacion')
+        
+        if nuevo_estado == 'COBRADO':
+            if not monto_cobrado:
+                return JsonResponse({'success': False, 'error': 'Debe especificar el monto cobrado'})
+            
+            try:
+                # Usar el mismo manejo robusto de Decimal
+                from decimal import Decimal, InvalidOperation
+                
+                # Limpiar el monto de forma inteligente (misma lógica que procesar_cobro_completo)
+                monto_str = str(monto_cobrado).strip()
+                
+                # Verificar formato europeo (coma decimal)
+                if ',' in monto_str:
+                    parts_comma = monto_str.split(',')
+                    if len(parts_comma) == 2 and len(parts_comma[1]) <= 2 and '.' not in parts_comma[1]:
+                        return JsonResponse({
+                            'success': False, 
+                            'error': f'Use punto (.) como separador decimal. Ejemplo: {monto_str.replace(",", ".")}'
+                        })
+                
+                # Limpiar comas de miles pero conservar punto decimal
+                monto_limpio = monto_str.replace(' ', '')
+                if ',' in monto_limpio:
+                    if '.' in monto_limpio:
+                        parte_entera, parte_decimal = monto_limpio.split('.', 1)
+                        parte_entera = parte_entera.replace(',', '')
+                        monto_limpio = f"{parte_entera}.{parte_decimal}"
+                    else:
+                        if not monto_limpio.endswith(',') and len(monto_limpio.split(',')[-1]) >= 3:
+                            monto_limpio = monto_limpio.replace(',', '')
+                
+                monto_decimal = Decimal(monto_limpio)
+                
+                # Validaciones de rango para pesos colombianos
+                if monto_decimal <= Decimal('0'):
+                    return JsonResponse({'success': False, 'error': 'El monto debe ser mayor que cero'})
+                
+                # Permitir montos desde $50 para casos excepcionales
+                if monto_decimal < Decimal('50'):
+                    return JsonResponse({
+                        'success': False, 
+                        'error': f'El monto ${monto_decimal} parece muy bajo para un pago en pesos colombianos.'
+                    })
+                
+                if monto_decimal > Decimal('50000000'):
+                    return JsonResponse({
+                        'success': False,
+                        'error': f'El monto ${monto_decimal} parece muy alto. Verifique el valor.'
+                    })
+                
+                # Validar que no supere el saldo pendiente del crédito
+                credito = tarea.credito
+                monto_total_credito = credito.monto_total or credito.monto
+                total_ya_pagado = credito.total_pagado()
+                saldo_pend = monto_total_credito - total_ya_pagado
+                if monto_decimal > saldo_pend:
+                    return JsonResponse({
+                        'success': False,
+                        'error': f'El monto (${monto_decimal:,.0f}) supera el saldo pendiente del crédito (${saldo_pend:,.0f}).'
+                    })
+                
+                lat = float(latitud) if latitud else None
+                lng = float(longitud) if longitud else None
+                
+                # 🎆 MAGIA: Marcar tarea Y crear pago automáticamente
+                pago_creado = tarea.marcar_como_cobrado(monto_decimal, observaciones, lat, lng)
+                
+            except (ValueError, InvalidOperation):
+                return JsonResponse({'success': False, 'error': f'Monto inválido: "{monto_cobrado}". Use solo números y punto decimal.'})
+        else:
+            fecha_reprog = None
+            if fecha_reprogramacion:
+                try:
+                    fecha_reprog = datetime.strptime(fecha_reprogramacion, '%Y-%m-%d').date()
+                except ValueError:
+                    pass
+            
+            tarea.cambiar_estado(nuevo_estado, observaciones, fecha_reprog, motivo_reprogramacion)
+        
+        # Auditoría: quién realizó la acción y log
+        tarea.usuario_ultima_accion = request.user
+        tarea.save(update_fields=['usuario_ultima_accion'])
+        acciones_permitidas = [c[0] for c in TareaCobroLog.ACCIONES]
+        estado_final = tarea.estado
+        log_accion = estado_final if estado_final in acciones_permitidas else 'NO_ENCONTRADO'
+        monto_log = None
+        if 'pago_creado' in locals():
+            monto_log = getattr(pago_creado, 'monto', None)
+        TareaCobroLog.objects.create(
+            tarea=tarea,
+            usuario=request.user,
+            accion=log_accion,
+            observaciones=observaciones,
+            motivo_reprogramacion=motivo_reprogramacion[:255] if motivo_reprogramacion else '',
+            monto_registrado=monto_log,
+        )
+        
+        # Preparar respuesta base
+        response_data = {
+            'success': True,
+            'tarea': {
+                'id': tarea.id,
+                'estado': tarea.estado,
+                'estado_display': tarea.get_estado_display(),
+                'color_estado': tarea.color_estado,
+                'monto_cobrado': float(tarea.monto_cobrado) if tarea.monto_cobrado else 0,
+                'observaciones': tarea.observaciones,
+                'fecha_visita': tarea.fecha_visita.strftime('%H:%M') if tarea.fecha_visita else None
+            }
+        }
+        
+        # Si se creó un pago, incluir información del pago
+        if 'pago_creado' in locals():
+            response_data['pago'] = {
+                'id': pago_creado.id,
+                'monto': float(pago_creado.monto),
+                'fecha': pago_creado.fecha_pago.strftime('%d/%m/%Y %H:%M'),
+                'cliente': tarea.credito.cliente.nombre_completo,
+                'cuota': tarea.cuota.numero_cuota,
+                'mensaje': (
+                    f'✅ Pago parcial de ${pago_creado.monto:,.0f} registrado. '
+                    f'Reprogramado para {tarea.fecha_reprogramacion.strftime("%d/%m/%Y")}.'
+                    if tarea.estado == 'REPROGRAMADO' and tarea.fecha_reprogramacion
+                    else f'✅ Pago de ${pago_creado.monto:,.0f} registrado exitosamente'
+                )
+            }
+        
+        return JsonResponse(response_data)
+        
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+@login_required
+def panel_supervisor(request):
+    """Panel de supervisor para ver progreso de todos los cobradores"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, timedelta
+    from django.db.models import Count, Sum, Avg, Q
+    from .models import TareaCobro
+    
+    # Fecha a consultar (por defecto hoy)
+    fecha_str = request.GET.get('fecha')
+    if fecha_str:
+        try:
+            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = date.today()
+    else:
+        fecha = date.today()
+    
+    # Filtro por estado (opcional): PENDIENTE, COBRADO, NO_ENCONTRADO, REPROGRAMADO, etc.
+    filtro_estado = request.GET.get('filtro_estado', '').strip()
+    estados_validos = [e[0] for e in TareaCobro.ESTADOS]
+    
+    # Obtener todos los cobradores activos
+    cobradores = Cobrador.objects.filter(activo=True)
+    
+    # Datos por cobrador
+    datos_cobradores = []
+    total_general_tareas = 0
+    total_general_cobradas = 0
+    total_general_monto = 0
+    
+    for cobrador in cobradores:
+        tareas = TareaCobro.objects.filter(
+            cobrador=cobrador,
+            fecha_asignacion=fecha
+        ).select_related('cuota__credito__cliente')
+        if filtro_estado and filtro_estado in estados_validos:
+            tareas = tareas.filter(estado=filtro_estado)
+        
+        total_tareas = tareas.count()
+        tareas_cobradas = tareas.filter(estado='COBRADO').count()
+        monto_cobrado = tareas.filter(estado='COBRADO').aggregate(
+            total=Sum('monto_cobrado')
+        )['total'] or 0
+        
+        porcentaje = (tareas_cobradas / total_tareas * 100) if total_tareas > 0 else 0
+        
+        # Últimas tareas actualizadas
+        ultimas_tareas = tareas.exclude(estado='PENDIENTE').order_by('-fecha_visita')[:3]
+        
+        rutas_qs = cobrador.rutas.all()
+        meta_diaria = cobrador.meta_diaria or 0
+        porcentaje_meta = round(float(monto_cobrado / meta_diaria * 100), 0) if meta_diaria and float(meta_diaria) > 0 else None
+        datos_cobradores.append({
+            'cobrador': cobrador,
+            'total_tareas': total_tareas,
+            'tareas_cobradas': tareas_cobradas,
+            'tareas_pendientes': total_tareas - tareas_cobradas,
+            'monto_cobrado': monto_cobrado,
+            'porcentaje': porcentaje,
+            'ultimas_tareas': ultimas_tareas,
+            'rutas': rutas_qs,
+            'sin_rutas': not rutas_qs.exists(),
+            'meta_diaria': meta_diaria,
+            'porcentaje_meta': porcentaje_meta,
+        })
+        
+        total_general_tareas += total_tareas
+        total_general_cobradas += tareas_cobradas
+        total_general_monto += monto_cobrado
+    
+    # Ordenar por porcentaje de completado (mayor a menor)
+    datos_cobradores.sort(key=lambda x: x['porcentaje'], reverse=True)
+    
+    # Estadísticas generales
+    porcentaje_general = (total_general_cobradas / total_general_tareas * 100) if total_general_tareas > 0 else 0
+    
+    # Tareas por estado (todas, sin filtrar para mostrar totales por estado)
+    todas_tareas = TareaCobro.objects.filter(fecha_asignacion=fecha)
+    estadisticas_estado = todas_tareas.values('estado').annotate(cantidad=Count('id'))
+    # Lista detallada dinámica (se recalcula en cada carga y refleja pagos/cambios del día).
+    tareas_detalle_qs = todas_tareas.exclude(estado='CANCELADO').select_related(
+        'cobrador', 'cuota__credito__cliente'
+    ).order_by('cobrador__nombres', 'cobrador__apellidos', 'orden_visita', 'id')
+    if filtro_estado and filtro_estado in estados_validos:
+        tareas_detalle_qs = tareas_detalle_qs.filter(estado=filtro_estado)
+    tareas_detalle = []
+    for t in tareas_detalle_qs:
+        tareas_detalle.append({
+            'cobrador': t.cobrador.nombre_completo,
+            'cliente': t.cuota.credito.cliente.nombre_completo,
+            'cuota_numero': t.cuota.numero_cuota,
+            'fecha_vencimiento': t.cuota.fecha_vencimiento,
+            'estado_tarea': t.estado,
+            'estado_tarea_display': t.get_estado_display(),
+            'estado_cuota': t.cuota.estado,
+            'estado_cuota_display': t.cuota.get_estado_display(),
+            'monto_pendiente': t.cuota.saldo_pendiente(),
+        })
+    
+    # Fechas anterior/siguiente para navegación (Django template no tiene add days)
+    fecha_anterior = (fecha - timedelta(days=1)).strftime('%Y-%m-%d')
+    fecha_siguiente = (fecha + timedelta(days=1)).strftime('%Y-%m-%d')
+    
+    # Alertas: pendientes al cierre, reprogramadas sin fecha o con fecha pasada, meta no cumplida
+    hoy = date.today()
+    alertas_pendientes_hoy = 0
+    if fecha == hoy:
+        alertas_pendientes_hoy = TareaCobro.objects.filter(
+            fecha_asignacion=fecha, estado='PENDIENTE'
+        ).count()
+    reprogramadas_problema = TareaCobro.objects.filter(
+        estado='REPROGRAMADO'
+    ).filter(
+        Q(fecha_reprogramacion__isnull=True) | Q(fecha_reprogramacion__lt=hoy)
+    ).count()
+    alertas_meta_bajo = []
+    for d in datos_cobradores:
+        if d['meta_diaria'] and float(d['meta_diaria']) > 0 and d['porcentaje_meta'] is not None and d['porcentaje_meta'] < 70:
+            alertas_meta_bajo.append({'cobrador': d['cobrador'], 'porcentaje_meta': d['porcentaje_meta']})
+    
+    context = {
+        'fecha': fecha,
+        'today': hoy,
+        'filtro_estado': filtro_estado,
+        'estados_tarea': TareaCobro.ESTADOS,
+        'fecha_anterior': fecha_anterior,
+        'fecha_siguiente': fecha_siguiente,
+        'datos_cobradores': datos_cobradores,
+        'total_general_tareas': total_general_tareas,
+        'total_general_cobradas': total_general_cobradas,
+        'total_general_monto': total_general_monto,
+        'porcentaje_general': porcentaje_general,
+        'estadisticas_estado': {item['estado']: item['cantidad'] for item in estadisticas_estado},
+        'tareas_detalle': tareas_detalle,
+        'alertas_pendientes_hoy': alertas_pendientes_hoy,
+        'alertas_reprogramadas_problema': reprogramadas_problema,
+        'alertas_meta_bajo': alertas_meta_bajo,
+    }
+    
+    return render(request, 'tareas/panel_supervisor.html', context)
+
+@login_required
+def generar_tareas_diarias(request):
+    """Vista para generar tareas diarias manualmente"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method == 'POST':
+        fecha_str = request.POST.get('fecha')
+        try:
+            if fecha_str:
+                fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+            else:
+                fecha = date.today()
+            
+            from .models import TareaCobro
+            tareas_creadas = TareaCobro.generar_tareas_diarias(fecha)
+            
+            messages.success(request, f'Se generaron {tareas_creadas} tareas para {fecha.strftime("%d/%m/%Y")}')
+            
+        except Exception as e:
+            messages.error(request, f'Error al generar tareas: {str(e)}')
+    
+    return redirect('panel_supervisor')
+
+
+# ========================================
+# CIERRE DE COBRO DIARIO
+# ========================================
+
+@login_required
+def cierre_cobro_diario(request):
+    """Lista cobradores activos y para la fecha elegida: lo que debían entregar y estado de cierre."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date
+    from django.db.models import Sum
+    from decimal import Decimal
+
+    fecha_str = request.GET.get('fecha')
+    if fecha_str:
+        try:
+            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = date.today()
+    else:
+        fecha = date.today()
+
+    cobradores = Cobrador.objects.filter(activo=True)
+    filas = []
+    for cobrador in cobradores:
+        pagos_dia = Pago.objects.filter(
+            credito__cobrador=cobrador,
+            fecha_pago__date=fecha
+        )
+        monto_esperado = pagos_dia.aggregate(Sum('monto'))['monto__sum'] or 0
+        cantidad_pagos = pagos_dia.count()
+        cierre = CierreCobroDiario.objects.filter(cobrador=cobrador, fecha=fecha).first()
+        estado_arqueo = 'PENDIENTE'
+        if cierre and cierre.monto_recibido is not None and cierre.diferencia is not None:
+            diferencia_ajustada = cierre.diferencia
+            # Tolerancia de 1 peso para evitar "faltante/sobrante" por centavos residuales.
+            if abs(diferencia_ajustada) < Decimal('1'):
+                diferencia_ajustada = Decimal('0')
+            if diferencia_ajustada == 0:
+                estado_arqueo = 'EXACTO'
+            elif diferencia_ajustada > 0:
+                estado_arqueo = 'SOBRANTE'
+            else:
+                estado_arqueo = 'FALTANTE'
+        filas.append({
+            'cobrador': cobrador,
+            'fecha': fecha,
+            'monto_esperado': monto_esperado,
+            'cantidad_pagos': cantidad_pagos,
+            'cierre': cierre,
+            'cerrado': cierre is not None,
+            'estado_arqueo': estado_arqueo,
+        })
+    # Ordenar por monto esperado descendente (los que más cobraron primero)
+    filas.sort(key=lambda x: (-float(x['monto_esperado']), x['cobrador'].apellidos or ''))
+
+    # Historial de cierres (últimos 30 días)
+    historial = CierreCobroDiario.objects.select_related('cobrador', 'cerrado_por').order_by('-fecha', '-fecha_cierre')[:50]
+
+    context = {
+        'fecha': fecha,
+        'filas': filas,
+        'historial': historial,
+    }
+    return render(request, 'cobranza/cierre_cobro_diario.html', context)
+
+
+@login_required
+def resumen_cierre_cobrador(request, cobrador_id):
+    """Detalle de lo que cobró un cobrador en una fecha: listado de pagos y opción de cerrar con arqueo."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date
+    from django.db.models import Sum
+
+    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
+    fecha_str = request.GET.get('fecha') or request.POST.get('fecha')
+    if fecha_str:
+        try:
+            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = date.today()
+    else:
+        fecha = date.today()
+
+    pagos = Pago.objects.filter(
+        credito__cobrador=cobrador,
+        fecha_pago__date=fecha
+    ).select_related('credito__cliente').order_by('fecha_pago')
+    monto_esperado = pagos.aggregate(Sum('monto'))['monto__sum'] or 0
+    cierre = CierreCobroDiario.objects.filter(cobrador=cobrador, fecha=fecha).first()
+
+    context = {
+        'cobrador': cobrador,
+        'fecha': fecha,
+        'pagos': pagos,
+        'monto_esperado': monto_esperado,
+        'cantidad_pagos': pagos.count(),
+        'cierre': cierre,
+    }
+    return render(request, 'cobranza/resumen_cierre_cobrador.html', context)
+
+
+@login_required
+def cerrar_cobro_cobrador(request):
+    """POST: registra el cierre (monto recibido) y calcula diferencia (arqueo)."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, datetime
+    from decimal import Decimal, InvalidOperation
+    from django.db.models import Sum
+
+    if request.method != 'POST':
+        return redirect('cierre_cobro_diario')
+    cobrador_id = request.POST.get('cobrador_id')
+    fecha_str = request.POST.get('fecha')
+    monto_recibido_str = request.POST.get('monto_recibido', '').strip()
+    observaciones = request.POST.get('observaciones', '').strip()
+    if not cobrador_id or not fecha_str:
+        messages.error(request, 'Faltan datos (cobrador o fecha).')
+        return redirect('cierre_cobro_diario')
+    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
+    try:
+        fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+    except ValueError:
+        fecha = date.today()
+    monto_esperado = Pago.objects.filter(
+        credito__cobrador=cobrador,
+        fecha_pago__date=fecha
+    ).aggregate(Sum('monto'))['monto__sum'] or Decimal('0')
+    cantidad_pagos = Pago.objects.filter(credito__cobrador=cobrador, fecha_pago__date=fecha).count()
+    def _parse_monto_cierre(valor_raw):
+        if valor_raw is None:
+            return None
+        txt = str(valor_raw).strip().replace(' ', '')
+        if not txt:
+            return None
+        # Soporta formatos: 500000 | 500.000 | 500,000 | 500000.50 | 500000,50
+        if ',' in txt and '.' in txt:
+            # Si ambos existen, asumir comas como miles
+            txt = txt.replace(',', '')
+        elif ',' in txt and '.' not in txt:
+            parts = txt.split(',')
+            if len(parts) == 2 and len(parts[1]) <= 2:
+                txt = parts[0] + '.' + parts[1]  # coma decimal
+            else:
+                txt = txt.replace(',', '')  # comas de miles
+        elif '.' in txt:
+            parts = txt.split('.')
+            # Si hay más de un punto, o el sufijo parece miles (3 dígitos), limpiar miles
+            if len(parts) > 2 or (len(parts) == 2 and len(parts[1]) == 3):
+                txt = txt.replace('.', '')
+        return Decimal(txt)
+
+    monto_recibido = None
+    if monto_recibido_str:
+        try:
+            monto_recibido = _parse_monto_cierre(monto_recibido_str)
+        except (InvalidOperation, ValueError):
+            messages.error(request, 'Monto recibido inválido. Use formato numérico válido (ej: 500000 o 500.000).')
+            return redirect(f"{reverse('resumen_cierre_cobrador', args=[cobrador.id])}?fecha={fecha.strftime('%Y-%m-%d')}")
+    diferencia = None
+    if monto_recibido is not None:
+        diferencia = monto_recibido - monto_esperado
+        # Normalizar diferencias menores a 1 peso por redondeos de centavos.
+        if abs(diferencia) < Decimal('1'):
+            diferencia = Decimal('0')
+    cierre, created = CierreCobroDiario.objects.update_or_create(
+        cobrador=cobrador,
+        fecha=fecha,
+        defaults={
+            'monto_esperado': monto_esperado,
+            'cantidad_pagos': cantidad_pagos,
+            'monto_recibido': monto_recibido,
+            'diferencia': diferencia,
+            'cerrado_por': request.user,
+            'observaciones': observaciones,
+        }
+    )
+    if created:
+        messages.success(request, f'Cierre registrado para {cobrador.nombre_completo} - {fecha.strftime("%d/%m/%Y")}.')
+    else:
+        messages.success(request, f'Cierre actualizado para {cobrador.nombre_completo}.')
+    return redirect(f"{reverse('cierre_cobro_diario')}?fecha={fecha.strftime('%Y-%m-%d')}")
@@ -0,0 +1,783 @@
+"""
+Vistas de créditos: listado, alta/edición, aprobación y desembolso, retanqueo y cronograma en PDF.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.http import JsonResponse, HttpResponse
+from .models import Cliente, Credito, Codeudor, Cobrador
+from .forms import CreditoForm
+from .retanqueo import ejecutar_retanqueo, revertir_retanqueo
+from .busqueda import buscar
+from . import cache_dominio
+from .paginacion import PARAMETRO_CURSOR, paginar_keyset
+from datetime import datetime, timedelta
+from io import BytesIO
+import re
+from .views import (
+    _forbidden_operacion,
+    _usuario_admin_operativo,
+    _usuario_cobrador_activo,
+    _usuario_es_gerente,
+    _usuario_puede_aprobar_credito,
+    _usuario_puede_ver_credito,
+)
+
+
+@login_required
+def creditos(request):
+    es_admin = _usuario_admin_operativo(request.user)
+    cobrador_usuario = _usuario_cobrador_activo(request.user)
+    if not es_admin and not cobrador_usuario:
+        return _forbidden_operacion(request)
+    from django.db.models import Q
+    
+    creditos_list = request.autorizacion.alcance_creditos(
+        Credito.objects.select_related('cliente', 'cobrador').with_saldos().order_by('-fecha_solicitud')
+    )
+    
+    # Búsqueda por cliente (nombre, apellidos, cédula) o por ID de crédito
+    q = request.GET.get('q', '').strip()
+    if q:
+        creditos_list = buscar(creditos_list, q, 'cliente', extra=Q(id=int(q)) if q.isdigit() else None)
+    
+    # Filtro por cobrador
+    cobrador_id = request.GET.get('cobrador', '').strip()
+    if cobrador_id and cobrador_id.isdigit():
+        creditos_list = creditos_list.filter(cobrador_id=int(cobrador_id))
+    
+    # Filtro por rango de fechas (fecha_solicitud)
+    fecha_desde = request.GET.get('fecha_desde', '').strip()
+    fecha_hasta = request.GET.get('fecha_hasta', '').strip()
+    if fecha_desde:
+        try:
+            from datetime import datetime as dt
+            d = dt.strptime(fecha_desde, '%Y-%m-%d').date()
+            creditos_list = creditos_list.filter(fecha_solicitud__date__gte=d)
+        except ValueError:
+            pass
+    if fecha_hasta:
+        try:
+            from datetime import datetime as dt
+            d = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
+            creditos_list = creditos_list.filter(fecha_solicitud__date__lte=d)
+        except ValueError:
+            pass
+    
+    # Calcular estadísticas (sobre la lista filtrada) con un solo aggregate condicional
+    stats = creditos_list.aggregate(
+        total=Count('id'),
+        aprobados=Count('id', filter=Q(estado='APROBADO')),
+        pendientes=Count('id', filter=Q(estado='SOLICITADO')),
+        vencidos=Count('id', filter=Q(estado='VENCIDO')),
+        desembolsados=Count('id', filter=Q(estado='DESEMBOLSADO')),
+        pagados=Count('id', filter=Q(estado='PAGADO')),
+    )
+    total_creditos = stats['total']
+    creditos_aprobados = stats['aprobados']
+    creditos_pendientes = stats['pendientes']
+    creditos_vencidos = stats['vencidos']
+    creditos_desembolsados = stats['desembolsados']
+    creditos_pagados = stats['pagados']
+    
+    # Paginación configurable (por cursor sobre fecha_solicitud, id)
+    per_page_str = request.GET.get('per_page', '10').strip()
+    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
+    creditos = paginar_keyset(
+        creditos_list, request.GET.get(PARAMETRO_CURSOR), per_page,
+        ('-fecha_solicitud', '-id'), total=total_creditos,
+    )
+    
+    resumen_credito_id = request.GET.get('resumen_credito', '').strip()
+    if resumen_credito_id and resumen_credito_id.isdigit():
+        c = Credito.objects.filter(id=int(resumen_credito_id)).first()
+        if not c or c.estado not in ('APROBADO', 'DESEMBOLSADO'):
+            resumen_credito_id = ''
+    
+    cobradores = cache_dominio.cobradores_activos()
+    filtro_cobrador_id = int(cobrador_id) if cobrador_id.isdigit() else None
+    
+    context = {
+        'creditos': creditos,
+        'total_creditos': total_creditos,
+        'creditos_aprobados': creditos_aprobados,
+        'creditos_pendientes': creditos_pendientes,
+        'creditos_vencidos': creditos_vencidos,
+        'creditos_desembolsados': creditos_desembolsados,
+        'creditos_pagados': creditos_pagados,
+        'q': q,
+        'resumen_credito_id': resumen_credito_id,
+        'cobradores': cobradores,
+        'filtro_cobrador_id': filtro_cobrador_id,
+        'filtro_fecha_desde': fecha_desde,
+        'filtro_fecha_hasta': fecha_hasta,
+        'per_page': per_page,
+        'puede_aprobar_credito': _usuario_puede_aprobar_credito(request.user),
+        'puede_editar_credito': _usuario_es_gerente(request.user),
+    }
+    return render(request, 'creditos.html', context)
+
+
+@login_required
+def exportar_creditos_excel(request):
+    """Exporta el listado de créditos aplicando los mismos filtros de la vista creditos."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+
+    import io
+    import pandas as pd
+
+    queryset = Credito.objects.select_related('cliente', 'cobrador').with_saldos().order_by('-fecha_solicitud')
+
+    q = request.GET.get('q', '').strip()
+    if q:
+        queryset = buscar(queryset, q, 'cliente', extra=Q(id=int(q)) if q.isdigit() else None)
+
+    cobrador_id = request.GET.get('cobrador', '').strip()
+    if cobrador_id and cobrador_id.isdigit():
+        queryset = queryset.filter(cobrador_id=int(cobrador_id))
+
+    fecha_desde = request.GET.get('fecha_desde', '').strip()
+    fecha_hasta = request.GET.get('fecha_hasta', '').strip()
+    if fecha_desde:
+        try:
+            d = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
+            queryset = queryset.filter(fecha_solicitud__date__gte=d)
+        except ValueError:
+            pass
+    if fecha_hasta:
+        try:
+            d = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+            queryset = queryset.filter(fecha_solicitud__date__lte=d)
+        except ValueError:
+            pass
+
+    rows = []
+    for credito in queryset:
+        modalidad = 'Nuevo'
+        if credito.credito_retanqueado_id:
+            modalidad = 'Retanqueo'
+        elif credito.es_renovacion:
+            modalidad = 'Renovación'
+
+        rows.append({
+            'ID crédito': credito.id,
+            'Estado': credito.get_estado_display(),
+            'Modalidad': modalidad,
+            'Cliente': credito.cliente.nombre_completo,
+            'Cédula cliente': credito.cliente.cedula,
+            'Monto': float(credito.monto),
+            'Monto total': float(credito.monto_total) if credito.monto_total else float(credito.monto),
+            'Saldo pendiente': float(credito.saldo_pendiente()),
+            'Total pagado': float(credito.total_pagado()),
+            'Tasa interés (%)': float(credito.tasa_interes or 0),
+            'Tipo plazo': credito.get_tipo_plazo_display(),
+            'Cantidad cuotas': credito.cantidad_cuotas,
+            'Valor cuota': float(credito.valor_cuota or 0),
+            'Días mora': credito.dias_mora or 0,
+            'Estado mora': credito.get_estado_mora_display() if credito.dias_mora and credito.dias_mora > 0 else 'Al día',
+            'Cobrador': credito.cobrador.nombre_completo if credito.cobrador else 'Sin asignar',
+            'Fecha solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y %H:%M') if credito.fecha_solicitud else '',
+            'Fecha desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else '',
+        })
+
+    df = pd.DataFrame(rows)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Creditos', index=False)
+    output.seek(0)
+
+    stamp = timezone.now().strftime('%Y%m%d_%H%M')
+    response = HttpResponse(
+        output.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+    response['Content-Disposition'] = f'attachment; filename="creditos_{stamp}.xlsx"'
+    return response
+
+# CRUD Créditos
+@login_required
+def nuevo_credito(request):
+    es_admin = _usuario_admin_operativo(request.user)
+    cobrador_usuario = _usuario_cobrador_activo(request.user)
+    if not es_admin and not cobrador_usuario:
+        return _forbidden_operacion(request)
+    cliente_prellenado = None
+    if request.method == 'POST':
+        form = CreditoForm(request.POST)
+        if cobrador_usuario and not es_admin:
+            form.fields['cobrador'].queryset = Cobrador.objects.filter(id=cobrador_usuario.id)
+            form.fields['cobrador'].initial = cobrador_usuario.id
+        if form.is_valid():
+            # Obtener el cliente del cleaned_data
+            cliente = form.cleaned_data.get('cliente')
+            if not cliente:
+                messages.error(request, 'Error: No se pudo identificar el cliente.')
+                return render(request, 'nuevo_credito.html', {'form': form})
+            ok, msg = _cliente_y_codeudor_tienen_habeas_data(cliente)
+            if not ok:
+                messages.error(request, msg)
+                return render(request, 'nuevo_credito.html', {'form': form, 'cliente_prellenado': cliente})
+            # Crear el crédito pero no guardar aún
+            credito = form.save(commit=False)
+            if cobrador_usuario and not es_admin:
+                credito.cobrador = cobrador_usuario
+            credito.cliente = cliente  # Asegurar que el cliente esté asignado
+            credito.save()  # Ahora sí guardar
+            
+            # Mostrar información del crédito creado
+            messages.success(
+                request, 
+                f'¡Crédito #{credito.id} creado exitosamente para {credito.cliente.nombre_completo}!'
+            )
+            messages.info(
+                request,
+                f'Monto: ${credito.monto:,.2f} | '
+                f'Cuotas: {credito.cantidad_cuotas} {credito.get_tipo_plazo_display().lower()}s | '
+                f'Valor cuota: ${credito.valor_cuota:,.2f}'
+            )
+            return redirect('creditos')
+        else:
+            # Mostrar errores de validación detallados
+            for field, errors in form.errors.items():
+                field_label = form.fields.get(field, {}).label or field
+                for error in errors:
+                    messages.error(request, f'{field_label}: {error}')
+    else:
+        # Preseleccionar cliente si viene cliente_id (ej. desde detalle del cliente)
+        cliente_prellenado = None
+        cliente_id = request.GET.get('cliente_id')
+        if cliente_id:
+            try:
+                cliente_prellenado = Cliente.objects.get(id=cliente_id, activo=True)
+                form = CreditoForm(initial={'cedula_cliente': cliente_prellenado.cedula})
+            except Cliente.DoesNotExist:
+                form = CreditoForm()
+        else:
+            form = CreditoForm()
+        if cobrador_usuario and not es_admin:
+            form.fields['cobrador'].queryset = Cobrador.objects.filter(id=cobrador_usuario.id)
+            form.fields['cobrador'].initial = cobrador_usuario.id
+    return render(request, 'nuevo_credito.html', {
+        'form': form,
+        'cliente_prellenado': cliente_prellenado,
+    })
+
+@login_required
+def editar_credito(request, credito_id):
+    if not _usuario_es_gerente(request.user):
+        return _forbidden_operacion(request)
+    credito = get_object_or_404(Credito, id=credito_id)
+    if request.method == 'POST':
+        form = CreditoForm(request.POST, instance=credito)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'Crédito #{credito.id} actualizado exitosamente')
+            return redirect('creditos')
+    else:
+        form = CreditoForm(instance=credito)
+    return render(request, 'editar_credito.html', {'form': form, 'credito': credito})
+
+# Vistas para cambio de estado de créditos
+def _cliente_y_codeudor_tienen_habeas_data(cliente):
+    """Verifica que cliente y codeudor (si existe) tengan Habeas Data firmado."""
+    if not cliente.tiene_habeas_data_firmado():
+        return False, 'El cliente debe tener la autorización Habeas Data firmada antes de continuar.'
+    try:
+        codeudor = cliente.codeudor
+        if not codeudor.tiene_habeas_data_firmado():
+            return False, 'El codeudor debe tener la autorización Habeas Data firmada antes de continuar.'
+    except Codeudor.DoesNotExist:
+        pass
+    return True, None
+
+
+@login_required
+def aprobar_credito(request, credito_id):
+    """Aprobación de crédito vía POST."""
+    if not _usuario_puede_aprobar_credito(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        messages.error(request, 'Método no permitido para aprobar crédito.')
+        return redirect('creditos')
+    credito = get_object_or_404(Credito, id=credito_id)
+    
+    if credito.estado != 'SOLICITADO':
+        messages.error(request, f'El crédito #{credito.id} no está en estado SOLICITADO')
+        return redirect('creditos')
+    
+    ok, msg = _cliente_y_codeudor_tienen_habeas_data(credito.cliente)
+    if not ok:
+        messages.error(request, msg)
+        return redirect('creditos')
+    
+    credito.estado = 'APROBADO'
+    credito.fecha_aprobacion = timezone.now()
+    credito.save()
+    
+    # Generar cronograma al aprobar (para resumen y envío al desembolsar)
+    try:
+        credito.generar_cronograma()
+    except Exception:
+        pass  # no bloquear aprobación
+    
+    messages.success(
+        request,
+        f'¡Crédito #{credito.id} de {credito.cliente.nombre_completo} por ${credito.monto} APROBADO exitosamente!'
+    )
+    return redirect(reverse('creditos') + f'?resumen_credito={credito.id}')
+
+@login_required
+def rechazar_credito(request, credito_id):
+    if not _usuario_puede_aprobar_credito(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        messages.error(request, 'Método no permitido para rechazar crédito.')
+        return redirect('creditos')
+    credito = get_object_or_404(Credito, id=credito_id)
+    
+    if credito.estado != 'SOLICITADO':
+        messages.error(request, f'El crédito #{credito.id} no está en estado SOLICITADO')
+        return redirect('creditos')
+
+    # Si es un crédito creado por retanqueo, revertir: quitar el pago del crédito anterior y dejarlo vigente
+    if credito.credito_retanqueado_id:
+        ok_revertir, msg_revertir = revertir_retanqueo(credito.id)
+        if ok_revertir and msg_revertir:
+            messages.info(request, msg_revertir)
+        elif not ok_revertir:
+            messages.error(request, msg_revertir)
+            return redirect('creditos')
+    
+    credito.estado = 'RECHAZADO'
+    credito.save()
+    
+    messages.warning(
+        request, 
+        f'Crédito #{credito.id} de {credito.cliente.nombre_completo} RECHAZADO'
+    )
+    return redirect('creditos')
+
+@login_required
+def desembolsar_credito(request, credito_id):
+    if not _usuario_puede_aprobar_credito(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        messages.error(request, 'Método no permitido para desembolsar crédito.')
+        return redirect('creditos')
+    credito = get_object_or_404(Credito, id=credito_id)
+    
+    if credito.estado != 'APROBADO':
+        messages.error(request, f'El crédito #{credito.id} no está en estado APROBADO')
+        return redirect('creditos')
+    
+    ok, msg = _cliente_y_codeudor_tienen_habeas_data(credito.cliente)
+    if not ok:
+        messages.error(request, msg)
+        return redirect('creditos')
+    if not credito.puede_desembolsar_segun_firma():
+        if credito.credito_retanqueado_id:
+            messages.error(request, 'El documento de retanqueo debe estar firmado por el cliente (OTP) antes de desembolsar.')
+        elif credito.es_renovacion:
+            messages.error(request, 'El documento de renovación debe estar firmado por el cliente antes de desembolsar.')
+        else:
+            messages.error(request, 'El pagaré debe estar firmado por el cliente (y codeudor si aplica) antes de desembolsar.')
+        return redirect('creditos')
+
+    # Actualizar estado y fecha de desembolso
+    credito.estado = 'DESEMBOLSADO'
+    credito.fecha_desembolso = timezone.now()
+    credito.save()
+    
+    # Asegurar cronograma (ya se genera al aprobar; por si acaso)
+    if not credito.cronograma.exists():
+        try:
+            credito.generar_cronograma()
+        except Exception:
+            pass
+    total_cuotas = credito.cronograma.count()
+    primera_vencimiento = credito.cronograma.first().fecha_vencimiento.strftime('%d/%m/%Y') if credito.cronograma.exists() else '—'
+    
+    # Generar PDF resumen + cronograma y enviar por correo al cliente
+    email_enviado = False
+    email_cliente = (credito.cliente.email or '').strip()
+    if email_cliente:
+        try:
+            from django.core.mail import EmailMessage
+            from django.conf import settings
+            pdf_buffer = _generar_pdf_resumen_cronograma_bytes(credito)
+            nombre_pdf = f'resumen_cronograma_credito_{credito.id:04d}.pdf'
+            asunto = f'Su crédito #{credito.id} ha sido desembolsado - Resumen y cronograma de pagos'
+            cuerpo = (
+                f'Hola {credito.cliente.nombre_completo},\n\n'
+                f'Su crédito por ${credito.monto:,.0f} ha sido desembolsado.\n\n'
+                f'Adjunto encontrará el resumen del crédito y el cronograma de pagos '
+                f'({credito.cantidad_cuotas} cuotas de ${credito.valor_cuota:,.0f}). '
+                f'Primera cuota vence: {primera_vencimiento}.\n\n'
+                f'Conserve este documento para sus registros.\n\n'
+                f'Atentamente,\nSistema de Créditos'
+            )
+            email = EmailMessage(
+                asunto,
+                cuerpo,
+                getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
+                [email_cliente],
+            )
+            email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
+            email.send(fail_silently=True)
+            email_enviado = True
+        except Exception:
+            pass
+    
+    messages.success(
+        request,
+        f'¡Desembolso de ${credito.monto:,.2f} realizado exitosamente a {credito.cliente.nombre_completo}!'
+    )
+    messages.info(
+        request,
+        f'{total_cuotas} cuotas {credito.get_tipo_plazo_display().lower()}s de ${credito.valor_cuota:,.2f}. '
+        f'Primera cuota vence: {primera_vencimiento}.'
+    )
+    if email_enviado:
+        messages.success(request, f'Se envió el resumen y cronograma por correo a {email_cliente}.')
+    elif email_cliente:
+        messages.warning(request, 'No se pudo enviar el correo con el cronograma; puede descargar el PDF desde el listado.')
+    else:
+        messages.info(request, 'El cliente no tiene correo registrado; descargue el PDF y entréguelo en mano.')
+    
+    return redirect('creditos')
+
+
+@login_required
+def retanqueo_credito(request, credito_id):
+    """
+    Retanqueo: liquidar crédito anterior y crear nuevo.
+    GET: formulario con saldo a liquidar y monto de la nueva solicitud.
+    POST: ejecutar retanqueo y redirigir al nuevo crédito o a créditos.
+    """
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not credito.puede_retanquear():
+        messages.error(
+            request,
+            'Este crédito no puede retanquearse. Debe estar desembolsado o vencido y con saldo pendiente.'
+        )
+        return redirect('creditos')
+
+    saldo_a_liquidar = credito.saldo_a_liquidar()
+
+    if request.method == 'POST':
+        monto_str = request.POST.get('monto_nueva_solicitud', '').strip()
+        try:
+            monto_nueva = float(monto_str.replace(',', '.'))
+        except (ValueError, TypeError):
+            messages.error(request, 'Ingrese un monto válido para la nueva solicitud.')
+            return render(request, 'retanqueo_credito.html', {
+                'credito': credito,
+                'saldo_a_liquidar': saldo_a_liquidar,
+                'saldo_a_liquidar_js': float(saldo_a_liquidar),
+                'monto_nueva_solicitud': monto_str,
+            })
+        success, nuevo_credito, message = ejecutar_retanqueo(credito.id, monto_nueva)
+        if success:
+            messages.success(request, message)
+            return redirect('creditos')
+        messages.error(request, message)
+        return render(request, 'retanqueo_credito.html', {
+            'credito': credito,
+            'saldo_a_liquidar': saldo_a_liquidar,
+            'saldo_a_liquidar_js': float(saldo_a_liquidar),
+            'monto_nueva_solicitud': monto_str,
+        })
+
+    return render(request, 'retanqueo_credito.html', {
+        'credito': credito,
+        'saldo_a_liquidar': saldo_a_liquidar,
+        'saldo_a_liquidar_js': float(saldo_a_liquidar),
+    })
+
+# Vista para obtener datos del crédito para el modal de aprobación
+@login_required
+def obtener_datos_credito(request, credito_id):
+    """Vista AJAX para obtener datos completos del crédito"""
+    try:
+        credito = get_object_or_404(Credito, id=credito_id)
+        if not _usuario_puede_ver_credito(request.user, credito):
+            return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este crédito.'}, status=403)
+        
+        # Calcular fechas del cronograma (simulado)
+        fechas_cronograma = []
+        if credito.cantidad_cuotas > 0:
+            fecha_base = timezone.now().date()
+            
+            for i in range(credito.cantidad_cuotas):
+                if credito.tipo_plazo == 'DIARIO':
+                    fecha_pago = fecha_base + timedelta(days=i+1)
+                elif credito.tipo_plazo == 'SEMANAL':
+                    fecha_pago = fecha_base + timedelta(weeks=i+1)
+                elif credito.tipo_plazo == 'QUINCENAL':
+                    fecha_pago = fecha_base + timedelta(days=(i+1)*15)
+                else:  # MENSUAL
+                    mes = fecha_base.month + (i + 1)
+                    año = fecha_base.year
+                    while mes > 12:
+                        mes -= 12
+                        año += 1
+                    
+                    try:
+                        fecha_pago = fecha_base.replace(year=año, month=mes)
+                    except ValueError:
+                        from calendar import monthrange
+                        ultimo_dia = monthrange(año, mes)[1]
+                        fecha_pago = fecha_base.replace(year=año, month=mes, day=min(fecha_base.day, ultimo_dia))
+                
+                fechas_cronograma.append({
+                    'cuota': i + 1,
+                    'fecha': fecha_pago.strftime('%d/%m/%Y'),
+                    'valor': float(credito.valor_cuota)
+                })
+        
+        return JsonResponse({
+            'success': True,
+            'credito': {
+                'id': credito.id,
+                'cliente': {
+                    'nombre_completo': credito.cliente.nombre_completo,
+                    'cedula': credito.cliente.cedula,
+                    'celular': credito.cliente.celular,
+                    'direccion': credito.cliente.direccion,
+                },
+                'monto': float(credito.monto),
+                'tasa_interes': float(credito.tasa_interes),
+                'tipo_plazo': credito.get_tipo_plazo_display(),
+                'cantidad_cuotas': credito.cantidad_cuotas,
+                'valor_cuota': float(credito.valor_cuota),
+                'monto_total': float(credito.monto_total),
+                'total_interes': float(credito.total_interes),
+                'fecha_solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y %H:%M'),
+                'descripcion_pago': credito.descripcion_pago,
+                'cronograma': fechas_cronograma
+            }
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+@login_required
+def obtener_pagos_credito(request, credito_id):
+    """Devuelve los abonos (pagos) del crédito para mostrar en detalle del crédito."""
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este crédito.'}, status=403)
+    pagos = credito.pago_set.order_by('-fecha_pago')
+    lista = []
+    for p in pagos:
+        cobrado_por = None
+        if p.observaciones:
+            # "Cobro en campo por Juan Pérez" o "Cobro por María García" o "💰 Cobro por ..."
+            m = re.search(r'(?:Cobro\s+(?:en\s+campo\s+)?por|por)\s+([^\n]+?)(?:\n|$)', p.observaciones.strip(), re.IGNORECASE)
+            if m:
+                cobrado_por = m.group(1).strip()
+        lista.append({
+            'id': p.id,
+            'fecha_pago': p.fecha_pago.strftime('%d/%m/%Y %H:%M'),
+            'monto': float(p.monto),
+            'numero_cuota': p.numero_cuota,
+            'observaciones': (p.observaciones or '').strip() or None,
+            'cobrado_por': cobrado_por,
+        })
+    total_pagado = credito.total_pagado()
+    saldo_pendiente = credito.saldo_pendiente()
+    return JsonResponse({
+        'success': True,
+        'pagos': lista,
+        'total_pagado': float(total_pagado),
+        'saldo_pendiente': float(saldo_pendiente),
+        'monto_total_credito': float(credito.monto_total or credito.monto),
+    })
+
+
+def _generar_pdf_resumen_cronograma_bytes(credito):
+    """
+    Genera el PDF resumen del crédito + cronograma de pagos.
+    Usa el cronograma de la BD si existe (generado al aprobar); si no, calcula fechas.
+    Retorna BytesIO con el PDF listo para adjuntar o devolver como respuesta.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    from reportlab.lib.units import inch
+    from .pdf_estilos import estilo_parrafo, tabla_encabezado, tabla_info_destacada
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=A4,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        rightMargin=0.5*inch
+    )
+    
+    # Estilos optimizados para menos espacio (cacheados entre documentos)
+    title_style = estilo_parrafo(
+        'CustomTitle', 'Heading1', fontSize=14, spaceAfter=12, alignment=1, textColor=colors.darkblue
+    )
+    subtitle_style = estilo_parrafo('CustomSubtitle', 'Heading2', fontSize=11, spaceAfter=8, textColor=colors.darkblue)
+    normal_style = estilo_parrafo('CustomNormal', fontSize=8, spaceAfter=3)
+    
+    # Contenido del PDF
+    story = []
+    
+    # Título principal compacto
+    story.append(Paragraph("SISTEMA DE CRÉDITOS - CRONOGRAMA DE PAGOS", title_style))
+    story.append(Spacer(1, 8))
+    
+    # Información del crédito (sin tasa de interés anual)
+    info_credito = [
+        ["Crédito N°:", f"#{credito.id:04d}", "Cliente:", credito.cliente.nombre_completo],
+        ["Cédula:", credito.cliente.cedula, "Celular:", credito.cliente.celular],
+        ["Fecha:", credito.fecha_solicitud.strftime('%d/%m/%Y'), "Modalidad:", credito.get_tipo_plazo_display()],
+        ["Monto:", f"${credito.monto:,.0f}", "Cuotas:", f"{credito.cantidad_cuotas}"],
+        ["Valor Cuota:", f"${credito.valor_cuota:,.0f}", "Total:", f"${credito.monto_total:,.0f}"]
+    ]
+    
+    info_table = Table(info_credito, colWidths=[1.2*inch, 1.8*inch, 1.2*inch, 1.8*inch])
+    info_table.setStyle(tabla_info_destacada(8))
+    
+    story.append(info_table)
+    story.append(Spacer(1, 10))
+    
+    # Cronograma de pagos
+    story.append(Paragraph("CRONOGRAMA DE PAGOS", subtitle_style))
+    
+    cronograma_data = [['Cuota N°', 'Fecha de Pago', 'Valor Cuota', 'Saldo Pendiente']]
+    cuotas_bd = credito.cronograma.all().order_by('numero_cuota')
+    
+    if cuotas_bd.exists():
+        saldo = float(credito.monto_total or credito.monto)
+        for c in cuotas_bd:
+            saldo -= float(c.monto_cuota)
+            cronograma_data.append([
+                str(c.numero_cuota),
+                c.fecha_vencimiento.strftime('%d/%m/%Y'),
+                f"${c.monto_cuota:,.0f}",
+                f"${max(0, saldo):,.0f}"
+            ])
+    else:
+        fecha_base = timezone.now().date()
+        saldo_pendiente = float(credito.monto_total or credito.monto)
+        for i in range(credito.cantidad_cuotas):
+            if credito.tipo_plazo == 'DIARIO':
+                fecha_pago = fecha_base + timedelta(days=i+1)
+            elif credito.tipo_plazo == 'SEMANAL':
+                fecha_pago = fecha_base + timedelta(weeks=i+1)
+            elif credito.tipo_plazo == 'QUINCENAL':
+                fecha_pago = fecha_base + timedelta(days=(i+1)*15)
+            else:
+                mes = fecha_base.month + (i + 1)
+                año = fecha_base.year
+                while mes > 12:
+                    mes -= 12
+                    año += 1
+                try:
+                    fecha_pago = fecha_base.replace(year=año, month=mes)
+                except ValueError:
+                    from calendar import monthrange
+                    ultimo_dia = monthrange(año, mes)[1]
+                    fecha_pago = fecha_base.replace(year=año, month=mes, day=min(fecha_base.day, ultimo_dia))
+            saldo_pendiente -= float(credito.valor_cuota)
+            cronograma_data.append([
+                f"{i+1}",
+                fecha_pago.strftime('%d/%m/%Y'),
+                f"${credito.valor_cuota:,.0f}",
+                f"${max(0, saldo_pendiente):,.0f}"
+            ])
+    
+    # Tabla del cronograma optimizada
+    cronograma_table = Table(cronograma_data, colWidths=[0.8*inch, 1.2*inch, 1.2*inch, 1.3*inch])
+    cronograma_table.setStyle(tabla_encabezado(7, centrada=True))
+    
+    story.append(cronograma_table)
+    story.append(Spacer(1, 10))
+    
+    # Información compacta de contacto y nota final
+    contacto_texto = (
+        "<b>CONTACTO:</b> Tel: +57 (XXX) XXX-XXXX | Email: creditos@sistemafinanciero.com | "
+        "Dirección: Calle XX #XX-XX, Ciudad<br/>"
+        "<b>NOTA:</b> Cronograma válido desde el desembolso. "
+        f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    )
+    
+    story.append(Paragraph(contacto_texto, normal_style))
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+@login_required
+def generar_pdf_cronograma(request, credito_id):
+    """Genera y descarga el PDF resumen + cronograma del crédito."""
+    from .pdf_cache import respuesta_pdf, version_cronograma
+    credito = get_object_or_404(Credito.objects.select_related('cliente'), id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return _forbidden_operacion(request)
+    try:
+        return respuesta_pdf(
+            request, credito.id, 'cronograma', version_cronograma(credito),
+            lambda: _generar_pdf_resumen_cronograma_bytes(credito),
+            f'resumen_cronograma_credito_{credito.id:04d}.pdf',
+        )
+    except Exception:
+        return HttpResponse('Error al generar el PDF.', status=500)
+
+
+@login_required
+def resumen_credito_json(request, credito_id):
+    """Devuelve JSON con resumen del crédito y cronograma para el modal tras aprobar."""
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return JsonResponse({'success': False, 'message': 'No tiene permisos para ver este crédito.'}, status=403)
+    if credito.estado != 'APROBADO' and credito.estado != 'DESEMBOLSADO':
+        return JsonResponse({'success': False, 'message': 'Crédito no disponible'}, status=400)
+    if not credito.cronograma.exists():
+        try:
+            credito.generar_cronograma()
+        except Exception:
+            pass
+    cliente = credito.cliente
+    cuotas = list(
+        credito.cronograma.all().order_by('numero_cuota').values(
+            'numero_cuota', 'fecha_vencimiento', 'monto_cuota'
+        )
+    )
+    for c in cuotas:
+        c['fecha_vencimiento'] = c['fecha_vencimiento'].strftime('%d/%m/%Y')
+        c['monto_cuota'] = float(c['monto_cuota'])
+    return JsonResponse({
+        'success': True,
+        'cliente': {
+            'nombre': cliente.nombre_completo,
+            'cedula': cliente.cedula or '',
+            'celular': cliente.celular or '',
+            'email': cliente.email or '',
+        },
+        'credito': {
+            'id': credito.id,
+            'monto': float(credito.monto),
+            'monto_total': float(credito.monto_total or credito.monto),
+            'cantidad_cuotas': credito.cantidad_cuotas,
+            'valor_cuota': float(credito.valor_cuota),
+            'tipo_plazo': credito.get_tipo_plazo_display(),
+            'fecha_solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y') if credito.fecha_solicitud else '',
+        },
+        'cronograma': cuotas,
+    })
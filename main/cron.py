@@ -58,6 +58,25 @@ def analizar_cartera_diaria():
         logger.error(f"❌ Error en análisis automático de cartera: {e}", exc_info=True)
         return False
 
+def cerrar_creditos_saldados(umbral=None, dry_run=False):
+    """
+    Pasa a PAGADO los créditos vigentes con saldo menor al umbral (residuos de
+    redondeo). Antes lo hacía buscar_creditos_cliente dentro de un GET.
+    Retorna la lista de ids cerrados (o que se cerrarían con dry_run).
+    """
+    from main.models import Credito, UMBRAL_SALDO_CERRADO
+
+    umbral = UMBRAL_SALDO_CERRADO if umbral is None else umbral
+    ids = list(Credito.objects.saldados_sin_cerrar(umbral).values_list('id', flat=True))
+    if dry_run:
+        return ids
+    # save() por crédito (no update()) para que corran las señales, p. ej. la caché de PDF
+    for credito in Credito.objects.filter(id__in=ids):
+        credito.estado = 'PAGADO'
+        credito.save(update_fields=['estado'])
+    logger.info(f"[CRON] Créditos saldados cerrados: {len(ids)}")
+    return ids
+
 def limpiar_logs_antiguos():
     """
     Limpia logs antiguos (más de 30 días)
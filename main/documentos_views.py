@@ -0,0 +1,380 @@
+"""
+Firma electrónica con OTP y descarga de documentos: Habeas Data, pagaré, renovación y retanqueo.
+"""
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, HttpResponse
+from .models import Cliente, Credito, Codeudor
+import json
+from .views import _forbidden_operacion, _usuario_admin_operativo, _usuario_puede_ver_credito
+
+
+# ---------- Habeas Data (Ley 1581/2012) ----------
+def _get_json_or_post(request, key, default=None):
+    """Obtiene un valor de request.POST o del body JSON si Content-Type es application/json."""
+    if request.content_type and 'application/json' in request.content_type:
+        try:
+            data = json.loads(request.body)
+            return data.get(key, default)
+        except Exception:
+            return default
+    return request.POST.get(key, default)
+
+
+@login_required
+def solicitar_habeas_data(request):
+    """Genera OTP, envía correo si hay email; retorna JSON con otp (para contingencia WhatsApp), celular, message."""
+    from .habeas_data import solicitar_otp_habeas_data
+
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    tipo = _get_json_or_post(request, 'tipo')
+    try:
+        objeto_id = int(_get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
+    if tipo not in ('cliente', 'codeudor'):
+        return JsonResponse({'success': False, 'message': 'Tipo inválido'}, status=400)
+    if tipo == 'cliente':
+        obj = Cliente.objects.filter(id=objeto_id).first()
+    else:
+        obj = Codeudor.objects.filter(id=objeto_id).first()
+    if not obj:
+        return JsonResponse({'success': False, 'message': 'No encontrado'}, status=404)
+    if tipo == 'cliente' and obj.tiene_habeas_data_firmado():
+        return JsonResponse({'success': False, 'message': 'El cliente ya tiene autorización Habeas Data firmada.'}, status=400)
+    if tipo == 'codeudor' and obj.tiene_habeas_data_firmado():
+        return JsonResponse({'success': False, 'message': 'El codeudor ya tiene autorización Habeas Data firmada.'}, status=400)
+    if tipo == 'codeudor' and not (getattr(obj, 'email', '') or '').strip():
+        return JsonResponse({
+            'success': False,
+            'message': 'El codeudor no tiene correo registrado. Actualice el correo para enviar y firmar Habeas Data.'
+        }, status=400)
+    otp_plain, email_enviado, celular, email_destino = solicitar_otp_habeas_data(tipo, objeto_id)
+    if not otp_plain:
+        return JsonResponse({'success': False, 'message': 'Error al generar código'}, status=500)
+    mensaje = f'Código generado. Válido por 15 minutos.'
+    if email_destino and email_enviado:
+        mensaje = f'Se envió un correo a {email_destino} con el código. Indique al titular que revise su bandeja e ingrese el código.'
+    elif not email_destino and celular:
+        mensaje = 'No hay correo registrado. Use "Enviar código por WhatsApp" para que el titular reciba el código.'
+    return JsonResponse({
+        'success': True,
+        'otp': otp_plain,
+        'celular': celular,
+        'message': mensaje,
+    })
+
+
+@login_required
+def validar_otp_habeas_data(request):
+    """Valida OTP, genera PDF, guarda en Cliente/Codeudor, envía correo con PDF. Retorna JSON."""
+    from .habeas_data import validar_otp_y_firmar
+
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    tipo = _get_json_or_post(request, 'tipo')
+    try:
+        objeto_id = int(_get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
+    otp = (_get_json_or_post(request, 'otp') or '').strip()
+    if not otp or len(otp) != 6:
+        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
+    ok, error = validar_otp_y_firmar(tipo, objeto_id, otp)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'Autorización Habeas Data registrada correctamente.'})
+
+
+@login_required
+def regenerar_habeas_data(request):
+    """Regenera el PDF de Habeas Data con el formato actual (código único, disclaimer). POST JSON: tipo, id."""
+    from .habeas_data import regenerar_pdf_habeas_data
+
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    tipo = _get_json_or_post(request, 'tipo')
+    try:
+        objeto_id = int(_get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
+    if tipo not in ('cliente', 'codeudor'):
+        return JsonResponse({'success': False, 'message': 'Tipo inválido'}, status=400)
+    ok, error = regenerar_pdf_habeas_data(tipo, objeto_id)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'PDF regenerado con el nuevo formato. Ya puede verlo o descargarlo.'})
+
+
+@login_required
+def descargar_habeas_data(request, tipo, objeto_id):
+    """Sirve el PDF de autorización Habeas Data del cliente o codeudor. ?inline=1 para vista previa en modal."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if tipo == 'cliente':
+        obj = get_object_or_404(Cliente, id=objeto_id)
+    else:
+        obj = get_object_or_404(Codeudor, id=objeto_id)
+    if not obj.documento_habeas_data:
+        return HttpResponse('No hay documento de autorización Habeas Data.', status=404)
+    try:
+        with obj.documento_habeas_data.open('rb') as f:
+            content = f.read()
+    except Exception:
+        return HttpResponse('Error al leer el documento.', status=500)
+    response = HttpResponse(content, content_type='application/pdf')
+    filename = f'autorizacion_habeas_data_{tipo}_{objeto_id}.pdf'
+    if request.GET.get('inline') == '1':
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        # Permitir vista previa en iframe del mismo sitio (modal)
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+    else:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------- Pagaré electrónico ----------
+@login_required
+def solicitar_firma_pagare(request):
+    """Genera OTP para cliente y codeudor del crédito. POST JSON: credito_id."""
+    from .pagare import solicitar_otp_pagare
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    credito = Credito.objects.filter(id=credito_id).select_related('cliente').first()
+    if not credito:
+        return JsonResponse({'success': False, 'message': 'Crédito no encontrado.'}, status=404)
+    try:
+        codeudor = credito.cliente.codeudor
+    except Exception:
+        codeudor = None
+    if codeudor and not (getattr(codeudor, 'email', '') or '').strip():
+        return JsonResponse({
+            'success': False,
+            'message': 'El codeudor no tiene correo registrado. Actualice el correo para enviar OTP y firmar pagaré.'
+        }, status=400)
+    result = solicitar_otp_pagare(credito_id)
+    if not result.get('success'):
+        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
+    return JsonResponse(result)
+
+
+@login_required
+def validar_otp_pagare_view(request):
+    """Valida OTP del cliente o codeudor. POST JSON: credito_id, tipo_firmante, otp."""
+    from .pagare import validar_otp_pagare
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    tipo_firmante = _get_json_or_post(request, 'tipo_firmante')
+    if tipo_firmante not in ('cliente', 'codeudor'):
+        return JsonResponse({'success': False, 'message': 'Tipo de firmante inválido'}, status=400)
+    otp = (_get_json_or_post(request, 'otp') or '').strip()
+    if not otp or len(otp) != 6:
+        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
+    ok, error = validar_otp_pagare(credito_id, tipo_firmante, otp)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'Firma registrada.', 'pagare_completo': _credito_tiene_pagare_completo(credito_id)})
+
+
+def _credito_tiene_pagare_completo(credito_id):
+    c = Credito.objects.filter(id=credito_id).first()
+    return c.tiene_pagare_firmado() if c else False
+
+
+@login_required
+def regenerar_pagare(request):
+    """Regenera el PDF del pagaré con el formato actual (páginas independientes + anexo). POST JSON: credito_id."""
+    from .pagare import regenerar_pdf_pagare
+
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    ok, error = regenerar_pdf_pagare(credito_id)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'PDF del pagaré regenerado con el nuevo formato (páginas independientes y anexo de cédulas). Ya puede verlo o descargarlo.'})
+
+
+@login_required
+def descargar_pagare(request, credito_id):
+    """Sirve el PDF del pagaré del crédito. ?inline=1 para vista previa en modal."""
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return _forbidden_operacion(request)
+    if not credito.documento_pagare:
+        return HttpResponse('No hay documento de pagaré para este crédito.', status=404)
+    try:
+        with credito.documento_pagare.open('rb') as f:
+            content = f.read()
+    except Exception:
+        return HttpResponse('Error al leer el documento.', status=500)
+    response = HttpResponse(content, content_type='application/pdf')
+    filename = f'pagare_credito_{credito_id}.pdf'
+    if request.GET.get('inline') == '1':
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+    else:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------- Renovación de crédito ----------
+@login_required
+def solicitar_firma_renovacion(request):
+    """Genera OTP para documento de renovación. POST JSON: credito_id."""
+    from .renovacion import solicitar_otp_renovacion
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    result = solicitar_otp_renovacion(credito_id)
+    if not result.get('success'):
+        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
+    return JsonResponse(result)
+
+
+@login_required
+def validar_otp_renovacion_view(request):
+    """Valida OTP de renovación. POST JSON: credito_id, otp."""
+    from .renovacion import validar_otp_renovacion
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    otp = (_get_json_or_post(request, 'otp') or '').strip()
+    if not otp or len(otp) != 6:
+        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
+    ok, error = validar_otp_renovacion(credito_id, otp)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'Documento de renovación firmado correctamente.'})
+
+
+@login_required
+def descargar_renovacion(request, credito_id):
+    """Sirve el PDF de renovación del crédito. ?inline=1 para vista previa."""
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return _forbidden_operacion(request)
+    if not credito.documento_renovacion:
+        return HttpResponse('No hay documento de renovación para este crédito.', status=404)
+    try:
+        with credito.documento_renovacion.open('rb') as f:
+            content = f.read()
+    except Exception:
+        return HttpResponse('Error al leer el documento.', status=500)
+    response = HttpResponse(content, content_type='application/pdf')
+    filename = f'renovacion_credito_{credito_id}.pdf'
+    if request.GET.get('inline') == '1':
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+    else:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------- Documento de conformidad de retanqueo (OTP) ----------
+@login_required
+def solicitar_firma_retanqueo(request):
+    """Genera OTP para documento de retanqueo. POST JSON: credito_id."""
+    from .retanqueo_documento import solicitar_otp_retanqueo
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    try:
+        result = solicitar_otp_retanqueo(credito_id)
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': f'Error al solicitar código: {str(e)}'}, status=500)
+    if not result.get('success'):
+        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
+    return JsonResponse(result)
+
+
+@login_required
+def validar_otp_retanqueo_view(request):
+    """Valida OTP del documento de retanqueo. POST JSON: credito_id, otp."""
+    from .retanqueo_documento import validar_otp_retanqueo
+
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    try:
+        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
+    otp = (_get_json_or_post(request, 'otp') or '').strip()
+    if not otp or len(otp) != 6:
+        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
+    try:
+        ok, error = validar_otp_retanqueo(credito_id, otp)
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': f'Error al validar: {str(e)}'}, status=500)
+    if not ok:
+        return JsonResponse({'success': False, 'message': error}, status=400)
+    return JsonResponse({'success': True, 'message': 'Documento de retanqueo firmado correctamente.'})
+
+
+@login_required
+def descargar_retanqueo(request, credito_id):
+    """Sirve el PDF del documento de retanqueo del crédito. ?inline=1 para vista previa."""
+    credito = get_object_or_404(Credito, id=credito_id)
+    if not _usuario_puede_ver_credito(request.user, credito):
+        return _forbidden_operacion(request)
+    if not credito.documento_retanqueo:
+        return HttpResponse('No hay documento de retanqueo para este crédito.', status=404)
+    try:
+        with credito.documento_retanqueo.open('rb') as f:
+            content = f.read()
+    except Exception:
+        return HttpResponse('Error al leer el documento.', status=500)
+    response = HttpResponse(content, content_type='application/pdf')
+    filename = f'retanqueo_credito_{credito_id}.pdf'
+    if request.GET.get('inline') == '1':
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+    else:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,143 @@
+"""
+Envío masivo de correos reutilizando conexiones.
+
+``EmailMessage.send()`` abre y cierra una conexión SMTP por mensaje. Para los
+recordatorios masivos se usa una conexión (``get_connection()``) por lote de
+mensajes y, opcionalmente, varias conexiones en paralelo con un pool de hilos.
+
+Dentro de cada lote los mensajes se envían uno a uno sobre la conexión abierta:
+así un error identifica exactamente al destinatario que falló (para reintentar
+solo ese) sin reenviar los que ya salieron. ``al_enviar(clave, error)`` permite
+registrar el resultado de cada mensaje apenas se conoce.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class ResultadoEnvio:
+    """Totales de un envío masivo y detalle de los destinatarios fallidos."""
+
+    def __init__(self):
+        self.enviados = 0
+        self.fallidos = []  # [{'clave': ..., 'destinatarios': [...], 'error': '...'}]
+        self.segundos = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def correos_por_segundo(self):
+        return self.enviados / self.segundos if self.segundos > 0 else 0.0
+
+    def _registrar(self, enviados, fallidos):
+        with self._lock:
+            self.enviados += enviados
+            self.fallidos.extend(fallidos)
+
+
+def _lotes(iterable, tamano):
+    lote = []
+    for item in iterable:
+        lote.append(item)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class EnviadorCorreos:
+    """
+    Envía ``(clave, EmailMessage)`` en lotes de ``tamano_lote`` por conexión.
+
+    ``conexiones`` > 1 reparte los lotes entre un pool de hilos, cada uno con su
+    propia conexión. ``backend`` permite forzar un backend distinto de
+    ``EMAIL_BACKEND`` (p. ej. locmem para pruebas de carga).
+    """
+
+    def __init__(self, tamano_lote=100, conexiones=1, backend=None):
+        self.tamano_lote = max(1, int(tamano_lote))
+        self.conexiones = max(1, int(conexiones))
+        self.backend = backend
+
+    def _enviar_lote(self, lote, al_enviar=None):
+        enviados = 0
+        fallidos = []
+        connection = get_connection(backend=self.backend, fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # Sin conexión: todo el lote queda pendiente de reintento
+            logger.warning(f'No se pudo abrir conexión de correo: {e}')
+            fallidos = [
+                {'clave': clave, 'destinatarios': list(msg.to), 'error': str(e)}
+                for clave, msg in lote
+            ]
+            if al_enviar:
+                for f in fallidos:
+                    al_enviar(f['clave'], f['error'])
+            return 0, fallidos
+        try:
+            for clave, msg in lote:
+                msg.connection = connection
+                error = None
+                try:
+                    enviados += connection.send_messages([msg]) or 0
+                except Exception as e:
+                    error = str(e)
+                    fallidos.append({'clave': clave, 'destinatarios': list(msg.to), 'error': error})
+                if al_enviar:
+                    al_enviar(clave, error)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return enviados, fallidos
+
+    def enviar(self, mensajes, al_enviar=None):
+        """
+        Envía un iterable de ``(clave, EmailMessage)`` y retorna un ``ResultadoEnvio``.
+
+        ``al_enviar(clave, error)`` se llama en el hilo que invoca ``enviar``:
+        tras cada mensaje con una conexión y al terminar cada lote con varias
+        (así no escribe en la BD desde los hilos del pool).
+        """
+        resultado = ResultadoEnvio()
+        inicio = time.perf_counter()
+        lotes = _lotes(mensajes, self.tamano_lote)
+
+        def registrar(enviados, fallidos, lote):
+            resultado._registrar(enviados, fallidos)
+            if al_enviar:
+                errores = {f['clave']: f['error'] for f in fallidos}
+                for clave, _msg in lote:
+                    al_enviar(clave, errores.get(clave))
+
+        if self.conexiones == 1:
+            for lote in lotes:
+                resultado._registrar(*self._enviar_lote(lote, al_enviar))
+        else:
+            # Cola acotada: no construir más lotes de los que el pool puede atender
+            max_en_vuelo = self.conexiones * 2
+            with ThreadPoolExecutor(max_workers=self.conexiones) as pool:
+                en_vuelo = set()
+                for lote in lotes:
+                    if len(en_vuelo) >= max_en_vuelo:
+                        hechos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                        for futuro in hechos:
+                            registrar(*futuro.result(), futuro.lote)
+                    futuro = pool.submit(self._enviar_lote, lote)
+                    futuro.lote = lote
+                    en_vuelo.add(futuro)
+                while en_vuelo:
+                    hechos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        registrar(*futuro.result(), futuro.lote)
+
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
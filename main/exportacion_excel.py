@@ -0,0 +1,325 @@
+"""
+Escritura de libros Excel (.xlsx) en modo streaming.
+
+Los reportes grandes (recaudación de fin de mes, tareas pendientes) no deben
+cargar todas las filas en memoria ni truncarse. Este módulo escribe cada hoja
+directamente como XML dentro del zip del libro, fila por fila, y recorre los
+querysets con ``.iterator()``, que en PostgreSQL usa cursores del lado del
+servidor. La memoria queda acotada por ``chunk_size`` y no por el número de
+filas. (openpyxl en modo ``write_only`` también es streaming, pero su
+serializador XML en Python puro es unas 10 veces más lento.)
+"""
+import datetime
+import math
+import re
+import tempfile
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import FileResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Filas que se traen por viaje a la base de datos al iterar querysets.
+CHUNK_SIZE_DEFAULT = 2000
+
+# Filas acumuladas antes de escribir al zip (menos llamadas a write()).
+_FILAS_POR_ESCRITURA = 500
+
+# Caracteres que XML 1.0 no admite ni escapados: uno solo (p. ej. un tabulador
+# vertical pegado desde el celular en observaciones) deja el libro ilegible
+_NO_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+# Excel tampoco admite estos en el nombre de una hoja
+_NO_NOMBRE_HOJA = re.compile(r'[\[\]:*?/\\]')
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+
+class HojaExcel:
+    """
+    Definición de una hoja del libro.
+
+    ``filas`` puede ser cualquier iterable (lista, generador o queryset de
+    ``values_list``). Si es un queryset se recorre con ``.iterator()`` para no
+    poblar la caché de resultados. ``transformar`` se aplica a cada fila antes de
+    escribirla (formatear fechas, convertir Decimal a float, etc.).
+    """
+
+    def __init__(self, nombre, encabezados, filas, transformar=None, chunk_size=CHUNK_SIZE_DEFAULT):
+        # Excel limita el nombre de la hoja a 31 caracteres
+        self.nombre = _NO_NOMBRE_HOJA.sub(' ', _texto_xml(nombre))[:31] or 'Hoja'
+        self.encabezados = list(encabezados)
+        self.filas = filas
+        self.transformar = transformar
+        self.chunk_size = chunk_size
+
+    def iterar_filas(self):
+        filas = self.filas
+        if hasattr(filas, 'iterator'):
+            filas = filas.iterator(chunk_size=self.chunk_size)
+        if self.transformar is None:
+            yield from filas
+        else:
+            for fila in filas:
+                yield self.transformar(fila)
+
+
+def _columna(indice):
+    """0 -> A, 25 -> Z, 26 -> AA."""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _texto_xml(valor):
+    return _NO_XML.sub('', str(valor))
+
+
+def _celda(ref, valor):
+    if valor is None or valor == '':
+        return ''
+    if isinstance(valor, bool):
+        return f'<c r="{ref}" t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        # NaN / Infinity no son números válidos en la celda: se dejan vacíos
+        if isinstance(valor, float) and not math.isfinite(valor):
+            return ''
+        if isinstance(valor, Decimal) and not valor.is_finite():
+            return ''
+        return f'<c r="{ref}"><v>{valor}</v></c>'
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        valor = valor.isoformat()
+    texto = escape(_texto_xml(valor))
+    if not texto:
+        return ''
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _escribir_hoja(zf, ruta, hoja):
+    total = 0
+    columnas = [_columna(i) for i in range(len(hoja.encabezados))]
+    with zf.open(ruta, 'w', force_zip64=True) as f:
+        f.write(
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{_NS_MAIN}"><sheetData>'.encode('utf-8')
+        )
+        buffer = []
+
+        def _fila(numero, valores):
+            while len(columnas) < len(valores):
+                columnas.append(_columna(len(columnas)))
+            celdas = ''.join(
+                _celda(f'{columnas[i]}{numero}', v) for i, v in enumerate(valores)
+            )
+            buffer.append(f'<row r="{numero}">{celdas}</row>')
+
+        _fila(1, hoja.encabezados)
+        for fila in hoja.iterar_filas():
+            total += 1
+            _fila(total + 1, fila)
+            if len(buffer) >= _FILAS_POR_ESCRITURA:
+                f.write(''.join(buffer).encode('utf-8'))
+                buffer.clear()
+        buffer.append('</sheetData></worksheet>')
+        f.write(''.join(buffer).encode('utf-8'))
+    return total
+
+
+def escribir_libro_xlsx(hojas, destino):
+    """
+    Escribe las hojas en ``destino`` (ruta o archivo binario abierto).
+    Retorna un dict {nombre_hoja: filas_escritas} (sin contar encabezados).
+    """
+    hojas = list(hojas) or [HojaExcel('Hoja1', [], [])]
+    conteo = {}
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, hoja in enumerate(hojas, start=1):
+            conteo[hoja.nombre] = _escribir_hoja(zf, f'xl/worksheets/sheet{i}.xml', hoja)
+
+        overrides = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+            f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(hojas) + 1)
+        )
+        zf.writestr(
+            '[Content_Types].xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{overrides}</Types>',
+        )
+        zf.writestr(
+            '_rels/.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>',
+        )
+        sheets = ''.join(
+            f'<sheet name="{escape(h.nombre, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, h in enumerate(hojas, start=1)
+        )
+        zf.writestr(
+            'xl/workbook.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>{sheets}</sheets></workbook>',
+        )
+        rels = ''.join(
+            f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(hojas) + 1)
+        )
+        zf.writestr(
+            'xl/_rels/workbook.xml.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_NS_PKG_REL}">{rels}</Relationships>',
+        )
+    return conteo
+
+
+def respuesta_libro_xlsx(hojas, nombre_archivo):
+    """
+    Genera el libro en un archivo temporal y lo devuelve como descarga.
+    El archivo temporal se elimina al cerrarse la respuesta.
+    """
+    archivo = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        escribir_libro_xlsx(hojas, archivo)
+        archivo.seek(0)
+    except Exception:
+        archivo.close()
+        raise
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=nombre_archivo,
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def _fecha_hora(valor):
+    return valor.strftime('%d/%m/%Y %H:%M') if valor else ''
+
+
+def _fecha(valor):
+    return valor.strftime('%d/%m/%Y') if valor else ''
+
+
+def hojas_recaudacion(fecha_inicio, fecha_fin, cobrador_id=None):
+    """
+    Hojas del reporte de recaudación: resumen por cobrador (una sola consulta
+    agregada) y detalle completo de pagos (consulta proyectada, sin límite).
+    """
+    from django.db.models import Count, Q, Sum
+    from .models import Cobrador, Pago
+
+    filtros = Q(fecha_pago__date__gte=fecha_inicio) & Q(fecha_pago__date__lte=fecha_fin)
+    if cobrador_id:
+        filtros &= Q(credito__cobrador_id=cobrador_id)
+    pagos = Pago.objects.filter(filtros)
+
+    # Hoja 1: Resumen por cobrador (GROUP BY en lugar de una consulta por cobrador)
+    totales = {
+        fila['credito__cobrador_id']: fila
+        for fila in pagos.values('credito__cobrador_id').annotate(
+            total=Sum('monto'), cantidad=Count('id')
+        ).order_by()
+    }
+    dias = (fecha_fin - fecha_inicio).days + 1
+    resumen = []
+    for c in Cobrador.objects.filter(activo=True).only('id', 'nombres', 'apellidos', 'meta_diaria'):
+        datos = totales.get(c.id) or {}
+        total = datos.get('total') or 0
+        cnt = datos.get('cantidad') or 0
+        if cnt == 0 and cobrador_id:
+            continue
+        meta_per = 0
+        if c.meta_diaria and dias > 0:
+            meta_per = round(float(total) / (float(c.meta_diaria) * dias) * 100, 1)
+        resumen.append([c.nombre_completo, float(total), cnt, meta_per])
+
+    # Hoja 2: Detalle de pagos
+    detalle = pagos.order_by('-fecha_pago', '-id').values_list(
+        'fecha_pago',
+        'credito__cobrador__nombres',
+        'credito__cobrador__apellidos',
+        'credito__cliente__nombres',
+        'credito__cliente__apellidos',
+        'credito__cliente__cedula',
+        'credito_id',
+        'numero_cuota',
+        'monto',
+    )
+
+    def _fila_detalle(f):
+        fecha_pago, cob_nom, cob_ape, cli_nom, cli_ape, cedula, credito_id, numero_cuota, monto = f
+        return [
+            _fecha_hora(fecha_pago),
+            f'{cob_nom} {cob_ape}' if cob_nom is not None else '',
+            f'{cli_nom} {cli_ape}',
+            cedula,
+            credito_id,
+            numero_cuota,
+            float(monto),
+        ]
+
+    return [
+        HojaExcel(
+            'Resumen por cobrador',
+            ['Cobrador', 'Total recaudado', 'Cantidad pagos', 'Cumplimiento meta (%)'],
+            resumen,
+        ),
+        HojaExcel(
+            'Detalle pagos',
+            ['Fecha', 'Cobrador', 'Cliente', 'Cédula', 'Crédito ID', 'Cuota', 'Monto'],
+            detalle,
+            transformar=_fila_detalle,
+        ),
+    ]
+
+
+def hojas_tareas_pendientes(tareas_qs, hoy):
+    """Hoja del reporte de tareas pendientes sin gestionar, sin límite de filas."""
+    from django.db.models import F
+
+    filas = tareas_qs.annotate(
+        saldo_cuota=F('cuota__monto_cuota') - F('cuota__monto_pagado'),
+    ).values_list(
+        'fecha_asignacion',
+        'cobrador__nombres',
+        'cobrador__apellidos',
+        'cuota__credito__cliente__nombres',
+        'cuota__credito__cliente__apellidos',
+        'cuota__credito_id',
+        'cuota__numero_cuota',
+        'saldo_cuota',
+    )
+
+    def _fila(f):
+        fecha_asignacion, cob_nom, cob_ape, cli_nom, cli_ape, credito_id, numero_cuota, saldo = f
+        return [
+            _fecha(fecha_asignacion),
+            f'{cob_nom} {cob_ape}',
+            f'{cli_nom} {cli_ape}',
+            credito_id,
+            numero_cuota,
+            float(saldo) if saldo else 0,
+            (hoy - fecha_asignacion).days,
+        ]
+
+    return [
+        HojaExcel(
+            'Tareas pendientes',
+            ['Fecha asignación', 'Cobrador', 'Cliente', 'Crédito', 'Cuota', 'Monto a cobrar', 'Días atraso'],
+            filas,
+            transformar=_fila,
+        ),
+    ]
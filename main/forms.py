@@ -322,11 +322,10 @@ class PagoForm(forms.ModelForm):
         if self.instance and self.instance.pk and hasattr(self.instance, 'credito') and self.instance.credito:
             self.fields['cedula_cliente'].initial = self.instance.credito.cliente.cedula
             # Mostrar solo créditos del cliente que pueden recibir pagos (con saldo pendiente)
-            candidatos = Credito.objects.filter(
-                cliente=self.instance.credito.cliente,
-                estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
-            ).exclude(estado='PAGADO')
-            ids_con_saldo = [c.id for c in candidatos if c.puede_recibir_pagos()]
+            ids_con_saldo = list(
+                Credito.objects.filter(cliente=self.instance.credito.cliente)
+                .que_pueden_recibir_pagos().values_list('id', flat=True)
+            )
             # Incluir el crédito actual por si acaso (para poder guardar el pago editado)
             credito_actual_id = self.instance.credito_id
             if credito_actual_id not in ids_con_saldo:
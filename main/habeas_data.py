@@ -177,9 +177,10 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter
     from reportlab.lib.enums import TA_JUSTIFY
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Image
+
+    from .pdf_estilos import estilo_parrafo, estilo_tabla, hoja_estilos
 
     if codigo is None:
         codigo = getattr(obj, 'codigo_habeas_data', None) or (
@@ -193,35 +194,15 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
         buffer, pagesize=letter,
         rightMargin=inch, leftMargin=inch, topMargin=inch, bottomMargin=inch
     )
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=14,
-        spaceAfter=6,
-        alignment=1,
-    )
-    normal = styles['Normal']
-    normal_justified = ParagraphStyle('NormalJustified', parent=normal, alignment=TA_JUSTIFY)
-    normal_small = ParagraphStyle('Small', parent=normal, fontSize=9, spaceAfter=4)
-    normal_small_center = ParagraphStyle('SmallCenter', parent=normal_small, alignment=1)
-    code_style = ParagraphStyle(
-        'Code',
-        parent=normal,
-        fontSize=11,
-        fontName='Helvetica-Bold',
-        borderPadding=8,
-        spaceAfter=4,
-        alignment=1,
-    )
-    disclaimer_style = ParagraphStyle(
-        'Disclaimer',
-        parent=normal,
-        fontSize=10,
-        alignment=1,
-        spaceAfter=4,
-        spaceBefore=4,
+    title_style = estilo_parrafo('CustomTitle', 'Heading1', fontSize=14, spaceAfter=6, alignment=1)
+    normal = hoja_estilos()['Normal']
+    normal_justified = estilo_parrafo('NormalJustified', normal, alignment=TA_JUSTIFY)
+    normal_small = estilo_parrafo('Small', normal, fontSize=9, spaceAfter=4)
+    normal_small_center = estilo_parrafo('SmallCenter', normal_small, alignment=1)
+    code_style = estilo_parrafo(
+        'Code', normal, fontSize=11, fontName='Helvetica-Bold', borderPadding=8, spaceAfter=4, alignment=1,
     )
+    disclaimer_style = estilo_parrafo('Disclaimer', normal, fontSize=10, alignment=1, spaceAfter=4, spaceBefore=4)
 
     flow = []
 
@@ -247,7 +228,7 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
 
     # Datos del titular + foto al lado (bien alineados)
     foto_rostro = getattr(obj, 'foto_rostro', None)
-    img_celda = Paragraph('<br/><br/><i>Sin foto</i>', ParagraphStyle('Placeholder', parent=normal_small, alignment=1))
+    img_celda = Paragraph('<br/><br/><i>Sin foto</i>', estilo_parrafo('Placeholder', normal_small, alignment=1))
     if foto_rostro and hasattr(foto_rostro, 'path'):
         try:
             img_celda = Image(foto_rostro.path, width=1.1 * inch, height=1.35 * inch)
@@ -260,18 +241,18 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
         [Paragraph(f'Documento de identidad: {obj.cedula}', normal_small), ''],
     ]
     tbl_titular = Table(datos_titular, colWidths=[4.2 * inch, 1.35 * inch], rowHeights=[None, None, None])
-    tbl_titular.setStyle(TableStyle([
+    tbl_titular.setStyle(estilo_tabla(
         ('SPAN', (1, 0), (1, 2)),  # foto ocupa las 3 filas a la derecha
         ('VALIGN', (0, 0), (-1, -1), 'TOP'),
         ('LEFTPADDING', (0, 0), (0, -1), 0),
         ('RIGHTPADDING', (1, 0), (1, -1), 6),
-    ]))
+    ))
     flow.append(tbl_titular)
     flow.append(Spacer(1, 0.35 * inch))
 
     # Línea separadora
     tbl_line = Table([['']], colWidths=[6.5 * inch], rowHeights=[4])
-    tbl_line.setStyle(TableStyle([('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cccccc'))]))
+    tbl_line.setStyle(estilo_tabla(('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cccccc'))))
     flow.append(tbl_line)
     flow.append(Spacer(1, 0.2 * inch))
 
@@ -279,7 +260,7 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
     fecha_hora = fecha_firma.strftime('%d/%m/%Y %H:%M') if hasattr(fecha_firma, 'strftime') else str(fecha_firma)
     flow.append(Paragraph(
         '<b>Firma digital</b>',
-        ParagraphStyle('FirmaTitle', parent=normal, fontSize=10, alignment=1, spaceAfter=8),
+        estilo_parrafo('FirmaTitle', normal, fontSize=10, alignment=1, spaceAfter=8),
     ))
     flow.append(Paragraph(
         '&bull; Firmado digitalmente mediante verificación OTP',
@@ -287,7 +268,7 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
     ))
     flow.append(Paragraph(
         'Este documento fue firmado de forma electrónica mediante código de un solo uso (OTP) enviado al titular.',
-        ParagraphStyle('Disclaimer2', parent=normal_small, fontSize=8, alignment=1, spaceAfter=6),
+        estilo_parrafo('Disclaimer2', normal_small, fontSize=8, alignment=1, spaceAfter=6),
     ))
     flow.append(Paragraph(f'Fecha y hora de aceptación: {fecha_hora}', normal_small_center))
     flow.append(Spacer(1, 0.1 * inch))
@@ -296,21 +277,21 @@ def generar_pdf_habeas_data(tipo, obj, codigo=None, fecha_firma=None):
         colWidths=[2.5 * inch],
         rowHeights=[None],
     )
-    tbl_code.setStyle(TableStyle([
+    tbl_code.setStyle(estilo_tabla(
         ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0f0f0')),
         ('BOX', (0, 0), (-1, -1), 0.5, colors.grey),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ]))
+    ))
     flow.append(tbl_code)
     flow.append(Spacer(1, 0.15 * inch))
     flow.append(Paragraph(
         'Este documento puede verificarse con el responsable del tratamiento mediante el código indicado.',
-        ParagraphStyle('VerifyNote', parent=normal_small, fontSize=8, alignment=1, textColor=colors.grey),
+        estilo_parrafo('VerifyNote', normal_small, fontSize=8, alignment=1, textColor=colors.grey),
     ))
     flow.append(Spacer(1, 0.25 * inch))
     flow.append(Paragraph(
         'Este documento queda en custodia del responsable del tratamiento como constancia de la autorización otorgada.',
-        ParagraphStyle('CustodiaJustificada', parent=normal_small, alignment=TA_JUSTIFY),
+        estilo_parrafo('CustodiaJustificada', normal_small, alignment=TA_JUSTIFY),
     ))
 
     try:
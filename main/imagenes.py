@@ -0,0 +1,166 @@
+"""
+Derivados de tamaño fijo para las fotos de clientes y codeudores.
+
+Cada foto original (rostro, cédulas, recibo de servicio) se acompaña de tres
+versiones JPEG guardadas en la misma carpeta::
+
+    clientes/rostros/foto.png
+    clientes/rostros/foto.png__thumb.jpg   (listados, miniaturas)
+    clientes/rostros/foto.png__card.jpg    (tarjetas del detalle / agenda)
+    clientes/rostros/foto.png__full.jpg    (visor a pantalla completa)
+
+Se generan al subir la foto (señal post_save) o, si faltan, en la primera
+petición; ``generar_derivados_imagenes`` rellena las fotos existentes. El
+nombre del derivado sale del nombre del original, y Django puede volver a
+entregar ese nombre a otra foto cuando la anterior se borra: por eso la URL
+lleva ``?v=<mtime_ns del original>`` y solo esa versión exacta se sirve con
+caché inmutable (el derivado más viejo que el original se regenera).
+"""
+import os
+import tempfile
+
+from django.conf import settings
+
+# nombre -> caja máxima (ancho, alto); 'full' conserva el límite que ya usaba media_views
+RENDICIONES = {
+    'thumb': (160, 160),
+    'card': (480, 360),
+    'full': (800, 600),
+}
+SEPARADOR = '__'
+CALIDAD_JPEG = 82
+
+CAMPOS_FOTO = {
+    'Cliente': ('foto_rostro', 'foto_cedula_frontal', 'foto_cedula_trasera', 'foto_recibo_servicio'),
+    'Codeudor': ('foto_rostro', 'foto_cedula_frontal', 'foto_cedula_trasera'),
+}
+
+
+def nombre_derivado(nombre_original, rendicion):
+    """``clientes/rostros/foto.png`` -> ``clientes/rostros/foto.png__thumb.jpg``."""
+    return f'{nombre_original}{SEPARADOR}{rendicion}.jpg'
+
+
+def separar_derivado(nombre):
+    """Si ``nombre`` es un derivado retorna ``(nombre_original, rendicion)``; si no, ``None``."""
+    base, ext = os.path.splitext(nombre)
+    if ext != '.jpg' or SEPARADOR not in base:
+        return None
+    original, rendicion = base.rsplit(SEPARADOR, 1)
+    if rendicion not in RENDICIONES:
+        return None
+    return original, rendicion
+
+
+def buscar_original(ruta_derivado):
+    """Ruta del original de un derivado, o None si no existe."""
+    partes = separar_derivado(ruta_derivado)
+    if partes is None or not os.path.isfile(partes[0]):
+        return None
+    return partes[0]
+
+
+def version_original(ruta_original):
+    """Versión de una foto para la URL de sus derivados (mtime en ns, hex), o '' si no existe."""
+    try:
+        return f'{os.stat(ruta_original).st_mtime_ns:x}'
+    except OSError:
+        return ''
+
+
+def url_derivado(archivo, rendicion):
+    """
+    URL versionada del derivado de un ``ImageFieldFile`` (cadena vacía si el
+    campo está vacío). Sin original en disco la URL va sin versión.
+    """
+    if not archivo or rendicion not in RENDICIONES:
+        return ''
+    url = settings.MEDIA_URL + nombre_derivado(archivo.name, rendicion).replace(os.sep, '/')
+    try:
+        version = version_original(archivo.path)
+    except (NotImplementedError, ValueError):
+        version = ''
+    return f'{url}?v={version}' if version else url
+
+
+def _a_rgb(img):
+    # Fondo blanco para transparencias, igual que hacía serve_optimized_image
+    if img.mode in ('RGBA', 'LA', 'P'):
+        from PIL import Image
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        fondo = Image.new('RGB', img.size, (255, 255, 255))
+        fondo.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        return fondo
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def generar_derivados(ruta_original, forzar=False, rendiciones=None):
+    """
+    Genera los derivados que falten de una foto (ruta absoluta). Abre y
+    decodifica el original una sola vez y reduce de mayor a menor tamaño.
+    Retorna la cantidad de archivos escritos. Función de módulo sin estado
+    de Django para poder ejecutarse en un pool de procesos.
+    """
+    from PIL import Image, ImageOps
+
+    nombres = rendiciones or list(RENDICIONES)
+    if forzar:
+        pendientes = list(nombres)
+    else:
+        # Un derivado más viejo que el original es de una foto anterior con el mismo nombre
+        modificado = os.path.getmtime(ruta_original)
+        pendientes = []
+        for r in nombres:
+            try:
+                if os.path.getmtime(nombre_derivado(ruta_original, r)) >= modificado:
+                    continue
+            except OSError:
+                pass
+            pendientes.append(r)
+    if not pendientes:
+        return 0
+
+    escritos = 0
+    with Image.open(ruta_original) as original:
+        # draft() deja que el decodificador JPEG reduzca al cargar (mucho más rápido en fotos de celular)
+        mayor = max(RENDICIONES[r] for r in pendientes)
+        original.draft('RGB', mayor)
+        img = _a_rgb(ImageOps.exif_transpose(original))
+        for rendicion in sorted(pendientes, key=lambda r: RENDICIONES[r], reverse=True):
+            img.thumbnail(RENDICIONES[rendicion], Image.Resampling.LANCZOS)
+            destino = nombre_derivado(ruta_original, rendicion)
+            # Temporal único: la señal y una petición (o dos workers) pueden generar el mismo derivado a la vez
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(destino), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    img.save(f, format='JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+                # mkstemp crea con 0600; el derivado se sirve como cualquier archivo de media
+                os.chmod(temporal, 0o644)
+                os.replace(temporal, destino)
+            except OSError:
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+                raise
+            escritos += 1
+    return escritos
+
+
+def generar_derivados_de_instancia(instancia, forzar=False):
+    """Genera los derivados de todos los campos de foto de un Cliente o Codeudor."""
+    escritos = 0
+    for campo in CAMPOS_FOTO.get(type(instancia).__name__, ()):
+        archivo = getattr(instancia, campo, None)
+        if not archivo:
+            continue
+        try:
+            ruta = archivo.path
+        except (NotImplementedError, ValueError):
+            continue
+        if os.path.exists(ruta):
+            escritos += generar_derivados(ruta, forzar=forzar)
+    return escritos
@@ -0,0 +1,259 @@
+"""
+Invariantes del libro de cartera, verificados de forma continua.
+
+Cada invariante es una función decorada con ``@invariante`` que recibe un
+queryset de créditos (el alcance de la corrida) y retorna filas
+``{'credito_id': ..., <detalle>}`` de los que la incumplen; todo se resuelve
+en SQL, un query por invariante y lote de créditos.
+
+``verificar_invariantes`` (cron cada 10 minutos) solo revisa los créditos
+tocados desde la marca de agua de la corrida anterior: crédito o cuota con
+``fecha_actualizacion`` posterior, pagos nuevos o editados/borrados (la
+señal marca el crédito) y tareas actualizadas. Las violaciones quedan en
+``ViolacionInvariante``: se abren al detectarse, se refrescan mientras
+sigan y se marcan resueltas cuando el crédito vuelve a cumplir. Los
+``update()`` masivos no pasan por ``save()``: ``--completo`` revisa todo.
+"""
+import time
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+ESTADOS_TAREA_ABIERTOS = [
+    'PENDIENTE',
+    'EN_PROCESO',
+    'NO_ENCONTRADO',
+    'NO_ESTABA',
+    'NO_PUDO_PAGAR',
+    'REPROGRAMADO',
+]
+TOLERANCIA = Decimal('0.01')
+# Un cambio guardado justo antes de la marca puede confirmarse después de leerla
+MARGEN_MARCA = timedelta(minutes=2)
+
+Invariante = namedtuple('Invariante', 'codigo descripcion consulta')
+INVARIANTES = []
+
+_MONTO = DecimalField(max_digits=14, decimal_places=2)
+
+
+def invariante(codigo, descripcion):
+    """Registra una consulta de violaciones en ``INVARIANTES``."""
+    def registrar(consulta):
+        INVARIANTES.append(Invariante(codigo, descripcion, consulta))
+        return consulta
+    return registrar
+
+
+def _monto_a_pagar():
+    # Igual que saldo_pendiente(): monto_total en 0 cae a monto
+    return Coalesce(NullIf('monto_total', Value(Decimal('0'))), 'monto', output_field=_MONTO)
+
+
+@invariante('cuotas_vs_pagos', 'La suma de monto_pagado de las cuotas es igual a la suma de los pagos del crédito')
+def _cuotas_vs_pagos(creditos):
+    from .models import CronogramaPago
+
+    suma_cuotas = (
+        CronogramaPago.objects.filter(credito=OuterRef('pk'))
+        .order_by()
+        .values('credito')
+        .annotate(total=Sum('monto_pagado'))
+        .values('total')
+    )
+    return (
+        creditos.filter(Exists(CronogramaPago.objects.filter(credito=OuterRef('pk'))))
+        .with_saldos()
+        .annotate(suma_cuotas=Coalesce(Subquery(suma_cuotas, output_field=_MONTO), Value(Decimal('0')), output_field=_MONTO))
+        .filter(
+            Q(suma_cuotas__gt=F('total_pagado_anotado') + TOLERANCIA)
+            | Q(suma_cuotas__lt=F('total_pagado_anotado') - TOLERANCIA)
+        )
+        .values('suma_cuotas', credito_id=F('id'), suma_pagos=F('total_pagado_anotado'))
+    )
+
+
+@invariante('pagado_con_saldo', 'Un crédito en estado PAGADO no tiene saldo pendiente')
+def _pagado_con_saldo(creditos):
+    from .models import UMBRAL_SALDO_CERRADO
+
+    return (
+        creditos.filter(estado='PAGADO')
+        .with_saldos()
+        .filter(saldo_pendiente_anotado__gte=UMBRAL_SALDO_CERRADO)
+        .values(credito_id=F('id'), saldo=F('saldo_pendiente_anotado'))
+    )
+
+
+@invariante('saldado_sin_cerrar', 'Un crédito vigente con saldo menor a 1 debería estar PAGADO')
+def _saldado_sin_cerrar(creditos):
+    return creditos.saldados_sin_cerrar().values(
+        credito_id=F('id'), estado_credito=F('estado'), saldo=F('saldo_pendiente_anotado')
+    )
+
+
+@invariante('pagos_exceden_total', 'Lo pagado no supera el monto total a pagar')
+def _pagos_exceden_total(creditos):
+    return (
+        creditos.with_saldos()
+        .annotate(monto_a_pagar=_monto_a_pagar())
+        .filter(total_pagado_anotado__gt=F('monto_a_pagar') + TOLERANCIA)
+        .values('monto_a_pagar', credito_id=F('id'), total_pagado=F('total_pagado_anotado'))
+    )
+
+
+@invariante('cuota_pagada_incompleta', 'Una cuota PAGADA tiene monto_pagado igual a monto_cuota')
+def _cuota_pagada_incompleta(creditos):
+    from .models import CronogramaPago
+
+    return (
+        CronogramaPago.objects.filter(
+            credito__in=creditos,
+            estado__in=['PAGADA', 'PAGADO'],
+            monto_pagado__lt=F('monto_cuota') - TOLERANCIA,
+        )
+        .order_by()
+        .values('credito_id')
+        .annotate(cuotas=Count('id'))
+    )
+
+
+@invariante('tarea_abierta_cuota_pagada', 'No hay tareas de cobro abiertas sobre cuotas ya pagadas')
+def _tarea_abierta_cuota_pagada(creditos):
+    from .models import TareaCobro
+
+    return (
+        TareaCobro.objects.filter(
+            cuota__credito__in=creditos,
+            estado__in=ESTADOS_TAREA_ABIERTOS,
+            cuota__estado__in=['PAGADA', 'PAGADO'],
+        )
+        .order_by()
+        .values(credito_id=F('cuota__credito_id'))
+        .annotate(tareas=Count('id'))
+    )
+
+
+def creditos_tocados(desde):
+    """Ids de créditos con cambios posteriores a ``desde`` (cada consulta usa un índice por fecha)."""
+    from .models import Credito, CronogramaPago, Pago, TareaCobro
+
+    ids = set(Credito.objects.filter(fecha_actualizacion__gt=desde).values_list('id', flat=True))
+    ids.update(CronogramaPago.objects.filter(fecha_actualizacion__gt=desde).values_list('credito_id', flat=True))
+    ids.update(Pago.objects.filter(fecha_pago__gt=desde).values_list('credito_id', flat=True))
+    ids.update(TareaCobro.objects.filter(fecha_actualizacion__gt=desde).values_list('cuota__credito_id', flat=True))
+    return sorted(ids)
+
+
+def _serializable(fila):
+    return {k: str(v) if isinstance(v, Decimal) else v for k, v in fila.items() if k != 'credito_id'}
+
+
+def _verificar_lote(ids, ahora, por_invariante):
+    """Evalúa todos los invariantes sobre ``ids`` y sincroniza sus violaciones. Retorna (nuevas, resueltas)."""
+    from .models import Credito, ViolacionInvariante
+
+    creditos = Credito.objects.filter(id__in=ids)
+    encontradas = {}
+    for inv in INVARIANTES:
+        t0 = time.perf_counter()
+        filas = list(inv.consulta(creditos))
+        for fila in filas:
+            encontradas[(inv.codigo, fila['credito_id'])] = _serializable(fila)
+        conteo = por_invariante.setdefault(inv.codigo, {'violaciones': 0, 'ms': 0.0})
+        conteo['violaciones'] += len(filas)
+        conteo['ms'] = round(conteo['ms'] + (time.perf_counter() - t0) * 1000, 1)
+
+    abiertas = {
+        (v.invariante, v.credito_id): v
+        for v in ViolacionInvariante.objects.filter(credito_id__in=ids, resuelta_en__isnull=True)
+    }
+    nuevas = [
+        ViolacionInvariante(invariante=codigo, credito_id=credito_id, detalle=detalle, ultima_deteccion=ahora)
+        for (codigo, credito_id), detalle in encontradas.items()
+        if (codigo, credito_id) not in abiertas
+    ]
+    siguen = []
+    resueltas = []
+    for clave, violacion in abiertas.items():
+        if clave in encontradas:
+            violacion.detalle = encontradas[clave]
+            violacion.ultima_deteccion = ahora
+            siguen.append(violacion)
+        else:
+            resueltas.append(violacion.id)
+
+    with transaction.atomic():
+        ViolacionInvariante.objects.bulk_create(nuevas)
+        ViolacionInvariante.objects.bulk_update(siguen, ['detalle', 'ultima_deteccion'])
+        ViolacionInvariante.objects.filter(id__in=resueltas).update(resuelta_en=ahora)
+    return len(nuevas), len(resueltas)
+
+
+def verificar_invariantes(completa=False, lote=500, conservar=1000):
+    """
+    Revisa los créditos tocados desde la última marca (o todos, si
+    ``completa`` o si nunca se ha corrido) en lotes de ``lote`` créditos y
+    guarda la corrida en ``EjecucionInvariantes``. Una corrida a la vez: si
+    otra sigue en curso (una completa dura más que el intervalo del cron)
+    retorna ``None`` sin revisar nada.
+    """
+    from .bloqueos import BloqueoOcupado, bloqueo_asesor
+
+    try:
+        with bloqueo_asesor('verificar_invariantes', espera=0):
+            return _verificar(completa, lote, conservar)
+    except BloqueoOcupado:
+        return None
+
+
+def _verificar(completa, lote, conservar):
+    from .models import Credito, EjecucionInvariantes, ViolacionInvariante
+
+    inicio = timezone.now()
+    t0 = time.perf_counter()
+    anterior = EjecucionInvariantes.objects.order_by('-marca').first()
+    completa = completa or anterior is None
+    desde = None if completa else anterior.marca - MARGEN_MARCA
+
+    if completa:
+        ids = list(Credito.objects.order_by('id').values_list('id', flat=True))
+    else:
+        ids = creditos_tocados(desde)
+
+    nuevas = resueltas = 0
+    por_invariante = {}
+    for i in range(0, len(ids), lote):
+        n, r = _verificar_lote(ids[i:i + lote], inicio, por_invariante)
+        nuevas += n
+        resueltas += r
+
+    ejecucion = EjecucionInvariantes.objects.create(
+        inicio=inicio,
+        marca=inicio,
+        desde=desde,
+        completa=completa,
+        creditos_revisados=len(ids),
+        violaciones_nuevas=nuevas,
+        violaciones_resueltas=resueltas,
+        violaciones_abiertas=ViolacionInvariante.objects.filter(resuelta_en__isnull=True).count(),
+        por_invariante=por_invariante,
+        duracion_segundos=round(time.perf_counter() - t0, 3),
+    )
+    if conservar:
+        viejas = EjecucionInvariantes.objects.order_by('-inicio', '-id').values_list('id', flat=True)[conservar:]
+        EjecucionInvariantes.objects.filter(id__in=list(viejas)).delete()
+    return ejecucion
+
+
+def marcar_creditos_tocados(credito_ids):
+    """Adelanta ``fecha_actualizacion`` de créditos cambiados con ``update()`` (no pasa por ``save()``)."""
+    from .models import Credito
+
+    if credito_ids:
+        Credito.objects.filter(id__in=list(credito_ids)).update(fecha_actualizacion=timezone.now())
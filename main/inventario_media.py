@@ -0,0 +1,166 @@
+"""
+Inventario de MEDIA_ROOT.
+
+Recorre el disco con ``os.scandir`` (un hilo por subdirectorio de primer
+nivel: el I/O de ``stat`` libera el GIL) y acumula archivos y bytes por
+directorio. Luego cruza, en una sola pasada por modelo, todas las rutas de
+``FileField``/``ImageField`` de la BD contra el conjunto de archivos
+encontrados, sin hacer un ``stat`` por referencia.
+
+El escaneo es incremental: cada inventario guarda el ``st_mtime`` de sus
+directorios y, si un directorio no cambió desde el anterior, se reusan sus
+bytes sin hacer ``stat`` de cada archivo. Sus nombres sí se listan (un
+``readdir``, sin ``stat``): hacen falta para cruzar las referencias de la
+BD. El mtime de un directorio cambia al crear, borrar o renombrar archivos
+en él (subidas, derivados y PDF se escriben con ``os.replace``), no al
+reescribir uno en su lugar: ``completo=True`` vuelve a medir todo.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+MAX_FALTANTES_GUARDADOS = 500
+
+
+def _escanear_directorio(raiz, relativo, previo):
+    """
+    Lista un directorio. Retorna ([archivos, bytes, mtime, reusado], {rutas}, [subdirectorios])
+    o ``None`` si no se pudo leer. ``previo`` es su entrada del inventario anterior.
+    """
+    ruta_dir = os.path.join(raiz, relativo)
+    try:
+        # Antes de listar: si cambia mientras se lista, el próximo inventario lo vuelve a medir
+        mtime = os.stat(ruta_dir).st_mtime_ns
+        archivos = []
+        subdirectorios = []
+        with os.scandir(ruta_dir) as entradas:
+            for entrada in entradas:
+                ruta = f'{relativo}/{entrada.name}' if relativo else entrada.name
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        subdirectorios.append(ruta)
+                    elif entrada.is_file(follow_symlinks=False):
+                        archivos.append((ruta, entrada))
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    if previo and previo.get('mtime') == mtime and previo.get('archivos') == len(archivos):
+        conteo = [len(archivos), previo['bytes'], mtime, True]
+    else:
+        total = 0
+        for _, entrada in archivos:
+            try:
+                total += entrada.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        conteo = [len(archivos), total, mtime, False]
+    return conteo, {ruta for ruta, _ in archivos}, subdirectorios
+
+
+def _escanear_arbol(raiz, relativo_inicial, previos):
+    """Recorre un subárbol. Retorna ({dir_relativo: [archivos, bytes, mtime, reusado]}, {rutas relativas})."""
+    por_directorio = {}
+    archivos = set()
+    pendientes = [relativo_inicial]
+    while pendientes:
+        relativo = pendientes.pop()
+        clave = relativo or '.'
+        resultado = _escanear_directorio(raiz, relativo, previos.get(clave))
+        if resultado is None:
+            continue
+        por_directorio[clave], rutas, subdirectorios = resultado
+        archivos |= rutas
+        pendientes.extend(subdirectorios)
+    return por_directorio, archivos
+
+
+def escanear_media(raiz=None, hilos=8, previos=None):
+    """
+    Totales por directorio (``[archivos, bytes, mtime, reusado]``) y conjunto de
+    rutas (relativas, con '/') de MEDIA_ROOT. ``previos`` es el ``por_directorio``
+    del inventario anterior: los directorios sin cambios reusan sus bytes.
+    """
+    raiz = str(raiz or settings.MEDIA_ROOT)
+    previos = previos or {}
+    por_directorio = {}
+    archivos = set()
+    if not os.path.isdir(raiz):
+        return por_directorio, archivos
+
+    resultado = _escanear_directorio(raiz, '', previos.get('.'))
+    if resultado is None:
+        return por_directorio, archivos
+    por_directorio['.'], archivos, subdirectorios = resultado
+
+    with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+        for parcial, rutas in pool.map(lambda d: _escanear_arbol(raiz, d, previos), subdirectorios):
+            por_directorio.update(parcial)
+            archivos |= rutas
+    return por_directorio, archivos
+
+
+def campos_archivo():
+    """[(modelo, [nombres de FileField/ImageField])] de la app main."""
+    resultado = []
+    for modelo in apps.get_app_config('main').get_models():
+        campos = [f.name for f in modelo._meta.get_fields() if isinstance(f, models.FileField)]
+        if campos:
+            resultado.append((modelo, campos))
+    return resultado
+
+
+def buscar_faltantes(archivos, limite=MAX_FALTANTES_GUARDADOS):
+    """
+    Cruza las rutas de archivos de la BD contra ``archivos``.
+    Retorna (total_referencias, total_faltantes, detalle acotado a ``limite``).
+    """
+    total = 0
+    faltantes = 0
+    detalle = []
+    for modelo, campos in campos_archivo():
+        filas = modelo.objects.values_list('pk', *campos).order_by('pk').iterator(chunk_size=2000)
+        for pk, *rutas in filas:
+            for campo, ruta in zip(campos, rutas):
+                if not ruta:
+                    continue
+                total += 1
+                if ruta.replace(os.sep, '/') not in archivos:
+                    faltantes += 1
+                    if len(detalle) < limite:
+                        detalle.append({'modelo': modelo.__name__, 'id': pk, 'campo': campo, 'ruta': ruta})
+    return total, faltantes, detalle
+
+
+def generar_inventario(hilos=8, conservar=30, completo=False):
+    """
+    Escanea (reusando lo que no cambió desde el último inventario, salvo
+    ``completo``), cruza con la BD, guarda un ``InventarioMedia`` y purga los
+    más antiguos. Retorna (inventario, directorios reusados).
+    """
+    from .models import InventarioMedia
+
+    inicio = time.perf_counter()
+    anterior = None if completo else InventarioMedia.objects.order_by('-fecha', '-id').first()
+    por_directorio, archivos = escanear_media(hilos=hilos, previos=anterior.por_directorio if anterior else None)
+    total_referencias, total_faltantes, faltantes = buscar_faltantes(archivos)
+    inventario = InventarioMedia.objects.create(
+        total_archivos=sum(c[0] for c in por_directorio.values()),
+        total_bytes=sum(c[1] for c in por_directorio.values()),
+        por_directorio={
+            d: {'archivos': c[0], 'bytes': c[1], 'mtime': c[2]} for d, c in sorted(por_directorio.items()) if c[0]
+        },
+        total_referencias=total_referencias,
+        total_faltantes=total_faltantes,
+        faltantes=faltantes,
+        duracion_segundos=round(time.perf_counter() - inicio, 3),
+    )
+    if conservar:
+        viejos = InventarioMedia.objects.order_by('-fecha', '-id').values_list('id', flat=True)[conservar:]
+        InventarioMedia.objects.filter(id__in=list(viejos)).delete()
+    return inventario, sum(1 for c in por_directorio.values() if c[0] and c[3])
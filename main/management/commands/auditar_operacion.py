@@ -1,145 +1,230 @@
-from django.core.management.base import BaseCommand
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.utils import timezone
 
+from main.invariantes import ESTADOS_TAREA_ABIERTOS, marcar_creditos_tocados
 from main.models import Credito, CronogramaPago, Pago, TareaCobro
+from main.pdf_cache import invalidar_credito
+
+# Hallazgos que impiden operar; con --estricto terminan con codigo 1
+CHECKS_BLOQUEANTES = ("cronograma_pagado_legacy", "tareas_huerfanas_abiertas", "tareas_abiertas_duplicadas")
+MUESTRA = 20
+
+
+def _cuota_del_pago():
+    """Cuota del cronograma con el mismo credito y numero_cuota que el pago externo."""
+    return CronogramaPago.objects.filter(
+        credito_id=OuterRef("credito_id"),
+        numero_cuota=OuterRef("numero_cuota"),
+    ).order_by("id")
+
+
+def _por_lotes(queryset, lote, actualizar):
+    """
+    Aplica ``actualizar(qs_del_lote)`` sobre ``queryset`` en lotes de ``lote``
+    ids (recorridos por id ascendente), cada lote en su propia transaccion
+    corta en lugar de una sola transaccion para toda la auditoria.
+    Retorna el total de filas actualizadas.
+    """
+    total = 0
+    ultimo_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=ultimo_id).order_by("id").values_list("id", flat=True)[:lote])
+        if not ids:
+            return total
+        with transaction.atomic():
+            total += actualizar(queryset.model.objects.filter(id__in=ids))
+        ultimo_id = ids[-1]
 
 
 class Command(BaseCommand):
-    help = "Audita integridad operativa (pagos, cuotas, tareas, cartera)."
+    help = (
+        "Audita integridad operativa (pagos, cuotas, tareas, cartera) con consultas agregadas; "
+        "--fix aplica correcciones seguras con update() por lotes."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--fix",
             action="store_true",
-            help="Aplica correcciones seguras (normalizacion de estados y cierre de tareas huerfanas).",
+            help="Aplica correcciones seguras (normalizacion de estados, cierre de tareas huerfanas y vinculo pago-cuota).",
+        )
+        parser.add_argument("--lote", type=int, default=1000, help="Filas por lote/transaccion en --fix.")
+        parser.add_argument("--json", action="store_true", help="Imprime el resultado como JSON (para el cron nocturno).")
+        parser.add_argument(
+            "--estricto",
+            action="store_true",
+            help="Termina con codigo 1 si quedan hallazgos bloqueantes (uso como health gate).",
         )
 
     def handle(self, *args, **options):
         apply_fix = bool(options.get("fix"))
-        self.stdout.write("Iniciando auditoria operativa...\n")
-
-        resumen = {
-            "cronograma_pagado_legacy": 0,
-            "tareas_huerfanas_abiertas": 0,
-            "tareas_abiertas_duplicadas": 0,
-            "pagos_sin_cuota": 0,
-            "creditos_cerrables_por_saldo": 0,
-            "fixes_aplicados": 0,
-        }
+        lote = max(1, options["lote"])
+        como_json = options["json"]
+        inicio = time.perf_counter()
+        if not como_json:
+            self.stdout.write("Iniciando auditoria operativa...\n")
 
-        # 1) Estados legacy en cronograma
         legacy_qs = CronogramaPago.objects.filter(estado="PAGADO")
-        resumen["cronograma_pagado_legacy"] = legacy_qs.count()
-
-        # 2) Tareas abiertas de cuotas ya pagadas
-        estados_abiertos = [
-            "PENDIENTE",
-            "EN_PROCESO",
-            "NO_ENCONTRADO",
-            "NO_ESTABA",
-            "NO_PUDO_PAGAR",
-            "REPROGRAMADO",
-        ]
         tareas_huerfanas = TareaCobro.objects.filter(
-            estado__in=estados_abiertos,
+            estado__in=ESTADOS_TAREA_ABIERTOS,
             cuota__estado__in=["PAGADA", "PAGADO"],
         )
-        resumen["tareas_huerfanas_abiertas"] = tareas_huerfanas.count()
-
-        # 3) Duplicados operativos de tareas abiertas por cuota + fecha
+        pagos_sin_cuota = Pago.objects.filter(cuota__isnull=True)
+        pagos_vinculables = pagos_sin_cuota.filter(numero_cuota__gt=0).filter(Exists(_cuota_del_pago()))
         duplicadas = (
-            TareaCobro.objects.filter(estado__in=estados_abiertos)
+            TareaCobro.objects.filter(estado__in=ESTADOS_TAREA_ABIERTOS)
             .values("cuota_id", "fecha_asignacion")
             .annotate(c=Count("id"))
             .filter(c__gt=1)
         )
-        resumen["tareas_abiertas_duplicadas"] = duplicadas.count()
+        creditos_cerrables = Credito.objects.saldados_sin_cerrar().order_by("id")
 
-        # 4) Pagos sin cuota asociada
-        pagos_sin_cuota = Pago.objects.filter(cuota__isnull=True)
-        resumen["pagos_sin_cuota"] = pagos_sin_cuota.count()
+        checks = {}
+
+        def medir(nombre, contar, muestra=None):
+            t0 = time.perf_counter()
+            hallazgos = contar()
+            checks[nombre] = {
+                "hallazgos": hallazgos,
+                "muestra": list(muestra()) if muestra and hallazgos else [],
+                "ms": round((time.perf_counter() - t0) * 1000, 1),
+            }
+
+        # 1) Estados legacy en cronograma
+        medir("cronograma_pagado_legacy", legacy_qs.count)
+
+        # 2) Tareas abiertas de cuotas ya pagadas
+        medir("tareas_huerfanas_abiertas", tareas_huerfanas.count)
+
+        # 3) Duplicados operativos de tareas abiertas por cuota + fecha
+        medir("tareas_abiertas_duplicadas", duplicadas.count)
+
+        # 4) Pagos sin cuota asociada (y cuantos se pueden vincular por credito + numero_cuota)
+        medir(
+            "pagos_sin_cuota",
+            pagos_sin_cuota.count,
+            lambda: pagos_sin_cuota.order_by("id").values("id", "credito_id", "numero_cuota", "monto")[:MUESTRA],
+        )
+        medir("pagos_vinculables", pagos_vinculables.count)
 
-        # 5) Creditos con saldo practicamente cero pero no cerrados
-        creditos_cerrables = []
-        for credito in Credito.objects.filter(estado__in=["APROBADO", "DESEMBOLSADO", "VENCIDO"]):
-            if credito.saldo_pendiente() < 1:
-                creditos_cerrables.append(credito.id)
-        resumen["creditos_cerrables_por_saldo"] = len(creditos_cerrables)
+        # 5) Creditos con saldo practicamente cero pero no cerrados (saldo anotado en SQL)
+        medir(
+            "creditos_cerrables_por_saldo",
+            creditos_cerrables.count,
+            lambda: creditos_cerrables.values_list("id", flat=True)[:MUESTRA],
+        )
 
-        # Correcciones seguras
+        fixes = {}
         if apply_fix:
-            with transaction.atomic():
-                # A) Normalizar estado legacy PAGADO -> PAGADA
-                updated_legacy = legacy_qs.update(estado="PAGADA")
-                resumen["fixes_aplicados"] += updated_legacy
-
-                # B) Cerrar tareas huerfanas de cuotas pagadas
-                cuota_ids = set(tareas_huerfanas.values_list("cuota_id", flat=True))
-                for cuota_id in cuota_ids:
-                    closed = TareaCobro.objects.filter(
-                        cuota_id=cuota_id,
-                        estado__in=estados_abiertos,
-                    ).update(
+            def corregir(nombre, aplicar):
+                t0 = time.perf_counter()
+                fixes[nombre] = {"filas": aplicar(), "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+            # A) Normalizar estado legacy PAGADO -> PAGADA
+            corregir(
+                "cronograma_pagado_legacy",
+                lambda: _por_lotes(
+                    legacy_qs, lote, lambda qs: qs.update(estado="PAGADA", fecha_actualizacion=timezone.now())
+                ),
+            )
+
+            # B) Cerrar tareas huerfanas de cuotas pagadas
+            corregir(
+                "tareas_huerfanas_abiertas",
+                lambda: _por_lotes(
+                    tareas_huerfanas,
+                    lote,
+                    lambda qs: qs.update(
                         estado="CANCELADO",
                         fecha_reprogramacion=None,
                         observaciones="Cancelada automaticamente en auditoria: cuota pagada.",
-                    )
-                    resumen["fixes_aplicados"] += closed
-
-                # C) Vincular pagos sin cuota cuando numero_cuota > 0 y coincide credito+cuota
-                vinculados = 0
-                for pago in pagos_sin_cuota.select_related("credito"):
-                    if not pago.numero_cuota or pago.numero_cuota <= 0:
-                        continue
-                    cuota = CronogramaPago.objects.filter(
-                        credito_id=pago.credito_id,
-                        numero_cuota=pago.numero_cuota,
-                    ).first()
-                    if cuota:
-                        pago.cuota = cuota
-                        pago.save(update_fields=["cuota"])
-                        vinculados += 1
-                resumen["fixes_aplicados"] += vinculados
-
-        # Reporte
+                        fecha_actualizacion=timezone.now(),
+                    ),
+                ),
+            )
+
+            # C) Vincular pagos sin cuota cuando numero_cuota > 0 y coincide credito+cuota.
+            # update() no dispara post_save: los PDF cacheados se invalidan a mano y el
+            # credito se marca para main.invariantes.
+            def vincular(qs):
+                creditos = set(qs.values_list("credito_id", flat=True))
+                filas = qs.update(cuota_id=Subquery(_cuota_del_pago().values("id")[:1]))
+                marcar_creditos_tocados(creditos)
+
+                def invalidar():
+                    for credito_id in creditos:
+                        invalidar_credito(credito_id)
+
+                transaction.on_commit(invalidar)
+                return filas
+
+            corregir("pagos_vinculables", lambda: _por_lotes(pagos_vinculables, lote, vincular))
+
+            # Recontar lo bloqueante: los duplicados, por ejemplo, no se corrigen aqui
+            for nombre, contar in (
+                ("cronograma_pagado_legacy", legacy_qs.count),
+                ("tareas_huerfanas_abiertas", tareas_huerfanas.count),
+                ("tareas_abiertas_duplicadas", duplicadas.count),
+            ):
+                checks[nombre]["pendientes_tras_fix"] = contar()
+
+        hay_bloqueantes = any(
+            checks[n].get("pendientes_tras_fix", checks[n]["hallazgos"]) > 0 for n in CHECKS_BLOQUEANTES
+        )
+        resultado = {
+            "estado": "ATENCION" if hay_bloqueantes else "OK",
+            "fix": apply_fix,
+            "checks": checks,
+            "fixes": fixes,
+            "duracion_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        }
+
+        if como_json:
+            self.stdout.write(json.dumps(resultado, default=str, indent=2))
+        else:
+            self._reporte(resultado)
+
+        if options["estricto"] and hay_bloqueantes:
+            raise CommandError("Auditoria con hallazgos bloqueantes.", returncode=1)
+
+    def _reporte(self, resultado):
+        checks = resultado["checks"]
         self.stdout.write("RESULTADO AUDITORIA")
-        self.stdout.write(f"- cronograma_pagado_legacy: {resumen['cronograma_pagado_legacy']}")
-        self.stdout.write(f"- tareas_huerfanas_abiertas: {resumen['tareas_huerfanas_abiertas']}")
-        self.stdout.write(f"- tareas_abiertas_duplicadas: {resumen['tareas_abiertas_duplicadas']}")
-        self.stdout.write(f"- pagos_sin_cuota: {resumen['pagos_sin_cuota']}")
-        self.stdout.write(f"- creditos_cerrables_por_saldo: {resumen['creditos_cerrables_por_saldo']}")
-        if apply_fix:
-            self.stdout.write(f"- fixes_aplicados: {resumen['fixes_aplicados']}")
+        for nombre, check in checks.items():
+            self.stdout.write(f"- {nombre}: {check['hallazgos']}  ({check['ms']} ms)")
+        if resultado["fix"]:
+            for nombre, fix in resultado["fixes"].items():
+                self.stdout.write(f"- fix {nombre}: {fix['filas']} filas  ({fix['ms']} ms)")
+            self.stdout.write(f"- fixes_aplicados: {sum(f['filas'] for f in resultado['fixes'].values())}")
+        self.stdout.write(f"- duracion total: {resultado['duracion_ms']} ms")
         self.stdout.write("")
 
         # Hallazgos en detalle para accion manual
-        if resumen["pagos_sin_cuota"] > 0:
+        if checks["pagos_sin_cuota"]["muestra"]:
             self.stdout.write("Pagos sin cuota (detalle breve):")
-            for p in pagos_sin_cuota.values("id", "credito_id", "numero_cuota", "monto")[:10]:
+            for p in checks["pagos_sin_cuota"]["muestra"][:10]:
                 self.stdout.write(
                     f"  Pago #{p['id']} | credito={p['credito_id']} | numero_cuota={p['numero_cuota']} | monto={p['monto']}"
                 )
             self.stdout.write("")
 
-        if resumen["creditos_cerrables_por_saldo"] > 0:
+        if checks["creditos_cerrables_por_saldo"]["muestra"]:
             self.stdout.write(
                 "Creditos con saldo < 1 y estado activo (revisar cierre): "
-                + ", ".join(str(cid) for cid in creditos_cerrables[:20])
+                + ", ".join(str(cid) for cid in checks["creditos_cerrables_por_saldo"]["muestra"])
             )
             self.stdout.write("")
 
-        hay_bloqueantes = any(
-            [
-                resumen["cronograma_pagado_legacy"] > 0,
-                resumen["tareas_huerfanas_abiertas"] > 0,
-                resumen["tareas_abiertas_duplicadas"] > 0,
-            ]
-        )
-
-        if hay_bloqueantes and not apply_fix:
+        if resultado["estado"] == "ATENCION" and not resultado["fix"]:
             self.stdout.write(
                 self.style.WARNING("Estado: ATENCION - hay hallazgos. Ejecuta con --fix para correcciones seguras.")
             )
+        elif resultado["estado"] == "ATENCION":
+            self.stdout.write(self.style.WARNING("Estado: ATENCION - quedan hallazgos que --fix no corrige."))
         else:
             self.stdout.write(self.style.SUCCESS("Estado: OK operativo para demo."))
@@ -0,0 +1,111 @@
+# Arranque en frío de un worker (django.setup + URLconf) y su memoria, en el árbol actual o en otra revisión
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PESADOS = ('reportlab', 'PIL', 'pandas', 'numpy', 'openpyxl')
+
+# Lo que hace un worker antes de atender la primera petición
+_HIJO = r'''
+import json, os, sys, time
+t0 = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'creditos.settings')
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+t2 = time.perf_counter()
+rss = 0
+try:
+    with open('/proc/self/status') as f:
+        rss = int(next(l for l in f if l.startswith('VmRSS:')).split()[1])
+except OSError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'setup_ms': (t1 - t0) * 1000,
+    'urls_ms': (t2 - t1) * 1000,
+    'rss_kb': rss,
+    'pesados': sorted({m.split('.')[0] for m in sys.modules} & set(%r)),
+}))
+''' % (PESADOS,)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide en procesos nuevos el tiempo de django.setup() + carga de las URL (todas las vistas) y la '
+        'memoria residente resultante, y lista los imports más caros según python -X importtime. '
+        'Con --ref compara contra otra revisión de git (p. ej. --ref HEAD~1).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ref', action='append', default=[], help='Revisión de git a comparar (repetible).')
+        parser.add_argument('--repeticiones', type=int, default=7)
+        parser.add_argument('--top', type=int, default=8, help='Imports de primer nivel más caros a mostrar.')
+
+    def _medir(self, raiz, repeticiones, top):
+        # Con los .pyc ya compilados, como en un worker de un despliegue que ya arrancó una vez
+        subprocess.run([sys.executable, '-m', 'compileall', '-q', 'creditos', 'main'], cwd=raiz, capture_output=True)
+        corridas = []
+        for _ in range(repeticiones):
+            salida = subprocess.run([sys.executable, '-c', _HIJO], cwd=raiz, capture_output=True, text=True)
+            if salida.returncode:
+                raise CommandError(f'Falló el arranque en {raiz}:\n{salida.stderr[-2000:]}')
+            corridas.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+        traza = subprocess.run([sys.executable, '-X', 'importtime', '-c', _HIJO], cwd=raiz,
+                               capture_output=True, text=True).stderr
+        primer_nivel = []
+        for linea in traza.splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            _, acumulado, nombre = linea[len('import time:'):].split('|')
+            if not nombre[1:].startswith(' '):
+                primer_nivel.append((int(acumulado), nombre.strip()))
+        primer_nivel.sort(reverse=True)
+        return {
+            'arranque_ms': statistics.median(c['setup_ms'] + c['urls_ms'] for c in corridas),
+            'urls_ms': statistics.median(c['urls_ms'] for c in corridas),
+            'rss_mb': statistics.median(c['rss_kb'] for c in corridas) / 1024,
+            'pesados': corridas[-1]['pesados'],
+            'top': primer_nivel[:top],
+        }
+
+    def _extraer(self, ref, destino):
+        archivo = subprocess.run(['git', 'archive', '--format=tar', ref], cwd=settings.BASE_DIR, capture_output=True)
+        if archivo.returncode:
+            raise CommandError(f'git archive {ref}: {archivo.stderr.decode().strip()}')
+        with tarfile.open(fileobj=io.BytesIO(archivo.stdout)) as tar:
+            tar.extractall(destino, filter='data')
+
+    def handle(self, *args, **options):
+        resultados = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for ref in options['ref']:
+                destino = os.path.join(tmp, ref.replace('/', '_'))
+                self._extraer(ref, destino)
+                resultados.append((ref, self._medir(destino, options['repeticiones'], options['top'])))
+            resultados.append(('árbol actual', self._medir(settings.BASE_DIR, options['repeticiones'], options['top'])))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Arranque en frío de un worker (mediana de {options["repeticiones"]} procesos)'
+        ))
+        self.stdout.write(f'  {"versión":<14} {"arranque":>10} {"de ellos URLs":>14} {"RSS":>9}  cargados')
+        for nombre, r in resultados:
+            self.stdout.write(
+                f'  {nombre:<14} {r["arranque_ms"]:7.0f} ms {r["urls_ms"]:11.0f} ms {r["rss_mb"]:6.1f} MB  '
+                f'{", ".join(r["pesados"]) or "-"}'
+            )
+        for nombre, r in resultados:
+            self.stdout.write(f'\n  Imports de primer nivel más caros ({nombre}, -X importtime):')
+            for acumulado, modulo in r['top']:
+                self.stdout.write(f'    {acumulado / 1000:8.1f} ms  {modulo}')
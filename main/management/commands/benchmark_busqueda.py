@@ -0,0 +1,107 @@
+# Benchmark de búsqueda de clientes: icontains sobre 4 columnas vs. main.busqueda.buscar()
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from main.busqueda import buscar, fts_disponible, texto_busqueda_cliente
+from main.models import Cliente
+
+NOMBRES = ['José', 'María', 'Andrés', 'Lucía', 'Óscar', 'Ángela', 'Julián', 'Sofía', 'Camilo', 'Valentina',
+           'Sebastián', 'Natalia', 'Iván', 'Mónica', 'Hernán', 'Daniela', 'Ramón', 'Paula', 'Germán', 'Inés']
+APELLIDOS = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'Pérez', 'Sánchez', 'Ramírez', 'Muñoz', 'Díaz', 'Peña',
+             'Castaño', 'Cárdenas', 'Giraldo', 'Ospina', 'Zuluaga', 'Agudelo', 'Suárez', 'Nuñez', 'Ríos', 'Vélez']
+BARRIOS = ['Centro', 'San José', 'La Aurora', 'El Poblado', 'Belén', 'Los Álamos', 'Boston', 'Manrique',
+           'Guayabal', 'La Floresta']
+CONSULTAS = ['jose', 'Martínez', 'andres pena', '1012', '10345678', 'san jose', 'zuluaga ines', 'xyz']
+
+
+class _Rollback(Exception):
+    """Señal para descartar el fixture al terminar."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Completa la tabla de clientes hasta N (dentro de una transacción que se revierte) y compara '
+        'la búsqueda anterior con icontains contra buscar() (conteo + primera página).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=200000, help='Clientes totales para la prueba.')
+        parser.add_argument('--repeticiones', type=int, default=10, help='Repeticiones por consulta.')
+        parser.add_argument('--por-pagina', type=int, default=25, help='Filas de la primera página.')
+        parser.add_argument('--semilla', type=int, default=7)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._ejecutar(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Fixture revertido.')
+
+    def _completar(self, total, semilla):
+        faltantes = total - Cliente.objects.count()
+        if faltantes <= 0:
+            return 0
+        rnd = random.Random(semilla)
+        base = 10_000_000 + Cliente.objects.count()
+        t0 = time.perf_counter()
+        for inicio in range(0, faltantes, 5000):
+            lote = []
+            for i in range(inicio, min(inicio + 5000, faltantes)):
+                cliente = Cliente(
+                    nombres=f'{rnd.choice(NOMBRES)} {rnd.choice(NOMBRES)}',
+                    apellidos=f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}',
+                    cedula=str(base + i),
+                    celular='3000000000',
+                    barrio=rnd.choice(BARRIOS),
+                )
+                # bulk_create no pasa por save(): el texto se calcula aquí (los triggers FTS sí corren)
+                cliente.texto_busqueda = texto_busqueda_cliente(cliente)
+                lote.append(cliente)
+            Cliente.objects.bulk_create(lote, batch_size=1000)
+        self.stdout.write(f'{faltantes} clientes creados en {time.perf_counter() - t0:.1f}s.')
+        return faltantes
+
+    def _medir(self, construir, repeticiones, por_pagina):
+        tiempos = []
+        total = 0
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            qs = construir()
+            total = qs.count()
+            list(qs[:por_pagina].values_list('id', flat=True))
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(tiempos), total
+
+    def _ejecutar(self, options):
+        self._completar(options['clientes'], options['semilla'])
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE main_cliente')
+            elif connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+        motor = connection.vendor + (' + FTS5' if fts_disponible() else '')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{Cliente.objects.count():,} clientes, motor {motor}, mediana de {options["repeticiones"]} repeticiones'
+        ))
+        self.stdout.write(f'  {"consulta":<16} {"icontains":>12} {"buscar()":>12} {"filas antes":>12} {"filas ahora":>12}')
+        base = Cliente.objects.filter(activo=True).order_by('-fecha_registro')
+        for q in CONSULTAS:
+            ms_antes, filas_antes = self._medir(
+                lambda: base.filter(
+                    Q(cedula__icontains=q) | Q(nombres__icontains=q) | Q(apellidos__icontains=q) | Q(barrio__icontains=q)
+                ),
+                options['repeticiones'], options['por_pagina'],
+            )
+            ms_ahora, filas_ahora = self._medir(
+                lambda: buscar(base, q, ordenar=True), options['repeticiones'], options['por_pagina'],
+            )
+            self.stdout.write(
+                f'  {q:<16} {ms_antes:9.1f} ms {ms_ahora:9.1f} ms {filas_antes:12,} {filas_ahora:12,}'
+            )
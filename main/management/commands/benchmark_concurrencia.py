@@ -0,0 +1,140 @@
+# Prueba de carga: gunicorn con 1 worker sync (arranque anterior) vs gunicorn.conf.py (gthread)
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+# gunicorn lee ./gunicorn.conf.py si no se le pasa -c: el perfil anterior usa uno vacío
+PERFILES = {
+    'antes': ['-c', os.devnull, '--workers', '1', '--worker-class', 'sync', '--timeout', '120'],
+    'gthread': ['-c', 'gunicorn.conf.py'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta gunicorn con cada perfil y mide cuántas peticiones rápidas (un listado) se atienden '
+        'mientras otros clientes piden en bucle una ruta lenta (exportación a Excel). Solo biblioteca '
+        'estándar: hilos + urllib contra la BD configurada.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruta-rapida', default='/clientes/')
+        parser.add_argument('--ruta-lenta', default='/exportar-pagos-excel/')
+        parser.add_argument('--clientes', type=int, default=8, help='Clientes concurrentes en la ruta rápida.')
+        parser.add_argument('--lentos', type=int, default=1, help='Clientes concurrentes en la ruta lenta.')
+        parser.add_argument('--duracion', type=float, default=15, help='Segundos de carga por perfil.')
+        parser.add_argument('--puerto', type=int, default=8765)
+        parser.add_argument('--perfiles', default='antes,gthread', help=f'Separados por coma: {", ".join(PERFILES)}.')
+        parser.add_argument('--usuario', default='', help='Usuario con sesión (por defecto, el primer superusuario).')
+
+    def _cookie_sesion(self, username):
+        User = get_user_model()
+        usuarios = User.objects.filter(is_active=True)
+        usuario = usuarios.filter(username=username).first() if username else usuarios.filter(is_superuser=True).first()
+        if usuario is None:
+            raise CommandError('No hay usuario para autenticar las peticiones (use --usuario).')
+        sesion = import_module(settings.SESSION_ENGINE).SessionStore()
+        sesion[SESSION_KEY] = str(usuario.pk)
+        sesion[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sesion.save()
+        return f'{settings.SESSION_COOKIE_NAME}={sesion.session_key}', sesion
+
+    def _pedir(self, url, cabeceras, timeout=180):
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=cabeceras), timeout=timeout) as r:
+                r.read()
+                estado = r.status
+        except urllib.error.HTTPError as e:
+            estado = e.code
+        except (urllib.error.URLError, OSError):
+            estado = None
+        return estado, (time.perf_counter() - t0) * 1000
+
+    def _arrancar(self, perfil, puerto, base, cabeceras):
+        env = dict(os.environ, PORT=str(puerto), DB_ROL='web')
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'creditos.wsgi:application',
+             '--bind', f'127.0.0.1:{puerto}', *PERFILES[perfil]],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if proceso.poll() is not None:
+                raise CommandError(f'gunicorn ({perfil}) terminó al arrancar:\n{proceso.stderr.read().decode()}')
+            if self._pedir(base + self.ruta_rapida, cabeceras, timeout=5)[0] is not None:
+                return proceso
+            time.sleep(0.3)
+        proceso.terminate()
+        raise CommandError(f'gunicorn ({perfil}) no respondió en 30 s.')
+
+    def _cargar(self, base, cabeceras, clientes, lentos, duracion):
+        rapidas, lentas = [], []
+        fin = time.monotonic() + duracion
+
+        def bucle(ruta, destino):
+            while time.monotonic() < fin:
+                destino.append(self._pedir(base + ruta, cabeceras))
+
+        hilos = [threading.Thread(target=bucle, args=(self.ruta_lenta, lentas)) for _ in range(lentos)]
+        hilos += [threading.Thread(target=bucle, args=(self.ruta_rapida, rapidas)) for _ in range(clientes)]
+        t0 = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return rapidas, lentas, time.perf_counter() - t0
+
+    def handle(self, *args, **options):
+        perfiles = [p.strip() for p in options['perfiles'].split(',') if p.strip()]
+        desconocidos = set(perfiles) - set(PERFILES)
+        if desconocidos:
+            raise CommandError(f'Perfiles desconocidos: {", ".join(sorted(desconocidos))}')
+        self.ruta_rapida = options['ruta_rapida']
+        self.ruta_lenta = options['ruta_lenta']
+        cookie, sesion = self._cookie_sesion(options['usuario'])
+        cabeceras = {'Cookie': cookie, 'X-Forwarded-Proto': 'https'}
+        base = f'http://127.0.0.1:{options["puerto"]}'
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["clientes"]} clientes en {self.ruta_rapida} + {options["lentos"]} en {self.ruta_lenta}, '
+            f'{options["duracion"]:.0f} s por perfil'
+        ))
+        self.stdout.write(
+            f'  {"perfil":<9} {"rápidas/s":>10} {"p50":>9} {"p95":>9} {"máx":>9} {"lentas":>7} {"errores":>8}'
+        )
+        try:
+            for perfil in perfiles:
+                proceso = self._arrancar(perfil, options['puerto'], base, cabeceras)
+                try:
+                    rapidas, lentas, segundos = self._cargar(
+                        base, cabeceras, options['clientes'], options['lentos'], options['duracion']
+                    )
+                finally:
+                    proceso.terminate()
+                    try:
+                        proceso.wait(timeout=30)
+                    except subprocess.TimeoutExpired:
+                        proceso.kill()
+                ok = sorted(ms for estado, ms in rapidas if estado == 200)
+                errores = sum(1 for estado, _ in rapidas + lentas if estado != 200)
+                if not ok:
+                    raise CommandError(f'Ninguna petición rápida respondió 200 con el perfil {perfil}.')
+                self.stdout.write(
+                    f'  {perfil:<9} {len(ok) / segundos:10.1f} {statistics.median(ok):6.0f} ms '
+                    f'{ok[max(0, int(len(ok) * 0.95) - 1)]:6.0f} ms {ok[-1]:6.0f} ms '
+                    f'{sum(1 for e, _ in lentas if e == 200):7} {errores:8}'
+                )
+        finally:
+            sesion.delete()
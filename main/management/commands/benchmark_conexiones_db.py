@@ -0,0 +1,104 @@
+# Benchmark de latencia por petición con y sin conexiones persistentes a la BD (CONN_MAX_AGE)
+import io
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia de una vista pasando por el handler WSGI real (con las señales que cierran '
+        'o reutilizan la conexión al final de cada petición) con CONN_MAX_AGE=0 y con conexión '
+        'persistente, con y sin CONN_HEALTH_CHECKS. Usa la BD configurada (PostgreSQL o SQLite).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruta', default='/clientes/', help='Ruta a pedir (autenticada).')
+        parser.add_argument('--peticiones', type=int, default=200)
+        parser.add_argument('--usuario', default='', help='Usuario con sesión (por defecto, el primer superusuario).')
+        parser.add_argument('--conn-max-age', type=int, default=60, help='CONN_MAX_AGE del modo persistente.')
+
+    def _cookie_sesion(self, username):
+        User = get_user_model()
+        usuarios = User.objects.filter(is_active=True)
+        usuario = usuarios.filter(username=username).first() if username else usuarios.filter(is_superuser=True).first()
+        if usuario is None:
+            raise CommandError('No hay usuario para autenticar las peticiones (use --usuario).')
+        sesion = import_module(settings.SESSION_ENGINE).SessionStore()
+        sesion[SESSION_KEY] = str(usuario.pk)
+        sesion[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sesion.save()
+        return f'{settings.SESSION_COOKIE_NAME}={sesion.session_key}', sesion
+
+    def _medir(self, handler, environ_base, n):
+        tiempos = []
+        estados = set()
+        for _ in range(n):
+            environ = dict(environ_base, **{'wsgi.input': io.BytesIO(b'')})
+            t0 = time.perf_counter()
+            respuesta = handler(environ, lambda status, headers, exc_info=None: estados.add(status))
+            b''.join(respuesta)
+            respuesta.close()  # dispara request_finished -> close_old_connections
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        return tiempos, estados
+
+    def handle(self, *args, **options):
+        cookie, sesion = self._cookie_sesion(options['usuario'])
+        ruta, _, consulta = options['ruta'].partition('?')
+        environ_base = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': ruta,
+            'QUERY_STRING': consulta,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': cookie,
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': io.StringIO(),
+        }
+        if settings.SECURE_SSL_REDIRECT:
+            environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+        handler = WSGIHandler()
+
+        abiertas = [0]
+
+        def contar(sender, **kwargs):
+            abiertas[0] += 1
+
+        connection_created.connect(contar)
+        modos = [
+            ('CONN_MAX_AGE=0 (antes)', 0, False),
+            (f'CONN_MAX_AGE={options["conn_max_age"]}', options['conn_max_age'], False),
+            (f'CONN_MAX_AGE={options["conn_max_age"]} + health checks', options['conn_max_age'], True),
+        ]
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{connection.vendor} · {options["peticiones"]} peticiones GET {options["ruta"]}'
+        ))
+        self.stdout.write(f'  {"modo":<36} {"media":>9} {"p50":>9} {"p95":>9} {"conexiones":>11}')
+        try:
+            for nombre, max_age, health in modos:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health
+                self._medir(handler, environ_base, 5)  # calentamiento
+                connection.close()
+                abiertas[0] = 0
+                tiempos, estados = self._medir(handler, environ_base, options['peticiones'])
+                if estados != {'200 OK'}:
+                    raise CommandError(f'Respuestas inesperadas {estados}: revise --ruta y --usuario.')
+                tiempos.sort()
+                self.stdout.write(
+                    f'  {nombre:<36} {statistics.mean(tiempos):6.2f} ms {statistics.median(tiempos):6.2f} ms '
+                    f'{tiempos[int(len(tiempos) * 0.95) - 1]:6.2f} ms {abiertas[0]:11}'
+                )
+        finally:
+            connection_created.disconnect(contar)
+            sesion.delete()
@@ -0,0 +1,113 @@
+# Benchmark de generación de cronogramas: create() por cuota vs. bulk_create por crédito vs. en lote (filas/s)
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.models import Cliente, CronogramaPago, Credito
+
+
+class _Rollback(Exception):
+    """Señal para descartar el fixture al terminar."""
+
+
+def _por_cuota(creditos):
+    """Cómo se generaba antes: borrar y un INSERT (create) por cuota."""
+    from main.creditos_utils import generar_cronograma_fechas
+
+    for credito in creditos:
+        credito.cronograma.all().delete()
+        for cuota_info in generar_cronograma_fechas(
+            credito.cantidad_cuotas, credito.tipo_plazo, credito.fecha_desembolso.date(),
+        ):
+            CronogramaPago.objects.create(
+                credito=credito,
+                numero_cuota=cuota_info['numero_cuota'],
+                fecha_vencimiento=cuota_info['fecha_objeto'],
+                monto_cuota=credito.valor_cuota,
+            )
+
+
+def _por_credito(creditos):
+    for credito in creditos:
+        credito.generar_cronograma()
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea N créditos desembolsados y regenera sus cronogramas con create() por cuota (como antes), '
+        'con Credito.generar_cronograma() (bulk_create por crédito) y con Credito.generar_cronogramas() '
+        '(en lote); reporta tiempo, consultas y filas/s. Por defecto mide créditos sin cronograma (aprobación); '
+        '--regenerar incluye el borrado del cronograma anterior. Todo se revierte al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--creditos', type=int, default=200)
+        parser.add_argument('--cuotas', type=int, default=60, help='Cuotas por crédito.')
+        parser.add_argument('--tipo-plazo', default='DIARIO', choices=['DIARIO', 'SEMANAL', 'QUINCENAL', 'MENSUAL'])
+        parser.add_argument('--lote', type=int, default=500, help='Créditos por lote de generar_cronogramas.')
+        parser.add_argument('--regenerar', action='store_true', help='Cada modo parte de créditos con cronograma.')
+
+    def handle(self, *args, **options):
+        if options['creditos'] <= 0 or options['cuotas'] <= 0:
+            raise CommandError('--creditos y --cuotas deben ser mayores a cero')
+        try:
+            with transaction.atomic():
+                self._ejecutar(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Fixture revertido.')
+
+    def _fixture(self, n, cuotas, tipo_plazo):
+        cliente = Cliente.objects.create(
+            nombres='Benchmark', apellidos='Cronograma', cedula='BENCH-CRON-0001', celular='3000000000',
+        )
+        ahora = timezone.now()
+        return Credito.objects.bulk_create([
+            Credito(
+                cliente=cliente, monto=Decimal('1000000'), tasa_interes=Decimal('10'), tipo_plazo=tipo_plazo,
+                cantidad_cuotas=cuotas, valor_cuota=Decimal('40000'), monto_total=Decimal(40000 * cuotas),
+                estado='DESEMBOLSADO', fecha_desembolso=ahora,
+            )
+            for _ in range(n)
+        ])
+
+    def _ejecutar(self, options):
+        creditos = self._fixture(options['creditos'], options['cuotas'], options['tipo_plazo'])
+        filas = options['creditos'] * options['cuotas']
+        modos = (
+            ('create() por cuota (antes)', lambda: _por_cuota(creditos)),
+            ('generar_cronograma()', lambda: _por_credito(creditos)),
+            ('generar_cronogramas() en lote', lambda: Credito.generar_cronogramas(creditos, lote=options['lote'])),
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["creditos"]} créditos × {options["cuotas"]} cuotas {options["tipo_plazo"]} = {filas} filas'
+            + (' (regenerando)' if options['regenerar'] else '')
+        ))
+        for nombre, generar in modos:
+            if options['regenerar']:
+                Credito.generar_cronogramas(creditos, lote=options['lote'])
+            else:
+                CronogramaPago.objects.filter(credito__in=creditos).delete()
+            segundos, consultas = self._medir(generar)
+            self.stdout.write(
+                f'  {nombre:<30} {segundos * 1000:9.1f} ms {consultas:>7} consultas {filas / segundos:>10,.0f} filas/s'
+            )
+        total = CronogramaPago.objects.filter(credito__in=creditos).count()
+        if total != filas:
+            raise CommandError(f'Se esperaban {filas} cuotas y hay {total}')
+
+    def _medir(self, generar):
+        consultas = [0]
+
+        def contar(execute, sql, params, many, context):
+            consultas[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            t0 = time.perf_counter()
+            generar()
+            segundos = time.perf_counter() - t0
+        return segundos, consultas[0]
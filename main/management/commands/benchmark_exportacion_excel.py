@@ -0,0 +1,129 @@
+# Benchmark de la exportación de recaudación en streaming (fixture sintético de pagos)
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from main.exportacion_excel import escribir_libro_xlsx, hojas_recaudacion
+from main.models import Cliente, Cobrador, Credito, Pago
+
+
+class _Rollback(Exception):
+    """Señal para descartar el fixture al terminar."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide tiempo y memoria pico de exportar_recaudacion_excel sobre un fixture '
+        'sintético de pagos (por defecto 500.000). El fixture se descarta al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pagos', type=int, default=500000, help='Cantidad de pagos a generar.')
+        parser.add_argument('--creditos', type=int, default=5000, help='Créditos sobre los que repartir los pagos.')
+        parser.add_argument('--cobradores', type=int, default=20, help='Cobradores activos del fixture.')
+        parser.add_argument('--dias', type=int, default=30, help='Días del período exportado.')
+        parser.add_argument('--batch', type=int, default=5000, help='Tamaño de lote para bulk_create.')
+        parser.add_argument(
+            '--sin-memoria',
+            action='store_true',
+            help='Omitir la segunda pasada que mide memoria pico con tracemalloc.',
+        )
+        parser.add_argument(
+            '--conservar',
+            action='store_true',
+            help='Conservar el fixture en la base de datos (por defecto se revierte).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._ejecutar(options)
+                if not options['conservar']:
+                    raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Fixture revertido.')
+
+    def _ejecutar(self, options):
+        n_pagos = options['pagos']
+        n_creditos = max(1, options['creditos'])
+        n_cobradores = max(1, options['cobradores'])
+        dias = max(1, options['dias'])
+        batch = options['batch']
+        fecha_fin = timezone.now().date()
+        fecha_inicio = fecha_fin - timedelta(days=dias - 1)
+
+        t0 = time.perf_counter()
+        cobradores = Cobrador.objects.bulk_create([
+            Cobrador(
+                nombres=f'Bench{i}', apellidos='Cobrador', numero_documento=f'BENCH-COB-{i}',
+                celular='3000000000', direccion='N/A', fecha_ingreso=date.today(),
+                meta_diaria=Decimal('500000'),
+            )
+            for i in range(n_cobradores)
+        ])
+        clientes = Cliente.objects.bulk_create([
+            Cliente(nombres=f'Cliente{i}', apellidos='Bench', cedula=f'9{i:09d}', celular='3000000000')
+            for i in range(n_creditos)
+        ], batch_size=batch)
+        creditos = Credito.objects.bulk_create([
+            Credito(
+                cliente=cli, cobrador=cobradores[i % n_cobradores], monto=Decimal('1000000'),
+                tasa_interes=Decimal('10'), tipo_plazo='DIARIO', cantidad_cuotas=120,
+                valor_cuota=Decimal('10000'), monto_total=Decimal('1200000'), estado='DESEMBOLSADO',
+            )
+            for i, cli in enumerate(clientes)
+        ], batch_size=batch)
+
+        primer_id = None
+        for inicio in range(0, n_pagos, batch):
+            lote = Pago.objects.bulk_create([
+                Pago(credito=creditos[j % n_creditos], monto=Decimal('10000'), numero_cuota=(j // n_creditos) + 1)
+                for j in range(inicio, min(inicio + batch, n_pagos))
+            ])
+            if primer_id is None and lote:
+                primer_id = lote[0].pk
+
+        # auto_now_add fija la fecha actual: repartir los pagos en el período por rangos de id
+        if primer_id is not None:
+            por_dia = -(-n_pagos // dias)
+            ahora = timezone.now()
+            for d in range(dias):
+                desde = primer_id + d * por_dia
+                Pago.objects.filter(pk__gte=desde, pk__lt=desde + por_dia).update(
+                    fecha_pago=ahora - timedelta(days=d)
+                )
+        self.stdout.write(
+            f'Fixture: {n_pagos} pagos, {n_creditos} créditos, {n_cobradores} cobradores '
+            f'en {time.perf_counter() - t0:.1f}s'
+        )
+
+        # Pasada 1: tiempo (sin tracemalloc, que ralentiza mucho la ejecución)
+        with tempfile.TemporaryFile(suffix='.xlsx') as destino:
+            t0 = time.perf_counter()
+            conteo = escribir_libro_xlsx(hojas_recaudacion(fecha_inicio, fecha_fin), destino)
+            segundos = time.perf_counter() - t0
+            tamano = destino.tell()
+
+        filas = sum(conteo.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Exportación: {filas} filas en {segundos:.2f}s ({filas / segundos:,.0f} filas/s), '
+            f'archivo {tamano / 1024 / 1024:.1f} MB'
+        ))
+        for hoja, total in conteo.items():
+            self.stdout.write(f'  - {hoja}: {total} filas')
+
+        # Pasada 2: memoria pico de Python durante la exportación
+        if options['sin_memoria']:
+            return
+        with tempfile.TemporaryFile(suffix='.xlsx') as destino:
+            tracemalloc.start()
+            escribir_libro_xlsx(hojas_recaudacion(fecha_inicio, fecha_fin), destino)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stdout.write(self.style.SUCCESS(f'Memoria pico: {pico / 1024 / 1024:.1f} MB'))
@@ -0,0 +1,100 @@
+# Benchmark de generación de recibos y cronogramas PDF (estilos sin caché vs. cacheados)
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from main import pdf_estilos
+from main.models import Cliente, CronogramaPago, Credito, Pago
+from main.creditos_views import _generar_pdf_resumen_cronograma_bytes
+from main.pagos_views import _generar_recibo_pdf_bytes
+
+
+class _Rollback(Exception):
+    """Señal para descartar el fixture al terminar."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera N recibos y N cronogramas PDF y reporta ms/documento y memoria pico, '
+        'reconstruyendo los estilos en cada documento (como antes) y con los estilos cacheados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documentos', type=int, default=200, help='Documentos de cada tipo a generar.')
+        parser.add_argument('--cuotas', type=int, default=30, help='Cuotas del crédito del fixture.')
+        parser.add_argument(
+            '--sin-memoria',
+            action='store_true',
+            help='Omitir la pasada que mide memoria pico con tracemalloc.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._ejecutar(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Fixture revertido.')
+
+    def _fixture(self, cuotas):
+        cliente = Cliente.objects.create(
+            nombres='Benchmark', apellidos='PDF', cedula='BENCH-PDF-0001', celular='3000000000',
+        )
+        credito = Credito.objects.create(
+            cliente=cliente, monto=Decimal('1000000'), tasa_interes=Decimal('10'), tipo_plazo='DIARIO',
+            cantidad_cuotas=cuotas, valor_cuota=Decimal('40000'), monto_total=Decimal(40000 * cuotas),
+            estado='DESEMBOLSADO', fecha_desembolso=timezone.now(),
+        )
+        credito.generar_cronograma()
+        cuota = CronogramaPago.objects.get(credito=credito, numero_cuota=1)
+        pago = Pago.objects.create(
+            credito=credito, cuota=cuota, monto=Decimal('40000'), numero_cuota=1,
+            observaciones='Pago de prueba del benchmark',
+        )
+        return credito, pago
+
+    def _ejecutar(self, options):
+        n = max(1, options['documentos'])
+        credito, pago = self._fixture(max(1, options['cuotas']))
+        documentos = (
+            ('Recibo', lambda: _generar_recibo_pdf_bytes(pago)),
+            ('Cronograma', lambda: _generar_pdf_resumen_cronograma_bytes(credito)),
+        )
+        # Calentar imports de ReportLab y consultas para no cargarlos al primer modo medido
+        for _, generar in documentos:
+            generar()
+
+        for nombre, generar in documentos:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{nombre} ({n} documentos)'))
+            for modo, sin_cache in (('estilos por documento', True), ('estilos cacheados', False)):
+                ms, pico = self._medir(generar, n, sin_cache, not options['sin_memoria'])
+                linea = f'  {modo:<22} {ms:7.2f} ms/doc'
+                if pico is not None:
+                    linea += f'   memoria pico {pico / 1024:8.1f} KB'
+                self.stdout.write(linea)
+
+    def _medir(self, generar, n, sin_cache, medir_memoria):
+        pdf_estilos.limpiar_cache()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            if sin_cache:
+                pdf_estilos.limpiar_cache()
+            generar()
+        ms = (time.perf_counter() - t0) * 1000 / n
+
+        pico = None
+        if medir_memoria:
+            # Pasada aparte: tracemalloc distorsiona mucho los tiempos
+            pdf_estilos.limpiar_cache()
+            tracemalloc.start()
+            for _ in range(min(n, 50)):
+                if sin_cache:
+                    pdf_estilos.limpiar_cache()
+                generar()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return ms, pico
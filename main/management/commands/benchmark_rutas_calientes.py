@@ -0,0 +1,98 @@
+# Benchmarks de rutas calientes (tareas, análisis, cobro, agenda, dashboards, exportaciones) con historial y umbral
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from main.benchmarks import (
+    CASOS, Contexto, cargar_historial, comparar, guardar_corrida, medir, nueva_corrida, ruta_historial,
+)
+from main.cartera_sintetica import generar_cartera_sintetica
+
+
+class _Rollback(Exception):
+    """Señal para descartar la cartera sintética al terminar."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera una cartera sintética por cada --tamanos (créditos) dentro de una transacción que se revierte, '
+        'mide tiempo, consultas y memoria pico de cada caso de main.benchmarks, agrega la corrida al historial '
+        'JSON y falla si alguna métrica empeora más de --umbral frente a las corridas anteriores.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', type=int, nargs='+', default=[1000], help='Créditos, p. ej. 1000 10000 100000.')
+        parser.add_argument('--casos', nargs='+', help='Solo estos casos (ver --listar).')
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--sin-memoria', action='store_true', help='Omite la pasada con tracemalloc.')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--umbral', type=float, help='Regresión tolerada (fracción; por defecto BENCHMARK_UMBRAL).')
+        parser.add_argument('--etiqueta', help='Serie del historial con la que comparar (por defecto el motor de BD).')
+        parser.add_argument('--historial', help='Archivo JSON (por defecto BENCHMARK_HISTORIAL).')
+        parser.add_argument('--no-guardar', action='store_true', help='Compara sin agregar la corrida al historial.')
+        parser.add_argument('--listar', action='store_true', help='Lista los casos y termina.')
+
+    def handle(self, *args, **options):
+        if options['listar']:
+            for c in CASOS:
+                self.stdout.write(f'  {c.nombre:<28} {c.descripcion}')
+            return
+        casos = CASOS
+        if options['casos']:
+            desconocidos = set(options['casos']) - {c.nombre for c in CASOS}
+            if desconocidos:
+                raise CommandError(f'Casos desconocidos: {", ".join(sorted(desconocidos))} (ver --listar)')
+            casos = [c for c in CASOS if c.nombre in options['casos']]
+
+        from main.models import Credito
+
+        if Credito.objects.exists():
+            self.stdout.write(self.style.WARNING(
+                'La BD ya tiene créditos: las mediciones incluyen esos datos además de la cartera sintética.'
+            ))
+        ruta = options['historial'] or ruta_historial()
+        etiqueta = options['etiqueta'] or connection.vendor
+        umbral = options['umbral'] if options['umbral'] is not None else settings.BENCHMARK_UMBRAL
+
+        regresiones = []
+        for tamano in options['tamanos']:
+            resultados = {}
+            try:
+                with transaction.atomic():
+                    self.stdout.write(self.style.MIGRATE_HEADING(f'{tamano} créditos'))
+                    cartera = generar_cartera_sintetica(tamano, semilla=options['semilla'])
+                    self.stdout.write(
+                        f'  Cartera sintética en {cartera["segundos"]} s: '
+                        + ', '.join(f'{k}={v}' for k, v in cartera['creados'].items())
+                    )
+                    ctx = Contexto()
+                    for c in casos:
+                        resultados[c.nombre] = medir(
+                            c, ctx, repeticiones=options['repeticiones'], memoria=not options['sin_memoria'],
+                        )
+                        self._imprimir(c.nombre, resultados[c.nombre])
+                    raise _Rollback()
+            except _Rollback:
+                pass
+
+            propias = comparar(resultados, cargar_historial(ruta), etiqueta, tamano, umbral=umbral)
+            regresiones += [(tamano, *r) for r in propias]
+            if not options['no_guardar']:
+                guardar_corrida(nueva_corrida(etiqueta, tamano, options['semilla'], resultados), ruta)
+
+        if not options['no_guardar']:
+            self.stdout.write(f'Historial: {ruta}')
+        if regresiones:
+            for tamano, nombre, metrica, base, valor in regresiones:
+                self.stdout.write(self.style.ERROR(
+                    f'  {tamano} créditos · {nombre} · {metrica}: {base if base is None else round(base, 1)} → {valor}'
+                ))
+            raise CommandError(f'{len(regresiones)} regresión(es) por encima del {umbral:.0%} ({etiqueta}).')
+        self.stdout.write(self.style.SUCCESS(f'Sin regresiones por encima del {umbral:.0%} ({etiqueta}).'))
+
+    def _imprimir(self, nombre, r):
+        if 'error' in r:
+            self.stdout.write(self.style.ERROR(f'  {nombre:<28} ERROR {r["error"]}'))
+            return
+        memoria = f'{r["memoria_kb"]:>9} KB' if 'memoria_kb' in r else ''
+        self.stdout.write(f'  {nombre:<28} {r["ms"]:>10.1f} ms {r["consultas"]:>7} consultas {memoria}')
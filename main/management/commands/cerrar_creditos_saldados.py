@@ -0,0 +1,32 @@
+# Conciliación diaria: cierra (PAGADO) los créditos vigentes cuyo saldo es solo un residuo de redondeo
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.cron import cerrar_creditos_saldados
+from main.models import UMBRAL_SALDO_CERRADO
+
+
+class Command(BaseCommand):
+    help = (
+        'Marca como PAGADO los créditos APROBADO/DESEMBOLSADO/VENCIDO con saldo pendiente '
+        f'menor al umbral (por defecto ${UMBRAL_SALDO_CERRADO}).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--umbral', type=str, help='Saldo máximo (exclusivo) que se considera pagado.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo listar los créditos, sin modificarlos.')
+
+    def handle(self, *args, **options):
+        umbral = UMBRAL_SALDO_CERRADO
+        if options['umbral']:
+            try:
+                umbral = Decimal(options['umbral'])
+            except InvalidOperation:
+                raise CommandError(f'Umbral inválido: {options["umbral"]}')
+
+        ids = cerrar_creditos_saldados(umbral=umbral, dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f'{len(ids)} créditos se cerrarían: {", ".join(map(str, ids[:50]))}')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(ids)} créditos marcados como PAGADO.'))
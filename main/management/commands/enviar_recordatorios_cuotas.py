@@ -1,11 +1,14 @@
 # Recordatorios de cuotas por correo (ejecutar diario, ej: 7:00 AM)
+import json
+from datetime import date
+from itertools import groupby
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.core.mail import EmailMessage
 from django.conf import settings
-from datetime import date
-from collections import defaultdict
 
+from main.envio_correos import EnviadorCorreos
 from main.models import CronogramaPago
 
 
@@ -23,8 +26,49 @@ class Command(BaseCommand):
             action='store_true',
             help='Solo mostrar a quién se enviaría, sin enviar.',
         )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=100,
+            help='Correos enviados por cada conexión SMTP (por defecto 100).',
+        )
+        parser.add_argument(
+            '--conexiones',
+            type=int,
+            default=1,
+            help='Conexiones SMTP en paralelo (pool de hilos). Por defecto 1.',
+        )
+        parser.add_argument(
+            '--backend',
+            type=str,
+            help='Backend de correo a usar en lugar de EMAIL_BACKEND '
+                 '(ej: django.core.mail.backends.locmem.EmailBackend).',
+        )
+        parser.add_argument(
+            '--fallidos',
+            type=str,
+            help='Archivo JSON donde guardar los destinatarios que fallaron (para reintento).',
+        )
+        parser.add_argument(
+            '--reintentar',
+            type=str,
+            help='Archivo JSON generado con --fallidos: reenvía solo a esos créditos.',
+        )
 
     def handle(self, *args, **options):
+        creditos_reintento = None
+        if options['reintentar']:
+            try:
+                with open(options['reintentar'], encoding='utf-8') as f:
+                    datos = json.load(f)
+                creditos_reintento = {item['credito_id'] for item in datos.get('fallidos', [])}
+                if not options['fecha']:
+                    options['fecha'] = datos.get('fecha')
+            except (OSError, ValueError, KeyError) as e:
+                self.stdout.write(self.style.ERROR(f'No se pudo leer el archivo de reintento: {e}'))
+                return
+            self.stdout.write(f'Reintentando {len(creditos_reintento)} crédito(s) fallidos.')
+
         if options['fecha']:
             try:
                 dia = timezone.datetime.strptime(options['fecha'], '%Y-%m-%d').date()
@@ -43,67 +87,102 @@ class Command(BaseCommand):
             fecha_vencimiento=dia,
             estado__in=['PENDIENTE', 'PARCIAL'],
         ).select_related('credito', 'credito__cliente').order_by('credito_id', 'numero_cuota')
+        if creditos_reintento is not None:
+            cuotas = cuotas.filter(credito_id__in=creditos_reintento)
 
-        # Agrupar por crédito (un correo por crédito con todas las cuotas del día)
-        por_credito = defaultdict(list)
-        for c in cuotas:
-            por_credito[c.credito_id].append(c)
-
-        enviados = 0
-        sin_email = 0
-        errores = 0
-
-        for credito_id, lista_cuotas in por_credito.items():
-            credito = lista_cuotas[0].credito
-            cliente = credito.cliente
-            email_destino = (cliente.email or '').strip()
-            if not email_destino:
-                sin_email += 1
-                continue
-
-            lineas = []
-            total_dia = 0
-            for cuota in lista_cuotas:
-                if cuota.estado == 'PARCIAL':
-                    valor = cuota.saldo_pendiente()
-                    lineas.append(f"  • Cuota #{cuota.numero_cuota} (saldo pendiente): ${valor:,.0f}")
-                else:
-                    valor = cuota.monto_cuota
-                    lineas.append(f"  • Cuota #{cuota.numero_cuota}: ${valor:,.0f}")
-                total_dia += float(valor)
-            texto_cuotas = '\n'.join(lineas)
-
-            asunto = f'Recordatorio de pago CREDIFLOW - Crédito #{credito.id} ({dia.strftime("%d/%m/%Y")})'
-            cuerpo = (
-                f'Estimado(a) {cliente.nombre_completo},\n\n'
-                f'Recuerde que hoy ({dia.strftime("%d/%m/%Y")}) corresponde el pago de su cuota del crédito con CREDIFLOW.\n\n'
-                f'Crédito: #{credito.id}\n'
-                f'Valor a pagar hoy: ${total_dia:,.0f}\n\n'
-                f'Detalle:\n'
-                f'{texto_cuotas}\n\n'
-                f'Su puntualidad es la mejor referencia para próximos créditos.\n\n'
-                f'Atentamente,\n'
-                f'Equipo CREDIFLOW'
+        contadores = {'sin_email': 0, 'mensajes': 0}
+        remitente = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local')
+
+        def _mensajes():
+            # Un correo por crédito con todas las cuotas del día. Las cuotas vienen
+            # ordenadas por crédito, así que se agrupan sin cargar todo en memoria.
+            for credito_id, grupo in groupby(cuotas.iterator(chunk_size=2000), key=lambda c: c.credito_id):
+                lista_cuotas = list(grupo)
+                credito = lista_cuotas[0].credito
+                cliente = credito.cliente
+                email_destino = (cliente.email or '').strip()
+                if not email_destino:
+                    contadores['sin_email'] += 1
+                    continue
+                contadores['mensajes'] += 1
+                yield credito_id, self._construir_mensaje(dia, credito, cliente, lista_cuotas, email_destino, remitente)
+
+        if dry_run:
+            for credito_id, msg in _mensajes():
+                self.stdout.write(f'  Enviaría a {msg.to[0]} (Crédito #{credito_id})')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Recordatorios: {contadores["mensajes"]} enviados, {contadores["sin_email"]} sin email, 0 errores.'
+                )
             )
+            return
 
-            if dry_run:
-                self.stdout.write(f'  Enviaría a {email_destino} (Crédito #{credito.id}, {len(lista_cuotas)} cuota(s))')
-                enviados += 1
-                continue
+        enviador = EnviadorCorreos(
+            tamano_lote=options['lote'],
+            conexiones=options['conexiones'],
+            backend=options['backend'],
+        )
+        resultado = enviador.enviar(_mensajes())
+        errores = len(resultado.fallidos)
 
-            try:
-                EmailMessage(
-                    asunto,
-                    cuerpo,
-                    getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
-                    [email_destino],
-                ).send(fail_silently=True)
-                enviados += 1
-            except Exception:
-                errores += 1
+        if options['fallidos']:
+            with open(options['fallidos'], 'w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        'fecha': dia.strftime('%Y-%m-%d'),
+                        'fallidos': [
+                            {
+                                'credito_id': item['clave'],
+                                'email': ', '.join(item['destinatarios']),
+                                'error': item['error'],
+                            }
+                            for item in resultado.fallidos
+                        ],
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            if errores:
+                self.stdout.write(f'Fallidos guardados en {options["fallidos"]} (use --reintentar).')
+        for item in resultado.fallidos[:20]:
+            self.stdout.write(
+                self.style.WARNING(f'  Falló crédito #{item["clave"]} ({", ".join(item["destinatarios"])}): {item["error"]}')
+            )
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'Recordatorios: {enviados} enviados, {sin_email} sin email, {errores} errores.'
+                f'Recordatorios: {resultado.enviados} enviados, {contadores["sin_email"]} sin email, {errores} errores.'
             )
         )
+        self.stdout.write(
+            f'Rendimiento: {resultado.correos_por_segundo:,.1f} correos/s '
+            f'({resultado.segundos:.2f}s, lote={enviador.tamano_lote}, conexiones={enviador.conexiones})'
+        )
+
+    def _construir_mensaje(self, dia, credito, cliente, lista_cuotas, email_destino, remitente):
+        lineas = []
+        total_dia = 0
+        for cuota in lista_cuotas:
+            if cuota.estado == 'PARCIAL':
+                valor = cuota.saldo_pendiente()
+                lineas.append(f"  • Cuota #{cuota.numero_cuota} (saldo pendiente): ${valor:,.0f}")
+            else:
+                valor = cuota.monto_cuota
+                lineas.append(f"  • Cuota #{cuota.numero_cuota}: ${valor:,.0f}")
+            total_dia += float(valor)
+        texto_cuotas = '\n'.join(lineas)
+
+        asunto = f'Recordatorio de pago CREDIFLOW - Crédito #{credito.id} ({dia.strftime("%d/%m/%Y")})'
+        cuerpo = (
+            f'Estimado(a) {cliente.nombre_completo},\n\n'
+            f'Recuerde que hoy ({dia.strftime("%d/%m/%Y")}) corresponde el pago de su cuota del crédito con CREDIFLOW.\n\n'
+            f'Crédito: #{credito.id}\n'
+            f'Valor a pagar hoy: ${total_dia:,.0f}\n\n'
+            f'Detalle:\n'
+            f'{texto_cuotas}\n\n'
+            f'Su puntualidad es la mejor referencia para próximos créditos.\n\n'
+            f'Atentamente,\n'
+            f'Equipo CREDIFLOW'
+        )
+        return EmailMessage(asunto, cuerpo, remitente, [email_destino])
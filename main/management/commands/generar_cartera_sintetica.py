@@ -0,0 +1,79 @@
+# Cartera sintética (clientes, cobradores, rutas, créditos, cuotas, pagos y tareas) para carga y benchmarks
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.cartera_sintetica import borrar_cartera_sintetica, generar_cartera_sintetica
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea con bulk_create una cartera sintética determinista (misma --semilla y --hoy, misma cartera): '
+        'créditos de todos los tipos de plazo con cronograma, pagos con mora realista y meses de historial '
+        'de tareas de cobro. --borrar elimina la cartera sintética existente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--creditos', type=int, default=10000, help='Créditos a crear.')
+        parser.add_argument('--clientes', type=int, help='Clientes (por defecto uno por crédito).')
+        parser.add_argument('--cobradores', type=int, help='Cobradores (por defecto uno por cada 400 créditos).')
+        parser.add_argument('--rutas', type=int, help='Rutas (por defecto una por cobrador).')
+        parser.add_argument('--meses', type=int, default=8, help='Meses de historia de desembolsos.')
+        parser.add_argument('--meses-tareas', type=int, default=2, help='Meses de historial de tareas.')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--hoy', help='Fecha de referencia YYYY-MM-DD (por defecto hoy).')
+        parser.add_argument('--lote', type=int, default=2000, help='Créditos por transacción.')
+        parser.add_argument('--batch', type=int, default=1000, help='Tamaño de lote para bulk_create.')
+        parser.add_argument('--borrar', action='store_true', help='Borra la cartera sintética y termina.')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado como JSON.')
+
+    def handle(self, *args, **options):
+        if options['borrar']:
+            borrados = borrar_cartera_sintetica()
+            self.stdout.write(', '.join(f'{k}={v}' for k, v in borrados.items()) + ' borrados.')
+            return
+
+        hoy = None
+        if options['hoy']:
+            try:
+                hoy = datetime.strptime(options['hoy'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--hoy debe tener formato YYYY-MM-DD')
+        if options['creditos'] <= 0:
+            raise CommandError('--creditos debe ser mayor a cero')
+
+        def progreso(conteo):
+            if not options['json']:
+                self.stdout.write(
+                    f'  {conteo["creditos"]:>9} créditos  {conteo["cuotas"]:>10} cuotas  '
+                    f'{conteo["pagos"]:>9} pagos  {conteo["tareas"]:>9} tareas'
+                )
+
+        resultado = generar_cartera_sintetica(
+            options['creditos'],
+            clientes=options['clientes'],
+            cobradores=options['cobradores'],
+            rutas=options['rutas'],
+            semilla=options['semilla'],
+            hoy=hoy,
+            meses=options['meses'],
+            meses_tareas=options['meses_tareas'],
+            lote=options['lote'],
+            batch=options['batch'],
+            progreso=progreso,
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+
+        creados = resultado['creados']
+        self.stdout.write(self.style.SUCCESS(
+            f'Cartera sintética (semilla {resultado["semilla"]}, hoy {resultado["hoy"]}) '
+            f'en {resultado["segundos"]} s'
+        ))
+        self.stdout.write('  ' + ', '.join(f'{k}={v}' for k, v in creados.items()))
+        total = sum(resultado['mora'].values()) or 1
+        self.stdout.write('  Estado de los créditos desembolsados:')
+        for estado, n in sorted(resultado['mora'].items(), key=lambda x: -x[1]):
+            self.stdout.write(f'    {estado:<15} {n:>9}  {100 * n / total:5.1f}%')
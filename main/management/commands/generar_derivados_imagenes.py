@@ -0,0 +1,84 @@
+# Genera los derivados (thumb/card/full) de las fotos ya subidas de clientes y codeudores
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.imagenes import CAMPOS_FOTO, RENDICIONES, generar_derivados, nombre_derivado
+from main.models import Cliente, Codeudor
+
+
+def _procesar(ruta, forzar):
+    """Trabajo de cada proceso: (ruta, archivos escritos, error)."""
+    try:
+        return ruta, generar_derivados(ruta, forzar=forzar), None
+    except Exception as e:
+        return ruta, 0, str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los derivados thumb/card/full de las fotos existentes de clientes y codeudores '
+        'usando un pool de procesos. Solo procesa las fotos a las que les falta algún derivado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos en paralelo (por defecto, uno por CPU).',
+        )
+        parser.add_argument('--forzar', action='store_true', help='Regenerar aunque el derivado ya exista.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar las fotos pendientes.')
+
+    def handle(self, *args, **options):
+        forzar = options['forzar']
+        rutas = []
+        inexistentes = 0
+        for modelo in (Cliente, Codeudor):
+            campos = CAMPOS_FOTO[modelo.__name__]
+            for fila in modelo.objects.values_list(*campos).iterator(chunk_size=2000):
+                for nombre in fila:
+                    if not nombre:
+                        continue
+                    ruta = os.path.join(settings.MEDIA_ROOT, nombre)
+                    if not os.path.exists(ruta):
+                        inexistentes += 1
+                        continue
+                    if forzar or any(not os.path.exists(nombre_derivado(ruta, r)) for r in RENDICIONES):
+                        rutas.append(ruta)
+
+        self.stdout.write(f'Fotos a procesar: {len(rutas)} ({inexistentes} referenciadas pero sin archivo).')
+        if options['dry_run'] or not rutas:
+            return
+
+        procesos = max(1, options['procesos'])
+        escritos = 0
+        errores = []
+        t0 = time.perf_counter()
+        if procesos == 1:
+            resultados = (_procesar(ruta, forzar) for ruta in rutas)
+        else:
+            pool = ProcessPoolExecutor(max_workers=procesos)
+            resultados = (f.result() for f in as_completed([pool.submit(_procesar, ruta, forzar) for ruta in rutas]))
+        try:
+            for i, (ruta, n, error) in enumerate(resultados, 1):
+                escritos += n
+                if error:
+                    errores.append((ruta, error))
+                if i % 500 == 0:
+                    self.stdout.write(f'  {i}/{len(rutas)} fotos...')
+        finally:
+            if procesos > 1:
+                pool.shutdown(cancel_futures=True)
+        segundos = time.perf_counter() - t0
+
+        for ruta, error in errores[:20]:
+            self.stdout.write(self.style.WARNING(f'  Error en {ruta}: {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{escritos} derivados generados de {len(rutas)} fotos en {segundos:.1f}s '
+            f'({len(rutas) / segundos if segundos else 0:,.1f} fotos/s, {procesos} procesos), {len(errores)} errores.'
+        ))
@@ -0,0 +1,34 @@
+# Inventario de MEDIA_ROOT y referencias de la BD a archivos faltantes (lo muestra /media-status/)
+from django.core.management.base import BaseCommand
+
+from main.inventario_media import generar_inventario
+
+
+class Command(BaseCommand):
+    help = (
+        'Escanea MEDIA_ROOT en paralelo, guarda totales por directorio y cruza todas las rutas '
+        'de FileField/ImageField contra el disco. media_status muestra el último inventario.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=8, help='Hilos de escaneo (uno por subdirectorio de primer nivel).')
+        parser.add_argument('--conservar', type=int, default=30, help='Inventarios históricos a conservar (0 = todos).')
+        parser.add_argument(
+            '--completo', action='store_true',
+            help='Medir todos los archivos, sin reusar los directorios que no cambiaron desde el inventario anterior.',
+        )
+
+    def handle(self, *args, **options):
+        inv, reusados = generar_inventario(
+            hilos=options['hilos'], conservar=options['conservar'], completo=options['completo'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Inventario: {inv.total_archivos} archivos, {inv.total_bytes / 1024 / 1024:.1f} MB '
+            f'en {len(inv.por_directorio)} directorios, {reusados} sin cambios ({inv.duracion_segundos:.2f}s).'
+        ))
+        estilo = self.style.WARNING if inv.total_faltantes else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f'Referencias en BD: {inv.total_referencias}, sin archivo en disco: {inv.total_faltantes}.'
+        ))
+        for item in inv.faltantes[:20]:
+            self.stdout.write(f'  {item["modelo"]} #{item["id"]} {item["campo"]}: {item["ruta"]}')
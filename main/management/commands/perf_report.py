@@ -0,0 +1,86 @@
+# Informe p50/p95 por vista a partir de las muestras del perfilado (MuestraRendimiento) y tasa de acierto del caché de dominio
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.cache_dominio import estadisticas
+from main.perfilado import purgar_muestras, resumen_por_vista
+
+
+class Command(BaseCommand):
+    help = (
+        'Imprime por vista las peticiones, p50/p95/máx de duración, consultas y SQL promedio y consultas '
+        'repetidas (N+1) según las muestras guardadas por el perfilado (PERFILADO=true). Con --vista '
+        'muestra además el SQL repetido y más lento de sus peticiones más lentas. Al final, aciertos y fallos '
+        'del caché de dominio (main.cache_dominio). Antes borra las muestras más viejas que '
+        'PERFILADO_RETENCION_DIAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=int, default=24, help='Ventana de muestras a considerar.')
+        parser.add_argument('--vista', help='Nombre de URL a detallar (p. ej. dashboard_negocio).')
+        parser.add_argument('--top', type=int, default=20, help='Vistas a listar (por p95).')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado como JSON.')
+        parser.add_argument('--solo-purgar', action='store_true', help='Solo borrar las muestras vencidas (cron).')
+
+    def handle(self, *args, **options):
+        from main.models import MuestraRendimiento
+
+        borradas = purgar_muestras()
+        if options['solo_purgar']:
+            self.stdout.write(f'{borradas} muestras de rendimiento vencidas borradas.')
+            return
+
+        muestras = MuestraRendimiento.objects.filter(fecha__gte=timezone.now() - timedelta(hours=options['horas']))
+        if options['vista']:
+            muestras = muestras.filter(vista=options['vista'])
+        filas = resumen_por_vista(
+            muestras.values('vista', 'duracion_ms', 'consultas', 'sql_ms', 'consultas_duplicadas').iterator()
+        )[:options['top']]
+        lentas = []
+        if options['vista']:
+            lentas = list(muestras.order_by('-duracion_ms').values(
+                'fecha', 'duracion_ms', 'consultas', 'consultas_duplicadas', 'detalle'
+            )[:3])
+
+        if options['json']:
+            for m in lentas:
+                m['fecha'] = m['fecha'].isoformat()
+            self.stdout.write(json.dumps(
+                {'horas': options['horas'], 'vistas': filas, 'lentas': lentas, 'cache_dominio': estadisticas()},
+                indent=2,
+            ))
+            return
+
+        if not filas:
+            self.stdout.write(f'Sin muestras en las últimas {options["horas"]} h (¿PERFILADO=true?).')
+            self._imprimir_cache()
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Rendimiento por vista, últimas {options["horas"]} h'))
+        self.stdout.write(
+            f'  {"vista":<36} {"n":>6} {"p50 ms":>9} {"p95 ms":>9} {"máx ms":>9} {"consultas":>10} '
+            f'{"SQL ms":>8} {"repetidas":>10}'
+        )
+        for f in filas:
+            self.stdout.write(
+                f'  {f["vista"][:36]:<36} {f["peticiones"]:>6} {f["p50_ms"]:>9} {f["p95_ms"]:>9} {f["max_ms"]:>9} '
+                f'{f["consultas"]:>10} {f["sql_ms"]:>8} {f["duplicadas"]:>10}'
+            )
+        for m in lentas:
+            self.stdout.write(
+                f'\n  {timezone.localtime(m["fecha"]):%Y-%m-%d %H:%M:%S}  {m["duracion_ms"]:.1f} ms, '
+                f'{m["consultas"]} consultas, {m["consultas_duplicadas"]} repetidas'
+            )
+            for n, sql in m['detalle'].get('duplicadas', []):
+                self.stdout.write(f'    {n:>4}×  {sql[:160]}')
+            for ms, sql in m['detalle'].get('top_sql', []):
+                self.stdout.write(f'    {ms:>6.1f} ms  {sql[:160]}')
+        self._imprimir_cache()
+
+    def _imprimir_cache(self):
+        self.stdout.write(self.style.MIGRATE_HEADING('\nCaché de dominio (todos los workers)'))
+        for c in estadisticas():
+            tasa = f'{c["tasa"]:.1f} %' if c['tasa'] is not None else '—'
+            self.stdout.write(f'  {c["espacio"]:<22} {c["aciertos"]:>9} aciertos {c["fallos"]:>9} fallos {tasa:>9}')
@@ -0,0 +1,112 @@
+# Fase release/pre-deploy: migraciones, superusuario y tareas del día, con bloqueo y una vez por día
+import io
+import json
+import time
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from main.bloqueos import BloqueoOcupado, bloqueo_asesor
+
+
+class Command(BaseCommand):
+    help = (
+        'Prepara la BD antes de arrancar la web: migraciones pendientes, superusuario inicial y '
+        'tareas de cobro de hoy (solo si no se generaron ya hoy). Toma un bloqueo asesor para que '
+        'dos despliegues simultáneos no lo hagan a la vez e informa el tiempo de cada paso.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estaticos', action='store_true',
+                            help='Incluye collectstatic (VPS de un solo host; en PaaS va en el build).')
+        parser.add_argument('--forzar', action='store_true', help='Repite los pasos diarios aunque ya estén hechos hoy.')
+        parser.add_argument('--espera', type=int, default=600, help='Segundos máximos esperando el bloqueo.')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado como JSON.')
+
+    def handle(self, *args, **options):
+        from main.models import PasoDespliegue
+
+        hoy = date.today()
+        pasos = [('migrar', self._migrar)]
+        if options['estaticos']:
+            pasos.append(('estaticos', self._estaticos))
+        pasos += [('superusuario', self._superusuario), ('tareas_del_dia', self._tareas_del_dia)]
+        diarios = {'tareas_del_dia'}
+
+        resultado = {'fecha': hoy.isoformat(), 'pasos': {}}
+        inicio_total = time.perf_counter()
+        try:
+            with bloqueo_asesor('preparar_despliegue', espera=options['espera']):
+                resultado['espera_bloqueo_ms'] = round((time.perf_counter() - inicio_total) * 1000, 1)
+                for nombre, ejecutar in pasos:
+                    if nombre in diarios and not options['forzar'] and PasoDespliegue.objects.filter(
+                        paso=nombre, fecha=hoy, ok=True
+                    ).exists():
+                        resultado['pasos'][nombre] = {'estado': 'ya hecho hoy', 'ms': 0, 'detalle': {}}
+                        continue
+                    inicio = timezone.now()
+                    t0 = time.perf_counter()
+                    try:
+                        detalle = ejecutar(hoy)
+                    except Exception as e:
+                        self._registrar(nombre, hoy, inicio, t0, False, {'error': str(e)})
+                        raise CommandError(f'Paso {nombre} falló: {e}') from e
+                    resultado['pasos'][nombre] = {
+                        'estado': 'ok',
+                        'ms': self._registrar(nombre, hoy, inicio, t0, True, detalle),
+                        'detalle': detalle,
+                    }
+        except BloqueoOcupado:
+            raise CommandError(f'Otro proceso sigue preparando el despliegue tras {options["espera"]} s.')
+        resultado['duracion_ms'] = round((time.perf_counter() - inicio_total) * 1000, 1)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+        self.stdout.write(f'Preparación de despliegue {hoy} (bloqueo en {resultado["espera_bloqueo_ms"]} ms)')
+        for nombre, paso in resultado['pasos'].items():
+            detalle = ', '.join(f'{k}={v}' for k, v in paso['detalle'].items())
+            self.stdout.write(f'  {nombre:<15} {paso["estado"]:<13} {paso["ms"]:>9.1f} ms  {detalle}')
+        self.stdout.write(self.style.SUCCESS(f'Listo en {resultado["duracion_ms"]} ms'))
+
+    def _registrar(self, nombre, hoy, inicio, t0, ok, detalle):
+        """Guarda el paso en PasoDespliegue; retorna su duración en ms."""
+        from main.models import PasoDespliegue
+
+        ms = round((time.perf_counter() - t0) * 1000, 1)
+        try:
+            PasoDespliegue.objects.update_or_create(
+                paso=nombre,
+                fecha=hoy,
+                defaults={'inicio': inicio, 'duracion_segundos': ms / 1000, 'ok': ok, 'detalle': detalle},
+            )
+        except DatabaseError:
+            # Falló migrar antes de crear la tabla: el error ya sale por CommandError
+            if ok:
+                raise
+        return ms
+
+    def _migrar(self, hoy):
+        executor = MigrationExecutor(connection)
+        pendientes = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if pendientes:
+            call_command('migrate', interactive=False, verbosity=0)
+        return {'aplicadas': len(pendientes)}
+
+    def _estaticos(self, hoy):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        return {}
+
+    def _superusuario(self, hoy):
+        # El comando lista todos los usuarios: la salida no va al log del despliegue
+        call_command('crear_superusuario_auto', stdout=io.StringIO())
+        return {}
+
+    def _tareas_del_dia(self, hoy):
+        from main.models import TareaCobro
+
+        return {'tareas_creadas': TareaCobro.generar_tareas_diarias(fecha=hoy)}
@@ -0,0 +1,91 @@
+# Programación y envío de recordatorios de pago (ejecutar cada hora en horario diurno)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from main.bloqueos import BloqueoOcupado, bloqueo_asesor
+from main.recordatorios import (
+    despachar_recordatorios,
+    en_horario_silencio,
+    obtener_canales,
+    planificar_recordatorios,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Planifica recordatorios (cuotas próximas, del día y vencidas; uno por cliente y día) '
+        'y envía los pendientes por los canales configurados. Re-ejecutarlo no duplica envíos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', type=str, help='Fecha a procesar (YYYY-MM-DD). Por defecto hoy.')
+        parser.add_argument(
+            '--canales',
+            type=str,
+            help='Canales separados por coma (EMAIL, WHATSAPP, SMS). Por defecto RECORDATORIOS_CANALES.',
+        )
+        parser.add_argument('--solo-planificar', action='store_true', help='Solo crear recordatorios, sin enviar.')
+        parser.add_argument('--solo-enviar', action='store_true', help='Solo enviar pendientes, sin planificar.')
+        parser.add_argument('--forzar', action='store_true', help='Enviar aunque sea horario de silencio.')
+        parser.add_argument('--limite', type=int, help='Máximo de recordatorios a enviar por canal en esta ejecución.')
+        parser.add_argument('--dry-run', action='store_true', help='Mostrar cuántos se planificarían y enviarían, sin guardar ni enviar.')
+        parser.add_argument('--lote', type=int, default=100, help='Correos por conexión SMTP.')
+        parser.add_argument('--conexiones', type=int, default=1, help='Conexiones SMTP en paralelo.')
+        parser.add_argument('--backend', type=str, help='Backend de correo alterno (ej: locmem para pruebas).')
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            # Una ejecución a la vez (cron horario, manual o un lote SMTP lento): la siguiente se omite
+            try:
+                with bloqueo_asesor('procesar_recordatorios', espera=0):
+                    self._procesar(options)
+            except BloqueoOcupado:
+                self.stdout.write(self.style.WARNING('Otra ejecución de procesar_recordatorios sigue en curso; se omite.'))
+            return
+        # dry-run: se planifica para poder contar, pero nada queda guardado
+        with transaction.atomic():
+            self._procesar(options)
+            transaction.set_rollback(True)
+
+    def _procesar(self, options):
+        if options['fecha']:
+            try:
+                fecha = timezone.datetime.strptime(options['fecha'], '%Y-%m-%d').date()
+            except ValueError:
+                self.stdout.write(self.style.ERROR('Fecha inválida. Use YYYY-MM-DD.'))
+                return
+        else:
+            fecha = timezone.localdate()
+
+        try:
+            canales = obtener_canales(
+                options['canales'].split(',') if options['canales'] else None,
+                tamano_lote=options['lote'],
+                conexiones=options['conexiones'],
+                backend=options['backend'],
+            )
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
+
+        if not options['solo_enviar']:
+            plan = planificar_recordatorios(fecha, canales)
+            self.stdout.write(
+                f'Planificación {fecha}: {plan["creados"]} nuevos, {plan["existentes"]} ya programados, '
+                f'{plan["sin_destino"]} sin destino.'
+            )
+
+        if options['solo_planificar']:
+            return
+
+        if en_horario_silencio() and not options['forzar']:
+            self.stdout.write(self.style.WARNING('Horario de silencio: los recordatorios quedan pendientes.'))
+            return
+
+        envio = despachar_recordatorios(canales, fecha, limite=options['limite'], dry_run=options['dry_run'])
+        prefijo = 'Se enviarían' if options['dry_run'] else 'Envío'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefijo}: {envio["enviados"]} enviados, {envio["fallidos"]} fallidos, '
+            f'{envio["omitidos"]} omitidos, {envio["vencidos"]} descartados de días anteriores.'
+        ))
@@ -0,0 +1,24 @@
+# Reconstruye Cliente.texto_busqueda (y la tabla FTS en SQLite) tras importaciones o cargas masivas
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.busqueda import asegurar_fts, reindexar
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el texto normalizado de búsqueda de todos los clientes. Necesario después de '
+        'bulk_create/update(), que no pasan por Cliente.save().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help='Clientes por bulk_update.')
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        asegurar_fts()
+        actualizados = reindexar(lote=max(1, options['lote']))
+        self.stdout.write(self.style.SUCCESS(
+            f'{actualizados} clientes reindexados en {time.perf_counter() - t0:.1f}s.'
+        ))
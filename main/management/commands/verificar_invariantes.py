@@ -0,0 +1,44 @@
+# Verifica los invariantes de cartera (main.invariantes) sobre los créditos tocados desde la última corrida
+from django.core.management.base import BaseCommand
+
+from main.invariantes import INVARIANTES, verificar_invariantes
+from main.models import ViolacionInvariante
+
+
+class Command(BaseCommand):
+    help = (
+        'Evalúa los invariantes de cartera (cuotas vs pagos, PAGADO sin saldo, tareas sobre cuotas pagadas...) '
+        'solo para los créditos tocados desde la marca de agua anterior y registra las violaciones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true', help='Revisar todos los créditos, no solo los tocados.')
+        parser.add_argument('--lote', type=int, default=500, help='Créditos por consulta/transacción.')
+        parser.add_argument('--conservar', type=int, default=1000, help='Ejecuciones históricas a conservar (0 = todas).')
+        parser.add_argument('--listar', action='store_true', help='Mostrar los invariantes registrados y salir.')
+
+    def handle(self, *args, **options):
+        if options['listar']:
+            for inv in INVARIANTES:
+                self.stdout.write(f'{inv.codigo}: {inv.descripcion}')
+            return
+
+        ejecucion = verificar_invariantes(
+            completa=options['completo'], lote=max(1, options['lote']), conservar=options['conservar'],
+        )
+        if ejecucion is None:
+            self.stdout.write(self.style.WARNING('Otra ejecución de verificar_invariantes sigue en curso; se omite.'))
+            return
+        alcance = 'revisión completa' if ejecucion.completa else f'cambios desde {ejecucion.desde:%Y-%m-%d %H:%M:%S}'
+        self.stdout.write(
+            f'{ejecucion.creditos_revisados} créditos revisados ({alcance}) en {ejecucion.duracion_segundos:.2f}s.'
+        )
+        for codigo, datos in ejecucion.por_invariante.items():
+            self.stdout.write(f'  {codigo}: {datos["violaciones"]} ({datos["ms"]} ms)')
+        estilo = self.style.WARNING if ejecucion.violaciones_abiertas else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f'Violaciones: {ejecucion.violaciones_nuevas} nuevas, {ejecucion.violaciones_resueltas} resueltas, '
+            f'{ejecucion.violaciones_abiertas} abiertas.'
+        ))
+        for v in ViolacionInvariante.objects.filter(resuelta_en__isnull=True).order_by('-ultima_deteccion')[:20]:
+            self.stdout.write(f'  {v.invariante} crédito #{v.credito_id}: {v.detalle}')
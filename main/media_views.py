@@ -1,193 +1,355 @@
 """
 Vistas para servir archivos media en producción
+
+Los archivos se sirven con ``ETag`` / ``Last-Modified`` calculados del
+``stat`` del archivo, responden 304 a peticiones condicionales y soportan
+``Range`` (un solo rango) para PDFs grandes. Con ``MEDIA_SENDFILE`` el envío
+del archivo se delega al servidor web (nginx ``X-Accel-Redirect`` o
+Apache/lighttpd ``X-Sendfile``) y el worker de Python solo valida permisos.
 """
 
 import os
 import mimetypes
-from django.http import HttpResponse, Http404, FileResponse
+import re
+from functools import lru_cache
+from django.http import HttpResponse, Http404, FileResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.html import escape
 from django.views.generic import View
-from PIL import Image
 from io import BytesIO
 
+from .imagenes import buscar_original, generar_derivados, nombre_derivado, separar_derivado, version_original
+
+# Caché del navegador por tipo de respuesta
+CACHE_ORIGINAL = 'private, max-age=3600'  # 1 hora, luego revalida con ETag
+CACHE_DERIVADO = 'private, max-age=31536000, immutable'  # solo con ?v= igual a la versión del original
+CACHE_PLACEHOLDER = 'private, max-age=86400'  # 24 horas
+
+TAMANO_BLOQUE = 64 * 1024
+_RANGO_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _ruta_segura(path):
+    """Ruta absoluta dentro de MEDIA_ROOT o Http404."""
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    file_path = os.path.abspath(os.path.join(media_root, path))
+    if not file_path.startswith(media_root + os.sep):
+        raise Http404("Acceso denegado")
+    return file_path
+
+
+def _no_modificado(request, etag, mtime):
+    """True si el cliente ya tiene esta versión (If-None-Match tiene prioridad sobre If-Modified-Since)."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    desde = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return desde is not None and int(mtime) <= desde
+
+
+def _rango_solicitado(request, etag, tamano):
+    """
+    (inicio, fin) inclusivo del Range pedido, None para servir completo, o
+    'invalido' si el rango no es satisfacible. Rangos múltiples se ignoran.
+    """
+    encabezado = request.headers.get('Range', '')
+    if not encabezado or request.method != 'GET':
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        return None
+    m = _RANGO_RE.match(encabezado.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        inicio = int(m.group(1))
+        fin = int(m.group(2)) if m.group(2) else tamano - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        inicio = max(0, tamano - int(m.group(2)))
+        fin = tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return 'invalido'
+    return inicio, min(fin, tamano - 1)
+
+
+def _leer_rango(f, inicio, longitud):
+    try:
+        f.seek(inicio)
+        while longitud > 0:
+            bloque = f.read(min(TAMANO_BLOQUE, longitud))
+            if not bloque:
+                break
+            longitud -= len(bloque)
+            yield bloque
+    finally:
+        f.close()
+
+
+def servir_archivo(request, file_path, content_type=None, cache_control=CACHE_ORIGINAL):
+    """
+    Respuesta para un archivo de MEDIA_ROOT ya autorizado: 304 si el cliente
+    tiene la misma versión, 206 para Range, o el archivo completo (por
+    sendfile del servidor web si MEDIA_SENDFILE está configurado).
+    """
+    st = os.stat(file_path)
+    etag = quote_etag(f'{st.st_mtime_ns:x}-{st.st_size:x}')
+    if content_type is None:
+        content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+
+    def _encabezados(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(st.st_mtime)
+        response['Cache-Control'] = cache_control
+        return response
+
+    if _no_modificado(request, etag, st.st_mtime):
+        return _encabezados(HttpResponseNotModified())
+
+    modo = getattr(settings, 'MEDIA_SENDFILE', '')
+    if modo:
+        # El servidor web envía el archivo (y resuelve Range); Python no toca el contenido
+        response = HttpResponse(content_type=content_type)
+        if modo == 'X-Accel-Redirect':
+            relativa = os.path.relpath(file_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_SENDFILE_PREFIX', '/protected-media/') + relativa
+        else:
+            response['X-Sendfile'] = file_path
+        return _encabezados(response)
+
+    rango = _rango_solicitado(request, etag, st.st_size)
+    if rango == 'invalido':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{st.st_size}'
+        return _encabezados(response)
+    if rango:
+        inicio, fin = rango
+        longitud = fin - inicio + 1
+        response = StreamingHttpResponse(
+            _leer_rango(open(file_path, 'rb'), inicio, longitud), status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{st.st_size}'
+        response['Content-Length'] = str(longitud)
+    else:
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type, as_attachment=False)
+    response['Accept-Ranges'] = 'bytes'
+    return _encabezados(response)
+
 
 @login_required
-@cache_control(max_age=3600, private=True)  # Cachear por 1 hora
 def serve_media_file(request, path):
     """
     Sirve archivos media de forma segura en producción
     """
     try:
-        # Construir ruta completa del archivo
-        file_path = os.path.join(settings.MEDIA_ROOT, path)
-        
+        # Verificar que está dentro de MEDIA_ROOT (seguridad)
+        file_path = _ruta_segura(path)
+
         # Verificar que el archivo existe
-        if not os.path.exists(file_path):
-            # Si no existe, crear imagen placeholder
+        if not os.path.isfile(file_path):
+            # Si no existe, devolver imagen placeholder
             return create_placeholder_image(request, path)
-        
-        # Verificar que está dentro de MEDIA_ROOT (seguridad)
-        if not os.path.abspath(file_path).startswith(os.path.abspath(settings.MEDIA_ROOT)):
-            raise Http404("Acceso denegado")
-        
+
         # Determinar tipo de contenido
         content_type, _ = mimetypes.guess_type(file_path)
-        
-        # Si es una imagen, optimizarla
+
+        # Si es una imagen, servir la versión optimizada
         if content_type and content_type.startswith('image/'):
-            return serve_optimized_image(file_path, content_type)
-        
+            return serve_optimized_image(request, file_path, content_type)
+
         # Para otros archivos, servir directamente
-        return FileResponse(
-            open(file_path, 'rb'),
-            content_type=content_type,
-            as_attachment=False
-        )
-        
+        return servir_archivo(request, file_path, content_type)
+
+    except Http404:
+        raise
     except Exception as e:
         # Log del error en desarrollo
         if settings.DEBUG:
             print(f"Error sirviendo media: {str(e)}")
-        
-        # Crear imagen placeholder
+
+        # Devolver imagen placeholder
         return create_placeholder_image(request, path)
 
 
-def serve_optimized_image(file_path, content_type):
+def serve_optimized_image(request, file_path, content_type):
     """
-    Sirve imagen optimizada
+    Sirve la versión 'full' (máx. 800x600) de la imagen. Se genera una sola
+    vez junto al original en lugar de redimensionar en cada petición.
     """
     try:
-        # Abrir y optimizar imagen
-        with Image.open(file_path) as img:
-            # Convertir RGBA a RGB si es necesario
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Crear fondo blanco
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Redimensionar si es muy grande
-            max_size = (800, 600)  # Máximo 800x600 para optimizar carga
-            if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                try:
-                    # Usar el nuevo enum de Pillow 10+
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                except AttributeError:
-                    # Fallback para versiones más antiguas de Pillow
-                    img.thumbnail(max_size, Image.LANCZOS)
-            
-            # Guardar en buffer
-            buffer = BytesIO()
-            format_name = 'JPEG' if content_type == 'image/jpeg' else 'PNG'
-            img.save(buffer, format=format_name, quality=85, optimize=True)
-            buffer.seek(0)
-            
-            response = HttpResponse(buffer.getvalue(), content_type=content_type)
-            response['Cache-Control'] = 'private, max-age=3600'  # Cache 1 hora
-            return response
-            
+        destino = nombre_derivado(file_path, 'full')
+        generar_derivados(file_path, rendiciones=['full'])
+        return servir_archivo(request, destino, 'image/jpeg')
     except Exception:
         # Si falla la optimización, servir archivo original
-        return FileResponse(
-            open(file_path, 'rb'),
-            content_type=content_type,
-            as_attachment=False
-        )
+        return servir_archivo(request, file_path, content_type)
+
+
+@login_required
+def serve_derivado_imagen(request, path):
+    """
+    Sirve un derivado de foto (thumb/card/full). Si falta o es más viejo que
+    el original se genera de nuevo. Solo se cachea como inmutable cuando el
+    ``?v=`` de la URL es la versión actual del original; sin versión, o con
+    una vieja (el nombre del original se reutilizó), el navegador revalida
+    con ETag como cualquier otro archivo.
+    """
+    file_path = _ruta_segura(path)
+    original = buscar_original(file_path)
+
+    if original is None:
+        if not os.path.exists(file_path):
+            return create_placeholder_image(request, path)
+        return servir_archivo(request, file_path, 'image/jpeg')
+
+    try:
+        generar_derivados(original, rendiciones=[separar_derivado(file_path)[1]])
+    except Exception as e:
+        if settings.DEBUG:
+            print(f"Error generando derivado: {str(e)}")
+        return servir_archivo(request, original)
+
+    version = request.GET.get('v')
+    cache_control = CACHE_DERIVADO if version and version == version_original(original) else CACHE_ORIGINAL
+    return servir_archivo(request, file_path, 'image/jpeg', cache_control=cache_control)
+
+
+def _tipo_placeholder(path):
+    path = path.lower()
+    if 'rostro' in path:
+        return 'rostro'
+    if 'cedula' in path:
+        return 'cedula'
+    if 'servicio' in path:
+        return 'servicio'
+    return 'otro'
+
+
+@lru_cache(maxsize=None)
+def _placeholder_png(tipo):
+    """PNG del placeholder de cada tipo; se dibuja una vez por proceso."""
+    textos = {
+        'rostro': "Sin foto\nde rostro",
+        'cedula': "Sin foto\nde cédula",
+        'servicio': "Sin recibo\nde servicio",
+        'otro': "Imagen\nno disponible",
+    }
+    from PIL import Image
+
+    img = Image.new('RGB', (300, 200), color=(240, 240, 240))
+
+    # Añadir texto si PIL tiene fuentes disponibles
+    try:
+        from PIL import ImageDraw
+        draw = ImageDraw.Draw(img)
+        text = textos[tipo]
+
+        # Centrar texto
+        bbox = draw.textbbox((0, 0), text)
+        x = (300 - (bbox[2] - bbox[0])) // 2
+        y = (200 - (bbox[3] - bbox[1])) // 2
+        draw.text((x, y), text, fill=(120, 120, 120), align="center")
+    except ImportError:
+        # Si no hay fuentes disponibles, crear imagen simple
+        pass
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
 
 
 def create_placeholder_image(request, path):
     """
-    Crea imagen placeholder cuando no se encuentra el archivo
+    Imagen placeholder cuando no se encuentra el archivo (memoizada por tipo).
     """
     try:
-        # Crear imagen placeholder
-        img = Image.new('RGB', (300, 200), color=(240, 240, 240))
-        
-        # Añadir texto si PIL tiene fuentes disponibles
-        try:
-            from PIL import ImageDraw, ImageFont
-            draw = ImageDraw.Draw(img)
-            
-            # Texto del placeholder
-            if 'rostro' in path.lower():
-                text = "Sin foto\nde rostro"
-            elif 'cedula' in path.lower():
-                text = "Sin foto\nde cédula"
-            elif 'servicio' in path.lower():
-                text = "Sin recibo\nde servicio"
-            else:
-                text = "Imagen\nno disponible"
-            
-            # Centrar texto
-            bbox = draw.textbbox((0, 0), text)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            x = (300 - text_width) // 2
-            y = (200 - text_height) // 2
-            
-            draw.text((x, y), text, fill=(120, 120, 120), align="center")
-            
-        except ImportError:
-            # Si no hay fuentes disponibles, crear imagen simple
-            pass
-        
-        # Convertir a bytes
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        response = HttpResponse(buffer.getvalue(), content_type='image/png')
-        response['Cache-Control'] = 'private, max-age=86400'  # Cache 24 horas
+        tipo = _tipo_placeholder(path)
+        contenido = _placeholder_png(tipo)
+        etag = quote_etag(f'placeholder-{tipo}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(contenido, content_type='image/png')
+        response['ETag'] = etag
+        response['Cache-Control'] = CACHE_PLACEHOLDER
         return response
-        
+
     except Exception:
         # Fallback: devolver respuesta 404
         raise Http404("Imagen no disponible")
 
 
+def _formatear_tamano(total_size):
+    if total_size < 1024:
+        return f"{total_size} bytes"
+    if total_size < 1024 * 1024:
+        return f"{total_size / 1024:.1f} KB"
+    return f"{total_size / (1024 * 1024):.1f} MB"
+
+
 @login_required
 def media_status(request):
     """
     Vista para mostrar el estado de los archivos media
     """
     try:
+        from .models import InventarioMedia
+
+        # Lee el último inventario (comando inventario_media) en vez de recorrer el disco
+        inventario = InventarioMedia.objects.first()
         media_exists = os.path.exists(settings.MEDIA_ROOT)
-        files_count = 0
-        total_size = 0
-        
-        if media_exists:
-            for root, dirs, files in os.walk(settings.MEDIA_ROOT):
-                files_count += len(files)
-                for file in files:
-                    try:
-                        total_size += os.path.getsize(os.path.join(root, file))
-                    except OSError:
-                        pass
-        
-        # Formatear tamaño
-        if total_size < 1024:
-            size_str = f"{total_size} bytes"
-        elif total_size < 1024 * 1024:
-            size_str = f"{total_size / 1024:.1f} KB"
-        else:
-            size_str = f"{total_size / (1024 * 1024):.1f} MB"
-        
+
         info = {
             'media_root_exists': media_exists,
             'media_root_path': str(settings.MEDIA_ROOT),
-            'files_count': files_count,
-            'total_size': size_str,
+            'files_count': inventario.total_archivos if inventario else 0,
+            'total_size': _formatear_tamano(inventario.total_bytes) if inventario else 'Sin inventario',
+            'fecha_inventario': (
+                timezone.localtime(inventario.fecha).strftime('%d/%m/%Y %H:%M') if inventario
+                else 'Nunca (ejecute: python manage.py inventario_media)'
+            ),
+            'referencias': inventario.total_referencias if inventario else 0,
+            'faltantes': inventario.total_faltantes if inventario else 0,
             # True si el entorno tiene almacenamiento efímero (archivos se pierden en cada deploy)
-'is_ephemeral': os.getenv('EPHEMERAL_STORAGE', os.getenv('RAILWAY_ENVIRONMENT', '')).lower() in ['true', '1', 'yes'],
+            'is_ephemeral': os.getenv('EPHEMERAL_STORAGE', os.getenv('RAILWAY_ENVIRONMENT', '')).lower() in ['true', '1', 'yes'],
         }
-        
+
+        aviso_efimero = (
+            '<div class="alert alert-ephemeral"><h5><i class="bi bi-exclamation-triangle me-2"></i>Información Importante</h5>'
+            '<p><strong>Este entorno usa almacenamiento efímero.</strong> Los archivos subidos (imágenes de clientes, documentos, etc.) '
+            'pueden perderse en cada nuevo deploy.</p><p class="mb-0"><strong>Solución:</strong> El sistema genera imágenes placeholder '
+            'cuando los archivos no están disponibles. Para persistir archivos use almacenamiento externo (S3, volumen persistente, etc.).</p></div>'
+        ) if info['is_ephemeral'] else ''
+
+        filas_directorios = ''
+        filas_faltantes = ''
+        if inventario:
+            directorios = sorted(inventario.por_directorio.items(), key=lambda d: d[1]['bytes'], reverse=True)[:15]
+            filas_directorios = ''.join(
+                f'<tr><td>{escape(d)}</td><td class="text-end">{t["archivos"]}</td>'
+                f'<td class="text-end">{_formatear_tamano(t["bytes"])}</td></tr>'
+                for d, t in directorios
+            )
+            filas_faltantes = ''.join(
+                f'<tr><td>{escape(f["modelo"])} #{f["id"]}</td><td>{escape(f["campo"])}</td><td>{escape(f["ruta"])}</td></tr>'
+                for f in inventario.faltantes[:50]
+            )
+        tabla_directorios = (
+            '<h5 class="mt-4">Directorios más pesados</h5><table class="table table-sm">'
+            '<thead><tr><th>Directorio</th><th class="text-end">Archivos</th><th class="text-end">Tamaño</th></tr></thead>'
+            f'<tbody>{filas_directorios}</tbody></table>'
+        ) if filas_directorios else ''
+        tabla_faltantes = (
+            f'<h5 class="mt-4">Referencias sin archivo (primeras {min(50, info["faltantes"])} de {info["faltantes"]})</h5>'
+            '<table class="table table-sm"><thead><tr><th>Registro</th><th>Campo</th><th>Ruta</th></tr></thead>'
+            f'<tbody>{filas_faltantes}</tbody></table>'
+        ) if filas_faltantes else ''
+
         # Crear HTML con estilos del sistema
         html_content = f"""
         <!DOCTYPE html>
@@ -342,7 +504,25 @@ def media_status(request):
                             </div>
                         </div>
                         
-                        {"<div class=\"alert alert-ephemeral\"><h5><i class=\"bi bi-exclamation-triangle me-2\"></i>Información Importante</h5><p><strong>Este entorno usa almacenamiento efímero.</strong> Los archivos subidos (imágenes de clientes, documentos, etc.) pueden perderse en cada nuevo deploy.</p><p class=\"mb-0\"><strong>Solución:</strong> El sistema genera imágenes placeholder cuando los archivos no están disponibles. Para persistir archivos use almacenamiento externo (S3, volumen persistente, etc.).</p></div>" if info['is_ephemeral'] else ""}
+                        <div class="status-item">
+                            <i class="bi bi-clock-history"></i>
+                            <div class="status-label">Último inventario:</div>
+                            <div class="status-value">{info['fecha_inventario']}</div>
+                        </div>
+                        
+                        <div class="status-item">
+                            <i class="bi bi-link-45deg"></i>
+                            <div class="status-label">Referencias sin archivo:</div>
+                            <div class="status-value {'danger' if info['faltantes'] else 'success'}">
+                                {info['faltantes']} de {info['referencias']} archivos referenciados en la BD
+                            </div>
+                        </div>
+                        
+                        {aviso_efimero}
+                        
+                        {tabla_directorios}
+                        
+                        {tabla_faltantes}
                         
                         <div class="text-center mt-4">
                             <a href="javascript:history.back()" class="btn-back">
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_credito_codigo_renovacion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(choices=[('EMAIL', 'Correo electrónico'), ('WHATSAPP', 'WhatsApp'), ('SMS', 'SMS')], default='EMAIL', max_length=10)),
+                ('tipo', models.CharField(choices=[('PROXIMO', 'Cuota próxima a vencer'), ('VENCE_HOY', 'Cuota vence hoy'), ('VENCIDO', 'Cuota vencida')], max_length=10)),
+                ('fecha_programada', models.DateField(verbose_name='Fecha programada')),
+                ('destino', models.CharField(blank=True, max_length=254, verbose_name='Destino (correo o celular)')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente de envío'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido'), ('OMITIDO', 'Omitido')], default='PENDIENTE', max_length=10)),
+                ('intentos', models.IntegerField(default=0, verbose_name='Intentos de envío')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha/hora de envío')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recordatorios', to='main.cliente')),
+                ('cuotas', models.ManyToManyField(related_name='recordatorios', to='main.cronogramapago', verbose_name='Cuotas incluidas')),
+            ],
+            options={
+                'verbose_name': 'Recordatorio de pago',
+                'verbose_name_plural': 'Recordatorios de pago',
+                'ordering': ['-fecha_programada', 'id'],
+                'indexes': [models.Index(fields=['estado', 'fecha_programada'], name='main_record_estado_0831b2_idx')],
+                'unique_together': {('cliente', 'canal', 'fecha_programada')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0022_recordatorio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventarioMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(auto_now_add=True, verbose_name='Fecha del inventario')),
+                ('total_archivos', models.IntegerField(default=0)),
+                ('total_bytes', models.BigIntegerField(default=0)),
+                ('por_directorio', models.JSONField(blank=True, default=dict)),
+                ('total_referencias', models.IntegerField(default=0, verbose_name='Archivos referenciados en la BD')),
+                ('total_faltantes', models.IntegerField(default=0, verbose_name='Referencias sin archivo')),
+                ('faltantes', models.JSONField(blank=True, default=list)),
+                ('duracion_segundos', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Inventario de media',
+                'verbose_name_plural': 'Inventarios de media',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
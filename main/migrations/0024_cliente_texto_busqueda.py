@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:53
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalizar(texto):
+    # Copia de main.busqueda.normalizar (las migraciones no dependen del código vivo)
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', texto).split())
+
+
+def poblar_texto_busqueda(apps, schema_editor):
+    Cliente = apps.get_model('main', 'Cliente')
+    lote = []
+    for cliente in Cliente.objects.only('id', 'cedula', 'nombres', 'apellidos', 'barrio').iterator(chunk_size=2000):
+        cliente.texto_busqueda = _normalizar(
+            ' '.join(str(v or '') for v in (cliente.nombres, cliente.apellidos, cliente.cedula, cliente.barrio))
+        )
+        lote.append(cliente)
+        if len(lote) >= 2000:
+            Cliente.objects.bulk_update(lote, ['texto_busqueda'])
+            lote = []
+    if lote:
+        Cliente.objects.bulk_update(lote, ['texto_busqueda'])
+
+
+def crear_indices_postgres(apps, schema_editor):
+    # En SQLite la tabla FTS5 la crea main.busqueda.asegurar_fts (post_migrate)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS main_cliente_busqueda_trgm '
+        'ON main_cliente USING gin (texto_busqueda gin_trgm_ops)'
+    )
+    # LIKE 'prefijo%' sobre la cédula con cualquier collation
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS main_cliente_cedula_patron '
+        'ON main_cliente (cedula varchar_pattern_ops)'
+    )
+
+
+def borrar_indices_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS main_cliente_busqueda_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS main_cliente_cedula_patron')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_inventariomedia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(poblar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indices_postgres, borrar_indices_postgres),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_cliente_texto_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['-fecha_registro', '-id'], name='main_client_fecha_r_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='credito',
+            index=models.Index(fields=['-fecha_solicitud', '-id'], name='main_credit_fecha_s_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='credito',
+            index=models.Index(fields=['-dias_mora', '-id'], name='main_credit_dias_m_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['-fecha_pago', '-id'], name='main_pago_fecha_p_keyset'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0025_indices_paginacion_keyset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionInvariantes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inicio', models.DateTimeField(verbose_name='Inicio')),
+                ('marca', models.DateTimeField(verbose_name='Marca de agua')),
+                ('desde', models.DateTimeField(blank=True, null=True, verbose_name='Revisó cambios desde')),
+                ('completa', models.BooleanField(default=False, verbose_name='Revisión completa')),
+                ('creditos_revisados', models.IntegerField(default=0)),
+                ('violaciones_nuevas', models.IntegerField(default=0)),
+                ('violaciones_resueltas', models.IntegerField(default=0)),
+                ('violaciones_abiertas', models.IntegerField(default=0)),
+                ('por_invariante', models.JSONField(blank=True, default=dict)),
+                ('duracion_segundos', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Ejecución de invariantes',
+                'verbose_name_plural': 'Ejecuciones de invariantes',
+                'ordering': ['-inicio'],
+            },
+        ),
+        migrations.AddField(
+            model_name='credito',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='cronogramapago',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='tareacobro',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='ViolacionInvariante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invariante', models.CharField(db_index=True, max_length=50)),
+                ('detalle', models.JSONField(blank=True, default=dict)),
+                ('detectada_en', models.DateTimeField(auto_now_add=True, verbose_name='Detectada')),
+                ('ultima_deteccion', models.DateTimeField(verbose_name='Última detección')),
+                ('resuelta_en', models.DateTimeField(blank=True, null=True, verbose_name='Resuelta')),
+                ('credito', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='violaciones_invariantes', to='main.credito')),
+            ],
+            options={
+                'verbose_name': 'Violación de invariante',
+                'verbose_name_plural': 'Violaciones de invariantes',
+                'ordering': ['-detectada_en'],
+                'indexes': [models.Index(fields=['resuelta_en', 'invariante'], name='main_violac_resuelt_bd9d10_idx')],
+            },
+        ),
+    ]
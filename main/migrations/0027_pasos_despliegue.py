@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_invariantes_cartera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PasoDespliegue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paso', models.CharField(max_length=50)),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('inicio', models.DateTimeField(verbose_name='Inicio')),
+                ('duracion_segundos', models.FloatField(default=0)),
+                ('ok', models.BooleanField(default=False)),
+                ('detalle', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Paso de despliegue',
+                'verbose_name_plural': 'Pasos de despliegue',
+                'ordering': ['-inicio'],
+                'unique_together': {('paso', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_pasos_despliegue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuestraRendimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(db_index=True, verbose_name='Fecha')),
+                ('vista', models.CharField(max_length=150, verbose_name='Vista (nombre de URL)')),
+                ('metodo', models.CharField(max_length=10)),
+                ('estado', models.PositiveSmallIntegerField(verbose_name='Código HTTP')),
+                ('duracion_ms', models.FloatField(verbose_name='Duración (ms)')),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('sql_ms', models.FloatField(default=0, verbose_name='Tiempo en SQL (ms)')),
+                ('consultas_duplicadas', models.PositiveIntegerField(default=0)),
+                ('detalle', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Muestra de rendimiento',
+                'verbose_name_plural': 'Muestras de rendimiento',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['vista', 'fecha'], name='main_muestr_vista_3ef137_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_muestras_rendimiento'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recordatorio',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', 'Pendiente de envío'), ('ENVIANDO', 'Enviando'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido'), ('OMITIDO', 'Omitido')], default='PENDIENTE', max_length=10),
+        ),
+    ]
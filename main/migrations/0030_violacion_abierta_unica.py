@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+def resolver_duplicadas(apps, schema_editor):
+    # Corridas superpuestas pudieron abrir dos veces la misma violación: queda la más reciente
+    ViolacionInvariante = apps.get_model('main', 'ViolacionInvariante')
+    vistas = set()
+    duplicadas = []
+    abiertas = ViolacionInvariante.objects.filter(resuelta_en__isnull=True).order_by('-ultima_deteccion', '-id')
+    for v in abiertas.only('id', 'invariante', 'credito_id', 'ultima_deteccion').iterator(chunk_size=2000):
+        clave = (v.invariante, v.credito_id)
+        if clave in vistas:
+            duplicadas.append(v)
+        else:
+            vistas.add(clave)
+    for v in duplicadas:
+        ViolacionInvariante.objects.filter(id=v.id).update(resuelta_en=v.ultima_deteccion)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_recordatorio_enviando'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolver_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='violacioninvariante',
+            constraint=models.UniqueConstraint(condition=models.Q(('resuelta_en__isnull', True)), fields=('invariante', 'credito'), name='violacion_abierta_unica'),
+        ),
+    ]
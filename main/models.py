@@ -19,6 +19,132 @@ telefono_fijo_validator = RegexValidator(
     message="El teléfono fijo debe tener 7-8 dígitos (ej: 6012345)"
 )
 
+# Saldos menores a esto (residuos de redondeo) se consideran pagados
+UMBRAL_SALDO_CERRADO = Decimal('1')
+
+# QuerySets con anotaciones para listados: evitan una consulta por fila cuando la
+# plantilla llama a saldo_pendiente, total_clientes, creditos_activos, etc.
+class CreditoQuerySet(models.QuerySet):
+    def with_saldos(self):
+        """
+        Anota ``total_pagado_anotado`` y ``saldo_pendiente_anotado`` con una
+        subconsulta por crédito; ``total_pagado()`` y ``saldo_pendiente()`` los
+        usan en lugar de consultar los pagos.
+        """
+        from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+        from django.db.models.functions import Coalesce, Greatest, NullIf
+
+        monto_decimal = DecimalField(max_digits=12, decimal_places=2)
+        pagos = (
+            Pago.objects.filter(credito=OuterRef('pk'))
+            .order_by()
+            .values('credito')
+            .annotate(total=Sum('monto'))
+            .values('total')
+        )
+        return self.annotate(
+            total_pagado_anotado=Coalesce(
+                Subquery(pagos, output_field=monto_decimal), Value(Decimal('0')), output_field=monto_decimal
+            ),
+        ).annotate(
+            # Igual que saldo_pendiente(): monto_total en 0 cae a monto, y nunca negativo
+            saldo_pendiente_anotado=Greatest(
+                Coalesce(NullIf('monto_total', Value(0)), 'monto') - models.F('total_pagado_anotado'),
+                Value(Decimal('0')),
+                output_field=monto_decimal,
+            ),
+        )
+
+    def with_proxima_cuota(self):
+        """
+        Anota ``proxima_cuota_numero`` y ``proxima_cuota_saldo`` (primera cuota
+        PENDIENTE o PARCIAL) y ``cuotas_pagadas_anotado``, con subconsultas.
+        """
+        from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+
+        pendientes = CronogramaPago.objects.filter(
+            credito=OuterRef('pk'), estado__in=['PENDIENTE', 'PARCIAL']
+        ).order_by('numero_cuota')
+        pagadas = (
+            CronogramaPago.objects.filter(credito=OuterRef('pk'), estado__in=['PAGADO', 'PAGADA'])
+            .order_by()
+            .values('credito')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return self.annotate(
+            proxima_cuota_numero=Subquery(pendientes.values('numero_cuota')[:1]),
+            proxima_cuota_saldo=Subquery(
+                pendientes.annotate(saldo=F('monto_cuota') - F('monto_pagado')).values('saldo')[:1],
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            cuotas_pagadas_anotado=Coalesce(Subquery(pagadas, output_field=IntegerField()), 0),
+        )
+
+    def saldados_sin_cerrar(self, umbral=UMBRAL_SALDO_CERRADO):
+        """Créditos vigentes cuyo saldo ya es menor que ``umbral`` (deberían estar PAGADO)."""
+        return self.filter(estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']).with_saldos().filter(
+            saldo_pendiente_anotado__lt=umbral
+        )
+
+    def que_pueden_recibir_pagos(self):
+        """Equivalente en SQL de filtrar por ``puede_recibir_pagos()``."""
+        return self.filter(estado__in=['APROBADO', 'DESEMBOLSADO']).with_saldos().filter(
+            saldo_pendiente_anotado__gt=0
+        )
+
+
+class CobradorQuerySet(models.QuerySet):
+    def with_carga(self):
+        """Anota los conteos de créditos del cobrador y precarga sus rutas."""
+        from django.db.models import Count, Q
+
+        return self.annotate(
+            creditos_activos_anotado=Count(
+                'credito', filter=Q(credito__estado__in=['APROBADO', 'DESEMBOLSADO']), distinct=True
+            ),
+            creditos_asignados_anotado=Count('credito', distinct=True),
+        ).prefetch_related('rutas')
+
+
+class RutaQuerySet(models.QuerySet):
+    def with_totales(self):
+        """
+        Anota los créditos activos de cada ruta y precarga sus cobradores.
+        ``total_clientes`` se cruza por barrio (texto separado por comas, no
+        se puede en SQL): la vista llama a ``asignar_total_clientes`` sobre
+        las rutas ya evaluadas.
+        """
+        from django.db.models import Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+
+        creditos = (
+            Credito.objects.filter(cobrador__rutas=OuterRef('pk'), estado__in=['APROBADO', 'DESEMBOLSADO'])
+            .order_by()
+            .values('cobrador__rutas')
+            .annotate(total=Count('id', distinct=True))
+            .values('total')
+        )
+        return self.annotate(
+            creditos_activos_anotado=Coalesce(Subquery(creditos, output_field=models.IntegerField()), 0),
+        ).prefetch_related('cobradores')
+
+
+def asignar_total_clientes(rutas):
+    """Asigna ``total_clientes_anotado`` a cada ruta (lista) con una consulta para todas."""
+    from django.db.models import Count
+
+    barrios = {b for ruta in rutas for b in ruta.get_barrios_lista()}
+    por_barrio = dict(
+        Cliente.objects.filter(barrio__in=barrios).order_by().values('barrio')
+        .annotate(total=Count('id')).values_list('barrio', 'total')
+    ) if barrios else {}
+    for ruta in rutas:
+        ruta.total_clientes_anotado = sum(por_barrio.get(b, 0) for b in set(ruta.get_barrios_lista()))
+    return rutas
+
+
 class Cliente(models.Model):
     # Información personal básica
     nombres = models.CharField(max_length=100, verbose_name="Nombres", default="")
@@ -79,6 +205,8 @@ class Cliente(models.Model):
     # Metadatos
     fecha_registro = models.DateTimeField(auto_now_add=True)
     activo = models.BooleanField(default=True)
+    # Cédula, nombres, apellidos y barrio normalizados para buscar (ver main/busqueda.py)
+    texto_busqueda = models.TextField(default='', blank=True, editable=False)
     
     # Habeas Data (Ley 1581 de 2012) - autorización de tratamiento de datos
     documento_habeas_data = models.FileField(
@@ -119,6 +247,12 @@ class Cliente(models.Model):
         null=True,
         help_text='Ej: REN-2025-000123',
     )
+
+    class Meta:
+        # Paginación por cursor del listado de clientes (main.paginacion)
+        indexes = [
+            models.Index(fields=['-fecha_registro', '-id'], name='main_client_fecha_r_keyset'),
+        ]
     
     # Campos de compatibilidad (para no romper el código existente)
     @property
@@ -141,6 +275,15 @@ class Cliente(models.Model):
         """True si el cliente tiene al menos un documento de renovación firmado (se muestra el último)."""
         return bool(self.fecha_firma_renovacion and self.documento_renovacion)
 
+    def save(self, *args, **kwargs):
+        """Mantiene ``texto_busqueda`` al día con los campos buscables"""
+        from .busqueda import CAMPOS_BUSQUEDA, texto_busqueda_cliente
+        self.texto_busqueda = texto_busqueda_cliente(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(CAMPOS_BUSQUEDA):
+            kwargs['update_fields'] = set(update_fields) | {'texto_busqueda'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.nombres} {self.apellidos} - {self.cedula}"
 
@@ -266,6 +409,8 @@ class Credito(models.Model):
     fecha_solicitud = models.DateTimeField(auto_now_add=True)
     fecha_aprobacion = models.DateTimeField(null=True, blank=True)
     fecha_desembolso = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de desembolso")
+    # Marca de agua de main.invariantes (también se actualiza al crear/editar/borrar pagos)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     # Pagaré electrónico (firma OTP antes del desembolso)
     documento_pagare = models.FileField(
@@ -367,6 +512,15 @@ class Credito(models.Model):
         null=True,
     )
 
+    objects = CreditoQuerySet.as_manager()
+
+    class Meta:
+        # Paginación por cursor de créditos y cartera vencida (main.paginacion)
+        indexes = [
+            models.Index(fields=['-fecha_solicitud', '-id'], name='main_credit_fecha_s_keyset'),
+            models.Index(fields=['-dias_mora', '-id'], name='main_credit_dias_m_keyset'),
+        ]
+
     def tiene_documento_retanqueo_firmado(self):
         """True si es crédito por retanqueo y el cliente ya firmó el documento con OTP."""
         return bool(
@@ -386,20 +540,16 @@ class Credito(models.Model):
     def sugerir_cobrador(self):
         """Sugiere un cobrador basado en el barrio del cliente"""
         if self.cliente.barrio:
-            # Buscar rutas que incluyan el barrio del cliente
-            rutas_posibles = Ruta.objects.filter(
-                barrios__icontains=self.cliente.barrio.strip(),
-                activa=True
-            )
-            
-            for ruta in rutas_posibles:
-                if self.cliente.barrio.strip().lower() in [b.lower() for b in ruta.get_barrios_lista()]:
-                    # Buscar cobradores activos asignados a esta ruta
-                    cobradores = ruta.cobradores.filter(activo=True)
-                    if cobradores.exists():
-                        # Retornar el cobrador con menos créditos activos (balance de carga)
-                        cobrador_sugerido = min(cobradores, key=lambda c: c.creditos_activos().count())
-                        return cobrador_sugerido
+            from .cache_dominio import rutas_por_barrio
+
+            # Rutas activas que incluyen el barrio del cliente (mapa cacheado)
+            for ruta_id in rutas_por_barrio().get(self.cliente.barrio.strip().lower(), []):
+                # Buscar cobradores activos asignados a esta ruta
+                cobradores = list(Cobrador.objects.filter(rutas=ruta_id, activo=True).with_carga())
+                if cobradores:
+                    # Retornar el cobrador con menos créditos activos (balance de carga)
+                    cobrador_sugerido = min(cobradores, key=lambda c: c.total_creditos_activos())
+                    return cobrador_sugerido
         return None
     
     def asignar_cobrador_automaticamente(self, forzar=False):
@@ -425,6 +575,11 @@ class Credito(models.Model):
         # Calcular cronograma si no está calculado
         if not self.valor_cuota:
             self.calcular_cronograma()
+
+        # auto_now solo se guarda si el campo va en update_fields
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'fecha_actualizacion'}
             
         super().save(*args, **kwargs)
     
@@ -480,31 +635,78 @@ class Credito(models.Model):
         # Retornar solo las fechas para compatibilidad
         return [item['fecha_objeto'] for item in cronograma]
     
-    def generar_cronograma(self):
-        """Genera el cronograma de pagos en la base de datos usando la lógica centralizada"""
+    def cuotas_cronograma(self):
+        """Cuotas (``CronogramaPago`` sin guardar) del cronograma según desembolso, plazo y valor de cuota."""
         from .creditos_utils import generar_cronograma_fechas
-        
+
         if not self.fecha_desembolso:
-            return
-        
-        # Eliminar cronograma anterior si existe
-        self.cronograma.all().delete()
-        
-        # Usar función centralizada para generar el cronograma completo
+            return []
         cronograma = generar_cronograma_fechas(
             cantidad_cuotas=self.cantidad_cuotas,
             tipo_plazo=self.tipo_plazo,
             fecha_inicio=self.fecha_desembolso.date() if hasattr(self.fecha_desembolso, 'date') else self.fecha_desembolso
         )
-        
-        # Crear registros en la base de datos
-        for cuota_info in cronograma:
-            CronogramaPago.objects.create(
+        return [
+            CronogramaPago(
                 credito=self,
                 numero_cuota=cuota_info['numero_cuota'],
                 fecha_vencimiento=cuota_info['fecha_objeto'],
                 monto_cuota=self.valor_cuota
             )
+            for cuota_info in cronograma
+        ]
+
+    def generar_cronograma(self):
+        """Genera el cronograma de pagos en la base de datos usando la lógica centralizada"""
+        if not self.fecha_desembolso:
+            return
+        Credito.generar_cronogramas([self])
+
+    @classmethod
+    def generar_cronogramas(cls, creditos, lote=500, batch_size=1000):
+        """
+        Regenera el cronograma de muchos créditos (migraciones, backfill,
+        retanqueos en lote): por cada ``lote`` de créditos borra sus cuotas
+        con una consulta y crea las nuevas con ``bulk_create``. Omite los
+        créditos sin desembolso. Retorna la cantidad de cuotas creadas.
+
+        ``bulk_create`` no dispara ``post_save``: aquí se invalidan los PDF
+        cacheados del crédito al confirmar, como haría la señal de cada cuota.
+        """
+        from django.db import transaction
+
+        from .pdf_cache import invalidar_credito
+
+        if isinstance(creditos, models.QuerySet):
+            creditos = creditos.filter(fecha_desembolso__isnull=False).iterator(chunk_size=lote)
+        creadas = 0
+        pendientes = []
+
+        def guardar(grupo):
+            cuotas = [cuota for credito in grupo for cuota in credito.cuotas_cronograma()]
+            with transaction.atomic():
+                # Eliminar cronograma anterior si existe
+                CronogramaPago.objects.filter(credito__in=[c.pk for c in grupo]).delete()
+                CronogramaPago.objects.bulk_create(cuotas, batch_size=batch_size)
+            ids = [credito.pk for credito in grupo]
+
+            def invalidar():
+                for credito_id in ids:
+                    invalidar_credito(credito_id)
+
+            transaction.on_commit(invalidar)
+            return len(cuotas)
+
+        for credito in creditos:
+            if not credito.fecha_desembolso:
+                continue
+            pendientes.append(credito)
+            if len(pendientes) >= lote:
+                creadas += guardar(pendientes)
+                pendientes = []
+        if pendientes:
+            creadas += guardar(pendientes)
+        return creadas
     
     def tiene_pagare_firmado(self):
         """True si el pagaré está firmado (cliente y codeudor si existe) y el PDF está guardado."""
@@ -533,7 +735,10 @@ class Credito(models.Model):
         return f"Crédito {self.id} - {self.cliente.nombre_completo} - ${self.monto}"
     
     def total_pagado(self):
-        """Calcula el total pagado en este crédito"""
+        """Calcula el total pagado en este crédito (usa la anotación de ``with_saldos()`` si existe)"""
+        anotado = getattr(self, 'total_pagado_anotado', None)
+        if anotado is not None:
+            return anotado
         try:
             total = self.pago_set.aggregate(total=models.Sum('monto'))['total']
             return total if total is not None else 0
@@ -542,6 +747,9 @@ class Credito(models.Model):
     
     def saldo_pendiente(self):
         """Calcula el saldo pendiente por pagar"""
+        anotado = getattr(self, 'saldo_pendiente_anotado', None)
+        if anotado is not None:
+            return anotado
         try:
             monto_total = self.monto_total if self.monto_total else self.monto
             total_pagado = self.total_pagado()
@@ -713,10 +921,18 @@ class CronogramaPago(models.Model):
     estado = models.CharField(max_length=10, choices=ESTADOS_CUOTA, default='PENDIENTE')
     fecha_pago = models.DateField(null=True, blank=True, verbose_name="Fecha de pago real")
     observaciones = models.TextField(blank=True, verbose_name="Observaciones")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         unique_together = ['credito', 'numero_cuota']
         ordering = ['numero_cuota']
+
+    def save(self, *args, **kwargs):
+        """Incluye ``fecha_actualizacion`` aunque se guarde con ``update_fields`` (marca de main.invariantes)"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'fecha_actualizacion'}
+        super().save(*args, **kwargs)
     
     def saldo_pendiente(self):
         return self.monto_cuota - self.monto_pagado
@@ -735,6 +951,12 @@ class Pago(models.Model):
     fecha_pago = models.DateTimeField(auto_now_add=True)
     numero_cuota = models.IntegerField()
     observaciones = models.TextField(blank=True)
+
+    class Meta:
+        # Paginación por cursor del historial de pagos (main.paginacion)
+        indexes = [
+            models.Index(fields=['-fecha_pago', '-id'], name='main_pago_fecha_p_keyset'),
+        ]
     
     def __str__(self):
         return f"Pago {self.id} - Crédito {self.credito.id} - ${self.monto}"
@@ -1087,7 +1309,7 @@ class TareaCobro(models.Model):
     
     # Metadatos
     fecha_creacion = models.DateTimeField(auto_now_add=True)
-    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Tarea de Cobro"
@@ -1548,6 +1770,8 @@ class Ruta(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_modificacion = models.DateTimeField(auto_now=True)
     
+    objects = RutaQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Ruta"
         verbose_name_plural = "Rutas"
@@ -1559,10 +1783,16 @@ class Ruta(models.Model):
     
     def total_clientes(self):
         """Cuenta el total de clientes asignados a esta ruta"""
+        anotado = getattr(self, 'total_clientes_anotado', None)
+        if anotado is not None:
+            return anotado
         return Cliente.objects.filter(barrio__in=self.get_barrios_lista()).count()
     
     def total_creditos_activos(self):
         """Cuenta créditos activos en esta ruta"""
+        anotado = getattr(self, 'creditos_activos_anotado', None)
+        if anotado is not None:
+            return anotado
         return Credito.objects.filter(
             cobrador__rutas=self,
             estado__in=['APROBADO', 'DESEMBOLSADO']
@@ -1623,6 +1853,8 @@ class Cobrador(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_modificacion = models.DateTimeField(auto_now=True)
     
+    objects = CobradorQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Cobrador"
         verbose_name_plural = "Cobradores"
@@ -1638,12 +1870,22 @@ class Cobrador(models.Model):
     
     def total_creditos_asignados(self):
         """Total de créditos asignados a este cobrador"""
+        anotado = getattr(self, 'creditos_asignados_anotado', None)
+        if anotado is not None:
+            return anotado
         return self.credito_set.count()
     
     def creditos_activos(self):
         """Créditos activos asignados a este cobrador"""
         return self.credito_set.filter(estado__in=['APROBADO', 'DESEMBOLSADO'])
     
+    def total_creditos_activos(self):
+        """Cantidad de créditos activos (usa la anotación de ``with_carga()`` si existe)"""
+        anotado = getattr(self, 'creditos_activos_anotado', None)
+        if anotado is not None:
+            return anotado
+        return self.creditos_activos().count()
+    
     def creditos_por_cobrar_hoy(self):
         """Créditos con cuotas que vencen hoy"""
         from datetime import date
@@ -1703,3 +1945,199 @@ class CierreCobroDiario(models.Model):
 
     def __str__(self):
         return f"Cierre {self.cobrador.nombre_completo} - {self.fecha}"
+
+
+class Recordatorio(models.Model):
+    """
+    Ledger de recordatorios de pago: uno por cliente, canal y día.
+    La restricción única evita enviar dos veces el mismo día aunque el proceso
+    se ejecute varias veces; el estado permite despachar solo lo nuevo.
+    ENVIANDO marca lo que un despacho ya reclamó: otro despacho no lo toma y,
+    si el proceso muere a mitad de envío, no se reintenta (mejor perder un
+    recordatorio que enviarlo dos veces).
+    """
+    CANALES = [
+        ('EMAIL', 'Correo electrónico'),
+        ('WHATSAPP', 'WhatsApp'),
+        ('SMS', 'SMS'),
+    ]
+    TIPOS = [
+        ('PROXIMO', 'Cuota próxima a vencer'),
+        ('VENCE_HOY', 'Cuota vence hoy'),
+        ('VENCIDO', 'Cuota vencida'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente de envío'),
+        ('ENVIANDO', 'Enviando'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido'),
+        ('OMITIDO', 'Omitido'),
+    ]
+
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='recordatorios')
+    cuotas = models.ManyToManyField(CronogramaPago, related_name='recordatorios', verbose_name="Cuotas incluidas")
+    canal = models.CharField(max_length=10, choices=CANALES, default='EMAIL')
+    tipo = models.CharField(max_length=10, choices=TIPOS)
+    fecha_programada = models.DateField(verbose_name="Fecha programada")
+    destino = models.CharField(max_length=254, blank=True, verbose_name="Destino (correo o celular)")
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='PENDIENTE')
+    intentos = models.IntegerField(default=0, verbose_name="Intentos de envío")
+    ultimo_error = models.TextField(blank=True, verbose_name="Último error")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha/hora de envío")
+
+    class Meta:
+        verbose_name = "Recordatorio de pago"
+        verbose_name_plural = "Recordatorios de pago"
+        ordering = ['-fecha_programada', 'id']
+        unique_together = [['cliente', 'canal', 'fecha_programada']]
+        indexes = [
+            models.Index(fields=['estado', 'fecha_programada']),
+        ]
+
+    def __str__(self):
+        return f"Recordatorio {self.get_canal_display()} - {self.cliente_id} - {self.fecha_programada} ({self.estado})"
+
+
+class InventarioMedia(models.Model):
+    """
+    Foto del contenido de MEDIA_ROOT generada por ``inventario_media``:
+    totales por directorio y referencias de la BD (FileField/ImageField)
+    que apuntan a archivos inexistentes. ``media_status`` lee el último.
+    """
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name="Fecha del inventario")
+    total_archivos = models.IntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    # {'clientes/rostros': {'archivos': 120, 'bytes': 34567890}, ...}
+    por_directorio = models.JSONField(default=dict, blank=True)
+    total_referencias = models.IntegerField(default=0, verbose_name="Archivos referenciados en la BD")
+    total_faltantes = models.IntegerField(default=0, verbose_name="Referencias sin archivo")
+    # [{'modelo': 'Cliente', 'id': 1, 'campo': 'foto_rostro', 'ruta': '...'}, ...] (acotado)
+    faltantes = models.JSONField(default=list, blank=True)
+    duracion_segundos = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = "Inventario de media"
+        verbose_name_plural = "Inventarios de media"
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"Inventario media {self.fecha:%Y-%m-%d %H:%M} ({self.total_archivos} archivos, {self.total_faltantes} faltantes)"
+
+
+class EjecucionInvariantes(models.Model):
+    """
+    Corrida de ``verificar_invariantes``. ``marca`` es la marca de agua: los
+    cambios anteriores a ella ya fueron revisados; la siguiente corrida solo
+    revisa los créditos tocados después (con un margen, ver main.invariantes).
+    """
+    inicio = models.DateTimeField(verbose_name="Inicio")
+    marca = models.DateTimeField(verbose_name="Marca de agua")
+    desde = models.DateTimeField(null=True, blank=True, verbose_name="Revisó cambios desde")
+    completa = models.BooleanField(default=False, verbose_name="Revisión completa")
+    creditos_revisados = models.IntegerField(default=0)
+    violaciones_nuevas = models.IntegerField(default=0)
+    violaciones_resueltas = models.IntegerField(default=0)
+    violaciones_abiertas = models.IntegerField(default=0)
+    # {'cuotas_vs_pagos': {'violaciones': 2, 'ms': 12.5}, ...}
+    por_invariante = models.JSONField(default=dict, blank=True)
+    duracion_segundos = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = "Ejecución de invariantes"
+        verbose_name_plural = "Ejecuciones de invariantes"
+        ordering = ['-inicio']
+
+    def __str__(self):
+        alcance = 'completa' if self.completa else f'desde {self.desde:%Y-%m-%d %H:%M}' if self.desde else 'inicial'
+        return f"Invariantes {self.inicio:%Y-%m-%d %H:%M} ({alcance}, {self.creditos_revisados} créditos)"
+
+
+class ViolacionInvariante(models.Model):
+    """
+    Un crédito que incumple un invariante de main.invariantes. Queda abierta
+    (``resuelta_en`` vacío) mientras la condición se siga detectando.
+    """
+    invariante = models.CharField(max_length=50, db_index=True)
+    credito = models.ForeignKey(Credito, on_delete=models.CASCADE, related_name='violaciones_invariantes')
+    # Valores que dispararon la violación, p. ej. {'suma_cuotas': '100.00', 'suma_pagos': '120.00'}
+    detalle = models.JSONField(default=dict, blank=True)
+    detectada_en = models.DateTimeField(auto_now_add=True, verbose_name="Detectada")
+    ultima_deteccion = models.DateTimeField(verbose_name="Última detección")
+    resuelta_en = models.DateTimeField(null=True, blank=True, verbose_name="Resuelta")
+
+    class Meta:
+        verbose_name = "Violación de invariante"
+        verbose_name_plural = "Violaciones de invariantes"
+        ordering = ['-detectada_en']
+        indexes = [
+            models.Index(fields=['resuelta_en', 'invariante']),
+        ]
+        constraints = [
+            # Una sola violación abierta por invariante y crédito
+            models.UniqueConstraint(
+                fields=['invariante', 'credito'],
+                condition=models.Q(resuelta_en__isnull=True),
+                name='violacion_abierta_unica',
+            ),
+        ]
+
+    @property
+    def abierta(self):
+        return self.resuelta_en is None
+
+    def __str__(self):
+        return f"{self.invariante} - Crédito {self.credito_id}"
+
+
+class PasoDespliegue(models.Model):
+    """
+    Última ejecución de un paso de ``preparar_despliegue`` en una fecha. Los
+    pasos diarios (generar las tareas de hoy) no se repiten si ya hay una
+    fila con ``ok`` para la fecha.
+    """
+    paso = models.CharField(max_length=50)
+    fecha = models.DateField(verbose_name="Fecha")
+    inicio = models.DateTimeField(verbose_name="Inicio")
+    duracion_segundos = models.FloatField(default=0)
+    ok = models.BooleanField(default=False)
+    # Resultado del paso, p. ej. {'tareas_creadas': 42} o el error
+    detalle = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        verbose_name = "Paso de despliegue"
+        verbose_name_plural = "Pasos de despliegue"
+        ordering = ['-inicio']
+        unique_together = [['paso', 'fecha']]
+
+    def __str__(self):
+        return f"{self.paso} {self.fecha:%Y-%m-%d} ({'ok' if self.ok else 'error'}, {self.duracion_segundos:.1f} s)"
+
+
+class MuestraRendimiento(models.Model):
+    """
+    Una petición perfilada por ``main.perfilado`` (solo con PERFILADO=true).
+    ``detalle`` guarda el SQL sin parámetros de las consultas más lentas y
+    de las repetidas.
+    """
+    fecha = models.DateTimeField(db_index=True, verbose_name="Fecha")
+    vista = models.CharField(max_length=150, verbose_name="Vista (nombre de URL)")
+    metodo = models.CharField(max_length=10)
+    estado = models.PositiveSmallIntegerField(verbose_name="Código HTTP")
+    duracion_ms = models.FloatField(verbose_name="Duración (ms)")
+    consultas = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0, verbose_name="Tiempo en SQL (ms)")
+    consultas_duplicadas = models.PositiveIntegerField(default=0)
+    # {'top_sql': [[ms, sql], ...], 'duplicadas': [[veces, sql], ...]}
+    detalle = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        verbose_name = "Muestra de rendimiento"
+        verbose_name_plural = "Muestras de rendimiento"
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['vista', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.vista} {self.duracion_ms:.0f} ms ({self.consultas} consultas)"
@@ -308,10 +308,10 @@ def generar_pdf_pagare(credito, codigo=None):
     """
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter
-    from reportlab.lib.enums import TA_JUSTIFY
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Image, PageBreak
+
+    from .pdf_estilos import estilo_parrafo, estilo_tabla, estilos_documento_firma, tabla_etiqueta_valor
 
     if codigo is None:
         codigo = getattr(credito, 'codigo_pagare', None) or f"PG-{timezone.now().year}-{credito.id:06d}"
@@ -322,12 +322,11 @@ def generar_pdf_pagare(credito, codigo=None):
         rightMargin=0.75 * inch, leftMargin=0.75 * inch,
         topMargin=0.6 * inch, bottomMargin=0.6 * inch,
     )
-    styles = getSampleStyleSheet()
-    normal = styles['Normal']
-    small = ParagraphStyle('Small', parent=normal, fontSize=8, spaceAfter=3)
-    small_justified = ParagraphStyle('SmallJustified', parent=small, alignment=TA_JUSTIFY)
-    small_bold = ParagraphStyle('SmallBold', parent=small, fontName='Helvetica-Bold')
-    titulo = ParagraphStyle('Titulo', parent=styles['Heading1'], fontSize=12, spaceAfter=6, alignment=1)
+    estilos = estilos_documento_firma(8, 3)
+    small = estilos['small']
+    small_justified = estilos['small_justified']
+    small_bold = estilos['small_bold']
+    titulo = estilos['titulo']
 
     # Datos comunes
     cliente = credito.cliente
@@ -354,13 +353,13 @@ def generar_pdf_pagare(credito, codigo=None):
         for nom, tipo, num, rol in firmantes:
             data.append([nom, tipo, num, rol])
         t = Table(data, colWidths=[2.2 * inch, 1.2 * inch, 1.2 * inch, 1.2 * inch])
-        t.setStyle(TableStyle([
+        t.setStyle(estilo_tabla(
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, -1), 8),
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e0e0')),
             ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        ))
         return t
 
     def fila_firma_con_foto(nombre_completo, tipo_doc, numero_doc, ruta_foto=None):
@@ -382,7 +381,7 @@ def generar_pdf_pagare(credito, codigo=None):
             'Tipo Documento Persona Representada: N/A'
         )
         t = Table([[img, Paragraph(texto_datos, small)]], colWidths=[1.2 * inch, 3.5 * inch])
-        t.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP'), ('BOX', (0, 0), (-1, -1), 0.5, colors.grey)]))
+        t.setStyle(estilo_tabla(('VALIGN', (0, 0), (-1, -1), 'TOP'), ('BOX', (0, 0), (-1, -1), 0.5, colors.grey)))
         return t
 
     flow = []
@@ -452,7 +451,7 @@ def generar_pdf_pagare(credito, codigo=None):
         flow.append(fila_firma_con_foto(codeudor.nombre_completo, 'CC', codeudor.cedula, getattr(codeudor, 'foto_rostro', None)))
 
     flow.append(Spacer(1, 0.15 * inch))
-    flow.append(Paragraph('&bull; Firmado digitalmente mediante verificación OTP. Documento generado por el sistema.', ParagraphStyle('Disclaimer', parent=small, fontSize=7, alignment=1, textColor=colors.grey)))
+    flow.append(Paragraph('&bull; Firmado digitalmente mediante verificación OTP. Documento generado por el sistema.', estilo_parrafo('Disclaimer', small, fontSize=7, alignment=1, textColor=colors.grey)))
 
     # Página independiente: Anexo documental (cédulas + datos básicos)
     flow.append(PageBreak())
@@ -472,21 +471,22 @@ def generar_pdf_pagare(credito, codigo=None):
 
     def _bloque_anexo_firmante(nombre_rol, persona):
         """Una sección: título, cédula frontal/trasera, resumen de datos."""
-        flow.append(Paragraph(nombre_rol, ParagraphStyle('AnexoSub', parent=small_bold, fontSize=10, spaceAfter=8)))
+        flow.append(Paragraph(nombre_rol, estilo_parrafo('AnexoSub', small_bold, fontSize=10, spaceAfter=8)))
         # Fotos cédula (lado a lado) con leyenda bajo cada una
         img_frente = _imagen_o_placeholder(getattr(persona, 'foto_cedula_frontal', None))
         img_trasera = _imagen_o_placeholder(getattr(persona, 'foto_cedula_trasera', None))
-        cap_frente = Paragraph('Cédula frente', ParagraphStyle('Cap', parent=small, fontSize=7, alignment=1))
-        cap_trasera = Paragraph('Cédula reverso', ParagraphStyle('Cap', parent=small, fontSize=7, alignment=1))
+        estilo_leyenda = estilo_parrafo('Cap', small, fontSize=7, alignment=1)
+        cap_frente = Paragraph('Cédula frente', estilo_leyenda)
+        cap_trasera = Paragraph('Cédula reverso', estilo_leyenda)
         tbl_fotos = Table(
             [[img_frente, img_trasera], [cap_frente, cap_trasera]],
             colWidths=[2 * inch, 2 * inch],
         )
-        tbl_fotos.setStyle(TableStyle([
+        tbl_fotos.setStyle(estilo_tabla(
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('ALIGN', (0, 0), (1, 0), 'CENTER'),
             ('ALIGN', (0, 1), (1, 1), 'CENTER'),
-        ]))
+        ))
         flow.append(tbl_fotos)
         flow.append(Spacer(1, 0.08 * inch))
         # Resumen datos básicos
@@ -501,12 +501,7 @@ def generar_pdf_pagare(credito, codigo=None):
         if getattr(persona, 'barrio', None):
             datos.append(['Barrio', persona.barrio])
         t_datos = Table(datos, colWidths=[1.5 * inch, 4 * inch])
-        t_datos.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        t_datos.setStyle(tabla_etiqueta_valor(8, alineacion_vertical='TOP'))
         flow.append(t_datos)
         flow.append(Spacer(1, 0.25 * inch))
 
@@ -0,0 +1,126 @@
+"""
+Paginación por cursor (keyset) para los listados grandes.
+
+``Paginator`` cuenta todo el conjunto filtrado y pide la página con
+``OFFSET``: cuanto más atrás se navega (historial de pagos), más filas
+recorre la BD para descartarlas. Aquí la página se pide a partir de la
+última fila vista::
+
+    WHERE (fecha_pago, id) < (:fecha, :id) ORDER BY fecha_pago DESC, id DESC LIMIT n + 1
+
+El cursor viaja en ``?cursor=`` como token firmado y opaco (dirección +
+valores de la fila de corte); un token inválido, alterado o más viejo que
+``VIGENCIA_CURSOR`` vuelve a la primera página. ``PaginaKeyset`` imita lo
+que las plantillas usan de un ``Page`` (iterar, ``len``, índice,
+``has_next``/``has_previous``), así que ``includes/pagination.html`` sirve
+para ambos.
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PARAMETRO_CURSOR = 'cursor'
+# Un enlace viejo (marcador, historial) no debe dejar al usuario a mitad de un listado que ya cambió
+VIGENCIA_CURSOR = 60 * 60 * 24
+_SAL = 'main.paginacion'
+
+
+class PaginaKeyset:
+    """Una página obtenida por cursor."""
+
+    es_keyset = True
+
+    def __init__(self, filas, token_anterior, token_siguiente, total=None):
+        self.object_list = filas
+        self.token_anterior = token_anterior
+        self.token_siguiente = token_siguiente
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, indice):
+        return self.object_list[indice]
+
+    def has_next(self):
+        return self.token_siguiente is not None
+
+    def has_previous(self):
+        return self.token_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _orden(campos):
+    """('-fecha_pago', '-id') -> [('fecha_pago', True), ('id', True)] (nombre, descendente)."""
+    return [(c.lstrip('-'), c.startswith('-')) for c in campos]
+
+
+def _codificar(direccion, fila, orden):
+    valores = [getattr(fila, nombre) for nombre, _ in orden]
+    return signing.dumps([direccion, [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores]],
+                         salt=_SAL, compress=True)
+
+
+def _decodificar(token, modelo, orden):
+    """(direccion, valores) del token, o None si no es válido para este listado."""
+    try:
+        direccion, crudos = signing.loads(token, salt=_SAL, max_age=VIGENCIA_CURSOR)
+        if direccion not in ('sig', 'ant') or len(crudos) != len(orden):
+            return None
+        valores = [modelo._meta.get_field(nombre).to_python(v) for (nombre, _), v in zip(orden, crudos)]
+    except (signing.BadSignature, ValidationError, ValueError, TypeError):
+        return None
+    return direccion, valores
+
+
+def _despues_de(orden, valores, hacia_atras):
+    """Filas estrictamente posteriores (o anteriores) a ``valores`` en el orden dado."""
+    condicion = Q()
+    prefijo = {}
+    for (nombre, descendente), valor in zip(orden, valores):
+        operador = 'gt' if descendente == hacia_atras else 'lt'
+        condicion |= Q(**prefijo, **{f'{nombre}__{operador}': valor})
+        prefijo[nombre] = valor
+    return condicion
+
+
+def paginar_keyset(queryset, token, por_pagina, campos, total=None):
+    """
+    Página de ``queryset`` ordenada por ``campos`` (el último debe ser único,
+    normalmente ``'-id'``) a partir de ``token`` (``None``/vacío = primera página).
+    ``total`` es opcional y solo se muestra en la plantilla.
+    """
+    orden = _orden(campos)
+    cursor = _decodificar(token, queryset.model, orden) if token else None
+    hacia_atras = cursor is not None and cursor[0] == 'ant'
+
+    if hacia_atras:
+        invertido = [f'-{n}' if not d else n for n, d in orden]
+        qs = queryset.filter(_despues_de(orden, cursor[1], True)).order_by(*invertido)
+    else:
+        qs = queryset.order_by(*campos)
+        if cursor is not None:
+            qs = qs.filter(_despues_de(orden, cursor[1], False))
+
+    filas = list(qs[:por_pagina + 1])
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if hacia_atras:
+        filas.reverse()
+
+    if not filas:
+        return PaginaKeyset(filas, None, None, total)
+    # Hacia adelante, "hay más" habla de la página siguiente; hacia atrás, de la anterior
+    hay_siguiente = hay_mas if not hacia_atras else True
+    hay_anterior = cursor is not None if not hacia_atras else hay_mas
+    return PaginaKeyset(
+        filas,
+        _codificar('ant', filas[0], orden) if hay_anterior else None,
+        _codificar('sig', filas[-1], orden) if hay_siguiente else None,
+        total,
+    )
@@ -0,0 +1,651 @@
+"""
+Vistas de pagos: listado, registro, confirmación, detalle y recibo en PDF.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.db.models import Q
+from django.utils import timezone
+from django.http import JsonResponse, HttpResponse
+from .models import Cliente, Credito, Pago, CronogramaPago, UMBRAL_SALDO_CERRADO
+from .forms import PagoForm
+from .busqueda import buscar
+from .paginacion import PARAMETRO_CURSOR, paginar_keyset
+from datetime import datetime, timedelta
+from io import BytesIO
+from .views import (
+    _aplicar_pago_a_cuota_si_corresponde,
+    _forbidden_operacion,
+    _resumen_soporte_pago,
+    _usuario_admin_operativo,
+    _usuario_puede_ver_pago,
+)
+
+
+@login_required
+def pagos(request):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.db.models import Count, Q, Sum
+    from datetime import date, datetime, timedelta
+    from django.utils import timezone
+    
+    pagos_list = Pago.objects.select_related('credito__cliente').order_by('-fecha_pago')
+    
+    # Estadísticas del encabezado en una sola consulta (conteos y sumas condicionales)
+    hoy = timezone.now().date()
+    hace_30_dias = timezone.now() - timedelta(days=30)
+    stats = pagos_list.aggregate(
+        total_pagos=Count('id'),
+        pagos_hoy=Count('id', filter=Q(fecha_pago__date=hoy)),
+        recaudado_hoy=Sum('monto', filter=Q(fecha_pago__date=hoy)),
+        promedio_mensual=Sum('monto', filter=Q(fecha_pago__gte=hace_30_dias)),
+        total_recaudado=Sum('monto'),
+    )
+    total_pagos = stats['total_pagos']
+    pagos_hoy = stats['pagos_hoy']
+    recaudado_hoy = stats['recaudado_hoy'] or 0
+    promedio_mensual = stats['promedio_mensual'] or 0
+    total_recaudado = stats['total_recaudado'] or 0
+    
+    # Promedio por pago
+    promedio_pago = total_recaudado / total_pagos if total_pagos > 0 else 0
+    
+    # Paginación configurable: por cursor sobre (fecha_pago, id), así las páginas
+    # profundas del historial cuestan lo mismo que la primera
+    per_page_str = request.GET.get('per_page', '10').strip()
+    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
+    pagos = paginar_keyset(
+        pagos_list, request.GET.get(PARAMETRO_CURSOR), per_page,
+        ('-fecha_pago', '-id'), total=total_pagos,
+    )
+    
+    context = {
+        'pagos': pagos,
+        'total_pagos': total_pagos,
+        'pagos_hoy': pagos_hoy,
+        'recaudado_hoy': recaudado_hoy,
+        'promedio_mensual': promedio_mensual,
+        'total_recaudado': total_recaudado,
+        'promedio_pago': promedio_pago,
+        'per_page': per_page,
+    }
+    
+    return render(request, 'pagos.html', context)
+
+
+@login_required
+def exportar_pagos_excel(request):
+    """Exporta pagos con filtros opcionales por fecha exacta y texto de búsqueda."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+
+    import io
+    import pandas as pd
+
+    pagos_qs = Pago.objects.select_related('credito__cliente', 'credito__cobrador').order_by('-fecha_pago')
+
+    fecha = request.GET.get('fecha', '').strip()
+    if fecha:
+        try:
+            fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
+            pagos_qs = pagos_qs.filter(fecha_pago__date=fecha_obj)
+        except ValueError:
+            pass
+
+    q = request.GET.get('q', '').strip()
+    if q:
+        extra = Q(observaciones__icontains=q)
+        if q.isdigit():
+            extra = extra | Q(credito__id=int(q))
+        pagos_qs = buscar(pagos_qs, q, 'credito__cliente', extra=extra)
+
+    rows = []
+    for pago in pagos_qs:
+        rows.append({
+            'ID pago': pago.id,
+            'Fecha pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M') if pago.fecha_pago else '',
+            'Cliente': pago.credito.cliente.nombre_completo,
+            'Cédula': pago.credito.cliente.cedula,
+            'Crédito ID': pago.credito_id,
+            'Estado crédito': pago.credito.get_estado_display(),
+            'Cobrador': pago.credito.cobrador.nombre_completo if pago.credito.cobrador else 'Sin asignar',
+            'Cuota #': pago.numero_cuota,
+            'Monto': float(pago.monto),
+            'Observaciones': pago.observaciones or '',
+        })
+
+    df = pd.DataFrame(rows)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Pagos', index=False)
+    output.seek(0)
+
+    stamp = timezone.now().strftime('%Y%m%d_%H%M')
+    response = HttpResponse(
+        output.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+    response['Content-Disposition'] = f'attachment; filename="pagos_{stamp}.xlsx"'
+    return response
+
+# CRUD Pagos
+@login_required
+def nuevo_pago(request):
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    if request.method == 'POST':
+        form = PagoForm(request.POST)
+        
+        # Actualizar queryset del crédito: solo los que pueden recibir pagos (con saldo pendiente)
+        cedula_cliente = request.POST.get('cedula_cliente')
+        if cedula_cliente:
+            try:
+                cliente = Cliente.objects.get(cedula=cedula_cliente, activo=True)
+                # Sin anotaciones en las instancias: tras guardar el pago el saldo se recalcula
+                con_saldo = Credito.objects.filter(cliente=cliente).que_pueden_recibir_pagos()
+                form.fields['credito'].queryset = Credito.objects.filter(pk__in=con_saldo.values('pk'))
+            except Cliente.DoesNotExist:
+                pass
+        
+        if form.is_valid():
+            credito = form.cleaned_data['credito']
+            monto_pago = form.cleaned_data['monto']
+            numero_cuota = form.cleaned_data.get('numero_cuota')
+            monto_total_credito = credito.monto_total or credito.monto
+            total_ya_pagado = credito.total_pagado()
+            if total_ya_pagado + monto_pago > monto_total_credito:
+                form.add_error(
+                    'monto',
+                    f'El monto (${monto_pago:,.0f}) supera el saldo pendiente del crédito. '
+                    f'Saldo pendiente: ${monto_total_credito - total_ya_pagado:,.0f}.'
+                )
+            if numero_cuota:
+                cuota_obj = CronogramaPago.objects.filter(
+                    credito=credito,
+                    numero_cuota=numero_cuota
+                ).first()
+                if not cuota_obj:
+                    form.add_error('numero_cuota', f'La cuota #{numero_cuota} no existe para este crédito.')
+                elif cuota_obj.estado in ['PAGADA', 'PAGADO']:
+                    form.add_error('numero_cuota', f'La cuota #{numero_cuota} ya está pagada.')
+                elif monto_pago > cuota_obj.saldo_pendiente():
+                    form.add_error(
+                        'monto',
+                        f'El monto supera el saldo pendiente de la cuota #{numero_cuota}. '
+                        f'Saldo de la cuota: ${cuota_obj.saldo_pendiente():,.0f}.'
+                    )
+            if not form.errors:
+                pago = form.save()
+                credito = pago.credito
+                _aplicar_pago_a_cuota_si_corresponde(pago)
+                
+                # Actualizar estado del crédito si está completamente pagado
+                if credito.esta_al_dia():
+                    credito.estado = 'PAGADO'
+                    credito.save()
+                    messages.success(
+                        request, 
+                        f'Pago #{pago.id} registrado exitosamente. '
+                        f'¡El crédito #{credito.id} de {credito.cliente.nombre_completo} está completamente pagado!'
+                    )
+                else:
+                    saldo = credito.saldo_pendiente()
+                    messages.success(
+                        request, 
+                        f'Pago #{pago.id} registrado exitosamente. '
+                        f'Saldo pendiente: ${saldo}'
+                    )
+                messages.success(
+                    request,
+                    f'¡Pago registrado exitosamente! Puede descargar o enviar el recibo al cliente.'
+                )
+                # Enviar comprobante por correo si el cliente tiene email
+                email_cliente = (credito.cliente.email or '').strip()
+                if email_cliente:
+                    try:
+                        from django.core.mail import EmailMessage
+                        from django.conf import settings
+                        pdf_buffer = _recibo_pdf_cacheado(pago)
+                        nombre_pdf = f'recibo_pago_{pago.id:05d}.pdf'
+                        asunto = f'Comprobante de pago #{pago.id:05d} - Crédito #{credito.id}'
+                        soporte_pago = _resumen_soporte_pago(pago)
+                        saldo_cuota_txt = (
+                            f"${soporte_pago['saldo_cuota']:,.0f}"
+                            if soporte_pago['saldo_cuota'] is not None else 'N/A'
+                        )
+                        if soporte_pago['proxima_cuota']:
+                            siguiente_txt = (
+                                f"Cuota #{soporte_pago['proxima_cuota'].numero_cuota} "
+                                f"por ${soporte_pago['proxima_cuota'].saldo_pendiente():,.0f}"
+                            )
+                        else:
+                            siguiente_txt = 'Sin cuotas pendientes'
+                        cuerpo = (
+                            f'Hola {credito.cliente.nombre_completo},\n\n'
+                            f'Adjunto encontrará el comprobante de su pago por ${pago.monto:,.0f} '
+                            f'(cuota #{pago.numero_cuota}, crédito #{credito.id}).\n\n'
+                            f'Tipo de aplicación: {soporte_pago["tipo_pago"]}\n'
+                            f'Saldo pendiente de esa cuota: {saldo_cuota_txt}\n'
+                            f'Siguiente obligación sugerida: {siguiente_txt}\n'
+                            f'Saldo pendiente del crédito: ${credito.saldo_pendiente():,.0f}\n\n'
+                            f'Conserve este recibo para sus registros.\n\n'
+                            f'Atentamente,\nSistema de Créditos'
+                        )
+                        email = EmailMessage(
+                            asunto,
+                            cuerpo,
+                            getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
+                            [email_cliente],
+                        )
+                        email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
+                        email.send(fail_silently=True)
+                        messages.success(request, f'Se envió el comprobante por correo a {email_cliente}.')
+                    except Exception:
+                        messages.warning(request, 'No se pudo enviar el comprobante por correo; puede descargar el PDF en la confirmación.')
+                else:
+                    messages.info(request, 'El cliente no tiene correo registrado; descargue el recibo y entréguelo en mano.')
+                return redirect('confirmacion_pago', pago_id=pago.id)
+        else:
+            # Si hay errores, mostrarlos como mensajes
+            for error in form.non_field_errors():
+                messages.error(request, error)
+            
+            # Mostrar errores de campo específicos
+            for field, errors in form.errors.items():
+                if field == '__all__':
+                    for error in errors:
+                        messages.error(request, error)
+                else:
+                    field_label = form.fields.get(field, None)
+                    if field_label and hasattr(field_label, 'label'):
+                        label = field_label.label or field
+                    else:
+                        label = field
+                    for error in errors:
+                        messages.error(request, f'{label}: {error}')
+    else:
+        form = PagoForm()
+    
+    # Los créditos del cliente se cargan con buscar_creditos_cliente al digitar la cédula;
+    # aquí solo se verifica (con EXISTS) que haya alguno que pueda recibir pagos
+    hay_creditos_disponibles = Credito.objects.que_pueden_recibir_pagos().exists()
+    
+    return render(request, 'nuevo_pago.html', {
+        'form': form,
+        'hay_creditos_disponibles': hay_creditos_disponibles,
+    })
+
+# Vista de confirmación de pago
+@login_required
+def confirmacion_pago(request, pago_id):
+    """Vista para mostrar confirmación de pago con opciones de descarga/envío"""
+    pago = get_object_or_404(Pago, id=pago_id)
+    if not _usuario_puede_ver_pago(request.user, pago):
+        return _forbidden_operacion(request)
+    # Saldos anotados: la plantilla los muestra varias veces
+    credito = Credito.objects.select_related('cliente').with_saldos().get(pk=pago.credito_id)
+    cliente = credito.cliente
+    
+    # Calcular información adicional de forma más robusta
+    try:
+        # Intentar usar cronograma si existe
+        if hasattr(credito, 'cronograma') and credito.cronograma.exists():
+            cuotas_pagadas = credito.cronograma.filter(estado__in=['PAGADO', 'PAGADA']).count()
+        else:
+            # Calcular basado en pagos y valor de cuota
+            total_pagado = credito.total_pagado()
+            valor_cuota = credito.valor_cuota if credito.valor_cuota > 0 else 1
+            cuotas_pagadas = int(total_pagado / valor_cuota)
+            
+        total_cuotas = credito.cantidad_cuotas if credito.cantidad_cuotas else 1
+        progreso_pago = (cuotas_pagadas / total_cuotas) * 100 if total_cuotas > 0 else 0
+        progreso_pago = min(100, max(0, progreso_pago))  # Limitar entre 0 y 100
+        
+    except Exception:
+        cuotas_pagadas = 0
+        total_cuotas = credito.cantidad_cuotas if credito.cantidad_cuotas else 1
+        progreso_pago = 0
+    
+    # Calcular próxima fecha de pago (estimada)
+    proxima_fecha_pago = None
+    if cuotas_pagadas < total_cuotas:
+        from datetime import timedelta
+        if credito.tipo_plazo == 'DIARIO':
+            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(days=1)
+        elif credito.tipo_plazo == 'SEMANAL':
+            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(weeks=1)
+        elif credito.tipo_plazo == 'QUINCENAL':
+            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(days=15)
+        elif credito.tipo_plazo == 'MENSUAL':
+            fecha_pago = pago.fecha_pago.date()
+            mes = fecha_pago.month + 1
+            año = fecha_pago.year
+            if mes > 12:
+                mes = 1
+                año += 1
+            try:
+                proxima_fecha_pago = fecha_pago.replace(year=año, month=mes)
+            except ValueError:
+                # Manejar casos como 31 de marzo -> 30 de abril
+                from calendar import monthrange
+                ultimo_dia = monthrange(año, mes)[1]
+                proxima_fecha_pago = fecha_pago.replace(year=año, month=mes, day=min(fecha_pago.day, ultimo_dia))
+    
+    # Parámetros desde agenda (Registrar cobro): mostrar si se envió correo o si no hay email
+    email_enviado_param = request.GET.get('email_enviado') == '1'
+    sin_email_param = request.GET.get('sin_email') == '1'
+    url_recibo_pdf = request.build_absolute_uri(reverse('generar_recibo_pdf', args=[pago.id]))
+    agenda_cobrador_url = None
+    if credito.cobrador_id:
+        fecha_agenda = pago.fecha_pago.date().strftime('%Y-%m-%d')
+        agenda_cobrador_url = reverse('agenda_cobrador_especifico', args=[credito.cobrador_id]) + f'?fecha={fecha_agenda}'
+    
+    context = {
+        'pago': pago,
+        'credito': credito,
+        'cliente': cliente,
+        'cuotas_pagadas': cuotas_pagadas,
+        'total_cuotas': total_cuotas,
+        'progreso_pago': progreso_pago,
+        'proxima_fecha_pago': proxima_fecha_pago,
+        'credito_completado': credito.estado == 'PAGADO',
+        'email_enviado_param': email_enviado_param,
+        'sin_email_param': sin_email_param,
+        'url_recibo_pdf': url_recibo_pdf,
+        'agenda_cobrador_url': agenda_cobrador_url,
+    }
+    
+    return render(request, 'confirmacion_pago.html', context)
+
+
+# Vistas adicionales para gestión de pagos
+@login_required
+def detalle_pago(request, pago_id):
+    """Vista AJAX para obtener detalles de un pago"""
+    try:
+        pago = get_object_or_404(Pago, id=pago_id)
+        if not _usuario_puede_ver_pago(request.user, pago):
+            return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este pago.'}, status=403)
+        
+        return JsonResponse({
+            'success': True,
+            'pago': {
+                'id': pago.id,
+                'monto': float(pago.monto),
+                'numero_cuota': pago.numero_cuota,
+                'fecha_pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M'),
+                'observaciones': pago.observaciones or 'Sin observaciones',
+                'credito': {
+                    'id': pago.credito.id,
+                    'monto_total': float(pago.credito.monto_total),
+                    'cliente': {
+                        'nombre_completo': pago.credito.cliente.nombre_completo,
+                        'cedula': pago.credito.cliente.cedula,
+                        'celular': pago.credito.cliente.celular,
+                        'direccion': pago.credito.cliente.direccion,
+                    }
+                }
+            }
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+def _generar_recibo_pdf_bytes(pago):
+    """Genera el PDF del recibo de pago en memoria. Retorna BytesIO."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    from reportlab.lib.units import inch
+    from .pdf_estilos import estilo_parrafo, tabla_encabezado, tabla_info_destacada
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=A4,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        rightMargin=0.5*inch
+    )
+    
+    # Estilos (cacheados entre documentos: el recibo está en el flujo de cobro)
+    title_style = estilo_parrafo(
+        'CustomTitle', 'Heading1', fontSize=16, spaceAfter=15, alignment=1, textColor=colors.darkblue
+    )
+    subtitle_style = estilo_parrafo('CustomSubtitle', 'Heading2', fontSize=12, spaceAfter=10, textColor=colors.darkblue)
+    normal_style = estilo_parrafo('CustomNormal', fontSize=9, spaceAfter=4)
+    
+    # Contenido del PDF
+    story = []
+    
+    # Título principal
+    story.append(Paragraph("RECIBO DE PAGO - SISTEMA DE CRÉDITOS", title_style))
+    story.append(Spacer(1, 10))
+    
+    # Información del recibo
+    info_recibo = [
+        ["N° Recibo:", f"#{pago.id:05d}", "Fecha:", pago.fecha_pago.strftime('%d/%m/%Y %H:%M')],
+        ["Cliente:", pago.credito.cliente.nombre_completo, "Cédula:", pago.credito.cliente.cedula],
+        ["Crédito N°:", f"#{pago.credito.id:04d}", "Cuota N°:", f"{pago.numero_cuota}"],
+    ]
+    
+    info_table = Table(info_recibo, colWidths=[1.2*inch, 2*inch, 1.2*inch, 1.8*inch])
+    info_table.setStyle(tabla_info_destacada(9))
+    
+    story.append(info_table)
+    story.append(Spacer(1, 20))
+    
+    soporte = _resumen_soporte_pago(pago)
+    saldo_cuota = soporte['saldo_cuota']
+    tipo_pago = soporte['tipo_pago']
+    proxima_cuota = soporte['proxima_cuota']
+
+    # Detalle del pago
+    story.append(Paragraph("DETALLE DEL PAGO", subtitle_style))
+    
+    detalle_pago = [
+        ["Concepto", "Monto"],
+        [f"Cuota #{pago.numero_cuota} del Crédito #{pago.credito.id:04d}", f"${pago.monto:,.0f}"],
+        ["Tipo de aplicación", tipo_pago],
+        ["", ""],
+        ["TOTAL PAGADO", f"${pago.monto:,.0f}"]
+    ]
+    
+    # Calcular información del crédito
+    cuotas_pagadas = pago.credito.cronograma.filter(estado__in=['PAGADO', 'PAGADA']).count()
+    progreso = (cuotas_pagadas / pago.credito.cantidad_cuotas) * 100
+    
+    detalle_table = Table(detalle_pago, colWidths=[4*inch, 2*inch])
+    detalle_table.setStyle(tabla_encabezado(10, cebra=False, fila_total=True))
+    
+    story.append(detalle_table)
+    story.append(Spacer(1, 15))
+    
+    # Estado del crédito
+    story.append(Paragraph("ESTADO DEL CRÉDITO", subtitle_style))
+    
+    estado_credito = [
+        ["Descripción", "Valor"],
+        ["Monto Total del Crédito", f"${pago.credito.monto_total:,.0f}"],
+        ["Total Pagado hasta la fecha", f"${pago.credito.total_pagado():,.0f}"],
+        ["Saldo Pendiente", f"${pago.credito.saldo_pendiente():,.0f}"],
+        ["Saldo de la cuota actual", f"${saldo_cuota:,.0f}" if saldo_cuota is not None else "N/A"],
+        ["Cuotas Pagadas", f"{cuotas_pagadas} de {pago.credito.cantidad_cuotas}"],
+        ["Progreso del Pago", f"{progreso:.1f}%"],
+        ["Modalidad de Pago", pago.credito.get_tipo_plazo_display()],
+        ["Valor por Cuota", f"${pago.credito.valor_cuota:,.0f}"]
+    ]
+    
+    estado_table = Table(estado_credito, colWidths=[3*inch, 2.5*inch])
+    estado_table.setStyle(tabla_encabezado(10))
+    
+    story.append(estado_table)
+    story.append(Spacer(1, 15))
+    
+    # Próximo pago (si no está completo)
+    if pago.credito.estado != 'PAGADO' and proxima_cuota:
+        # Calcular próxima fecha estimada según modalidad del crédito
+        if pago.credito.tipo_plazo == 'DIARIO':
+            proxima_fecha = pago.fecha_pago.date() + timedelta(days=1)
+        elif pago.credito.tipo_plazo == 'SEMANAL':
+            proxima_fecha = pago.fecha_pago.date() + timedelta(weeks=1)
+        elif pago.credito.tipo_plazo == 'QUINCENAL':
+            proxima_fecha = pago.fecha_pago.date() + timedelta(days=15)
+        else:  # MENSUAL
+            fecha_pago = pago.fecha_pago.date()
+            mes = fecha_pago.month + 1
+            año = fecha_pago.year
+            if mes > 12:
+                mes = 1
+                año += 1
+            try:
+                proxima_fecha = fecha_pago.replace(year=año, month=mes)
+            except ValueError:
+                from calendar import monthrange
+                ultimo_dia = monthrange(año, mes)[1]
+                proxima_fecha = fecha_pago.replace(year=año, month=mes, day=min(fecha_pago.day, ultimo_dia))
+        
+        story.append(Paragraph("PRÓXIMO PAGO", subtitle_style))
+        proximo_texto = (
+            f"<b>Cuota #{proxima_cuota.numero_cuota}:</b> ${proxima_cuota.saldo_pendiente():,.0f}<br/>"
+            f"<b>Fecha Estimada:</b> {proxima_fecha.strftime('%d/%m/%Y')}<br/>"
+            f"<b>Modalidad:</b> {pago.credito.get_tipo_plazo_display()}"
+        )
+        story.append(Paragraph(proximo_texto, normal_style))
+        story.append(Spacer(1, 15))
+    
+    # Observaciones
+    if pago.observaciones:
+        story.append(Paragraph("OBSERVACIONES", subtitle_style))
+        story.append(Paragraph(pago.observaciones, normal_style))
+        story.append(Spacer(1, 15))
+    
+    # Información de contacto y nota
+    contacto_texto = (
+        "<b>CONTACTO:</b> Tel: +57 (XXX) XXX-XXXX | Email: creditos@sistemafinanciero.com<br/>"
+        "<b>NOTA:</b> Conserve este recibo como comprobante de pago. "
+        f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    )
+    
+    story.append(Paragraph(contacto_texto, normal_style))
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def _recibo_pdf_cacheado(pago):
+    """Recibo en BytesIO desde la caché de PDF (lo deja listo para la descarga posterior)."""
+    from .pdf_cache import contenido_pdf, version_recibo
+    return contenido_pdf(
+        pago.credito_id, f'recibo_{pago.id}', version_recibo(pago), lambda: _generar_recibo_pdf_bytes(pago),
+    )
+
+
+@login_required
+def generar_recibo_pdf(request, pago_id):
+    """Genera y descarga PDF del recibo de pago."""
+    from .pdf_cache import respuesta_pdf, version_recibo
+    pago = get_object_or_404(Pago.objects.select_related('credito__cliente', 'cuota'), id=pago_id)
+    if not _usuario_puede_ver_pago(request.user, pago):
+        return _forbidden_operacion(request)
+    try:
+        return respuesta_pdf(
+            request, pago.credito_id, f'recibo_{pago.id}', version_recibo(pago),
+            lambda: _generar_recibo_pdf_bytes(pago),
+            f'recibo_pago_{pago.id:05d}.pdf',
+        )
+    except Exception:
+        return HttpResponse('Error al generar el recibo.', status=500)
+
+
+# Vista AJAX para buscar créditos de un cliente en formulario de pago
+@login_required
+def buscar_creditos_cliente(request):
+    """Vista AJAX para buscar créditos de un cliente por cédula. Solo devuelve créditos con saldo pendiente > 0."""
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
+    cedula = request.GET.get('cedula', '').strip()
+    
+    if not cedula:
+        return JsonResponse({
+            'success': False,
+            'error': 'Debe proporcionar una cédula'
+        })
+    
+    try:
+        cliente = Cliente.objects.get(cedula=cedula, activo=True)
+        
+        # Créditos vigentes con saldo "real" (>= 1 peso), en una sola consulta anotada.
+        # Los saldos por redondeo no se muestran; el comando cerrar_creditos_saldados los pasa a PAGADO.
+        creditos = list(
+            Credito.objects.filter(
+                cliente=cliente,
+                estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
+            ).with_saldos().with_proxima_cuota().filter(
+                saldo_pendiente_anotado__gte=UMBRAL_SALDO_CERRADO
+            ).order_by('id')
+        )
+        
+        if not creditos:
+            return JsonResponse({
+                'success': False,
+                'error': f'El cliente {cliente.nombre_completo} no tiene créditos con saldo pendiente para registrar pagos'
+            })
+        
+        # Preparar URL de la foto (si existe)
+        foto_url = None
+        if cliente.foto_rostro:
+            try:
+                foto_url = cliente.foto_rostro.url
+            except ValueError:
+                foto_url = None
+        
+        # Preparar lista de créditos (solo los que pueden recibir pagos)
+        creditos_data = []
+        for credito in creditos:
+            saldo = credito.saldo_pendiente_anotado
+            if credito.proxima_cuota_numero is not None:
+                numero_cuota_sugerida = credito.proxima_cuota_numero
+                monto_sugerido = credito.proxima_cuota_saldo
+            else:
+                numero_cuota_sugerida = 1
+                monto_sugerido = credito.valor_cuota if credito.valor_cuota else saldo
+            creditos_data.append({
+                'id': credito.id,
+                'monto_total': float(credito.monto_total),
+                'saldo_pendiente': float(saldo),
+                'total_pagado': float(credito.total_pagado_anotado),
+                'estado': credito.get_estado_display(),
+                'fecha_desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else 'N/A',
+                'tipo_plazo': credito.get_tipo_plazo_display(),
+                'cantidad_cuotas': credito.cantidad_cuotas,
+                'valor_cuota': float(credito.valor_cuota),
+                'cuotas_pagadas': credito.cuotas_pagadas_anotado,
+                'numero_cuota_sugerida': numero_cuota_sugerida,
+                'monto_sugerido': float(monto_sugerido),
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'cliente': {
+                'id': cliente.id,
+                'nombre_completo': cliente.nombre_completo,
+                'cedula': cliente.cedula,
+                'celular': cliente.celular,
+                'direccion': cliente.direccion,
+                'foto_url': foto_url
+            },
+            'creditos': creditos_data
+        })
+        
+    except Cliente.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
+        })
@@ -0,0 +1,160 @@
+"""
+Caché en disco de los PDF de recibos y cronogramas.
+
+Cada PDF se guarda en ``MEDIA_ROOT/pdf_cache/credito_<id>/<documento>_<version>.pdf``,
+donde ``version`` es un hash de los datos que se imprimen (pago, crédito,
+cliente y estado de las cuotas). Si algo cambia la versión cambia y el PDF se
+regenera; mientras tanto una descarga repetida es solo una lectura de archivo,
+y el navegador puede revalidar con ``If-None-Match`` sin recibir el cuerpo.
+
+Las señales de ``main.signals`` borran la carpeta del crédito cuando se
+confirma un cambio de sus pagos, cuotas o del propio crédito, para no acumular
+versiones viejas.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+DIRECTORIO_CACHE = 'pdf_cache'
+
+
+def _directorio_credito(credito_id):
+    return os.path.join(settings.MEDIA_ROOT, DIRECTORIO_CACHE, f'credito_{credito_id}')
+
+
+def _normalizar(valor):
+    # Decimal('40000') recién asignado y Decimal('40000.00') leído de la BD deben dar el mismo hash
+    if isinstance(valor, Decimal):
+        return valor.normalize()
+    if isinstance(valor, (tuple, list)):
+        return tuple(_normalizar(v) for v in valor)
+    return valor
+
+
+def _hash(*partes):
+    return hashlib.sha256(repr(_normalizar(partes)).encode('utf-8')).hexdigest()[:20]
+
+
+def _datos_credito(credito):
+    cliente = credito.cliente
+    return (
+        credito.id, credito.estado, credito.monto, credito.monto_total, credito.cantidad_cuotas,
+        credito.valor_cuota, credito.tipo_plazo, credito.fecha_solicitud,
+        cliente.nombre_completo, cliente.cedula, cliente.celular,
+    )
+
+
+def _datos_cuotas(credito):
+    return tuple(
+        credito.cronograma.order_by('numero_cuota').values_list(
+            'numero_cuota', 'fecha_vencimiento', 'monto_cuota', 'monto_pagado', 'estado'
+        )
+    )
+
+
+def version_recibo(pago):
+    """Versión del recibo: el pago, el crédito, sus cuotas y el total pagado a la fecha."""
+    credito = pago.credito
+    pagos = credito.pago_set.aggregate(total=Sum('monto'), cantidad=Count('id'))
+    return _hash(
+        'recibo', pago.id, pago.monto, pago.fecha_pago, pago.numero_cuota, pago.cuota_id, pago.observaciones,
+        _datos_credito(credito), _datos_cuotas(credito), pagos['total'], pagos['cantidad'],
+    )
+
+
+def version_cronograma(credito):
+    """Versión del resumen + cronograma: datos del crédito, cliente y cuotas."""
+    return _hash('cronograma', _datos_credito(credito), _datos_cuotas(credito))
+
+
+def _guardar(directorio, ruta, documento, contenido):
+    os.makedirs(directorio, exist_ok=True)
+    # Escritura atómica: otro worker nunca lee un PDF a medio escribir
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+    prefijo = f'{documento}_'
+    for nombre in os.listdir(directorio):
+        if nombre.startswith(prefijo) and nombre != os.path.basename(ruta) and nombre.endswith('.pdf'):
+            try:
+                os.remove(os.path.join(directorio, nombre))
+            except OSError:
+                pass
+
+
+def abrir_pdf(credito_id, documento, version, generar):
+    """
+    Archivo binario abierto del PDF ``documento`` en la versión indicada (quien
+    lo recibe lo cierra), generándolo con ``generar()`` (que retorna un
+    BytesIO) si aún no está en disco. Al escribir una versión nueva se borran
+    las anteriores del mismo documento.
+
+    Se abre aquí y no se retorna la ruta: ``invalidar_credito`` de otro worker
+    puede borrar la carpeta en cualquier momento, y un archivo ya abierto se
+    sigue leyendo aunque lo borren. Si el borrado llega antes de abrirlo, se
+    responde con lo recién generado en memoria.
+    """
+    directorio = _directorio_credito(credito_id)
+    ruta = os.path.join(directorio, f'{documento}_{version}.pdf')
+    try:
+        return open(ruta, 'rb')
+    except FileNotFoundError:
+        pass
+
+    buffer = generar()
+    try:
+        _guardar(directorio, ruta, documento, buffer.getvalue())
+        return open(ruta, 'rb')
+    except FileNotFoundError:
+        buffer.seek(0)
+        return buffer
+
+
+def contenido_pdf(credito_id, documento, version, generar):
+    """Como ``abrir_pdf`` pero retorna un BytesIO (para adjuntar en correos)."""
+    with abrir_pdf(credito_id, documento, version, generar) as f:
+        return BytesIO(f.read())
+
+
+def respuesta_pdf(request, credito_id, documento, version, generar, nombre_archivo):
+    """
+    ``FileResponse`` del PDF cacheado con ``ETag``. Si el cliente ya tiene esa
+    versión (``If-None-Match``) responde 304 sin tocar el disco ni generar nada.
+    """
+    etag = f'"{documento}-{version}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        respuesta = HttpResponseNotModified()
+    else:
+        respuesta = FileResponse(
+            abrir_pdf(credito_id, documento, version, generar),
+            as_attachment=True, filename=nombre_archivo, content_type='application/pdf',
+        )
+    respuesta['ETag'] = etag
+    # El PDF cambia cuando cambian los pagos: el navegador debe revalidar siempre
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def invalidar_credito(credito_id):
+    """Elimina todos los PDF cacheados de un crédito."""
+    directorio = _directorio_credito(credito_id)
+    if os.path.isdir(directorio):
+        shutil.rmtree(directorio, ignore_errors=True)
@@ -0,0 +1,145 @@
+"""
+Estilos compartidos para los PDF generados con ReportLab.
+
+``getSampleStyleSheet()`` construye la hoja de estilos completa en cada llamada
+y cada generador armaba además sus ``ParagraphStyle``/``TableStyle`` por
+documento. Aquí se construyen una sola vez por proceso (``lru_cache``) y se
+reutilizan: ReportLab solo lee estos objetos al maquetar, así que compartirlos
+entre documentos (e hilos) es seguro mientras nadie los modifique.
+
+Las fuentes usadas son las estándar de PDF (Helvetica); ReportLab ya las
+registra y cachea en ``pdfmetrics``, por eso no hay registro de fuentes propio.
+"""
+from functools import lru_cache
+
+FUENTE = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+
+
+@lru_cache(maxsize=None)
+def hoja_estilos():
+    """Hoja de estilos base de ReportLab (Normal, Heading1, Heading2...)."""
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def estilo_parrafo(nombre, padre='Normal', **atributos):
+    """
+    ``ParagraphStyle`` cacheado por nombre, padre y atributos.
+
+    ``padre`` puede ser el nombre de un estilo de la hoja base o otro estilo
+    obtenido con esta misma función. Los atributos deben ser hashables
+    (números, cadenas, colores de ``reportlab.lib.colors``).
+    """
+    from reportlab.lib.styles import ParagraphStyle
+    if isinstance(padre, str):
+        padre = hoja_estilos()[padre]
+    return ParagraphStyle(nombre, parent=padre, **atributos)
+
+
+@lru_cache(maxsize=None)
+def estilo_tabla(*comandos):
+    """``TableStyle`` cacheado. Los comandos van como tuplas (listas internas como tuplas)."""
+    from reportlab.platypus import TableStyle
+    return TableStyle(list(comandos))
+
+
+# ---------------------------------------------------------------------------
+# Plantillas de tabla reutilizadas por varios documentos
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def tabla_info_destacada(tamano_fuente):
+    """Grilla de datos en 4 columnas con las etiquetas (columnas 0 y 2) en azul oscuro."""
+    from reportlab.lib import colors
+    return estilo_tabla(
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), FUENTE_NEGRITA),
+        ('FONTNAME', (1, 0), (-1, -1), FUENTE),
+        ('FONTSIZE', (0, 0), (-1, -1), tamano_fuente),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BACKGROUND', (0, 0), (0, -1), colors.darkblue),
+        ('BACKGROUND', (2, 0), (2, -1), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
+        ('TEXTCOLOR', (2, 0), (2, -1), colors.white),
+    )
+
+
+@lru_cache(maxsize=None)
+def tabla_encabezado(tamano_fuente, centrada=False, cebra=True, fila_total=False):
+    """
+    Tabla con encabezado azul oscuro.
+
+    ``centrada`` centra todas las celdas; si no, texto a la izquierda y la
+    segunda columna (montos) a la derecha. ``cebra`` alterna el fondo de las
+    filas y ``fila_total`` resalta la última fila.
+    """
+    from reportlab.lib import colors
+    comandos = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ]
+    if centrada:
+        comandos.append(('ALIGN', (0, 0), (-1, -1), 'CENTER'))
+    else:
+        comandos += [
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ]
+    comandos += [
+        ('FONTNAME', (0, 0), (-1, 0), FUENTE_NEGRITA),
+        ('FONTNAME', (0, 1), (-1, -1), FUENTE),
+        ('FONTSIZE', (0, 0), (-1, -1), tamano_fuente),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]
+    if cebra:
+        comandos.append(('ROWBACKGROUNDS', (0, 1), (-1, -1), (colors.white, colors.lightgrey)))
+    if fila_total:
+        comandos += [
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (-1, -1), FUENTE_NEGRITA),
+            ('FONTSIZE', (0, -1), (-1, -1), tamano_fuente + 2),
+        ]
+    return estilo_tabla(*comandos)
+
+
+@lru_cache(maxsize=None)
+def tabla_etiqueta_valor(tamano_fuente, grosor_grilla=0.25, alineacion_vertical='MIDDLE'):
+    """Tabla de dos columnas etiqueta/valor con la etiqueta en negrilla y grilla gris."""
+    from reportlab.lib import colors
+    return estilo_tabla(
+        ('FONTNAME', (0, 0), (0, -1), FUENTE_NEGRITA),
+        ('FONTSIZE', (0, 0), (-1, -1), tamano_fuente),
+        ('GRID', (0, 0), (-1, -1), grosor_grilla, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), alineacion_vertical),
+    )
+
+
+@lru_cache(maxsize=None)
+def estilos_documento_firma(tamano_fuente, espacio_despues):
+    """
+    Estilos de los documentos firmados por OTP (pagaré, renovación, retanqueo):
+    ``titulo``, ``small``, ``small_justified`` y ``small_bold``.
+    """
+    from reportlab.lib.enums import TA_JUSTIFY
+    small = estilo_parrafo('Small', fontSize=tamano_fuente, spaceAfter=espacio_despues)
+    return {
+        'titulo': estilo_parrafo('Titulo', 'Heading1', fontSize=12, spaceAfter=6, alignment=1),
+        'small': small,
+        'small_justified': estilo_parrafo('SmallJustified', small, alignment=TA_JUSTIFY),
+        'small_bold': estilo_parrafo('SmallBold', small, fontName=FUENTE_NEGRITA),
+    }
+
+
+def limpiar_cache():
+    """Descarta todos los estilos cacheados (usado por el benchmark para medir sin caché)."""
+    for funcion in (
+        hoja_estilos, estilo_parrafo, estilo_tabla, tabla_info_destacada,
+        tabla_encabezado, tabla_etiqueta_valor, estilos_documento_firma,
+    ):
+        funcion.cache_clear()
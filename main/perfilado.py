@@ -0,0 +1,203 @@
+"""
+Perfilado de peticiones por vista (opt-in con ``PERFILADO=true``).
+
+``PerfiladoMiddleware`` envuelve la ejecución de SQL de la conexión
+``default`` durante la petición (``connection.execute_wrapper``) y registra,
+por nombre de URL: tiempo total, número de consultas, tiempo en SQL, las
+``PERFILADO_TOP_SQL`` consultas más lentas y las repetidas. Una consulta
+"repetida" es el mismo SQL (con sus ``%s``, sin parámetros) ejecutado más
+de una vez en la petición: el patrón N+1 de un bucle que consulta por fila.
+No se guardan parámetros, así que no quedan datos de clientes en las muestras.
+
+Las muestras quedan en un buffer circular en memoria por proceso (lo que
+muestra ``/rendimiento/`` en vivo) y un hilo de fondo de cada proceso las
+guarda en ``MuestraRendimiento`` (lo que lee ``perf_report``) cada
+``PERFILADO_FLUSH_SEGUNDOS``; ``worker_exit`` de gunicorn guarda lo que
+quede al reciclar el worker. Ninguna petición escribe en la BD por el
+perfilado, y las muestras más viejas que ``PERFILADO_RETENCION_DIAS`` las
+borra ``perf_report`` (``--solo-purgar`` en el cron diario). Con
+``PERFILADO_MUESTREO`` < 1 solo se perfila esa fracción de las peticiones.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+_LARGO_SQL = 500
+
+_lock = threading.Lock()
+_buffer = deque(maxlen=getattr(settings, 'PERFILADO_BUFFER', 2000))
+_pendientes = []
+_ultimo_flush = [time.monotonic()]
+_hilo_pid = [None]  # proceso que arrancó el hilo de guardado (un fork no hereda el hilo)
+
+
+def muestras_recientes():
+    """Copia del buffer en memoria de este proceso (más antiguas primero)."""
+    with _lock:
+        return list(_buffer)
+
+
+def _muestra(request, response, duracion_ms, consultas, top):
+    por_sql = Counter(sql for sql, _ in consultas)
+    repetidas = sorted(((n, sql) for sql, n in por_sql.items() if n > 1), reverse=True)
+    lentas = sorted(consultas, key=lambda c: c[1], reverse=True)[:top]
+    return {
+        'fecha': time.time(),
+        'vista': request.resolver_match.view_name,
+        'metodo': request.method,
+        'estado': response.status_code,
+        'duracion_ms': round(duracion_ms, 2),
+        'consultas': len(consultas),
+        'sql_ms': round(sum(ms for _, ms in consultas), 2),
+        'consultas_duplicadas': sum(n - 1 for n, _ in repetidas),
+        'top_sql': [[round(ms, 2), sql[:_LARGO_SQL]] for sql, ms in lentas],
+        'duplicadas': [[n, sql[:_LARGO_SQL]] for n, sql in repetidas[:top]],
+    }
+
+
+def guardar_pendientes(forzar=False):
+    """Guarda en ``MuestraRendimiento`` las muestras acumuladas si pasó el intervalo (o ``forzar``)."""
+    from .models import MuestraRendimiento
+
+    intervalo = getattr(settings, 'PERFILADO_FLUSH_SEGUNDOS', 60)
+    with _lock:
+        if not _pendientes or (not forzar and time.monotonic() - _ultimo_flush[0] < intervalo):
+            return 0
+        lote = _pendientes[:]
+        _pendientes.clear()
+        _ultimo_flush[0] = time.monotonic()
+    try:
+        MuestraRendimiento.objects.bulk_create([
+            MuestraRendimiento(
+                fecha=datetime.fromtimestamp(m['fecha'], tz=dt_timezone.utc),
+                vista=m['vista'][:150],
+                metodo=m['metodo'],
+                estado=m['estado'],
+                duracion_ms=m['duracion_ms'],
+                consultas=m['consultas'],
+                sql_ms=m['sql_ms'],
+                consultas_duplicadas=m['consultas_duplicadas'],
+                detalle={'top_sql': m['top_sql'], 'duplicadas': m['duplicadas']},
+            )
+            for m in lote
+        ])
+    except DatabaseError:
+        logger.warning('No se pudieron guardar %s muestras de rendimiento', len(lote), exc_info=True)
+        return 0
+    return len(lote)
+
+
+def purgar_muestras(dias=None):
+    """Borra las muestras más viejas que ``dias`` (por defecto ``PERFILADO_RETENCION_DIAS``). Retorna cuántas."""
+    from django.utils import timezone
+
+    from .models import MuestraRendimiento
+
+    dias = getattr(settings, 'PERFILADO_RETENCION_DIAS', 7) if dias is None else dias
+    borradas, _ = MuestraRendimiento.objects.filter(fecha__lt=timezone.now() - timedelta(days=dias)).delete()
+    return borradas
+
+
+def _guardar_periodicamente():
+    intervalo = getattr(settings, 'PERFILADO_FLUSH_SEGUNDOS', 60)
+    while True:
+        time.sleep(intervalo)
+        try:
+            guardar_pendientes(forzar=True)
+        except Exception:
+            logger.warning('Fallo el guardado periódico de muestras de rendimiento', exc_info=True)
+        finally:
+            # Conexión propia de este hilo: no dejarla abierta entre guardados
+            connection.close()
+
+
+def _iniciar_guardado():
+    """Arranca (una vez por proceso) el hilo que guarda las muestras fuera de las peticiones."""
+    pid = os.getpid()
+    if _hilo_pid[0] == pid:
+        return
+    with _lock:
+        if _hilo_pid[0] == pid:
+            return
+        _hilo_pid[0] = pid
+    threading.Thread(target=_guardar_periodicamente, name='perfilado-guardado', daemon=True).start()
+
+
+class PerfiladoMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFILADO_ACTIVO', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'PERFILADO_MUESTREO', 1.0)
+        self.top = getattr(settings, 'PERFILADO_TOP_SQL', 5)
+
+    def __call__(self, request):
+        if self.muestreo < 1 and random.random() >= self.muestreo:
+            return self.get_response(request)
+
+        consultas = []
+
+        def registrar(execute, sql, params, many, context):
+            t0 = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                consultas.append((sql, (time.perf_counter() - t0) * 1000))
+
+        t0 = time.perf_counter()
+        with connection.execute_wrapper(registrar):
+            response = self.get_response(request)
+        duracion_ms = (time.perf_counter() - t0) * 1000
+
+        # Sin URL resuelta (404 de ruta, archivos) no hay vista a la que atribuirlo
+        if getattr(request, 'resolver_match', None) is not None:
+            muestra = _muestra(request, response, duracion_ms, consultas, self.top)
+            with _lock:
+                _buffer.append(muestra)
+                _pendientes.append(muestra)
+            _iniciar_guardado()
+        return response
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumen_por_vista(muestras):
+    """
+    Agrega muestras (dicts con las claves de ``_muestra`` o filas de
+    ``MuestraRendimiento.values()``) por vista: peticiones, p50/p95/máx de
+    duración, promedio de consultas y de SQL, y consultas repetidas por
+    petición. Ordenado por p95 descendente.
+    """
+    por_vista = {}
+    for m in muestras:
+        por_vista.setdefault(m['vista'], []).append(m)
+    filas = []
+    for vista, grupo in por_vista.items():
+        duraciones = sorted(m['duracion_ms'] for m in grupo)
+        n = len(grupo)
+        filas.append({
+            'vista': vista,
+            'peticiones': n,
+            'p50_ms': round(_percentil(duraciones, 50), 1),
+            'p95_ms': round(_percentil(duraciones, 95), 1),
+            'max_ms': round(duraciones[-1], 1),
+            'consultas': round(sum(m['consultas'] for m in grupo) / n, 1),
+            'sql_ms': round(sum(m['sql_ms'] for m in grupo) / n, 1),
+            'duplicadas': round(sum(m['consultas_duplicadas'] for m in grupo) / n, 1),
+        })
+    filas.sort(key=lambda f: f['p95_ms'], reverse=True)
+    return filas
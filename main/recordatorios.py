@@ -0,0 +1,353 @@
+"""
+Programación y despacho de recordatorios de pago (ledger ``Recordatorio``).
+
+Flujo:
+1. ``planificar_recordatorios(fecha)``: revisa ``CronogramaPago`` y crea, por
+   cliente y canal, un único recordatorio del día con las cuotas próximas, que
+   vencen hoy o vencidas. Es idempotente: si el cliente ya tiene recordatorio
+   para ese día y canal no se crea otro.
+2. ``despachar_recordatorios()``: envía solo los recordatorios PENDIENTE (y los
+   FALLIDO con intentos disponibles). Antes de enviar los reclama (pasan a
+   ENVIANDO), así dos ejecuciones superpuestas no envían el mismo, y guarda el
+   resultado de cada uno apenas se conoce. Un ENVIANDO que quedó de un proceso
+   interrumpido no se reenvía. El horario de silencio lo aplica el comando
+   ``procesar_recordatorios``.
+
+Los canales son intercambiables: correo hoy; WhatsApp y SMS como stub hasta
+tener proveedor. Configuración opcional en settings:
+
+    RECORDATORIOS_CANALES = ['EMAIL']
+    RECORDATORIOS_DIAS_ANTES = [1]              # días antes del vencimiento
+    RECORDATORIOS_DIAS_VENCIDO = [1, 3, 7, 15, 30]  # días de mora en que se recuerda
+    RECORDATORIOS_HORARIO_SILENCIO = ('21:00', '07:00')
+    RECORDATORIOS_ZONA_HORARIA = 'America/Bogota'
+    RECORDATORIOS_MAX_INTENTOS = 3
+"""
+import logging
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Prefetch, Q
+from django.utils import timezone
+
+from .models import CronogramaPago, Recordatorio
+
+logger = logging.getLogger(__name__)
+
+# Error que reportan los canales sin proveedor: el recordatorio queda OMITIDO, no FALLIDO
+SIN_PROVEEDOR = 'Canal sin proveedor configurado (stub).'
+
+# Severidad para elegir el tipo del recordatorio cuando agrupa varias cuotas
+_SEVERIDAD_TIPO = {'PROXIMO': 0, 'VENCE_HOY': 1, 'VENCIDO': 2}
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# ---------------------------------------------------------------------------
+# Canales
+# ---------------------------------------------------------------------------
+
+class CanalRecordatorio:
+    """
+    Interfaz de un canal. ``enviar`` retorna {recordatorio_id: error o None} y,
+    si se pasa ``al_enviar(recordatorio_id, error)``, lo llama por cada uno
+    apenas se conoce el resultado.
+    """
+    codigo = None
+
+    def destino(self, cliente):
+        raise NotImplementedError
+
+    def enviar(self, recordatorios, al_enviar=None):
+        raise NotImplementedError
+
+
+class CanalEmail(CanalRecordatorio):
+    codigo = 'EMAIL'
+
+    def __init__(self, tamano_lote=100, conexiones=1, backend=None):
+        self.tamano_lote = tamano_lote
+        self.conexiones = conexiones
+        self.backend = backend
+
+    def destino(self, cliente):
+        return (cliente.email or '').strip()
+
+    def enviar(self, recordatorios, al_enviar=None):
+        from .envio_correos import EnviadorCorreos
+
+        remitente = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local')
+        enviador = EnviadorCorreos(self.tamano_lote, self.conexiones, self.backend)
+        resultado = enviador.enviar(
+            ((r.id, EmailMessage(*texto_recordatorio(r), remitente, [r.destino])) for r in recordatorios),
+            al_enviar=al_enviar,
+        )
+        errores = {f['clave']: f['error'] for f in resultado.fallidos}
+        return {r.id: errores.get(r.id) for r in recordatorios}
+
+
+class CanalStub(CanalRecordatorio):
+    """Canal sin proveedor configurado: registra en log y marca como omitido."""
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+
+    def destino(self, cliente):
+        return (cliente.celular or '').strip()
+
+    def enviar(self, recordatorios, al_enviar=None):
+        for r in recordatorios:
+            logger.info(f'[{self.codigo} stub] Recordatorio {r.id} para {r.destino}: {texto_recordatorio(r)[0]}')
+            if al_enviar:
+                al_enviar(r.id, SIN_PROVEEDOR)
+        return {r.id: SIN_PROVEEDOR for r in recordatorios}
+
+
+def obtener_canales(codigos=None, **opciones_email):
+    """Instancia los canales pedidos (por defecto RECORDATORIOS_CANALES)."""
+    codigos = codigos or _config('RECORDATORIOS_CANALES', ['EMAIL'])
+    canales = []
+    for codigo in codigos:
+        codigo = codigo.strip().upper()
+        if codigo == 'EMAIL':
+            canales.append(CanalEmail(**opciones_email))
+        elif codigo in ('WHATSAPP', 'SMS'):
+            canales.append(CanalStub(codigo))
+        else:
+            raise ValueError(f'Canal de recordatorio desconocido: {codigo}')
+    return canales
+
+
+# ---------------------------------------------------------------------------
+# Contenido
+# ---------------------------------------------------------------------------
+
+def texto_recordatorio(recordatorio):
+    """Retorna (asunto, cuerpo) del recordatorio según su tipo y cuotas."""
+    cliente = recordatorio.cliente
+    fecha = recordatorio.fecha_programada
+    lineas = []
+    total = 0
+    for cuota in recordatorio.cuotas.all():
+        saldo = cuota.saldo_pendiente()
+        total += float(saldo)
+        venc = cuota.fecha_vencimiento.strftime('%d/%m/%Y')
+        lineas.append(f"  • Crédito #{cuota.credito_id} - Cuota #{cuota.numero_cuota} (vence {venc}): ${saldo:,.0f}")
+    detalle = '\n'.join(lineas)
+
+    if recordatorio.tipo == 'VENCIDO':
+        asunto = 'CREDIFLOW - Tiene cuotas vencidas pendientes de pago'
+        intro = 'Le recordamos que tiene cuotas vencidas con CREDIFLOW. Póngase al día para evitar intereses de mora.'
+    elif recordatorio.tipo == 'VENCE_HOY':
+        asunto = f'Recordatorio de pago CREDIFLOW ({fecha.strftime("%d/%m/%Y")})'
+        intro = f'Recuerde que hoy ({fecha.strftime("%d/%m/%Y")}) corresponde el pago de su cuota con CREDIFLOW.'
+    else:
+        asunto = 'CREDIFLOW - Próximo pago de su cuota'
+        intro = 'Le recordamos que se aproxima la fecha de pago de su cuota con CREDIFLOW.'
+
+    cuerpo = (
+        f'Estimado(a) {cliente.nombre_completo},\n\n'
+        f'{intro}\n\n'
+        f'Valor total: ${total:,.0f}\n\n'
+        f'Detalle:\n'
+        f'{detalle}\n\n'
+        f'Su puntualidad es la mejor referencia para próximos créditos.\n\n'
+        f'Atentamente,\n'
+        f'Equipo CREDIFLOW'
+    )
+    return asunto, cuerpo
+
+
+# ---------------------------------------------------------------------------
+# Planificación
+# ---------------------------------------------------------------------------
+
+def _tipo_cuota(fecha_vencimiento, fecha):
+    if fecha_vencimiento > fecha:
+        return 'PROXIMO'
+    if fecha_vencimiento == fecha:
+        return 'VENCE_HOY'
+    return 'VENCIDO'
+
+
+def cuotas_a_recordar(fecha):
+    """Cuotas pendientes/parciales de créditos activos que tocan recordar en ``fecha``."""
+    dias_antes = _config('RECORDATORIOS_DIAS_ANTES', [1])
+    dias_vencido = _config('RECORDATORIOS_DIAS_VENCIDO', [1, 3, 7, 15, 30])
+    fechas = {fecha}
+    fechas.update(fecha + timedelta(days=d) for d in dias_antes)
+    fechas.update(fecha - timedelta(days=d) for d in dias_vencido)
+    return CronogramaPago.objects.filter(
+        fecha_vencimiento__in=sorted(fechas),
+        estado__in=['PENDIENTE', 'PARCIAL'],
+        credito__estado__in=['DESEMBOLSADO', 'VENCIDO'],
+        credito__cliente__activo=True,
+    )
+
+
+def planificar_recordatorios(fecha=None, canales=None):
+    """
+    Crea los recordatorios del día (uno por cliente y canal). Retorna
+    {'creados': n, 'existentes': n, 'sin_destino': n}.
+    """
+    fecha = fecha or timezone.localdate()
+    canales = canales or obtener_canales()
+    resumen = {'creados': 0, 'existentes': 0, 'sin_destino': 0}
+
+    # cliente_id -> {'cliente': Cliente, 'cuotas': [ids], 'tipo': ...}
+    por_cliente = {}
+    cuotas = cuotas_a_recordar(fecha).select_related('credito__cliente').only(
+        'id', 'fecha_vencimiento', 'credito__id', 'credito__cliente__id',
+        'credito__cliente__email', 'credito__cliente__celular',
+    )
+    for cuota in cuotas.iterator(chunk_size=2000):
+        cliente = cuota.credito.cliente
+        datos = por_cliente.setdefault(cliente.id, {'cliente': cliente, 'cuotas': [], 'tipo': 'PROXIMO'})
+        datos['cuotas'].append(cuota.id)
+        tipo = _tipo_cuota(cuota.fecha_vencimiento, fecha)
+        if _SEVERIDAD_TIPO[tipo] > _SEVERIDAD_TIPO[datos['tipo']]:
+            datos['tipo'] = tipo
+
+    for canal in canales:
+        existentes = set(
+            Recordatorio.objects.filter(canal=canal.codigo, fecha_programada=fecha)
+            .values_list('cliente_id', flat=True)
+        )
+        nuevos = []
+        cuotas_nuevos = []
+        for cliente_id, datos in por_cliente.items():
+            if cliente_id in existentes:
+                resumen['existentes'] += 1
+                continue
+            destino = canal.destino(datos['cliente'])
+            if not destino:
+                resumen['sin_destino'] += 1
+                continue
+            nuevos.append(Recordatorio(
+                cliente_id=cliente_id,
+                canal=canal.codigo,
+                tipo=datos['tipo'],
+                fecha_programada=fecha,
+                destino=destino,
+            ))
+            cuotas_nuevos.append(datos['cuotas'])
+
+        if not nuevos:
+            continue
+        try:
+            with transaction.atomic():
+                creados = Recordatorio.objects.bulk_create(nuevos, batch_size=1000)
+                Through = Recordatorio.cuotas.through
+                Through.objects.bulk_create(
+                    [
+                        Through(recordatorio_id=rec.id, cronogramapago_id=cuota_id)
+                        for rec, ids in zip(creados, cuotas_nuevos)
+                        for cuota_id in ids
+                    ],
+                    batch_size=2000,
+                )
+            resumen['creados'] += len(creados)
+        except IntegrityError:
+            # Otra ejecución concurrente planificó el mismo día: lo suyo queda como válido
+            logger.warning(f'Planificación concurrente de recordatorios {canal.codigo} {fecha}; se omite.')
+
+    return resumen
+
+
+# ---------------------------------------------------------------------------
+# Despacho
+# ---------------------------------------------------------------------------
+
+def _hora(valor):
+    if isinstance(valor, dtime):
+        return valor
+    return datetime.strptime(valor, '%H:%M').time()
+
+
+def en_horario_silencio(momento=None):
+    """True si ``momento`` (por defecto ahora) cae en el horario de silencio configurado."""
+    horario = _config('RECORDATORIOS_HORARIO_SILENCIO', ('21:00', '07:00'))
+    if not horario:
+        return False
+    zona = ZoneInfo(_config('RECORDATORIOS_ZONA_HORARIA', 'America/Bogota'))
+    hora = (momento or timezone.now()).astimezone(zona).time()
+    inicio, fin = _hora(horario[0]), _hora(horario[1])
+    if inicio <= fin:
+        return inicio <= hora < fin
+    return hora >= inicio or hora < fin
+
+
+def _reclamar(candidatos, abiertos):
+    """
+    Pasa a ENVIANDO los recordatorios de ``candidatos`` (queryset ordenado,
+    quizá recortado) que sigan abiertos y retorna los ids que reclamó esta
+    ejecución; otra ejecución simultánea no los toma.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(candidatos.select_for_update(skip_locked=True).values_list('id', flat=True))
+            Recordatorio.objects.filter(id__in=ids).update(estado='ENVIANDO', intentos=F('intentos') + 1)
+        return ids
+    # Sin SKIP LOCKED (SQLite): UPDATE condicional por fila, solo cuenta la que este proceso cambió
+    return [
+        rid for rid in list(candidatos.values_list('id', flat=True))
+        if Recordatorio.objects.filter(abiertos, id=rid).update(estado='ENVIANDO', intentos=F('intentos') + 1)
+    ]
+
+
+def despachar_recordatorios(canales=None, fecha=None, limite=None, dry_run=False):
+    """
+    Envía los recordatorios pendientes (y fallidos con intentos disponibles) hasta
+    ``fecha``. Recordatorios de días anteriores que quedaron sin enviar se
+    descartan (OMITIDO): un recordatorio tardío confunde más de lo que ayuda.
+    Retorna {'enviados': n, 'fallidos': n, 'omitidos': n, 'vencidos': n}.
+    """
+    fecha = fecha or timezone.localdate()
+    canales = canales or obtener_canales()
+    max_intentos = _config('RECORDATORIOS_MAX_INTENTOS', 3)
+    resumen = {'enviados': 0, 'fallidos': 0, 'omitidos': 0, 'vencidos': 0}
+
+    abiertos = Q(estado='PENDIENTE') | Q(estado='FALLIDO', intentos__lt=max_intentos)
+    if not dry_run:
+        resumen['vencidos'] = Recordatorio.objects.filter(abiertos, fecha_programada__lt=fecha).update(
+            estado='OMITIDO', ultimo_error='No enviado el día programado.'
+        )
+        # Reclamados por un despacho que no terminó: pudieron salir, no se reintentan
+        resumen['vencidos'] += Recordatorio.objects.filter(estado='ENVIANDO', fecha_programada__lt=fecha).update(
+            estado='OMITIDO', ultimo_error='Envío interrumpido; no se reintenta para no duplicarlo.'
+        )
+
+    for canal in canales:
+        candidatos = Recordatorio.objects.filter(abiertos, canal=canal.codigo, fecha_programada=fecha).order_by('id')
+        if limite:
+            candidatos = candidatos[:limite]
+        if dry_run:
+            resumen['enviados'] += candidatos.count()
+            continue
+        ids = _reclamar(candidatos, abiertos)
+        if not ids:
+            continue
+        recordatorios = list(
+            Recordatorio.objects.filter(id__in=ids).select_related('cliente').prefetch_related(
+                Prefetch('cuotas', queryset=CronogramaPago.objects.order_by('credito_id', 'numero_cuota'))
+            ).order_by('id')
+        )
+
+        def registrar(recordatorio_id, error):
+            if error is None:
+                cambios, clave = {'estado': 'ENVIADO', 'fecha_envio': timezone.now(), 'ultimo_error': ''}, 'enviados'
+            elif error == SIN_PROVEEDOR:
+                cambios, clave = {'estado': 'OMITIDO', 'ultimo_error': error}, 'omitidos'
+            else:
+                cambios, clave = {'estado': 'FALLIDO', 'ultimo_error': error[:1000]}, 'fallidos'
+            Recordatorio.objects.filter(id=recordatorio_id, estado='ENVIANDO').update(**cambios)
+            resumen[clave] += 1
+
+        canal.enviar(recordatorios, al_enviar=registrar)
+
+    return resumen
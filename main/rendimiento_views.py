@@ -0,0 +1,46 @@
+"""
+Rendimiento por vista (staff): muestras de ``main.perfilado``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from .views import _forbidden_operacion, _usuario_admin_operativo
+
+_CAMPOS_RESUMEN = ('vista', 'duracion_ms', 'consultas', 'sql_ms', 'consultas_duplicadas')
+
+
+@login_required
+def rendimiento(request):
+    """
+    p50/p95, consultas y SQL repetido por vista (en vivo y guardado) y tasa
+    de acierto del caché de dominio.
+    """
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from .cache_dominio import estadisticas
+    from .models import MuestraRendimiento
+    from .perfilado import muestras_recientes, resumen_por_vista
+
+    try:
+        horas = min(max(int(request.GET.get('horas', '24')), 1), 24 * 7)
+    except ValueError:
+        horas = 24
+    vista = request.GET.get('vista', '').strip()
+
+    guardadas = MuestraRendimiento.objects.filter(fecha__gte=timezone.now() - timedelta(hours=horas))
+    context = {
+        'activo': getattr(settings, 'PERFILADO_ACTIVO', False),
+        'flush_segundos': getattr(settings, 'PERFILADO_FLUSH_SEGUNDOS', 60),
+        'horas': horas,
+        'vista': vista,
+        'en_vivo': resumen_por_vista(muestras_recientes()),
+        'guardado': resumen_por_vista(guardadas.values(*_CAMPOS_RESUMEN).iterator()),
+        'cache_dominio': estadisticas(),
+    }
+    if vista:
+        context['lentas'] = guardadas.filter(vista=vista).order_by('-duracion_ms')[:10]
+    return render(request, 'rendimiento.html', context)
@@ -130,10 +130,10 @@ def generar_pdf_renovacion(cliente, credito, codigo=None):
     """
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter
-    from reportlab.lib.enums import TA_JUSTIFY
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+
+    from .pdf_estilos import estilo_parrafo, estilos_documento_firma, tabla_etiqueta_valor
 
     if codigo is None:
         codigo = getattr(credito, 'codigo_renovacion', None) or f"REN-{timezone.now().year}-{credito.id:06d}"
@@ -144,12 +144,11 @@ def generar_pdf_renovacion(cliente, credito, codigo=None):
         rightMargin=0.75 * inch, leftMargin=0.75 * inch,
         topMargin=0.6 * inch, bottomMargin=0.6 * inch,
     )
-    styles = getSampleStyleSheet()
-    normal = styles['Normal']
-    small = ParagraphStyle('Small', parent=normal, fontSize=9, spaceAfter=4)
-    small_justified = ParagraphStyle('SmallJustified', parent=small, alignment=TA_JUSTIFY)
-    small_bold = ParagraphStyle('SmallBold', parent=small, fontName='Helvetica-Bold')
-    titulo = ParagraphStyle('Titulo', parent=styles['Heading1'], fontSize=12, spaceAfter=6, alignment=1)
+    estilos = estilos_documento_firma(9, 4)
+    small = estilos['small']
+    small_justified = estilos['small_justified']
+    small_bold = estilos['small_bold']
+    titulo = estilos['titulo']
 
     flow = []
 
@@ -172,12 +171,7 @@ def generar_pdf_renovacion(cliente, credito, codigo=None):
     if credito.fecha_desembolso:
         datos.append(['Fecha de desembolso', credito.fecha_desembolso.strftime('%d/%m/%Y %H:%M')])
     t = Table(datos, colWidths=[2.2 * inch, 3.5 * inch])
-    t.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
+    t.setStyle(tabla_etiqueta_valor(9))
     flow.append(t)
     flow.append(Spacer(1, 0.2 * inch))
 
@@ -194,7 +188,7 @@ def generar_pdf_renovacion(cliente, credito, codigo=None):
     flow.append(Paragraph('Firma digital', small_bold))
     flow.append(Paragraph(
         '&bull; Firmado digitalmente mediante verificación OTP.',
-        ParagraphStyle('Disclaimer', parent=small, fontSize=8, alignment=1),
+        estilo_parrafo('Disclaimer', small, fontSize=8, alignment=1),
     ))
     flow.append(Paragraph(
         f'Fecha y hora de aceptación: {(timezone.now().strftime("%d/%m/%Y %H:%M"))}',
@@ -203,7 +197,7 @@ def generar_pdf_renovacion(cliente, credito, codigo=None):
     flow.append(Spacer(1, 0.1 * inch))
     flow.append(Paragraph(
         f'Documento generado por el sistema. Código: {codigo}',
-        ParagraphStyle('Code', parent=small, fontSize=7, textColor=colors.grey, alignment=1),
+        estilo_parrafo('Code', small, fontSize=7, textColor=colors.grey, alignment=1),
     ))
 
     try:
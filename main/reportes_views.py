@@ -0,0 +1,521 @@
+"""
+Reportes: KPIs y recaudación por cobrador, tareas pendientes.
+"""
+from django.shortcuts import render, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.db.models import Sum
+from django.http import JsonResponse
+from .models import Credito, Pago, Cobrador, TareaCobro
+from . import cache_dominio
+from datetime import date
+from .views import _forbidden_operacion, _usuario_admin_operativo
+
+
+@login_required
+def kpis_cobradores(request):
+    """Vista detallada de KPIs por cobrador"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, timedelta
+    from django.db.models import Q, Sum, Count, Avg, Max, Min
+    from .models import TareaCobro, CarteraAnalisis
+    
+    # Parámetros de filtrado
+    fecha_desde = request.GET.get('fecha_desde')
+    fecha_hasta = request.GET.get('fecha_hasta')
+    cobrador_id = request.GET.get('cobrador_id')
+    
+    # Fechas por defecto (últimos 30 días)
+    if not fecha_desde:
+        fecha_desde = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
+    if not fecha_hasta:
+        fecha_hasta = date.today().strftime('%Y-%m-%d')
+    
+    # Convertir a objetos date
+    from datetime import datetime
+    fecha_inicio = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
+    fecha_fin = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+    dias_periodo = (fecha_fin - fecha_inicio).days + 1
+    
+    # Obtener todos los cobradores activos
+    cobradores_query = Cobrador.objects.filter(activo=True)
+    if cobrador_id:
+        cobradores_query = cobradores_query.filter(id=cobrador_id)
+    cobradores = list(cobradores_query.prefetch_related('rutas').order_by('nombres', 'apellidos'))
+    ids_cobradores = [c.id for c in cobradores]
+    
+    # Agregados de todos los cobradores en tres consultas agrupadas (no unas 12 por cobrador)
+    pagos_por_cobrador = {
+        fila['credito__cobrador']: fila
+        for fila in Pago.objects.filter(
+            credito__cobrador__in=ids_cobradores,
+            fecha_pago__date__gte=fecha_inicio,
+            fecha_pago__date__lte=fecha_fin
+        ).order_by().values('credito__cobrador').annotate(total=Sum('monto'), cantidad=Count('id'))
+    }
+    tareas_por_cobrador = {
+        fila['cobrador']: fila
+        for fila in TareaCobro.objects.filter(
+            cobrador__in=ids_cobradores,
+            fecha_asignacion__gte=fecha_inicio,
+            fecha_asignacion__lte=fecha_fin
+        ).order_by().values('cobrador').annotate(
+            total=Count('id'),
+            cobradas=Count('id', filter=Q(estado='COBRADO')),
+            pendientes=Count('id', filter=Q(estado='PENDIENTE')),
+            no_encontrado=Count('id', filter=Q(estado='NO_ENCONTRADO')),
+            reprogramadas=Count('id', filter=Q(estado='REPROGRAMADO')),
+        )
+    }
+    creditos_por_cobrador = {
+        fila['cobrador']: fila
+        for fila in Credito.objects.filter(cobrador__in=ids_cobradores).order_by().values('cobrador').annotate(
+            cartera=Sum('monto_total'),
+            vencidos=Count('id', filter=Q(dias_mora__gt=0)),
+            al_dia=Count('id', filter=Q(dias_mora=0)),
+            mora_promedio=Avg('dias_mora', filter=Q(dias_mora__gt=0)),
+        )
+    }
+    
+    # Calcular KPIs por cobrador
+    datos_cobradores = []
+    
+    for cobrador in cobradores:
+        # KPIs de Recaudación
+        pagos_cobrador = pagos_por_cobrador.get(cobrador.id, {})
+        total_recaudado = pagos_cobrador.get('total') or 0
+        cantidad_pagos = pagos_cobrador.get('cantidad', 0)
+        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
+        
+        # KPIs de Tareas de Cobro
+        tareas_cobrador = tareas_por_cobrador.get(cobrador.id, {})
+        total_tareas = tareas_cobrador.get('total', 0)
+        tareas_cobradas = tareas_cobrador.get('cobradas', 0)
+        tareas_pendientes = tareas_cobrador.get('pendientes', 0)
+        tareas_no_encontrado = tareas_cobrador.get('no_encontrado', 0)
+        tareas_reprogramadas = tareas_cobrador.get('reprogramadas', 0)
+        
+        # Efectividad de cobro
+        efectividad_cobro = (tareas_cobradas / total_tareas * 100) if total_tareas > 0 else 0
+        
+        # KPIs de Cartera Asignada
+        creditos_asignados = creditos_por_cobrador.get(cobrador.id, {})
+        cartera_total_cobrador = creditos_asignados.get('cartera') or 0
+        creditos_vencidos_cobrador = creditos_asignados.get('vencidos', 0)
+        creditos_al_dia_cobrador = creditos_asignados.get('al_dia', 0)
+        
+        # Mora promedio de la cartera del cobrador
+        mora_promedio = creditos_asignados.get('mora_promedio') or 0
+        
+        # Meta diaria y cumplimiento
+        meta_periodo = cobrador.meta_diaria * dias_periodo if cobrador.meta_diaria else 0
+        cumplimiento_meta = (total_recaudado / meta_periodo * 100) if meta_periodo > 0 else 0
+        
+        # Productividad diaria
+        productividad_diaria = total_recaudado / dias_periodo if dias_periodo > 0 else 0
+        tareas_diaria_promedio = total_tareas / dias_periodo if dias_periodo > 0 else 0
+        
+        # Tasa de contacto efectivo
+        tareas_con_contacto = total_tareas - tareas_no_encontrado
+        tasa_contacto = (tareas_con_contacto / total_tareas * 100) if total_tareas > 0 else 0
+        
+        # Calificación general (score)
+        score = 0
+        if efectividad_cobro >= 80: score += 25
+        elif efectividad_cobro >= 60: score += 20
+        elif efectividad_cobro >= 40: score += 15
+        elif efectividad_cobro >= 20: score += 10
+        
+        if cumplimiento_meta >= 100: score += 25
+        elif cumplimiento_meta >= 80: score += 20
+        elif cumplimiento_meta >= 60: score += 15
+        elif cumplimiento_meta >= 40: score += 10
+        
+        if tasa_contacto >= 85: score += 25
+        elif tasa_contacto >= 70: score += 20
+        elif tasa_contacto >= 55: score += 15
+        elif tasa_contacto >= 40: score += 10
+        
+        if mora_promedio <= 15: score += 25
+        elif mora_promedio <= 30: score += 20
+        elif mora_promedio <= 45: score += 15
+        elif mora_promedio <= 60: score += 10
+        
+        # Determinar nivel de rendimiento
+        if score >= 90:
+            nivel_rendimiento = 'EXCELENTE'
+            color_rendimiento = 'success'
+        elif score >= 70:
+            nivel_rendimiento = 'BUENO'
+            color_rendimiento = 'primary'
+        elif score >= 50:
+            nivel_rendimiento = 'REGULAR'
+            color_rendimiento = 'warning'
+        else:
+            nivel_rendimiento = 'NECESITA MEJORA'
+            color_rendimiento = 'danger'
+        
+        datos_cobradores.append({
+            'cobrador': cobrador,
+            'total_recaudado': total_recaudado,
+            'cantidad_pagos': cantidad_pagos,
+            'promedio_pago': promedio_pago,
+            'total_tareas': total_tareas,
+            'tareas_cobradas': tareas_cobradas,
+            'tareas_pendientes': tareas_pendientes,
+            'tareas_no_encontrado': tareas_no_encontrado,
+            'tareas_reprogramadas': tareas_reprogramadas,
+            'efectividad_cobro': efectividad_cobro,
+            'cartera_total_cobrador': cartera_total_cobrador,
+            'creditos_vencidos_cobrador': creditos_vencidos_cobrador,
+            'creditos_al_dia_cobrador': creditos_al_dia_cobrador,
+            'mora_promedio': mora_promedio,
+            'meta_periodo': meta_periodo,
+            'cumplimiento_meta': cumplimiento_meta,
+            'productividad_diaria': productividad_diaria,
+            'tareas_diaria_promedio': tareas_diaria_promedio,
+            'tasa_contacto': tasa_contacto,
+            'score': score,
+            'nivel_rendimiento': nivel_rendimiento,
+            'color_rendimiento': color_rendimiento,
+        })
+    
+    # Ordenar por score descendente
+    datos_cobradores.sort(key=lambda x: x['score'], reverse=True)
+    
+    # Calcular promedios generales
+    if datos_cobradores:
+        promedio_efectividad = sum([d['efectividad_cobro'] for d in datos_cobradores]) / len(datos_cobradores)
+        promedio_cumplimiento = sum([d['cumplimiento_meta'] for d in datos_cobradores]) / len(datos_cobradores)
+        promedio_contacto = sum([d['tasa_contacto'] for d in datos_cobradores]) / len(datos_cobradores)
+        total_recaudado_general = sum([d['total_recaudado'] for d in datos_cobradores])
+        total_tareas_general = sum([d['total_tareas'] for d in datos_cobradores])
+    else:
+        promedio_efectividad = promedio_cumplimiento = promedio_contacto = 0
+        total_recaudado_general = total_tareas_general = 0
+    
+    context = {
+        'datos_cobradores': datos_cobradores,
+        'cobradores_todos': cache_dominio.cobradores_activos(),
+        'fecha_desde': fecha_desde,
+        'fecha_hasta': fecha_hasta,
+        'cobrador_id': int(cobrador_id) if cobrador_id else None,
+        'dias_periodo': dias_periodo,
+        'promedio_efectividad': promedio_efectividad,
+        'promedio_cumplimiento': promedio_cumplimiento,
+        'promedio_contacto': promedio_contacto,
+        'total_recaudado_general': total_recaudado_general,
+        'total_tareas_general': total_tareas_general,
+    }
+    
+    return render(request, 'cartera/kpis_cobradores.html', context)
+
+
+# ========================================
+# REPORTES DE RECAUDACIÓN
+# ========================================
+
+@login_required
+def recaudacion_cobradores(request):
+    """Vista para mostrar reportes de recaudación por cobrador"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, timedelta
+    from django.db.models import Q, Sum, Count, Avg
+    
+    # Parámetros de filtrado
+    fecha_desde = request.GET.get('fecha_desde')
+    fecha_hasta = request.GET.get('fecha_hasta')
+    cobrador_id = request.GET.get('cobrador_id')
+    
+    # Fechas por defecto (día actual)
+    if not fecha_desde:
+        fecha_desde = date.today().strftime('%Y-%m-%d')
+    if not fecha_hasta:
+        fecha_hasta = date.today().strftime('%Y-%m-%d')
+    
+    # Parsear a date para filtros consistentes
+    from datetime import datetime as dt
+    try:
+        fecha_inicio = dt.strptime(fecha_desde, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        fecha_inicio = date.today()
+    try:
+        fecha_fin = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        fecha_fin = date.today()
+    
+    filtros_pagos = Q(fecha_pago__date__gte=fecha_inicio) & Q(fecha_pago__date__lte=fecha_fin)
+    
+    # Si se especifica un cobrador, filtrar solo ese
+    if cobrador_id:
+        filtros_pagos &= Q(credito__cobrador_id=cobrador_id)
+    
+    # Obtener todos los cobradores activos
+    cobradores = Cobrador.objects.filter(activo=True).prefetch_related('rutas').order_by('nombres', 'apellidos')
+    
+    # Totales de todos los cobradores en una consulta agrupada
+    pagos_por_cobrador = {
+        fila['credito__cobrador']: fila
+        for fila in Pago.objects.filter(filtros_pagos).order_by().values('credito__cobrador').annotate(
+            total=Sum('monto'), cantidad=Count('id'), creditos=Count('credito', distinct=True)
+        )
+    }
+    
+    # Datos de recaudación por cobrador
+    datos_recaudacion = []
+    total_general_recaudado = 0
+    total_general_pagos = 0
+    
+    for cobrador in cobradores:
+        # Pagos del cobrador en el período (el listado solo se consulta si la plantilla lo usa)
+        pagos_cobrador = Pago.objects.filter(
+            filtros_pagos & Q(credito__cobrador=cobrador)
+        )
+        
+        # Estadísticas del cobrador
+        totales = pagos_por_cobrador.get(cobrador.id, {})
+        total_recaudado = totales.get('total') or 0
+        cantidad_pagos = totales.get('cantidad', 0)
+        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
+        
+        # Créditos únicos gestionados
+        creditos_gestionados = totales.get('creditos', 0)
+        
+        # Cumplimiento de meta (si tiene meta diaria)
+        cumplimiento_meta = 0
+        if cobrador.meta_diaria and cobrador.meta_diaria > 0:
+            dias_periodo = (fecha_fin - fecha_inicio).days + 1
+            meta_periodo = cobrador.meta_diaria * dias_periodo
+            cumplimiento_meta = (total_recaudado / meta_periodo * 100) if meta_periodo > 0 else 0
+        
+        # Solo incluir cobradores que tienen actividad o siempre mostrar todos
+        if total_recaudado > 0 or not cobrador_id:  # Mostrar todos si no hay filtro específico
+            datos_recaudacion.append({
+                'cobrador': cobrador,
+                'total_recaudado': total_recaudado,
+                'cantidad_pagos': cantidad_pagos,
+                'promedio_pago': promedio_pago,
+                'creditos_gestionados': creditos_gestionados,
+                'cumplimiento_meta': cumplimiento_meta,
+                'pagos': pagos_cobrador.order_by('-fecha_pago')[:5],  # Últimos 5 pagos
+            })
+        
+        total_general_recaudado += total_recaudado
+        total_general_pagos += cantidad_pagos
+    
+    # Ordenar por total recaudado (mayor a menor)
+    datos_recaudacion.sort(key=lambda x: x['total_recaudado'], reverse=True)
+    
+    # Estadísticas generales
+    promedio_general = total_general_recaudado / total_general_pagos if total_general_pagos > 0 else 0
+    
+    # Top performers
+    top_recaudadores = datos_recaudacion[:3]  # Top 3
+    
+    context = {
+        'datos_recaudacion': datos_recaudacion,
+        'cobradores': cobradores,
+        'fecha_desde': fecha_desde,
+        'fecha_hasta': fecha_hasta,
+        'cobrador_id': int(cobrador_id) if cobrador_id else None,
+        'total_general_recaudado': total_general_recaudado,
+        'total_general_pagos': total_general_pagos,
+        'promedio_general': promedio_general,
+        'top_recaudadores': top_recaudadores,
+    }
+    
+    return render(request, 'cobradores/recaudacion_cobradores.html', context)
+
+
+@login_required
+def exportar_recaudacion_excel(request):
+    """Exporta el reporte de recaudación (mismo filtro que recaudacion_cobradores) a Excel."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date
+    from datetime import datetime as dt
+
+    fecha_desde = request.GET.get('fecha_desde') or date.today().strftime('%Y-%m-%d')
+    fecha_hasta = request.GET.get('fecha_hasta') or date.today().strftime('%Y-%m-%d')
+    cobrador_id = request.GET.get('cobrador_id')
+    try:
+        fecha_inicio = dt.strptime(fecha_desde, '%Y-%m-%d').date()
+        fecha_fin = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        fecha_inicio = date.today()
+        fecha_fin = date.today()
+
+    cobrador_filtro = None
+    if cobrador_id:
+        try:
+            cobrador_filtro = int(cobrador_id)
+        except ValueError:
+            pass
+
+    # Libro en streaming: resumen agregado + detalle completo (sin tope de filas)
+    from .exportacion_excel import hojas_recaudacion, respuesta_libro_xlsx
+    return respuesta_libro_xlsx(
+        hojas_recaudacion(fecha_inicio, fecha_fin, cobrador_filtro),
+        f'recaudacion_{fecha_desde}_{fecha_hasta}.xlsx',
+    )
+
+
+@login_required
+def reporte_tareas_pendientes(request):
+    """Lista tareas en estado PENDIENTE con fecha de asignación ya pasada (sin gestionar a tiempo)."""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from datetime import date, timedelta
+    from django.db.models import Q, Count
+
+    dias_atraso = request.GET.get('dias', '1')
+    try:
+        dias_atraso = max(0, int(dias_atraso))
+    except ValueError:
+        dias_atraso = 1
+    cobrador_id = request.GET.get('cobrador_id', '').strip()
+    fecha_limite = date.today() - timedelta(days=dias_atraso)
+
+    tareas_qs = TareaCobro.objects.filter(
+        estado='PENDIENTE',
+        fecha_asignacion__lte=fecha_limite,
+    ).select_related('cobrador', 'cuota__credito__cliente').order_by('fecha_asignacion', 'cobrador')
+
+    if cobrador_id:
+        try:
+            tareas_qs = tareas_qs.filter(cobrador_id=int(cobrador_id))
+        except ValueError:
+            pass
+
+    export = request.GET.get('export') == 'xlsx'
+    if export:
+        from .exportacion_excel import hojas_tareas_pendientes, respuesta_libro_xlsx
+        return respuesta_libro_xlsx(
+            hojas_tareas_pendientes(tareas_qs, date.today()),
+            'tareas_pendientes_sin_gestionar.xlsx',
+        )
+
+    tareas = list(tareas_qs[:500])
+    cobradores = cache_dominio.cobradores_activos()
+
+    # Resumen por cobrador
+    por_cobrador = tareas_qs.values('cobrador__nombres', 'cobrador__apellidos', 'cobrador_id').annotate(
+        total=Count('id')
+    ).order_by('-total')
+
+    context = {
+        'tareas': tareas,
+        'cobradores': cobradores,
+        'dias_atraso': dias_atraso,
+        'cobrador_id': int(cobrador_id) if cobrador_id else None,
+        'fecha_limite': fecha_limite,
+        'por_cobrador': por_cobrador,
+        'total': len(tareas),
+    }
+    return render(request, 'tareas/reporte_tareas_pendientes.html', context)
+
+
+# Vista AJAX para obtener detalles de pagos por cobrador
+@login_required
+def detalles_pagos_cobrador(request, cobrador_id):
+    """Vista AJAX que devuelve detalles completos de pagos de un cobrador"""
+    if not _usuario_admin_operativo(request.user):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
+    try:
+        cobrador = get_object_or_404(Cobrador, id=cobrador_id)
+        
+        # Parámetros de filtrado
+        fecha_desde = request.GET.get('fecha_desde')
+        fecha_hasta = request.GET.get('fecha_hasta')
+        buscar = request.GET.get('buscar', '').strip()
+        
+        # Fechas por defecto (día actual)
+        if not fecha_desde:
+            fecha_desde = date.today().strftime('%Y-%m-%d')
+        if not fecha_hasta:
+            fecha_hasta = date.today().strftime('%Y-%m-%d')
+        try:
+            from datetime import datetime as dt
+            fecha_inicio_ajax = dt.strptime(fecha_desde, '%Y-%m-%d').date()
+            fecha_fin_ajax = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            fecha_inicio_ajax = date.today()
+            fecha_fin_ajax = date.today()
+        
+        # Filtrar pagos del cobrador
+        pagos = Pago.objects.filter(
+            credito__cobrador=cobrador,
+            fecha_pago__date__gte=fecha_inicio_ajax,
+            fecha_pago__date__lte=fecha_fin_ajax
+        ).select_related(
+            'credito__cliente'
+        ).order_by('-fecha_pago')
+        
+        # Filtro de búsqueda por nombre de cliente
+        if buscar:
+            from .busqueda import buscar as buscar_clientes
+            pagos = buscar_clientes(pagos, buscar, 'credito__cliente')
+        
+        # Estadísticas del período
+        total_recaudado = pagos.aggregate(Sum('monto'))['monto__sum'] or 0
+        cantidad_pagos = pagos.count()
+        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
+        creditos_unicos = pagos.values('credito').distinct().count()
+        
+        # Convertir pagos a lista de diccionarios
+        pagos_data = []
+        for pago in pagos[:50]:  # Limitar a 50 para rendimiento
+            pagos_data.append({
+                'id': pago.id,
+                'fecha_pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M'),
+                'fecha_pago_corta': pago.fecha_pago.strftime('%d/%m/%Y'),
+                'hora_pago': pago.fecha_pago.strftime('%H:%M'),
+                'monto': float(pago.monto),
+                'numero_cuota': pago.numero_cuota,
+                'observaciones': pago.observaciones or '',
+                'cliente': {
+                    'id': pago.credito.cliente.id,
+                    'nombre_completo': pago.credito.cliente.nombre_completo,
+                    'nombres': pago.credito.cliente.nombres,
+                    'apellidos': pago.credito.cliente.apellidos,
+                    'cedula': pago.credito.cliente.cedula,
+                    'celular': pago.credito.cliente.celular,
+                    'direccion': pago.credito.cliente.direccion,
+                    'barrio': pago.credito.cliente.barrio,
+                },
+                'credito': {
+                    'id': pago.credito.id,
+                    'monto_total': float(pago.credito.monto),
+                    'estado': pago.credito.get_estado_display(),
+                    'tasa_interes': float(pago.credito.tasa_interes),
+                    'cantidad_cuotas': pago.credito.cantidad_cuotas,
+                    'tipo_plazo': pago.credito.get_tipo_plazo_display() if hasattr(pago.credito, 'tipo_plazo') else 'N/A',
+                }
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'cobrador': {
+                'id': cobrador.id,
+                'nombre': cobrador.nombre_completo,
+                'meta_diaria': float(cobrador.meta_diaria) if cobrador.meta_diaria else 0,
+                'comision_porcentaje': float(cobrador.comision_porcentaje) if cobrador.comision_porcentaje else 0,
+            },
+            'estadisticas': {
+                'total_recaudado': float(total_recaudado),
+                'cantidad_pagos': cantidad_pagos,
+                'promedio_pago': float(promedio_pago),
+                'creditos_unicos': creditos_unicos,
+                'fecha_desde': fecha_desde,
+                'fecha_hasta': fecha_hasta,
+            },
+            'pagos': pagos_data,
+            'tiene_mas_pagos': pagos.count() > 50,
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error al cargar los datos: {str(e)}'
+        })
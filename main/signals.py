@@ -0,0 +1,121 @@
+"""
+Señales de la app: invalidan los PDF cacheados (``main.pdf_cache``) cuando
+cambian los datos que imprimen, generan los derivados de las fotos subidas
+(``main.imagenes``), marcan el crédito de un pago editado o borrado para la
+verificación incremental de ``main.invariantes`` e invalidan el caché de
+dominio (``main.cache_dominio``) cuando cambian roles, cobradores o rutas.
+"""
+import logging
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache_dominio
+from .imagenes import CAMPOS_FOTO, generar_derivados_de_instancia
+from .invariantes import marcar_creditos_tocados
+from .models import Cliente, Cobrador, Codeudor, CronogramaPago, Credito, Pago, Ruta
+from .pdf_cache import invalidar_credito
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidar_pdfs_al_confirmar(credito_ids):
+    # Después del commit: si se borrara antes, otro worker podría volver a
+    # escribir la versión vieja (la que aún ve confirmada) y quedaría huérfana.
+    # Fuera de una transacción on_commit ejecuta de inmediato.
+    credito_ids = list(credito_ids)
+
+    def invalidar():
+        for credito_id in credito_ids:
+            invalidar_credito(credito_id)
+
+    transaction.on_commit(invalidar)
+
+
+@receiver(post_save, sender=Pago)
+@receiver(post_delete, sender=Pago)
+@receiver(post_save, sender=CronogramaPago)
+def invalidar_pdfs_por_pago_o_cuota(sender, instance, raw=False, **kwargs):
+    # Sin post_delete de CronogramaPago: borrar cuotas solo ocurre al regenerar
+    # el cronograma (que luego las crea) o en cascada desde el crédito.
+    if not raw:
+        _invalidar_pdfs_al_confirmar([instance.credito_id])
+
+
+@receiver(post_save, sender=Pago)
+@receiver(post_delete, sender=Pago)
+def marcar_credito_por_pago(sender, instance, raw=False, created=False, **kwargs):
+    # Un pago nuevo ya se detecta por su fecha_pago; editado o borrado, no
+    if not raw and not created:
+        marcar_creditos_tocados([instance.credito_id])
+
+
+@receiver(post_save, sender=Credito)
+@receiver(post_delete, sender=Credito)
+def invalidar_pdfs_por_credito(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _invalidar_pdfs_al_confirmar([instance.id])
+
+
+@receiver(post_save, sender=Cliente)
+def invalidar_pdfs_por_cliente(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    _invalidar_pdfs_al_confirmar(Credito.objects.filter(cliente_id=instance.id).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_save, sender=Codeudor)
+def generar_derivados_fotos(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_FOTO[sender.__name__]):
+        return
+    try:
+        generar_derivados_de_instancia(instance)
+    except Exception as e:
+        # No bloquear el guardado: el derivado se generará en la primera petición
+        logger.warning(f'No se pudieron generar derivados de fotos ({sender.__name__} {instance.pk}): {e}')
+
+
+# Sin chequear ``raw``: una fixture cargada también cambia lo cacheado.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_cache_por_usuario(sender, instance, **kwargs):
+    cache_dominio.invalidar('rol', instance.pk)
+    if kwargs.get('signal') is post_delete:
+        # Cobrador.usuario queda en NULL con un UPDATE, sin señales del cobrador
+        cache_dominio.invalidar('cobrador_usuario')
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_cache_por_grupos_de_usuario(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # group.user_set.add/remove/clear: pueden ser muchos usuarios
+        cache_dominio.invalidar('rol')
+    else:
+        cache_dominio.invalidar('rol', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidar_cache_por_grupo(sender, instance, **kwargs):
+    cache_dominio.invalidar('rol')
+
+
+@receiver(post_save, sender=Cobrador)
+@receiver(post_delete, sender=Cobrador)
+def invalidar_cache_por_cobrador(sender, instance, **kwargs):
+    cache_dominio.invalidar('cobrador_usuario')
+    cache_dominio.invalidar('cobradores_activos')
+
+
+@receiver(post_save, sender=Ruta)
+@receiver(post_delete, sender=Ruta)
+def invalidar_cache_por_ruta(sender, instance, **kwargs):
+    cache_dominio.invalidar('rutas_por_barrio')
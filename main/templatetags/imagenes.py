@@ -0,0 +1,11 @@
+from django import template
+
+from main.imagenes import url_derivado
+
+register = template.Library()
+
+
+@register.filter
+def rendicion(archivo, nombre):
+    """URL de un derivado de foto: ``{{ cliente.foto_rostro|rendicion:'thumb' }}``."""
+    return url_derivado(archivo, nombre)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+
+from ..benchmarks import (
+    CASOS, HOLGURA, Contexto, cargar_historial, comparar, guardar_corrida, medir, nueva_corrida,
+)
+from ..cartera_sintetica import generar_cartera_sintetica
+
+# Tamaño de la cartera (créditos) y si la corrida se agrega al historial
+TAMANO = int(os.getenv('BENCHMARK_TAMANO', '1000'))
+GUARDAR = os.getenv('BENCHMARK_GUARDAR', 'false').lower() in ['true', '1', 'yes']
+ACTIVOS = os.getenv('BENCHMARK', 'false').lower() in ['true', '1', 'yes']
+
+
+def _historial(*corridas, etiqueta='sqlite', creditos=1000):
+    return {'corridas': [
+        {'etiqueta': etiqueta, 'creditos': creditos, 'resultados': resultados} for resultados in corridas
+    ]}
+
+
+class CompararTests(SimpleTestCase):
+    """``comparar`` con historiales sintéticos: umbral, holgura absoluta, ventana y errores."""
+
+    def test_regresion_sobre_umbral_y_holgura(self):
+        historial = _historial(*[{'caso': {'ms': 100, 'consultas': 10}}] * 3)
+        regresiones = comparar({'caso': {'ms': 200, 'consultas': 10}}, historial, 'sqlite', 1000, umbral=0.25)
+        self.assertEqual(regresiones, [('caso', 'ms', 100, 200)])
+
+    def test_dentro_del_umbral(self):
+        historial = _historial({'caso': {'ms': 100, 'consultas': 10}})
+        self.assertEqual(comparar({'caso': {'ms': 124, 'consultas': 10}}, historial, 'sqlite', 1000, umbral=0.25), [])
+
+    def test_holgura_absoluta_en_casos_rapidos(self):
+        # +100 % pero por debajo de la holgura de ms y consultas: ruido, no regresión
+        historial = _historial({'caso': {'ms': 5, 'consultas': 1}})
+        actual = {'caso': {'ms': 5 + HOLGURA['ms'], 'consultas': 1 + HOLGURA['consultas']}}
+        self.assertEqual(comparar(actual, historial, 'sqlite', 1000, umbral=0.25), [])
+        actual = {'caso': {'ms': 6 + HOLGURA['ms'], 'consultas': 2 + HOLGURA['consultas']}}
+        self.assertEqual(
+            [r[1] for r in comparar(actual, historial, 'sqlite', 1000, umbral=0.25)], ['ms', 'consultas'],
+        )
+
+    def test_ventana_usa_mediana_de_las_ultimas(self):
+        historial = _historial(
+            *[{'caso': {'ms': 100}}] * 5,   # fuera de la ventana
+            *[{'caso': {'ms': 400}}] * 3,
+        )
+        self.assertEqual(comparar({'caso': {'ms': 450}}, historial, 'sqlite', 1000, umbral=0.25, ventana=3), [])
+        self.assertEqual(
+            comparar({'caso': {'ms': 450}}, historial, 'sqlite', 1000, umbral=0.25, ventana=8),
+            [('caso', 'ms', 100.0, 450)],
+        )
+
+    def test_solo_misma_etiqueta_y_tamano(self):
+        historial = {'corridas': (
+            _historial({'caso': {'ms': 10}}, etiqueta='postgresql')['corridas']
+            + _historial({'caso': {'ms': 10}}, creditos=10000)['corridas']
+        )}
+        self.assertEqual(comparar({'caso': {'ms': 1000}}, historial, 'sqlite', 1000), [])
+
+    def test_errores(self):
+        historial = _historial({'caso': {'ms': 10}, 'roto': {'error': 'HTTP 500'}})
+        regresiones = comparar(
+            {'caso': {'error': 'HTTP 500'}, 'roto': {'error': 'HTTP 500'}}, historial, 'sqlite', 1000,
+        )
+        # Falla y antes no fallaba: regresión; ya fallaba: sin base con la que comparar
+        self.assertEqual(regresiones, [('caso', 'error', None, 'HTTP 500')])
+
+    def test_sin_historial(self):
+        self.assertEqual(comparar({'caso': {'ms': 10}}, {'corridas': []}, 'sqlite', 1000), [])
+
+
+@tag('benchmark')
+@skipUnless(ACTIVOS, 'Benchmarks de rutas calientes: activar con BENCHMARK=1')
+class RutasCalientesBenchmarkTests(TestCase):
+    """
+    Mide los casos de ``main.benchmarks`` sobre una cartera sintética y falla
+    si alguno responde con error o empeora más de ``BENCHMARK_UMBRAL`` frente
+    al historial (serie ``<motor>-tests``). Solo con ``BENCHMARK=1``: depende
+    del tiempo de reloj de la máquina. Los PDF que genera el cobro van a un
+    MEDIA_ROOT temporal; el historial también, salvo que se indique
+    ``BENCHMARK_HISTORIAL``.
+    """
+
+    etiqueta = f'{connection.vendor}-tests'
+
+    @classmethod
+    def setUpClass(cls):
+        temporal = tempfile.TemporaryDirectory(prefix='benchmark-tests-')
+        cls.addClassCleanup(temporal.cleanup)
+        ajustes = override_settings(
+            MEDIA_ROOT=os.path.join(temporal.name, 'media'),
+            BENCHMARK_HISTORIAL=os.getenv('BENCHMARK_HISTORIAL') or os.path.join(temporal.name, 'historial.json'),
+        )
+        ajustes.enable()
+        cls.addClassCleanup(ajustes.disable)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_cartera_sintetica(TAMANO, semilla=42)
+        contexto = Contexto()
+        cls.resultados = {c.nombre: medir(c, contexto, repeticiones=3) for c in CASOS}
+        if GUARDAR:
+            guardar_corrida(nueva_corrida(cls.etiqueta, TAMANO, 42, cls.resultados))
+
+    def test_casos_sin_error(self):
+        for nombre, resultado in self.resultados.items():
+            with self.subTest(caso=nombre):
+                self.assertNotIn('error', resultado, resultado.get('error'))
+
+    def test_sin_regresiones(self):
+        historial = cargar_historial()
+        if GUARDAR:
+            # La corrida actual ya está al final del historial: comparar solo contra las anteriores
+            historial['corridas'] = historial['corridas'][:-1]
+        regresiones = comparar(self.resultados, historial, self.etiqueta, TAMANO)
+        self.assertEqual(regresiones, [], f'Regresiones sobre {settings.BENCHMARK_UMBRAL:.0%}: {regresiones}')
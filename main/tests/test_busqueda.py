@@ -0,0 +1,80 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from .. import busqueda
+from ..busqueda import buscar, fts_disponible, normalizar
+from ..models import Cliente
+
+
+class BusquedaClientesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.juan = Cliente.objects.create(
+            nombres='Juan José', apellidos='Pérez Núñez', cedula='1234567890', celular='3000000000', barrio='El Prado',
+        )
+        cls.maria = Cliente.objects.create(
+            nombres='María', apellidos='Gómez', cedula='9876543210', celular='3000000001', barrio='Centro',
+        )
+        cls.juana = Cliente.objects.create(
+            nombres='Juana', apellidos='Pérez', cedula='12345', celular='3000000002', barrio='Centro',
+        )
+
+    def _ids(self, q, **kwargs):
+        return set(buscar(Cliente.objects.all(), q, **kwargs).values_list('id', flat=True))
+
+    def test_normalizar(self):
+        self.assertEqual(normalizar('  José  Núñez-Peña '), 'jose nunez pena')
+        self.assertEqual(self.juan.texto_busqueda, 'juan jose perez nunez 1234567890 el prado')
+
+    def test_todas_las_palabras_sin_tildes_ni_mayusculas(self):
+        self.assertEqual(self._ids('JOSE perez'), {self.juan.id})
+        self.assertEqual(self._ids('pérez'), {self.juan.id, self.juana.id})
+        self.assertEqual(self._ids('centro gomez'), {self.maria.id})
+        self.assertEqual(self._ids('perez gomez'), set())
+        self.assertEqual(self._ids('  '), {self.juan.id, self.maria.id, self.juana.id})
+
+    def test_prefijos(self):
+        self.assertEqual(self._ids('jua pe'), {self.juan.id, self.juana.id})
+        self.assertEqual(self._ids('12345'), {self.juan.id, self.juana.id})
+        self.assertEqual(self._ids('987'), {self.maria.id})
+
+    def test_relevancia(self):
+        ordenados = list(buscar(Cliente.objects.order_by('id'), '12345', ordenar=True))
+        # Cédula exacta antes que prefijo de cédula
+        self.assertEqual(ordenados, [self.juana, self.juan])
+
+    def test_save_mantiene_texto_busqueda(self):
+        self.juana.nombres = 'Rosalba'
+        self.juana.save(update_fields=['nombres'])
+
+        self.assertEqual(Cliente.objects.get(id=self.juana.id).texto_busqueda, 'rosalba perez 12345 centro')
+        self.assertEqual(self._ids('rosalba'), {self.juana.id})
+        self.assertEqual(self._ids('juana'), set())
+
+    def test_extra(self):
+        self.assertEqual(self._ids('gomez', extra=Q(id=self.juan.id)), {self.maria.id, self.juan.id})
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 solo en SQLite')
+    def test_fts5_solo_por_prefijo(self):
+        self.assertTrue(fts_disponible())
+        # Una subcadena en medio de la palabra o de la cédula no es un prefijo: FTS5 no la encuentra
+        self.assertEqual(self._ids('uan'), set())
+        self.assertEqual(self._ids('4567'), set())
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm solo en PostgreSQL')
+    def test_trigramas_encuentran_subcadenas(self):
+        self.assertEqual(self._ids('uan'), {self.juan.id, self.juana.id})
+        self.assertEqual(self._ids('4567'), {self.juan.id})
+
+    def test_sin_fts_usa_like_sobre_texto_normalizado(self):
+        with mock.patch.object(busqueda, '_fts_disponible', False):
+            self.assertFalse(fts_disponible())
+            self.assertEqual(self._ids('JOSE perez'), {self.juan.id})
+            self.assertEqual(self._ids('jua pe'), {self.juan.id, self.juana.id})
+            # LIKE '%x%' también encuentra subcadenas, como los trigramas de PostgreSQL
+            self.assertEqual(self._ids('4567'), {self.juan.id})
+            self.assertEqual(self._ids('uan'), {self.juan.id, self.juana.id})
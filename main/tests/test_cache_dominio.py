@@ -0,0 +1,90 @@
+from datetime import date
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from .. import cache_dominio
+from ..models import Cobrador
+
+
+class _Revertir(Exception):
+    pass
+
+
+def _lecturas(espacio):
+    """(aciertos, fallos) acumulados del espacio."""
+    fila = next(f for f in cache_dominio.estadisticas() if f['espacio'] == espacio)
+    return fila['aciertos'], fila['fallos']
+
+
+# TransactionTestCase: dentro del atomic de TestCase todo espacio invalidado quedaría sucio
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cache-dominio-tests'}},
+)
+class RevocacionCacheDominioTests(TransactionTestCase):
+
+    def setUp(self):
+        self.grupo = Group.objects.create(name='COBRADOR')
+        self.usuario = User.objects.create_user('cobrador', password='clave')
+        self.usuario.groups.add(self.grupo)
+        self.cobrador = Cobrador.objects.create(
+            nombres='Ana', apellidos='Cobra', numero_documento='CACHE-0001', celular='3000000000',
+            direccion='Calle 1', fecha_ingreso=date(2026, 1, 1), usuario=self.usuario,
+        )
+        cache_dominio.reiniciar_estadisticas()
+
+    def _rol_cacheado(self):
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), 'COBRADOR')
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), 'COBRADOR')
+        self.assertEqual(_lecturas('rol'), (1, 1))
+
+    def test_quitar_grupo_al_usuario(self):
+        self._rol_cacheado()
+        self.usuario.groups.remove(self.grupo)
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+
+    def test_quitar_usuario_del_grupo(self):
+        self._rol_cacheado()
+        self.grupo.user_set.remove(self.usuario)
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+
+    def test_desactivar_cobrador(self):
+        self.assertEqual(cache_dominio.cobrador_de_usuario(self.usuario), self.cobrador)
+        self.assertEqual(cache_dominio.cobradores_activos(), [self.cobrador])
+
+        self.cobrador.activo = False
+        self.cobrador.save()
+
+        self.assertIsNone(cache_dominio.cobrador_de_usuario(self.usuario))
+        self.assertEqual(cache_dominio.cobradores_activos(), [])
+
+    def test_cambio_revertido(self):
+        self._rol_cacheado()
+        with self.assertRaises(_Revertir), transaction.atomic():
+            self.usuario.groups.remove(self.grupo)
+            # Dentro de la transacción se ve el cambio, leído de la BD y sin pasar por el caché
+            self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+            self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+            self.assertEqual(_lecturas('rol'), (1, 1))
+            raise _Revertir()
+
+        # Lo leído en la transacción revertida no quedó cacheado
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), 'COBRADOR')
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), 'COBRADOR')
+        self.assertEqual(_lecturas('rol'), (2, 2))
+
+    def test_lecturas_en_transaccion_confirmada(self):
+        self._rol_cacheado()
+        with transaction.atomic():
+            self.usuario.groups.remove(self.grupo)
+            self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+            self.assertEqual(_lecturas('rol'), (1, 1))
+            # Otros espacios siguen usando el caché
+            cache_dominio.cobradores_activos()
+            cache_dominio.cobradores_activos()
+            self.assertEqual(_lecturas('cobradores_activos'), (1, 1))
+
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+        self.assertEqual(cache_dominio.rol_de_usuario(self.usuario), '')
+        self.assertEqual(_lecturas('rol'), (2, 2))
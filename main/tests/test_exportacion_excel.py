@@ -0,0 +1,107 @@
+import datetime
+import tempfile
+from decimal import Decimal
+
+import openpyxl
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ..exportacion_excel import HojaExcel, escribir_libro_xlsx, hojas_recaudacion, hojas_tareas_pendientes
+from ..models import Cliente, Cobrador, CronogramaPago, Credito, Pago, TareaCobro
+
+
+def _reabrir(hojas):
+    """Escribe el libro y lo vuelve a abrir con openpyxl: {hoja: [filas como tuplas]}."""
+    with tempfile.TemporaryFile(suffix='.xlsx') as archivo:
+        conteo = escribir_libro_xlsx(hojas, archivo)
+        archivo.seek(0)
+        libro = openpyxl.load_workbook(archivo, read_only=True)
+        filas = {hoja.title: [tuple(f) for f in hoja.iter_rows(values_only=True)] for hoja in libro.worksheets}
+        libro.close()
+    return conteo, filas
+
+
+class EscribirLibroTests(SimpleTestCase):
+
+    def test_texto_hostil_y_numeros_no_finitos(self):
+        hostiles = [
+            ['ok\x0bvertical tab', 'nulo\x00aquí', 'campana\x07', '<b>&"\'</b>', 'línea\nnueva\tcon tab'],
+            ['\ufffe\uffff\ud800x', '\x1f', ' espacios ', 'ñandú – “comillas”', '=SUMA(A1)'],
+        ]
+        numeros = [
+            [1, None, 2.5, Decimal('40000.00'), True],
+            [float('nan'), float('inf'), Decimal('NaN'), Decimal('-Infinity'), 7],
+            [datetime.date(2026, 3, 10), datetime.datetime(2026, 3, 10, 8, 30), 0, False, -1],
+        ]
+        muchas = ([i, f'fila {i}'] for i in range(1234))
+
+        conteo, filas = _reabrir([
+            HojaExcel('Texto 01/03', ['A', 'B\x0b', 'C', 'D', 'E'], hostiles),
+            HojaExcel('Números', ['A', 'B', 'C', 'D', 'E'], numeros),
+            HojaExcel('Muchas filas', ['n', 'texto'], muchas),
+        ])
+
+        self.assertEqual(conteo, {'Texto 01 03': 2, 'Números': 3, 'Muchas filas': 1234})
+        self.assertEqual(list(filas), ['Texto 01 03', 'Números', 'Muchas filas'])
+        self.assertEqual(filas['Texto 01 03'], [
+            ('A', 'B', 'C', 'D', 'E'),
+            ('okvertical tab', 'nuloaquí', 'campana', '<b>&"\'</b>', 'línea\nnueva\tcon tab'),
+            ('x', None, ' espacios ', 'ñandú – “comillas”', '=SUMA(A1)'),
+        ])
+        self.assertEqual(filas['Números'][1:], [
+            (1, None, 2.5, 40000, True),
+            (None, None, None, None, 7),
+            ('2026-03-10', '2026-03-10T08:30:00', 0, False, -1),
+        ])
+        self.assertEqual(len(filas['Muchas filas']), 1235)
+        self.assertEqual(filas['Muchas filas'][-1], (1233, 'fila 1233'))
+
+    def test_libro_sin_hojas(self):
+        conteo, filas = _reabrir([])
+        self.assertEqual(conteo, {'Hoja1': 0})
+
+
+class ExportacionesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cobrador = Cobrador.objects.create(
+            nombres='Cobra\x0bdor', apellidos='Uno', numero_documento='EXP-0001', celular='3000000000',
+            direccion='Calle 1', fecha_ingreso=datetime.date(2026, 1, 1), meta_diaria=Decimal('100000'),
+        )
+        cliente = Cliente.objects.create(
+            nombres='Ana\x00', apellidos='Pérez', cedula='EXP-1', celular='3000000001',
+        )
+        credito = Credito.objects.create(
+            cliente=cliente, cobrador=cls.cobrador, monto=Decimal('100000'), tasa_interes=Decimal('10'),
+            tipo_plazo='DIARIO', cantidad_cuotas=2, valor_cuota=Decimal('55000'), monto_total=Decimal('110000'),
+            estado='DESEMBOLSADO', fecha_desembolso=timezone.now(),
+        )
+        cls.cuota = CronogramaPago.objects.create(
+            credito=credito, numero_cuota=1, fecha_vencimiento=datetime.date(2026, 3, 9), monto_cuota=Decimal('55000'),
+        )
+        Pago.objects.bulk_create([
+            Pago(credito=credito, cuota=cls.cuota, monto=Decimal('55000'), numero_cuota=1),
+            Pago(credito=credito, monto=Decimal('20000'), numero_cuota=2),
+        ])
+        TareaCobro.objects.create(cobrador=cls.cobrador, cuota=cls.cuota, fecha_asignacion=datetime.date(2026, 3, 7))
+
+    def test_recaudacion(self):
+        hoy = timezone.localdate()
+        conteo, filas = _reabrir(hojas_recaudacion(hoy, hoy))
+
+        self.assertEqual(conteo, {'Resumen por cobrador': 1, 'Detalle pagos': 2})
+        self.assertEqual(filas['Resumen por cobrador'][1], ('Cobrador Uno', 75000, 2, 75.0))
+        detalle = filas['Detalle pagos']
+        self.assertEqual(len(detalle), 3)
+        self.assertEqual(sorted(f[6] for f in detalle[1:]), [20000, 55000])
+        self.assertEqual({f[2] for f in detalle[1:]}, {'Ana Pérez'})
+
+    def test_tareas_pendientes(self):
+        conteo, filas = _reabrir(hojas_tareas_pendientes(TareaCobro.objects.all(), datetime.date(2026, 3, 10)))
+
+        self.assertEqual(conteo, {'Tareas pendientes': 1})
+        self.assertEqual(
+            filas['Tareas pendientes'][1],
+            ('07/03/2026', 'Cobrador Uno', 'Ana Pérez', self.cuota.credito_id, 1, 55000, 3),
+        )
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from ..imagenes import url_derivado
+from ..models import Cliente
+
+
+class DerivadosVersionadosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('gerente', 'gerente@example.com', 'clave')
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory(prefix='imagenes-tests-')
+        self.addCleanup(temporal.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=temporal.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.force_login(self.usuario)
+
+    def _cliente_con_foto(self, cedula, color, mtime_ns):
+        cliente = Cliente.objects.create(nombres='Foto', apellidos='Prueba', cedula=cedula, celular='3000000000')
+        ruta = os.path.join(default_storage.location, 'clientes/rostros/foto.png')
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        Image.new('RGB', (40, 30), color).save(ruta)
+        os.utime(ruta, ns=(mtime_ns, mtime_ns))
+        cliente.foto_rostro.name = 'clientes/rostros/foto.png'
+        return cliente
+
+    def _color(self, respuesta):
+        contenido = b''.join(respuesta.streaming_content)
+        with Image.open(BytesIO(contenido)) as img:
+            return img.convert('RGB').getpixel((0, 0))
+
+    def test_nombre_reutilizado_cambia_la_url(self):
+        subida = time.time_ns() - 3600 * 10**9
+        primero = self._cliente_con_foto('IMG-1', (255, 0, 0), subida)
+        url_vieja = url_derivado(primero.foto_rostro, 'thumb')
+        self.assertEqual(url_vieja, f'/media/clientes/rostros/foto.png__thumb.jpg?v={subida:x}')
+
+        respuesta = self.client.get(url_vieja)
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=31536000, immutable')
+        self.assertGreater(self._color(respuesta)[0], 200)
+
+        # La foto se borra y otro cliente recibe el mismo nombre
+        segundo = self._cliente_con_foto('IMG-2', (0, 0, 255), time.time_ns())
+        url_nueva = url_derivado(segundo.foto_rostro, 'thumb')
+        self.assertNotEqual(url_nueva, url_vieja)
+
+        respuesta = self.client.get(url_nueva)
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=31536000, immutable')
+        self.assertGreater(self._color(respuesta)[2], 200)
+
+        # La URL vieja ya no es inmutable: se revalida y entrega la foto actual
+        respuesta = self.client.get(url_vieja)
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=3600')
+        self.assertGreater(self._color(respuesta)[2], 200)
+
+    def test_sin_version_revalida(self):
+        cliente = self._cliente_con_foto('IMG-3', (0, 255, 0), time.time_ns())
+        url = url_derivado(cliente.foto_rostro, 'card').split('?')[0]
+
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=3600')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+
+    def test_sin_original_no_lleva_version(self):
+        cliente = Cliente(foto_rostro='clientes/rostros/no-existe.png')
+        self.assertEqual(url_derivado(cliente.foto_rostro, 'full'), '/media/clientes/rostros/no-existe.png__full.jpg')
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from ..bloqueos import bloqueo_asesor
+from ..invariantes import verificar_invariantes
+from ..models import Cliente, Credito, EjecucionInvariantes, ViolacionInvariante
+
+
+class VerificarInvariantesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cliente = Cliente.objects.create(nombres='Ana', apellidos='Inv', cedula='INV-0001', celular='3000000000')
+        cls.credito = Credito.objects.create(
+            cliente=cliente, monto=Decimal('100000'), tasa_interes=Decimal('10'), tipo_plazo='DIARIO',
+            cantidad_cuotas=1, valor_cuota=Decimal('110000'), monto_total=Decimal('110000'),
+        )
+
+    def test_omite_si_otra_corrida_sigue_en_curso(self):
+        with bloqueo_asesor('verificar_invariantes', espera=0):
+            self.assertIsNone(verificar_invariantes(completa=True))
+        self.assertFalse(EjecucionInvariantes.objects.exists())
+
+        self.assertEqual(verificar_invariantes(completa=True).creditos_revisados, 1)
+
+    def test_una_violacion_abierta_por_invariante_y_credito(self):
+        ahora = timezone.now()
+        ViolacionInvariante.objects.create(invariante='x', credito=self.credito, ultima_deteccion=ahora)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ViolacionInvariante.objects.create(invariante='x', credito=self.credito, ultima_deteccion=ahora)
+
+        # Resuelta, puede volver a abrirse
+        ViolacionInvariante.objects.update(resuelta_en=ahora)
+        ViolacionInvariante.objects.create(invariante='x', credito=self.credito, ultima_deteccion=ahora)
+        self.assertEqual(ViolacionInvariante.objects.filter(resuelta_en__isnull=True).count(), 1)
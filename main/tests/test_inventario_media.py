@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from ..inventario_media import generar_inventario
+from ..models import InventarioMedia
+
+
+class InventarioIncrementalTests(TestCase):
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory(prefix='inventario-tests-')
+        self.addCleanup(temporal.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=temporal.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.raiz = temporal.name
+        self._escribir('clientes/rostros/a.jpg', 10)
+        self._escribir('clientes/cedulas/b.jpg', 20)
+        self._escribir('raiz.txt', 5)
+
+    def _escribir(self, relativo, tamano):
+        ruta = os.path.join(self.raiz, relativo)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'wb') as f:
+            f.write(b'x' * tamano)
+
+    def _marcar_bytes(self, directorio, bytes_):
+        # Altera el inventario anterior: si el directorio se reusa, el valor falso aparece en el nuevo
+        anterior = InventarioMedia.objects.order_by('-fecha', '-id').first()
+        anterior.por_directorio[directorio]['bytes'] = bytes_
+        anterior.save(update_fields=['por_directorio'])
+
+    def test_reusa_directorios_sin_cambios(self):
+        inventario, reusados = generar_inventario()
+        self.assertEqual((inventario.total_archivos, inventario.total_bytes, reusados), (3, 35, 0))
+
+        self._marcar_bytes('clientes/rostros', 999)
+        inventario, reusados = generar_inventario()
+        self.assertEqual(reusados, 3)
+        self.assertEqual(inventario.por_directorio['clientes/rostros']['bytes'], 999)
+
+    def test_directorio_cambiado_se_vuelve_a_medir(self):
+        generar_inventario()
+        self._marcar_bytes('clientes/rostros', 999)
+        self._marcar_bytes('clientes/cedulas', 999)
+        self._escribir('clientes/rostros/c.jpg', 7)
+        os.utime(os.path.join(self.raiz, 'clientes/rostros'), ns=(0, 0))
+
+        inventario, reusados = generar_inventario()
+        self.assertEqual(reusados, 2)
+        self.assertEqual(inventario.por_directorio['clientes/rostros'], {
+            'archivos': 2, 'bytes': 17, 'mtime': 0,
+        })
+        self.assertEqual(inventario.por_directorio['clientes/cedulas']['bytes'], 999)
+
+    def test_completo_no_reusa(self):
+        generar_inventario()
+        self._marcar_bytes('clientes/rostros', 999)
+
+        inventario, reusados = generar_inventario(completo=True)
+        self.assertEqual((inventario.total_bytes, reusados), (35, 0))
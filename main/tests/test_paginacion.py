@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.paginator import Page
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Cliente
+from ..paginacion import VIGENCIA_CURSOR, PaginaKeyset, paginar_keyset
+
+ORDEN = ('-fecha_registro', '-id')
+
+
+class PaginarKeysetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(11):
+            Cliente.objects.create(
+                nombres=f'Cliente {i:02d}', apellidos='Cursor', cedula=f'CUR-{i:04d}', celular='3000000000',
+            )
+        # Empates en la clave de orden: grupos de clientes con la misma fecha_registro
+        base = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        for i, cliente in enumerate(Cliente.objects.order_by('id')):
+            Cliente.objects.filter(id=cliente.id).update(fecha_registro=base + timedelta(days=i // 4))
+        cls.esperado = list(Cliente.objects.order_by(*ORDEN).values_list('id', flat=True))
+
+    def _pagina(self, token):
+        return paginar_keyset(Cliente.objects.all(), token, 3, ORDEN)
+
+    def test_adelante_y_atras_con_empates(self):
+        paginas = [self._pagina(None)]
+        while paginas[-1].has_next():
+            paginas.append(self._pagina(paginas[-1].token_siguiente))
+        ids = [[c.id for c in p] for p in paginas]
+
+        self.assertEqual([i for pagina in ids for i in pagina], self.esperado)
+        self.assertEqual([len(p) for p in ids], [3, 3, 3, 2])
+        self.assertFalse(paginas[0].has_previous())
+
+        # De vuelta desde la última: las mismas páginas, sin saltos ni repetidos
+        pagina = paginas[-1]
+        atras = [ids[-1]]
+        while pagina.has_previous():
+            pagina = self._pagina(pagina.token_anterior)
+            atras.append([c.id for c in pagina])
+        self.assertEqual(atras[::-1], ids)
+
+    def test_token_alterado_vuelve_a_la_primera(self):
+        segunda = self._pagina(self._pagina(None).token_siguiente)
+        token = segunda.token_siguiente
+        for alterado in (token[:-2] + ('A' if token[-2] != 'A' else 'B') + token[-1], 'basura', '::'):
+            with self.subTest(token=alterado):
+                pagina = self._pagina(alterado)
+                self.assertEqual([c.id for c in pagina], self.esperado[:3])
+                self.assertFalse(pagina.has_previous())
+
+    def test_token_vencido_vuelve_a_la_primera(self):
+        token = self._pagina(None).token_siguiente
+        self.assertEqual([c.id for c in self._pagina(token)], self.esperado[3:6])
+
+        despues = time.time() + VIGENCIA_CURSOR + 1
+        with mock.patch('django.core.signing.time.time', return_value=despues):
+            pagina = self._pagina(token)
+        self.assertEqual([c.id for c in pagina], self.esperado[:3])
+
+    def test_token_de_otro_listado(self):
+        # Mismo firmante, otras columnas de orden: no es válido aquí
+        token = paginar_keyset(Cliente.objects.all(), None, 3, ('-id',)).token_siguiente
+        self.assertEqual([c.id for c in self._pagina(token)], self.esperado[:3])
+
+
+class ListadoClientesPaginacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('gerente', 'gerente@example.com', 'clave')
+        for i in range(12):
+            Cliente.objects.create(
+                nombres=f'Pedro {i:02d}', apellidos='Listado', cedula=f'LIS-{i:04d}', celular='3000000000',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_sin_busqueda_usa_cursor(self):
+        respuesta = self.client.get(reverse('clientes'))
+        self.assertIsInstance(respuesta.context['clientes'], PaginaKeyset)
+        self.assertTrue(respuesta.context['clientes'].has_next())
+
+    def test_con_busqueda_usa_paginator(self):
+        respuesta = self.client.get(reverse('clientes'), {'q': 'pedro', 'page': 2})
+        clientes = respuesta.context['clientes']
+        self.assertIsInstance(clientes, Page)
+        self.assertEqual((clientes.number, clientes.paginator.count, len(clientes)), (2, 12, 2))
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import pdf_cache
+from ..models import Cliente, Credito
+
+
+class AbrirPdfTests(SimpleTestCase):
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory(prefix='pdf-cache-tests-')
+        self.addCleanup(temporal.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=temporal.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.generados = 0
+
+    def generar(self):
+        self.generados += 1
+        return BytesIO(b'%PDF-' + str(self.generados).encode())
+
+    def test_reutiliza_y_reemplaza_versiones(self):
+        with pdf_cache.abrir_pdf(7, 'recibo', 'v1', self.generar) as f:
+            self.assertEqual(f.read(), b'%PDF-1')
+        with pdf_cache.abrir_pdf(7, 'recibo', 'v1', self.generar) as f:
+            self.assertEqual(f.read(), b'%PDF-1')
+        with pdf_cache.abrir_pdf(7, 'recibo', 'v2', self.generar) as f:
+            self.assertEqual(f.read(), b'%PDF-2')
+        self.assertEqual(os.listdir(pdf_cache._directorio_credito(7)), ['recibo_v2.pdf'])
+
+    def test_invalidacion_con_el_archivo_abierto(self):
+        f = pdf_cache.abrir_pdf(7, 'recibo', 'v1', self.generar)
+        pdf_cache.invalidar_credito(7)
+        with f:
+            self.assertEqual(f.read(), b'%PDF-1')
+
+    def test_invalidacion_antes_de_abrir(self):
+        abrir = open
+
+        def abrir_tras_invalidar(ruta, *args, **kwargs):
+            # Otro worker borra la carpeta justo después de escribir el PDF
+            pdf_cache.invalidar_credito(7)
+            return abrir(ruta, *args, **kwargs)
+
+        with mock.patch.object(pdf_cache, 'open', abrir_tras_invalidar, create=True):
+            with pdf_cache.abrir_pdf(7, 'recibo', 'v1', self.generar) as f:
+                self.assertEqual(f.read(), b'%PDF-1')
+        self.assertEqual(self.generados, 1)
+
+
+class InvalidacionPorSenalesTests(TestCase):
+
+    def test_invalida_al_confirmar(self):
+        cliente = Cliente.objects.create(nombres='Ana', apellidos='Pdf', cedula='PDF-0001', celular='3000000000')
+        credito = Credito.objects.create(
+            cliente=cliente, monto=Decimal('100000'), tasa_interes=Decimal('10'), tipo_plazo='DIARIO',
+            cantidad_cuotas=1, valor_cuota=Decimal('110000'), monto_total=Decimal('110000'),
+        )
+        with mock.patch('main.signals.invalidar_credito') as invalidar:
+            with self.captureOnCommitCallbacks(execute=True):
+                credito.estado = 'APROBADO'
+                credito.save()
+                cliente.celular = '3000000001'
+                cliente.save()
+                invalidar.assert_not_called()
+        self.assertEqual([c.args for c in invalidar.call_args_list], [(credito.id,), (credito.id,)])
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+
+from .. import perfilado
+from ..models import MuestraRendimiento
+
+
+def _muestra(dias):
+    return MuestraRendimiento(
+        fecha=timezone.now() - timedelta(days=dias), vista='dashboard', metodo='GET', estado=200, duracion_ms=10,
+    )
+
+
+@override_settings(PERFILADO_ACTIVO=True, PERFILADO_RETENCION_DIAS=7)
+class PerfiladoTests(TestCase):
+
+    def setUp(self):
+        perfilado._pendientes.clear()
+        self.addCleanup(perfilado._pendientes.clear)
+
+    def test_la_peticion_no_escribe_en_la_bd(self):
+        request = RequestFactory().get('/dashboard/')
+        request.resolver_match = resolve('/dashboard/')
+        middleware = perfilado.PerfiladoMiddleware(lambda r: HttpResponse('ok'))
+
+        with mock.patch.object(perfilado, '_iniciar_guardado') as iniciar, \
+                CaptureQueriesContext(connection) as consultas:
+            middleware(request)
+
+        self.assertEqual(len(consultas), 0)
+        iniciar.assert_called_once_with()
+        self.assertEqual([m['vista'] for m in perfilado._pendientes], ['dashboard'])
+
+        self.assertEqual(perfilado.guardar_pendientes(forzar=True), 1)
+        self.assertEqual(MuestraRendimiento.objects.count(), 1)
+
+    def test_guardar_no_purga(self):
+        MuestraRendimiento.objects.bulk_create([_muestra(30)])
+        perfilado._pendientes.append(perfilado._muestra(
+            mock.Mock(resolver_match=mock.Mock(view_name='clientes'), method='GET'),
+            HttpResponse(), 5.0, [], 5,
+        ))
+
+        perfilado.guardar_pendientes(forzar=True)
+        self.assertEqual(MuestraRendimiento.objects.count(), 2)
+
+    def test_perf_report_purga_las_vencidas(self):
+        MuestraRendimiento.objects.bulk_create([_muestra(30), _muestra(8), _muestra(1)])
+        salida = StringIO()
+
+        call_command('perf_report', solo_purgar=True, stdout=salida)
+
+        self.assertIn('2 muestras', salida.getvalue())
+        self.assertEqual(MuestraRendimiento.objects.count(), 1)
+
+    def test_un_hilo_de_guardado_por_proceso(self):
+        with mock.patch.object(perfilado, '_hilo_pid', [None]), \
+                mock.patch.object(perfilado.threading, 'Thread') as hilo:
+            perfilado._iniciar_guardado()
+            perfilado._iniciar_guardado()
+        hilo.assert_called_once()
+        hilo.return_value.start.assert_called_once_with()
@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Cliente, CronogramaPago, Credito, Recordatorio
+from ..recordatorios import (
+    CanalEmail, despachar_recordatorios, en_horario_silencio, planificar_recordatorios,
+)
+
+FECHA = date(2026, 3, 10)
+BOGOTA = ZoneInfo('America/Bogota')
+
+
+@override_settings(
+    RECORDATORIOS_CANALES=['EMAIL'],
+    RECORDATORIOS_DIAS_ANTES=[1],
+    RECORDATORIOS_DIAS_VENCIDO=[1],
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class RecordatoriosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clientes = []
+        for i in range(3):
+            cliente = Cliente.objects.create(
+                nombres=f'Cliente {i}', apellidos='Prueba', cedula=f'REC-{i:04d}', celular=f'300000000{i}',
+                email=f'cliente{i}@example.com',
+            )
+            credito = Credito.objects.create(
+                cliente=cliente, monto=Decimal('300000'), tasa_interes=Decimal('10'), tipo_plazo='DIARIO',
+                cantidad_cuotas=3, valor_cuota=Decimal('110000'), monto_total=Decimal('330000'),
+                estado='DESEMBOLSADO', fecha_desembolso=timezone.now(),
+            )
+            # Vencida ayer, vence hoy y vence mañana: tres cuotas, un solo recordatorio
+            for numero, dias in enumerate((-1, 0, 1), start=1):
+                CronogramaPago.objects.create(
+                    credito=credito, numero_cuota=numero, fecha_vencimiento=FECHA + timedelta(days=dias),
+                    monto_cuota=credito.valor_cuota,
+                )
+            cls.clientes.append(cliente)
+
+    def test_un_recordatorio_por_cliente_y_dia(self):
+        primero = planificar_recordatorios(FECHA)
+        segundo = planificar_recordatorios(FECHA)
+
+        self.assertEqual(primero['creados'], 3)
+        self.assertEqual(segundo, {'creados': 0, 'existentes': 3, 'sin_destino': 0})
+        self.assertEqual(Recordatorio.objects.count(), 3)
+        recordatorio = Recordatorio.objects.get(cliente=self.clientes[0])
+        self.assertEqual(recordatorio.tipo, 'VENCIDO')
+        self.assertEqual(recordatorio.cuotas.count(), 3)
+
+    def test_segundo_despacho_no_envia_nada(self):
+        planificar_recordatorios(FECHA)
+        primero = despachar_recordatorios(fecha=FECHA)
+        segundo = despachar_recordatorios(fecha=FECHA)
+
+        self.assertEqual(primero['enviados'], 3)
+        self.assertEqual(segundo['enviados'], 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(Recordatorio.objects.values_list('estado', 'intentos')), [('ENVIADO', 1)] * 3,
+        )
+
+    def test_despacho_con_varias_conexiones(self):
+        planificar_recordatorios(FECHA)
+        canales = [CanalEmail(tamano_lote=1, conexiones=2)]
+
+        self.assertEqual(despachar_recordatorios(canales, FECHA)['enviados'], 3)
+        self.assertEqual(despachar_recordatorios(canales, FECHA)['enviados'], 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_reclamados_no_se_reenvian(self):
+        planificar_recordatorios(FECHA)
+        # Otro despacho ya reclamó este y no terminó
+        Recordatorio.objects.filter(cliente=self.clientes[0]).update(estado='ENVIANDO', intentos=1)
+
+        resumen = despachar_recordatorios(fecha=FECHA)
+
+        self.assertEqual(resumen['enviados'], 2)
+        self.assertNotIn('cliente0@example.com', [m.to[0] for m in mail.outbox])
+        # Al día siguiente se descarta en vez de reintentarse
+        resumen = despachar_recordatorios(fecha=FECHA + timedelta(days=1))
+        self.assertEqual(resumen['vencidos'], 1)
+        self.assertEqual(Recordatorio.objects.get(cliente=self.clientes[0]).estado, 'OMITIDO')
+
+    def test_resultado_se_guarda_por_recordatorio(self):
+        planificar_recordatorios(FECHA)
+        estados = []
+
+        def enviar(canal, recordatorios, al_enviar=None):
+            # Cuando se envía el segundo, el primero ya quedó guardado
+            for r in recordatorios:
+                estados.append(list(Recordatorio.objects.order_by('id').values_list('estado', flat=True)))
+                al_enviar(r.id, None)
+            return {r.id: None for r in recordatorios}
+
+        with mock.patch.object(CanalEmail, 'enviar', enviar):
+            despachar_recordatorios(fecha=FECHA)
+
+        self.assertEqual(estados, [
+            ['ENVIANDO', 'ENVIANDO', 'ENVIANDO'],
+            ['ENVIADO', 'ENVIANDO', 'ENVIANDO'],
+            ['ENVIADO', 'ENVIADO', 'ENVIANDO'],
+        ])
+
+    def test_fallido_con_intentos_se_reintenta(self):
+        planificar_recordatorios(FECHA)
+        Recordatorio.objects.update(estado='FALLIDO', intentos=1, ultimo_error='SMTP caído')
+
+        self.assertEqual(despachar_recordatorios(fecha=FECHA)['enviados'], 3)
+        self.assertEqual(set(Recordatorio.objects.values_list('intentos', flat=True)), {2})
+
+    @override_settings(RECORDATORIOS_HORARIO_SILENCIO=('21:00', '07:00'), RECORDATORIOS_ZONA_HORARIA='America/Bogota')
+    def test_horario_silencio(self):
+        self.assertTrue(en_horario_silencio(datetime(2026, 3, 10, 22, 30, tzinfo=BOGOTA)))
+        self.assertTrue(en_horario_silencio(datetime(2026, 3, 10, 6, 59, tzinfo=BOGOTA)))
+        self.assertFalse(en_horario_silencio(datetime(2026, 3, 10, 7, 0, tzinfo=BOGOTA)))
+        self.assertFalse(en_horario_silencio(datetime(2026, 3, 10, 20, 59, tzinfo=BOGOTA)))
+        # Se compara en la zona configurada: 03:00 UTC son las 22:00 en Bogotá
+        self.assertTrue(en_horario_silencio(datetime(2026, 3, 11, 3, 0, tzinfo=ZoneInfo('UTC'))))
+
+    @override_settings(RECORDATORIOS_HORARIO_SILENCIO=('21:00', '07:00'), RECORDATORIOS_ZONA_HORARIA='America/Bogota')
+    def test_comando_respeta_horario_silencio(self):
+        noche = datetime(2026, 3, 10, 23, 0, tzinfo=BOGOTA)
+        salida = StringIO()
+        with mock.patch('django.utils.timezone.now', return_value=noche):
+            call_command('procesar_recordatorios', fecha=FECHA.isoformat(), stdout=salida)
+
+        self.assertIn('Horario de silencio', salida.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(set(Recordatorio.objects.values_list('estado', flat=True)), {'PENDIENTE'})
+
+        with mock.patch('django.utils.timezone.now', return_value=noche):
+            call_command('procesar_recordatorios', fecha=FECHA.isoformat(), forzar=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Cliente, Ruta
+
+
+class ListaRutasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('gerente', 'gerente@example.com', 'clave')
+        for i, barrio in enumerate(['Centro', 'Centro', 'Norte', 'Sur']):
+            Cliente.objects.create(
+                nombres=f'Cliente {i}', apellidos='Ruta', cedula=f'RUTA-{i:04d}', celular='3000000000', barrio=barrio,
+            )
+
+    def _consultas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('rutas'))
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, len(consultas)
+
+    def test_totales_sin_consultas_por_ruta(self):
+        self.client.force_login(self.usuario)
+        Ruta.objects.create(nombre='A', barrios='Centro, Norte')
+        Ruta.objects.create(nombre='B', barrios='Sur', activa=False)
+        respuesta, base = self._consultas()
+
+        rutas = respuesta.context['rutas']
+        self.assertEqual([(r.nombre, r.total_clientes()) for r in rutas], [('A', 3), ('B', 1)])
+        self.assertEqual((respuesta.context['total_rutas'], respuesta.context['rutas_activas']), (2, 1))
+
+        for i in range(5):
+            Ruta.objects.create(nombre=f'C{i}', barrios='Centro')
+        self.assertEqual(self._consultas()[1], base)
@@ -1,6 +1,16 @@
 from django.urls import path
 from . import views
+from . import clientes_views
+from . import creditos_views
+from . import pagos_views
+from . import documentos_views
+from . import cobradores_views
+from . import cobro_views
+from . import cartera_views
+from . import usuarios_views
+from . import reportes_views
 from . import valorizador_views
+from . import rendimiento_views
 
 urlpatterns = [
     path('', views.login_view, name='login'),
@@ -11,110 +21,113 @@ urlpatterns = [
     path('dashboard-negocio/', views.dashboard_negocio, name='dashboard_negocio'),
     
     # Clientes
-    path('clientes/', views.clientes, name='clientes'),
-    path('exportar-clientes-excel/', views.exportar_clientes_excel, name='exportar_clientes_excel'),
-    path('nuevo-cliente/', views.nuevo_cliente, name='nuevo_cliente'),
-    path('editar-cliente/<int:cliente_id>/', views.editar_cliente, name='editar_cliente'),
-    path('eliminar-cliente/<int:cliente_id>/', views.eliminar_cliente, name='eliminar_cliente'),
-    path('reactivar-cliente/<int:cliente_id>/', views.reactivar_cliente, name='reactivar_cliente'),
-    path('detalle-cliente/<int:cliente_id>/', views.detalle_cliente, name='detalle_cliente'),
-    path('buscar-cliente/', views.buscar_cliente, name='buscar_cliente'),
-    path('habeas-data/solicitar/', views.solicitar_habeas_data, name='solicitar_habeas_data'),
-    path('habeas-data/validar/', views.validar_otp_habeas_data, name='validar_otp_habeas_data'),
-    path('habeas-data/descargar/<str:tipo>/<int:objeto_id>/', views.descargar_habeas_data, name='descargar_habeas_data'),
-    path('habeas-data/regenerar/', views.regenerar_habeas_data, name='regenerar_habeas_data'),
-    path('renovacion/solicitar/', views.solicitar_firma_renovacion, name='solicitar_firma_renovacion'),
-    path('renovacion/validar/', views.validar_otp_renovacion_view, name='validar_otp_renovacion'),
-    path('renovacion/descargar/<int:credito_id>/', views.descargar_renovacion, name='descargar_renovacion'),
-    path('retanqueo/credito/<int:credito_id>/', views.retanqueo_credito, name='retanqueo_credito'),
-    path('retanqueo-documento/solicitar/', views.solicitar_firma_retanqueo, name='solicitar_firma_retanqueo'),
-    path('retanqueo-documento/validar/', views.validar_otp_retanqueo_view, name='validar_otp_retanqueo'),
-    path('retanqueo-documento/descargar/<int:credito_id>/', views.descargar_retanqueo, name='descargar_retanqueo'),
+    path('clientes/', clientes_views.clientes, name='clientes'),
+    path('exportar-clientes-excel/', clientes_views.exportar_clientes_excel, name='exportar_clientes_excel'),
+    path('nuevo-cliente/', clientes_views.nuevo_cliente, name='nuevo_cliente'),
+    path('editar-cliente/<int:cliente_id>/', clientes_views.editar_cliente, name='editar_cliente'),
+    path('eliminar-cliente/<int:cliente_id>/', clientes_views.eliminar_cliente, name='eliminar_cliente'),
+    path('reactivar-cliente/<int:cliente_id>/', clientes_views.reactivar_cliente, name='reactivar_cliente'),
+    path('detalle-cliente/<int:cliente_id>/', clientes_views.detalle_cliente, name='detalle_cliente'),
+    path('buscar-cliente/', clientes_views.buscar_cliente, name='buscar_cliente'),
+    path('habeas-data/solicitar/', documentos_views.solicitar_habeas_data, name='solicitar_habeas_data'),
+    path('habeas-data/validar/', documentos_views.validar_otp_habeas_data, name='validar_otp_habeas_data'),
+    path('habeas-data/descargar/<str:tipo>/<int:objeto_id>/', documentos_views.descargar_habeas_data, name='descargar_habeas_data'),
+    path('habeas-data/regenerar/', documentos_views.regenerar_habeas_data, name='regenerar_habeas_data'),
+    path('renovacion/solicitar/', documentos_views.solicitar_firma_renovacion, name='solicitar_firma_renovacion'),
+    path('renovacion/validar/', documentos_views.validar_otp_renovacion_view, name='validar_otp_renovacion'),
+    path('renovacion/descargar/<int:credito_id>/', documentos_views.descargar_renovacion, name='descargar_renovacion'),
+    path('retanqueo/credito/<int:credito_id>/', creditos_views.retanqueo_credito, name='retanqueo_credito'),
+    path('retanqueo-documento/solicitar/', documentos_views.solicitar_firma_retanqueo, name='solicitar_firma_retanqueo'),
+    path('retanqueo-documento/validar/', documentos_views.validar_otp_retanqueo_view, name='validar_otp_retanqueo'),
+    path('retanqueo-documento/descargar/<int:credito_id>/', documentos_views.descargar_retanqueo, name='descargar_retanqueo'),
 
     # Codeudores
-    path('nuevo-codeudor/<int:cliente_id>/', views.nuevo_codeudor, name='nuevo_codeudor'),
-    path('editar-codeudor/<int:codeudor_id>/', views.editar_codeudor, name='editar_codeudor'),
-    path('eliminar-codeudor/<int:codeudor_id>/', views.eliminar_codeudor, name='eliminar_codeudor'),
+    path('nuevo-codeudor/<int:cliente_id>/', clientes_views.nuevo_codeudor, name='nuevo_codeudor'),
+    path('editar-codeudor/<int:codeudor_id>/', clientes_views.editar_codeudor, name='editar_codeudor'),
+    path('eliminar-codeudor/<int:codeudor_id>/', clientes_views.eliminar_codeudor, name='eliminar_codeudor'),
     
     # Créditos
-    path('creditos/', views.creditos, name='creditos'),
-    path('exportar-creditos-excel/', views.exportar_creditos_excel, name='exportar_creditos_excel'),
-    path('nuevo-credito/', views.nuevo_credito, name='nuevo_credito'),
-    path('editar-credito/<int:credito_id>/', views.editar_credito, name='editar_credito'),
-    path('aprobar-credito/<int:credito_id>/', views.aprobar_credito, name='aprobar_credito'),
-    path('rechazar-credito/<int:credito_id>/', views.rechazar_credito, name='rechazar_credito'),
-    path('desembolsar-credito/<int:credito_id>/', views.desembolsar_credito, name='desembolsar_credito'),
-    path('pagare/solicitar/', views.solicitar_firma_pagare, name='solicitar_firma_pagare'),
-    path('pagare/validar/', views.validar_otp_pagare_view, name='validar_otp_pagare'),
-    path('pagare/descargar/<int:credito_id>/', views.descargar_pagare, name='descargar_pagare'),
-    path('pagare/regenerar/', views.regenerar_pagare, name='regenerar_pagare'),
-    path('buscar-cliente-credito/', views.buscar_cliente_credito, name='buscar_cliente_credito'),
-    path('obtener-datos-credito/<int:credito_id>/', views.obtener_datos_credito, name='obtener_datos_credito'),
-    path('obtener-pagos-credito/<int:credito_id>/', views.obtener_pagos_credito, name='obtener_pagos_credito'),
-    path('generar-pdf-cronograma/<int:credito_id>/', views.generar_pdf_cronograma, name='generar_pdf_cronograma'),
-    path('resumen-credito/<int:credito_id>/', views.resumen_credito_json, name='resumen_credito_json'),
+    path('creditos/', creditos_views.creditos, name='creditos'),
+    path('exportar-creditos-excel/', creditos_views.exportar_creditos_excel, name='exportar_creditos_excel'),
+    path('nuevo-credito/', creditos_views.nuevo_credito, name='nuevo_credito'),
+    path('editar-credito/<int:credito_id>/', creditos_views.editar_credito, name='editar_credito'),
+    path('aprobar-credito/<int:credito_id>/', creditos_views.aprobar_credito, name='aprobar_credito'),
+    path('rechazar-credito/<int:credito_id>/', creditos_views.rechazar_credito, name='rechazar_credito'),
+    path('desembolsar-credito/<int:credito_id>/', creditos_views.desembolsar_credito, name='desembolsar_credito'),
+    path('pagare/solicitar/', documentos_views.solicitar_firma_pagare, name='solicitar_firma_pagare'),
+    path('pagare/validar/', documentos_views.validar_otp_pagare_view, name='validar_otp_pagare'),
+    path('pagare/descargar/<int:credito_id>/', documentos_views.descargar_pagare, name='descargar_pagare'),
+    path('pagare/regenerar/', documentos_views.regenerar_pagare, name='regenerar_pagare'),
+    path('buscar-cliente-credito/', clientes_views.buscar_cliente_credito, name='buscar_cliente_credito'),
+    path('obtener-datos-credito/<int:credito_id>/', creditos_views.obtener_datos_credito, name='obtener_datos_credito'),
+    path('obtener-pagos-credito/<int:credito_id>/', creditos_views.obtener_pagos_credito, name='obtener_pagos_credito'),
+    path('generar-pdf-cronograma/<int:credito_id>/', creditos_views.generar_pdf_cronograma, name='generar_pdf_cronograma'),
+    path('resumen-credito/<int:credito_id>/', creditos_views.resumen_credito_json, name='resumen_credito_json'),
     
     # Pagos
-    path('pagos/', views.pagos, name='pagos'),
-    path('exportar-pagos-excel/', views.exportar_pagos_excel, name='exportar_pagos_excel'),
-    path('nuevo-pago/', views.nuevo_pago, name='nuevo_pago'),
-    path('detalle-pago/<int:pago_id>/', views.detalle_pago, name='detalle_pago'),
-    path('generar-recibo-pdf/<int:pago_id>/', views.generar_recibo_pdf, name='generar_recibo_pdf'),
-    path('buscar-creditos-cliente/', views.buscar_creditos_cliente, name='buscar_creditos_cliente'),
-    path('confirmacion-pago/<int:pago_id>/', views.confirmacion_pago, name='confirmacion_pago'),
+    path('pagos/', pagos_views.pagos, name='pagos'),
+    path('exportar-pagos-excel/', pagos_views.exportar_pagos_excel, name='exportar_pagos_excel'),
+    path('nuevo-pago/', pagos_views.nuevo_pago, name='nuevo_pago'),
+    path('detalle-pago/<int:pago_id>/', pagos_views.detalle_pago, name='detalle_pago'),
+    path('generar-recibo-pdf/<int:pago_id>/', pagos_views.generar_recibo_pdf, name='generar_recibo_pdf'),
+    path('buscar-creditos-cliente/', pagos_views.buscar_creditos_cliente, name='buscar_creditos_cliente'),
+    path('confirmacion-pago/<int:pago_id>/', pagos_views.confirmacion_pago, name='confirmacion_pago'),
     
     # Cobradores
-    path('cobradores/', views.cobradores, name='cobradores'),
-    path('nuevo-cobrador/', views.nuevo_cobrador, name='nuevo_cobrador'),
-    path('detalle-cobrador/<int:cobrador_id>/', views.detalle_cobrador, name='detalle_cobrador'),
-    path('editar-cobrador/<int:cobrador_id>/', views.editar_cobrador, name='editar_cobrador'),
+    path('cobradores/', cobradores_views.cobradores, name='cobradores'),
+    path('nuevo-cobrador/', cobradores_views.nuevo_cobrador, name='nuevo_cobrador'),
+    path('detalle-cobrador/<int:cobrador_id>/', cobradores_views.detalle_cobrador, name='detalle_cobrador'),
+    path('editar-cobrador/<int:cobrador_id>/', cobradores_views.editar_cobrador, name='editar_cobrador'),
     
     # Rutas
-    path('rutas/', views.rutas, name='rutas'),
-    path('nueva-ruta/', views.nueva_ruta, name='nueva_ruta'),
-    path('detalle-ruta/<int:ruta_id>/', views.detalle_ruta, name='detalle_ruta'),
-    path('editar-ruta/<int:ruta_id>/', views.editar_ruta, name='editar_ruta'),
+    path('rutas/', cobradores_views.rutas, name='rutas'),
+    path('nueva-ruta/', cobradores_views.nueva_ruta, name='nueva_ruta'),
+    path('detalle-ruta/<int:ruta_id>/', cobradores_views.detalle_ruta, name='detalle_ruta'),
+    path('editar-ruta/<int:ruta_id>/', cobradores_views.editar_ruta, name='editar_ruta'),
     
     # Gestión diaria de cobros
-    path('gestion-diaria-cobros/', views.gestion_diaria_cobros, name='gestion_diaria_cobros'),
+    path('gestion-diaria-cobros/', cobro_views.gestion_diaria_cobros, name='gestion_diaria_cobros'),
     
     # Gestión de cartera
-    path('gestion-cartera/', views.gestion_cartera, name='gestion_cartera'),
-    path('resumen-dinero/', views.resumen_dinero, name='resumen_dinero'),
-    path('cartera-vencida/', views.cartera_vencida, name='cartera_vencida'),
-    path('clientes-en-mora/', views.clientes_en_mora, name='clientes_en_mora'),
-    path('actualizar-cartera/', views.actualizar_cartera, name='actualizar_cartera'),
-    path('exportar-cartera-excel/', views.exportar_cartera_excel, name='exportar_cartera_excel'),
-    path('kpis-cobradores/', views.kpis_cobradores, name='kpis_cobradores'),
+    path('gestion-cartera/', cartera_views.gestion_cartera, name='gestion_cartera'),
+    path('resumen-dinero/', cartera_views.resumen_dinero, name='resumen_dinero'),
+    path('cartera-vencida/', cartera_views.cartera_vencida, name='cartera_vencida'),
+    path('clientes-en-mora/', cartera_views.clientes_en_mora, name='clientes_en_mora'),
+    path('actualizar-cartera/', cartera_views.actualizar_cartera, name='actualizar_cartera'),
+    path('exportar-cartera-excel/', cartera_views.exportar_cartera_excel, name='exportar_cartera_excel'),
+    path('kpis-cobradores/', reportes_views.kpis_cobradores, name='kpis_cobradores'),
     
     # Reportes de recaudación
-    path('recaudacion-cobradores/', views.recaudacion_cobradores, name='recaudacion_cobradores'),
-    path('exportar-recaudacion-excel/', views.exportar_recaudacion_excel, name='exportar_recaudacion_excel'),
-    path('reporte-tareas-pendientes/', views.reporte_tareas_pendientes, name='reporte_tareas_pendientes'),
-    path('detalles-pagos-cobrador/<int:cobrador_id>/', views.detalles_pagos_cobrador, name='detalles_pagos_cobrador'),
+    path('recaudacion-cobradores/', reportes_views.recaudacion_cobradores, name='recaudacion_cobradores'),
+    path('exportar-recaudacion-excel/', reportes_views.exportar_recaudacion_excel, name='exportar_recaudacion_excel'),
+    path('reporte-tareas-pendientes/', reportes_views.reporte_tareas_pendientes, name='reporte_tareas_pendientes'),
+    path('detalles-pagos-cobrador/<int:cobrador_id>/', reportes_views.detalles_pagos_cobrador, name='detalles_pagos_cobrador'),
     
     # Sistema de tareas de cobro
-    path('cobrador/', views.acceso_cobrador, name='acceso_cobrador'),
-    path('tareas/agenda/', views.agenda_cobrador, name='agenda_cobrador'),
-    path('tareas/agenda/<int:cobrador_id>/', views.agenda_cobrador, name='agenda_cobrador_especifico'),
-    path('tareas/cobrar/<int:tarea_id>/', views.procesar_cobro_completo, name='procesar_cobro_completo'),
-    path('tareas/actualizar/<int:tarea_id>/', views.actualizar_tarea, name='actualizar_tarea'),
-    path('tareas/supervisor/', views.panel_supervisor, name='panel_supervisor'),
-    path('tareas/generar/', views.generar_tareas_diarias, name='generar_tareas_diarias'),
+    path('cobrador/', cobro_views.acceso_cobrador, name='acceso_cobrador'),
+    path('tareas/agenda/', cobro_views.agenda_cobrador, name='agenda_cobrador'),
+    path('tareas/agenda/<int:cobrador_id>/', cobro_views.agenda_cobrador, name='agenda_cobrador_especifico'),
+    path('tareas/cobrar/<int:tarea_id>/', cobro_views.procesar_cobro_completo, name='procesar_cobro_completo'),
+    path('tareas/actualizar/<int:tarea_id>/', cobro_views.actualizar_tarea, name='actualizar_tarea'),
+    path('tareas/supervisor/', cobro_views.panel_supervisor, name='panel_supervisor'),
+    path('tareas/generar/', cobro_views.generar_tareas_diarias, name='generar_tareas_diarias'),
     # Cierre de cobro diario
-    path('cierre-cobro-diario/', views.cierre_cobro_diario, name='cierre_cobro_diario'),
-    path('cierre-cobro-diario/cobrador/<int:cobrador_id>/', views.resumen_cierre_cobrador, name='resumen_cierre_cobrador'),
-    path('cierre-cobro-diario/cerrar/', views.cerrar_cobro_cobrador, name='cerrar_cobro_cobrador'),
+    path('cierre-cobro-diario/', cobro_views.cierre_cobro_diario, name='cierre_cobro_diario'),
+    path('cierre-cobro-diario/cobrador/<int:cobrador_id>/', cobro_views.resumen_cierre_cobrador, name='resumen_cierre_cobrador'),
+    path('cierre-cobro-diario/cerrar/', cobro_views.cerrar_cobro_cobrador, name='cerrar_cobro_cobrador'),
     
     # Gestión de Usuarios
-    path('usuarios/', views.lista_usuarios, name='lista_usuarios'),
-    path('nuevo-usuario/', views.nuevo_usuario, name='nuevo_usuario'),
-    path('editar-usuario/<int:user_id>/', views.editar_usuario, name='editar_usuario'),
-    path('eliminar-usuario/<int:user_id>/', views.eliminar_usuario, name='eliminar_usuario'),
-    path('cambiar-password/<int:user_id>/', views.cambiar_password_usuario, name='cambiar_password_usuario'),
+    path('usuarios/', usuarios_views.lista_usuarios, name='lista_usuarios'),
+    path('nuevo-usuario/', usuarios_views.nuevo_usuario, name='nuevo_usuario'),
+    path('editar-usuario/<int:user_id>/', usuarios_views.editar_usuario, name='editar_usuario'),
+    path('eliminar-usuario/<int:user_id>/', usuarios_views.eliminar_usuario, name='eliminar_usuario'),
+    path('cambiar-password/<int:user_id>/', usuarios_views.cambiar_password_usuario, name='cambiar_password_usuario'),
     
     # Valorizador de créditos
     path('valorizador/', valorizador_views.valorizador, name='valorizador'),
     path('valorizador/calcular/', valorizador_views.calcular_credito, name='calcular_credito'),
     path('valorizador/comparar/', valorizador_views.comparar_modalidades, name='comparar_modalidades'),
+
+    # Rendimiento por vista (perfilado)
+    path('rendimiento/', rendimiento_views.rendimiento, name='rendimiento'),
 ]
@@ -0,0 +1,295 @@
+"""
+Administración de usuarios del sistema y sus roles.
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.models import User
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from .models import Cobrador
+from .views import (
+    ROLES_FORM,
+    ROLE_COBRADOR,
+    ROLE_OPERADOR,
+    _asignar_rol_usuario,
+    _forbidden_operacion,
+    _rol_usuario,
+    _usuario_admin_operativo,
+)
+
+
+# ========================================
+# VISTAS PARA GESTIÓN DE USUARIOS
+# ========================================
+
+@login_required
+def lista_usuarios(request):
+    """Lista todos los usuarios del sistema"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.core.paginator import Paginator
+    
+    usuarios = User.objects.all().order_by('-date_joined')
+    roles_por_usuario = {u.id: _rol_usuario(u) for u in usuarios}
+    cobradores_por_usuario = {
+        c.usuario_id: c.nombre_completo for c in Cobrador.objects.filter(usuario__isnull=False)
+    }
+    
+    # Paginación configurable
+    per_page_str = request.GET.get('per_page', '10').strip()
+    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
+    paginator = Paginator(usuarios, per_page)
+    page_number = request.GET.get('page')
+    usuarios_paginados = paginator.get_page(page_number)
+    usuarios_rows = [
+        {
+            'usuario': u,
+            'rol': roles_por_usuario.get(u.id, ROLE_OPERADOR),
+            'cobrador': cobradores_por_usuario.get(u.id, ''),
+        }
+        for u in usuarios_paginados
+    ]
+    
+    context = {
+        'usuarios': usuarios_paginados,
+        'usuarios_rows': usuarios_rows,
+        'total_usuarios': usuarios.count(),
+        'per_page': per_page,
+    }
+    
+    return render(request, 'usuarios/lista_usuarios.html', context)
+
+@login_required
+def nuevo_usuario(request):
+    """Crear nuevo usuario"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.contrib.auth.forms import UserCreationForm
+    from django import forms
+
+    class UsuarioForm(UserCreationForm):
+        email = forms.EmailField(required=True, label='Email')
+        first_name = forms.CharField(max_length=30, required=True, label='Nombre')
+        last_name = forms.CharField(max_length=30, required=True, label='Apellido')
+        rol = forms.ChoiceField(choices=ROLES_FORM, required=True, label='Rol del usuario')
+        cobrador = forms.ModelChoiceField(
+            queryset=Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos'),
+            required=False,
+            label='Vincular a cobrador existente',
+            empty_label='-- Sin vincular --'
+        )
+        
+        class Meta:
+            model = User
+            fields = ('username', 'email', 'first_name', 'last_name', 'password1', 'password2', 'rol', 'cobrador')
+            labels = {
+                'username': 'Nombre de usuario',
+            }
+            help_texts = {
+                'username': 'Requerido. 150 caracteres o menos. Solo letras, dígitos y @/./+/-/_ permitidos.',
+            }
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.fields['password1'].label = 'Contraseña'
+            self.fields['password2'].label = 'Confirmar contraseña'
+            self.fields['password1'].help_text = (
+                'Tu contraseña debe tener al menos 8 caracteres, '
+                'no puede ser demasiado común y no puede ser completamente numérica.'
+            )
+            self.fields['password2'].help_text = 'Ingresa la misma contraseña para verificación.'
+            
+            # Agregar clases CSS
+            for field_name, field in self.fields.items():
+                if field_name not in ('rol', 'cobrador'):
+                    field.widget.attrs.update({
+                        'class': 'form-control',
+                        'placeholder': field.label
+                    })
+                else:
+                    field.widget.attrs.update({'class': 'form-select'})
+            # Estandar visual de captura
+            self.fields['first_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
+            self.fields['last_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
+            self.fields['email'].widget.attrs.update({'style': 'text-transform: lowercase;'})
+
+        def clean(self):
+            cleaned = super().clean()
+            if cleaned.get('first_name'):
+                cleaned['first_name'] = str(cleaned['first_name']).strip().upper()
+            if cleaned.get('last_name'):
+                cleaned['last_name'] = str(cleaned['last_name']).strip().upper()
+            if cleaned.get('email'):
+                cleaned['email'] = str(cleaned['email']).strip().lower()
+            rol = cleaned.get('rol')
+            cobrador = cleaned.get('cobrador')
+            if rol == ROLE_COBRADOR and not cobrador:
+                self.add_error('cobrador', 'Para rol cobrador debe seleccionar un cobrador existente.')
+            if rol != ROLE_COBRADOR and cobrador:
+                self.add_error('cobrador', 'Solo puede vincular cobrador cuando el rol es cobrador.')
+            if cobrador and cobrador.usuario_id:
+                self.add_error('cobrador', f'El cobrador {cobrador.nombre_completo} ya está vinculado a otro usuario.')
+            return cleaned
+    
+    if request.method == 'POST':
+        form = UsuarioForm(request.POST)
+        if form.is_valid():
+            usuario = form.save()
+            rol = form.cleaned_data['rol']
+            cobrador = form.cleaned_data.get('cobrador')
+            _asignar_rol_usuario(usuario, rol)
+            usuario.save()
+            if cobrador:
+                cobrador.usuario = usuario
+                cobrador.save(update_fields=['usuario'])
+            messages.success(request, f'Usuario "{usuario.username}" creado exitosamente')
+            return redirect('lista_usuarios')
+    else:
+        form = UsuarioForm()
+    
+    return render(request, 'usuarios/nuevo_usuario.html', {'form': form})
+
+@login_required
+def editar_usuario(request, user_id):
+    """Editar usuario existente"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django import forms
+    
+    usuario = get_object_or_404(User, id=user_id)
+    class EditarUsuarioForm(forms.ModelForm):
+        rol = forms.ChoiceField(
+            choices=ROLES_FORM,
+            required=True,
+            label='Rol del usuario'
+        )
+        cobrador = forms.ModelChoiceField(
+            queryset=Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos'),
+            required=False,
+            label='Vincular a cobrador existente',
+            empty_label='-- Sin vincular --'
+        )
+
+        class Meta:
+            model = User
+            fields = ['username', 'email', 'first_name', 'last_name', 'is_active']
+            labels = {
+                'username': 'Nombre de usuario',
+                'email': 'Email',
+                'first_name': 'Nombre',
+                'last_name': 'Apellido', 
+                'is_active': 'Usuario activo',
+            }
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.fields['rol'].initial = _rol_usuario(self.instance)
+            self.fields['cobrador'].initial = Cobrador.objects.filter(usuario=self.instance).first()
+            # Agregar clases CSS
+            for field_name, field in self.fields.items():
+                if field_name not in ['is_active', 'rol', 'cobrador']:
+                    field.widget.attrs.update({
+                        'class': 'form-control',
+                        'placeholder': field.label
+                    })
+                elif field_name in ['rol', 'cobrador']:
+                    field.widget.attrs.update({'class': 'form-select'})
+                else:
+                    field.widget.attrs.update({'class': 'form-check-input'})
+            # Estandar visual de captura
+            self.fields['first_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
+            self.fields['last_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
+            self.fields['email'].widget.attrs.update({'style': 'text-transform: lowercase;'})
+
+        def clean(self):
+            cleaned = super().clean()
+            if cleaned.get('first_name'):
+                cleaned['first_name'] = str(cleaned['first_name']).strip().upper()
+            if cleaned.get('last_name'):
+                cleaned['last_name'] = str(cleaned['last_name']).strip().upper()
+            if cleaned.get('email'):
+                cleaned['email'] = str(cleaned['email']).strip().lower()
+            rol = cleaned.get('rol')
+            cobrador = cleaned.get('cobrador')
+            if rol == ROLE_COBRADOR and not cobrador:
+                self.add_error('cobrador', 'Para rol cobrador debe seleccionar un cobrador existente.')
+            if rol != ROLE_COBRADOR and cobrador:
+                self.add_error('cobrador', 'Solo puede vincular cobrador cuando el rol es cobrador.')
+            if cobrador and cobrador.usuario_id and cobrador.usuario_id != self.instance.id:
+                self.add_error('cobrador', f'El cobrador {cobrador.nombre_completo} ya está vinculado a otro usuario.')
+            return cleaned
+    
+    if request.method == 'POST':
+        form = EditarUsuarioForm(request.POST, instance=usuario)
+        if form.is_valid():
+            usuario = form.save()
+            rol = form.cleaned_data['rol']
+            cobrador_seleccionado = form.cleaned_data.get('cobrador')
+            _asignar_rol_usuario(usuario, rol)
+            usuario.save()
+
+            # Desvincular cobrador previo (si existe y cambió)
+            Cobrador.objects.filter(usuario=usuario).exclude(
+                id=cobrador_seleccionado.id if cobrador_seleccionado else None
+            ).update(usuario=None)
+
+            if cobrador_seleccionado:
+                cobrador_seleccionado.usuario = usuario
+                cobrador_seleccionado.save(update_fields=['usuario'])
+
+            messages.success(request, f'Usuario "{usuario.username}" actualizado exitosamente')
+            return redirect('lista_usuarios')
+    else:
+        form = EditarUsuarioForm(instance=usuario)
+    
+    return render(request, 'usuarios/editar_usuario.html', {
+        'form': form, 
+        'usuario': usuario
+    })
+
+@login_required
+def eliminar_usuario(request, user_id):
+    """Eliminar usuario"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.contrib.auth.models import User
+    
+    usuario = get_object_or_404(User, id=user_id)
+    
+    # No permitir eliminar al usuario actual
+    if usuario == request.user:
+        messages.error(request, 'No puedes eliminar tu propio usuario')
+        return redirect('lista_usuarios')
+    
+    if request.method == 'POST':
+        username = usuario.username
+        usuario.delete()
+        messages.success(request, f'Usuario "{username}" eliminado exitosamente')
+        return redirect('lista_usuarios')
+    
+    return render(request, 'usuarios/confirmar_eliminar_usuario.html', {
+        'usuario': usuario
+    })
+
+@login_required
+def cambiar_password_usuario(request, user_id):
+    """Cambiar contraseña de usuario"""
+    if not _usuario_admin_operativo(request.user):
+        return _forbidden_operacion(request)
+    from django.contrib.auth.models import User
+    from django.contrib.auth.forms import SetPasswordForm
+    
+    usuario = get_object_or_404(User, id=user_id)
+    
+    if request.method == 'POST':
+        form = SetPasswordForm(usuario, request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'Contraseña de "{usuario.username}" cambiada exitosamente')
+            return redirect('lista_usuarios')
+    else:
+        form = SetPasswordForm(usuario)
+    
+    return render(request, 'usuarios/cambiar_password.html', {
+        'form': form,
+        'usuario': usuario
+    })
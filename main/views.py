@@ -1,40 +1,32 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse
+"""
+Vistas comunes: roles y permisos compartidos, ayudas de pago/tareas usadas
+por varios módulos, login y dashboards.
+
+Las demás vistas están separadas por dominio (``clientes_views``,
+``creditos_views``, ``pagos_views``, ``documentos_views``,
+``cobradores_views``, ``cobro_views``, ``cartera_views``,
+``usuarios_views``, ``reportes_views``). ReportLab, pandas y los módulos
+de firma/PDF se importan dentro de la vista que los usa: un worker que
+solo atiende la agenda no los carga.
+"""
+from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.models import User, Group
+from django.contrib.auth.models import Group
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Count, Q, Max, Exists, OuterRef
+from django.db.models import Sum, Max, Exists, OuterRef
 from django.db.models.functions import TruncDate
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
-from django.template.loader import get_template
-from .models import Cliente, Credito, Pago, Codeudor, CronogramaPago, Cobrador, Ruta, TareaCobro, TareaCobroLog, CierreCobroDiario
-from .forms import ClienteForm, CreditoForm, PagoForm, CodeudorForm
-from .habeas_data import solicitar_otp_habeas_data, validar_otp_y_firmar, regenerar_pdf_habeas_data
-from .pagare import solicitar_otp_pagare, validar_otp_pagare, regenerar_pdf_pagare
-from .renovacion import solicitar_otp_renovacion, validar_otp_renovacion
-from .retanqueo import ejecutar_retanqueo, revertir_retanqueo
-from .retanqueo_documento import solicitar_otp_retanqueo, validar_otp_retanqueo
-
-# Para generar PDFs
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from datetime import datetime, timedelta, date
-from io import BytesIO
+from django.http import JsonResponse
+from .models import Cliente, Credito, Pago, CronogramaPago, Cobrador, TareaCobro, CierreCobroDiario
+from .autorizacion import (
+    ROLE_ADMIN, ROLE_COBRADOR, ROLE_GERENTE, ROLE_OPERADOR, ROLE_SUPERVISOR, ROLES_SISTEMA,
+    contexto_de, olvidar_usuario,
+)
+from datetime import datetime, timedelta
 import json
-import re
 from decimal import Decimal
 
-ROLE_GERENTE = 'GERENTE'
-ROLE_ADMIN = 'ADMIN'
-ROLE_SUPERVISOR = 'SUPERVISOR'
-ROLE_COBRADOR = 'COBRADOR'
-ROLE_OPERADOR = 'OPERADOR'
-ROLES_SISTEMA = [ROLE_GERENTE, ROLE_ADMIN, ROLE_SUPERVISOR, ROLE_COBRADOR, ROLE_OPERADOR]
 ROLES_FORM = [
     (ROLE_GERENTE, 'Gerente (acceso total)'),
     (ROLE_ADMIN, 'Administrador'),
@@ -50,12 +42,7 @@ def _asegurar_grupo(nombre):
 
 
 def _rol_usuario(user):
-    if not user or not user.is_authenticated:
-        return None
-    if user.is_superuser:
-        return ROLE_GERENTE
-    rol = user.groups.filter(name__in=ROLES_SISTEMA).values_list('name', flat=True).first()
-    return rol or ROLE_OPERADOR
+    return contexto_de(user).rol
 
 
 def _asignar_rol_usuario(user, rol):
@@ -63,6 +50,7 @@ def _asignar_rol_usuario(user, rol):
         rol = ROLE_OPERADOR
     user.groups.clear()
     user.groups.add(_asegurar_grupo(rol))
+    olvidar_usuario(user)
 
     if rol == ROLE_GERENTE:
         user.is_superuser = True
@@ -90,7 +78,7 @@ def _usuario_es_gerente(user):
 
 def _usuario_admin_operativo(user):
     """Permisos mínimos para operaciones críticas de crédito/cobranza."""
-    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser))
+    return contexto_de(user).es_admin
 
 def _forbidden_operacion(request, mensaje='No tiene permisos para esta operación.'):
     """Respuesta consistente para denegar operaciones críticas."""
@@ -105,16 +93,11 @@ def _forbidden_operacion(request, mensaje='No tiene permisos para esta operació
 
 def _usuario_cobrador_activo(user):
     """Retorna el cobrador activo asociado al usuario, si existe."""
-    if not user or not user.is_authenticated:
-        return None
-    return Cobrador.objects.filter(usuario=user, activo=True).first()
+    return contexto_de(user).cobrador
 
 def _usuario_puede_ver_credito(user, credito):
     """Admin puede ver todo; cobrador solo su cartera asignada."""
-    if _usuario_admin_operativo(user):
-        return True
-    cobrador = _usuario_cobrador_activo(user)
-    return bool(cobrador and credito and credito.cobrador_id == cobrador.id)
+    return contexto_de(user).puede_ver_credito(credito)
 
 def _usuario_puede_ver_pago(user, pago):
     """Delega el permiso al crédito asociado al pago."""
@@ -393,7 +376,7 @@ def dashboard_negocio(request):
     total_desembolsado = desembolsos_periodo.aggregate(total=Sum('monto'))['total'] or 0
     total_recaudado = pagos_periodo.aggregate(total=Sum('monto'))['total'] or 0
 
-    creditos_activos = Credito.objects.filter(estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO'])
+    creditos_activos = Credito.objects.filter(estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']).with_saldos()
     cartera_activa = sum((c.saldo_pendiente() for c in creditos_activos), Decimal('0'))
     cartera_vencida = sum((c.saldo_pendiente() for c in creditos_activos.filter(estado='VENCIDO')), Decimal('0'))
     porcentaje_mora = float((cartera_vencida / cartera_activa * 100) if cartera_activa > 0 else 0)
@@ -563,4821 +546,3 @@ def dashboard_negocio(request):
         'chart_pipeline_values': json.dumps(pipeline_values),
     }
     return render(request, 'dashboard_negocio.html', context)
-
-@login_required
-def clientes(request):
-    if not _usuario_puede_registrar_cliente_credito(request.user):
-        return _forbidden_operacion(request)
-    es_admin_operativo = _usuario_admin_operativo(request.user)
-    from django.core.paginator import Paginator
-    from django.db.models import Q
-    
-    # Filtro: activos por defecto; ver_inactivos=1 para ver desactivados
-    ver_inactivos = request.GET.get('ver_inactivos') == '1'
-    activo_filter = False if ver_inactivos else True
-
-    base_queryset = Cliente.objects.filter(activo=activo_filter).select_related('codeudor').order_by('-fecha_registro')
-
-    # Filtro funcional: clientes con/sin crédito activo (no confundir con cliente desactivado)
-    cartera_estado = request.GET.get('cartera_estado', 'todos').strip()
-    if cartera_estado not in ('todos', 'con_credito_activo', 'sin_credito_activo'):
-        cartera_estado = 'todos'
-    credito_activo_subquery = Credito.objects.filter(
-        cliente_id=OuterRef('pk'),
-        estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
-    )
-    base_queryset = base_queryset.annotate(tiene_credito_activo=Exists(credito_activo_subquery))
-    if cartera_estado == 'con_credito_activo':
-        base_queryset = base_queryset.filter(tiene_credito_activo=True)
-    elif cartera_estado == 'sin_credito_activo':
-        base_queryset = base_queryset.filter(tiene_credito_activo=False)
-
-    # Búsqueda en servidor: q (cédula, nombres, apellidos, barrio)
-    q = request.GET.get('q', '').strip()
-    if q:
-        base_queryset = base_queryset.filter(
-            Q(cedula__icontains=q) |
-            Q(nombres__icontains=q) |
-            Q(apellidos__icontains=q) |
-            Q(barrio__icontains=q)
-        )
-    
-    # Estadísticas sobre el conjunto filtrado (antes de paginar)
-    total_clientes = base_queryset.count()
-    clientes_con_codeudor = base_queryset.filter(codeudor__isnull=False).count()
-    clientes_sin_codeudor = total_clientes - clientes_con_codeudor
-    
-    # Paginación configurable
-    per_page_str = request.GET.get('per_page', '10').strip()
-    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
-    paginator = Paginator(base_queryset, per_page)
-    page_number = request.GET.get('page')
-    clientes = paginator.get_page(page_number)
-    
-    context = {
-        'clientes': clientes,
-        'total_clientes': total_clientes,
-        'clientes_con_codeudor': clientes_con_codeudor,
-        'clientes_sin_codeudor': clientes_sin_codeudor,
-        'q': q,
-        'ver_inactivos': ver_inactivos,
-        'cartera_estado': cartera_estado,
-        'per_page': per_page,
-        'es_admin_operativo': es_admin_operativo,
-    }
-    
-    return render(request, 'clientes.html', context)
-
-
-@login_required
-def exportar_clientes_excel(request):
-    """Exporta el listado de clientes aplicando los mismos filtros de la vista clientes."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-
-    import io
-    import pandas as pd
-
-    ver_inactivos = request.GET.get('ver_inactivos') == '1'
-    activo_filter = False if ver_inactivos else True
-    cartera_estado = request.GET.get('cartera_estado', 'todos').strip()
-    if cartera_estado not in ('todos', 'con_credito_activo', 'sin_credito_activo'):
-        cartera_estado = 'todos'
-    q = request.GET.get('q', '').strip()
-
-    queryset = Cliente.objects.filter(activo=activo_filter).select_related('codeudor').order_by('-fecha_registro')
-    credito_activo_subquery = Credito.objects.filter(
-        cliente_id=OuterRef('pk'),
-        estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
-    )
-    queryset = queryset.annotate(tiene_credito_activo=Exists(credito_activo_subquery))
-    if cartera_estado == 'con_credito_activo':
-        queryset = queryset.filter(tiene_credito_activo=True)
-    elif cartera_estado == 'sin_credito_activo':
-        queryset = queryset.filter(tiene_credito_activo=False)
-
-    if q:
-        queryset = queryset.filter(
-            Q(cedula__icontains=q)
-            | Q(nombres__icontains=q)
-            | Q(apellidos__icontains=q)
-            | Q(barrio__icontains=q)
-        )
-
-    rows = []
-    for cliente in queryset:
-        rows.append({
-            'ID': cliente.id,
-            'Estado registro': 'Desactivado' if not cliente.activo else 'Activo',
-            'Estado cartera': 'Con crédito activo' if cliente.tiene_credito_activo else 'Sin crédito activo',
-            'Nombres': cliente.nombres,
-            'Apellidos': cliente.apellidos,
-            'Nombre completo': cliente.nombre_completo,
-            'Cédula': cliente.cedula,
-            'Celular': cliente.celular or '',
-            'Teléfono fijo': cliente.telefono_fijo or '',
-            'Email': cliente.email or '',
-            'Dirección': cliente.direccion or '',
-            'Barrio': cliente.barrio or '',
-            'Ciudad': cliente.ciudad or '',
-            'Departamento': cliente.departamento or '',
-            'Fecha registro': cliente.fecha_registro.strftime('%d/%m/%Y %H:%M') if cliente.fecha_registro else '',
-            'Codeudor asignado': 'Sí' if cliente.codeudor_id else 'No',
-            'Nombre codeudor': cliente.codeudor.nombre_completo if cliente.codeudor_id else '',
-            'Cédula codeudor': cliente.codeudor.cedula if cliente.codeudor_id else '',
-        })
-
-    df = pd.DataFrame(rows)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Clientes', index=False)
-    output.seek(0)
-
-    stamp = timezone.now().strftime('%Y%m%d_%H%M')
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = f'attachment; filename="clientes_{stamp}.xlsx"'
-    return response
-
-@login_required
-def creditos(request):
-    es_admin = _usuario_admin_operativo(request.user)
-    cobrador_usuario = _usuario_cobrador_activo(request.user)
-    if not es_admin and not cobrador_usuario:
-        return _forbidden_operacion(request)
-    from django.core.paginator import Paginator
-    from django.db.models import Q
-    
-    creditos_list = Credito.objects.select_related('cliente', 'cobrador').order_by('-fecha_solicitud')
-    if not es_admin:
-        creditos_list = creditos_list.filter(cobrador=cobrador_usuario)
-    
-    # Búsqueda por cliente (nombre, apellidos, cédula) o por ID de crédito
-    q = request.GET.get('q', '').strip()
-    if q:
-        filtro = (
-            Q(cliente__nombres__icontains=q) |
-            Q(cliente__apellidos__icontains=q) |
-            Q(cliente__cedula__icontains=q)
-        )
-        if q.isdigit():
-            filtro = filtro | Q(id=int(q))
-        creditos_list = creditos_list.filter(filtro)
-    
-    # Filtro por cobrador
-    cobrador_id = request.GET.get('cobrador', '').strip()
-    if cobrador_id and cobrador_id.isdigit():
-        creditos_list = creditos_list.filter(cobrador_id=int(cobrador_id))
-    
-    # Filtro por rango de fechas (fecha_solicitud)
-    fecha_desde = request.GET.get('fecha_desde', '').strip()
-    fecha_hasta = request.GET.get('fecha_hasta', '').strip()
-    if fecha_desde:
-        try:
-            from datetime import datetime as dt
-            d = dt.strptime(fecha_desde, '%Y-%m-%d').date()
-            creditos_list = creditos_list.filter(fecha_solicitud__date__gte=d)
-        except ValueError:
-            pass
-    if fecha_hasta:
-        try:
-            from datetime import datetime as dt
-            d = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
-            creditos_list = creditos_list.filter(fecha_solicitud__date__lte=d)
-        except ValueError:
-            pass
-    
-    # Calcular estadísticas (sobre la lista filtrada)
-    total_creditos = creditos_list.count()
-    creditos_aprobados = creditos_list.filter(estado='APROBADO').count()
-    creditos_pendientes = creditos_list.filter(estado='SOLICITADO').count()
-    creditos_vencidos = creditos_list.filter(estado='VENCIDO').count()
-    creditos_desembolsados = creditos_list.filter(estado='DESEMBOLSADO').count()
-    creditos_pagados = creditos_list.filter(estado='PAGADO').count()
-    
-    # Paginación configurable
-    per_page_str = request.GET.get('per_page', '10').strip()
-    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
-    paginator = Paginator(creditos_list, per_page)
-    page_number = request.GET.get('page')
-    creditos = paginator.get_page(page_number)
-    
-    resumen_credito_id = request.GET.get('resumen_credito', '').strip()
-    if resumen_credito_id and resumen_credito_id.isdigit():
-        c = Credito.objects.filter(id=int(resumen_credito_id)).first()
-        if not c or c.estado not in ('APROBADO', 'DESEMBOLSADO'):
-            resumen_credito_id = ''
-    
-    cobradores = Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos')
-    filtro_cobrador_id = int(cobrador_id) if cobrador_id.isdigit() else None
-    
-    context = {
-        'creditos': creditos,
-        'total_creditos': total_creditos,
-        'creditos_aprobados': creditos_aprobados,
-        'creditos_pendientes': creditos_pendientes,
-        'creditos_vencidos': creditos_vencidos,
-        'creditos_desembolsados': creditos_desembolsados,
-        'creditos_pagados': creditos_pagados,
-        'q': q,
-        'resumen_credito_id': resumen_credito_id,
-        'cobradores': cobradores,
-        'filtro_cobrador_id': filtro_cobrador_id,
-        'filtro_fecha_desde': fecha_desde,
-        'filtro_fecha_hasta': fecha_hasta,
-        'per_page': per_page,
-        'puede_aprobar_credito': _usuario_puede_aprobar_credito(request.user),
-        'puede_editar_credito': _usuario_es_gerente(request.user),
-    }
-    return render(request, 'creditos.html', context)
-
-
-@login_required
-def exportar_creditos_excel(request):
-    """Exporta el listado de créditos aplicando los mismos filtros de la vista creditos."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-
-    import io
-    import pandas as pd
-
-    queryset = Credito.objects.select_related('cliente', 'cobrador').order_by('-fecha_solicitud')
-
-    q = request.GET.get('q', '').strip()
-    if q:
-        filtro = (
-            Q(cliente__nombres__icontains=q)
-            | Q(cliente__apellidos__icontains=q)
-            | Q(cliente__cedula__icontains=q)
-        )
-        if q.isdigit():
-            filtro = filtro | Q(id=int(q))
-        queryset = queryset.filter(filtro)
-
-    cobrador_id = request.GET.get('cobrador', '').strip()
-    if cobrador_id and cobrador_id.isdigit():
-        queryset = queryset.filter(cobrador_id=int(cobrador_id))
-
-    fecha_desde = request.GET.get('fecha_desde', '').strip()
-    fecha_hasta = request.GET.get('fecha_hasta', '').strip()
-    if fecha_desde:
-        try:
-            d = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-            queryset = queryset.filter(fecha_solicitud__date__gte=d)
-        except ValueError:
-            pass
-    if fecha_hasta:
-        try:
-            d = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-            queryset = queryset.filter(fecha_solicitud__date__lte=d)
-        except ValueError:
-            pass
-
-    rows = []
-    for credito in queryset:
-        modalidad = 'Nuevo'
-        if credito.credito_retanqueado_id:
-            modalidad = 'Retanqueo'
-        elif credito.es_renovacion:
-            modalidad = 'Renovación'
-
-        rows.append({
-            'ID crédito': credito.id,
-            'Estado': credito.get_estado_display(),
-            'Modalidad': modalidad,
-            'Cliente': credito.cliente.nombre_completo,
-            'Cédula cliente': credito.cliente.cedula,
-            'Monto': float(credito.monto),
-            'Monto total': float(credito.monto_total) if credito.monto_total else float(credito.monto),
-            'Saldo pendiente': float(credito.saldo_pendiente()),
-            'Total pagado': float(credito.total_pagado()),
-            'Tasa interés (%)': float(credito.tasa_interes or 0),
-            'Tipo plazo': credito.get_tipo_plazo_display(),
-            'Cantidad cuotas': credito.cantidad_cuotas,
-            'Valor cuota': float(credito.valor_cuota()) if credito.valor_cuota() else 0,
-            'Días mora': credito.dias_mora or 0,
-            'Estado mora': credito.get_estado_mora_display() if credito.dias_mora and credito.dias_mora > 0 else 'Al día',
-            'Cobrador': credito.cobrador.nombre_completo if credito.cobrador else 'Sin asignar',
-            'Fecha solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y %H:%M') if credito.fecha_solicitud else '',
-            'Fecha desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else '',
-        })
-
-    df = pd.DataFrame(rows)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Creditos', index=False)
-    output.seek(0)
-
-    stamp = timezone.now().strftime('%Y%m%d_%H%M')
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = f'attachment; filename="creditos_{stamp}.xlsx"'
-    return response
-
-@login_required
-def pagos(request):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.db.models import Sum
-    from datetime import date, datetime, timedelta
-    from django.utils import timezone
-    from django.core.paginator import Paginator
-    
-    pagos_list = Pago.objects.all().order_by('-fecha_pago')
-    
-    # Calcular estadísticas (usar la lista completa)
-    total_pagos = pagos_list.count()
-    
-    # Pagos de hoy
-    hoy = timezone.now().date()
-    pagos_hoy = pagos_list.filter(fecha_pago__date=hoy).count()
-    
-    # Monto recaudado hoy
-    recaudado_hoy = pagos_list.filter(fecha_pago__date=hoy).aggregate(
-        total=Sum('monto')
-    )['total'] or 0
-    
-    # Promedio mensual (últimos 30 días)
-    hace_30_dias = timezone.now() - timedelta(days=30)
-    pagos_mes = pagos_list.filter(fecha_pago__gte=hace_30_dias)
-    promedio_mensual = pagos_mes.aggregate(
-        total=Sum('monto')
-    )['total'] or 0
-    
-    # Total recaudado histórico
-    total_recaudado = pagos_list.aggregate(
-        total=Sum('monto')
-    )['total'] or 0
-    
-    # Promedio por pago
-    promedio_pago = total_recaudado / total_pagos if total_pagos > 0 else 0
-    
-    # Paginación configurable
-    per_page_str = request.GET.get('per_page', '10').strip()
-    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
-    paginator = Paginator(pagos_list, per_page)
-    page_number = request.GET.get('page')
-    pagos = paginator.get_page(page_number)
-    
-    context = {
-        'pagos': pagos,
-        'total_pagos': total_pagos,
-        'pagos_hoy': pagos_hoy,
-        'recaudado_hoy': recaudado_hoy,
-        'promedio_mensual': promedio_mensual,
-        'total_recaudado': total_recaudado,
-        'promedio_pago': promedio_pago,
-        'per_page': per_page,
-    }
-    
-    return render(request, 'pagos.html', context)
-
-
-@login_required
-def exportar_pagos_excel(request):
-    """Exporta pagos con filtros opcionales por fecha exacta y texto de búsqueda."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-
-    import io
-    import pandas as pd
-
-    pagos_qs = Pago.objects.select_related('credito__cliente', 'credito__cobrador').order_by('-fecha_pago')
-
-    fecha = request.GET.get('fecha', '').strip()
-    if fecha:
-        try:
-            fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-            pagos_qs = pagos_qs.filter(fecha_pago__date=fecha_obj)
-        except ValueError:
-            pass
-
-    q = request.GET.get('q', '').strip()
-    if q:
-        filtros = (
-            Q(credito__cliente__nombres__icontains=q)
-            | Q(credito__cliente__apellidos__icontains=q)
-            | Q(credito__cliente__cedula__icontains=q)
-            | Q(observaciones__icontains=q)
-        )
-        if q.isdigit():
-            filtros = filtros | Q(credito__id=int(q))
-        pagos_qs = pagos_qs.filter(filtros)
-
-    rows = []
-    for pago in pagos_qs:
-        rows.append({
-            'ID pago': pago.id,
-            'Fecha pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M') if pago.fecha_pago else '',
-            'Cliente': pago.credito.cliente.nombre_completo,
-            'Cédula': pago.credito.cliente.cedula,
-            'Crédito ID': pago.credito_id,
-            'Estado crédito': pago.credito.get_estado_display(),
-            'Cobrador': pago.credito.cobrador.nombre_completo if pago.credito.cobrador else 'Sin asignar',
-            'Cuota #': pago.numero_cuota,
-            'Monto': float(pago.monto),
-            'Observaciones': pago.observaciones or '',
-        })
-
-    df = pd.DataFrame(rows)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Pagos', index=False)
-    output.seek(0)
-
-    stamp = timezone.now().strftime('%Y%m%d_%H%M')
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = f'attachment; filename="pagos_{stamp}.xlsx"'
-    return response
-
-# CRUD Clientes
-@login_required
-def nuevo_cliente(request):
-    if not _usuario_puede_registrar_cliente_credito(request.user):
-        return _forbidden_operacion(request)
-    if request.method == 'POST':
-        form = ClienteForm(request.POST, request.FILES)
-        if form.is_valid():
-            cliente = form.save()
-            messages.success(request, f'Cliente {cliente.nombre_completo} creado exitosamente')
-            if _rol_usuario(request.user) == ROLE_COBRADOR and _usuario_cobrador_activo(request.user):
-                return redirect(f"{reverse('nuevo_credito')}?cliente_id={cliente.id}")
-            return redirect('detalle_cliente', cliente_id=cliente.id)  # Redirigir al detalle para ver los documentos
-        else:
-            # Mostrar errores de validación
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = ClienteForm()
-    return render(request, 'nuevo_cliente.html', {'form': form})
-
-@login_required
-def editar_cliente(request, cliente_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cliente = get_object_or_404(Cliente, id=cliente_id)
-    if request.method == 'POST':
-        form = ClienteForm(request.POST, request.FILES, instance=cliente)
-        if form.is_valid():
-            cliente_actualizado = form.save()
-            messages.success(request, f'Cliente {cliente_actualizado.nombre_completo} actualizado exitosamente')
-            return redirect('detalle_cliente', cliente_id=cliente.id)
-        else:
-            # Mostrar errores de validación
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = ClienteForm(instance=cliente)
-    return render(request, 'editar_cliente.html', {'form': form, 'cliente': cliente})
-
-@login_required
-def eliminar_cliente(request, cliente_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cliente = get_object_or_404(Cliente, id=cliente_id)
-    if request.method == 'POST':
-        cliente.activo = False
-        cliente.save()
-        messages.success(request, f'Cliente {cliente.nombre_completo} desactivado exitosamente')
-        return redirect('clientes')
-    return render(request, 'confirmar_eliminar_cliente.html', {'cliente': cliente})
-
-@login_required
-def reactivar_cliente(request, cliente_id):
-    """Reactivar un cliente que estaba inactivo."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cliente = get_object_or_404(Cliente, id=cliente_id)
-    if request.method == 'POST':
-        cliente.activo = True
-        cliente.save()
-        messages.success(request, f'Cliente {cliente.nombre_completo} reactivado exitosamente')
-        return redirect('detalle_cliente', cliente_id=cliente.id)
-    # GET: redirigir a lista de inactivos
-    return redirect(reverse('clientes') + '?ver_inactivos=1')
-
-# CRUD Créditos
-@login_required
-def nuevo_credito(request):
-    es_admin = _usuario_admin_operativo(request.user)
-    cobrador_usuario = _usuario_cobrador_activo(request.user)
-    if not es_admin and not cobrador_usuario:
-        return _forbidden_operacion(request)
-    cliente_prellenado = None
-    if request.method == 'POST':
-        form = CreditoForm(request.POST)
-        if cobrador_usuario and not es_admin:
-            form.fields['cobrador'].queryset = Cobrador.objects.filter(id=cobrador_usuario.id)
-            form.fields['cobrador'].initial = cobrador_usuario.id
-        if form.is_valid():
-            # Obtener el cliente del cleaned_data
-            cliente = form.cleaned_data.get('cliente')
-            if not cliente:
-                messages.error(request, 'Error: No se pudo identificar el cliente.')
-                return render(request, 'nuevo_credito.html', {'form': form})
-            ok, msg = _cliente_y_codeudor_tienen_habeas_data(cliente)
-            if not ok:
-                messages.error(request, msg)
-                return render(request, 'nuevo_credito.html', {'form': form, 'cliente_prellenado': cliente})
-            # Crear el crédito pero no guardar aún
-            credito = form.save(commit=False)
-            if cobrador_usuario and not es_admin:
-                credito.cobrador = cobrador_usuario
-            credito.cliente = cliente  # Asegurar que el cliente esté asignado
-            credito.save()  # Ahora sí guardar
-            
-            # Mostrar información del crédito creado
-            messages.success(
-                request, 
-                f'¡Crédito #{credito.id} creado exitosamente para {credito.cliente.nombre_completo}!'
-            )
-            messages.info(
-                request,
-                f'Monto: ${credito.monto:,.2f} | '
-                f'Cuotas: {credito.cantidad_cuotas} {credito.get_tipo_plazo_display().lower()}s | '
-                f'Valor cuota: ${credito.valor_cuota:,.2f}'
-            )
-            return redirect('creditos')
-        else:
-            # Mostrar errores de validación detallados
-            for field, errors in form.errors.items():
-                field_label = form.fields.get(field, {}).label or field
-                for error in errors:
-                    messages.error(request, f'{field_label}: {error}')
-    else:
-        # Preseleccionar cliente si viene cliente_id (ej. desde detalle del cliente)
-        cliente_prellenado = None
-        cliente_id = request.GET.get('cliente_id')
-        if cliente_id:
-            try:
-                cliente_prellenado = Cliente.objects.get(id=cliente_id, activo=True)
-                form = CreditoForm(initial={'cedula_cliente': cliente_prellenado.cedula})
-            except Cliente.DoesNotExist:
-                form = CreditoForm()
-        else:
-            form = CreditoForm()
-        if cobrador_usuario and not es_admin:
-            form.fields['cobrador'].queryset = Cobrador.objects.filter(id=cobrador_usuario.id)
-            form.fields['cobrador'].initial = cobrador_usuario.id
-    return render(request, 'nuevo_credito.html', {
-        'form': form,
-        'cliente_prellenado': cliente_prellenado,
-    })
-
-@login_required
-def editar_credito(request, credito_id):
-    if not _usuario_es_gerente(request.user):
-        return _forbidden_operacion(request)
-    credito = get_object_or_404(Credito, id=credito_id)
-    if request.method == 'POST':
-        form = CreditoForm(request.POST, instance=credito)
-        if form.is_valid():
-            form.save()
-            messages.success(request, f'Crédito #{credito.id} actualizado exitosamente')
-            return redirect('creditos')
-    else:
-        form = CreditoForm(instance=credito)
-    return render(request, 'editar_credito.html', {'form': form, 'credito': credito})
-
-# CRUD Pagos
-@login_required
-def nuevo_pago(request):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method == 'POST':
-        form = PagoForm(request.POST)
-        
-        # Actualizar queryset del crédito: solo los que pueden recibir pagos (con saldo pendiente)
-        cedula_cliente = request.POST.get('cedula_cliente')
-        if cedula_cliente:
-            try:
-                cliente = Cliente.objects.get(cedula=cedula_cliente, activo=True)
-                candidatos = Credito.objects.filter(
-                    cliente=cliente,
-                    estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
-                ).exclude(estado='PAGADO')
-                ids_con_saldo = [c.id for c in candidatos if c.puede_recibir_pagos()]
-                form.fields['credito'].queryset = Credito.objects.filter(id__in=ids_con_saldo)
-            except Cliente.DoesNotExist:
-                pass
-        
-        if form.is_valid():
-            credito = form.cleaned_data['credito']
-            monto_pago = form.cleaned_data['monto']
-            numero_cuota = form.cleaned_data.get('numero_cuota')
-            monto_total_credito = credito.monto_total or credito.monto
-            total_ya_pagado = credito.total_pagado()
-            if total_ya_pagado + monto_pago > monto_total_credito:
-                form.add_error(
-                    'monto',
-                    f'El monto (${monto_pago:,.0f}) supera el saldo pendiente del crédito. '
-                    f'Saldo pendiente: ${monto_total_credito - total_ya_pagado:,.0f}.'
-                )
-            if numero_cuota:
-                cuota_obj = CronogramaPago.objects.filter(
-                    credito=credito,
-                    numero_cuota=numero_cuota
-                ).first()
-                if not cuota_obj:
-                    form.add_error('numero_cuota', f'La cuota #{numero_cuota} no existe para este crédito.')
-                elif cuota_obj.estado in ['PAGADA', 'PAGADO']:
-                    form.add_error('numero_cuota', f'La cuota #{numero_cuota} ya está pagada.')
-                elif monto_pago > cuota_obj.saldo_pendiente():
-                    form.add_error(
-                        'monto',
-                        f'El monto supera el saldo pendiente de la cuota #{numero_cuota}. '
-                        f'Saldo de la cuota: ${cuota_obj.saldo_pendiente():,.0f}.'
-                    )
-            if not form.errors:
-                pago = form.save()
-                credito = pago.credito
-                _aplicar_pago_a_cuota_si_corresponde(pago)
-                
-                # Actualizar estado del crédito si está completamente pagado
-                if credito.esta_al_dia():
-                    credito.estado = 'PAGADO'
-                    credito.save()
-                    messages.success(
-                        request, 
-                        f'Pago #{pago.id} registrado exitosamente. '
-                        f'¡El crédito #{credito.id} de {credito.cliente.nombre_completo} está completamente pagado!'
-                    )
-                else:
-                    saldo = credito.saldo_pendiente()
-                    messages.success(
-                        request, 
-                        f'Pago #{pago.id} registrado exitosamente. '
-                        f'Saldo pendiente: ${saldo}'
-                    )
-                messages.success(
-                    request,
-                    f'¡Pago registrado exitosamente! Puede descargar o enviar el recibo al cliente.'
-                )
-                # Enviar comprobante por correo si el cliente tiene email
-                email_cliente = (credito.cliente.email or '').strip()
-                if email_cliente:
-                    try:
-                        from django.core.mail import EmailMessage
-                        from django.conf import settings
-                        pdf_buffer = _generar_recibo_pdf_bytes(pago)
-                        nombre_pdf = f'recibo_pago_{pago.id:05d}.pdf'
-                        asunto = f'Comprobante de pago #{pago.id:05d} - Crédito #{credito.id}'
-                        soporte_pago = _resumen_soporte_pago(pago)
-                        saldo_cuota_txt = (
-                            f"${soporte_pago['saldo_cuota']:,.0f}"
-                            if soporte_pago['saldo_cuota'] is not None else 'N/A'
-                        )
-                        if soporte_pago['proxima_cuota']:
-                            siguiente_txt = (
-                                f"Cuota #{soporte_pago['proxima_cuota'].numero_cuota} "
-                                f"por ${soporte_pago['proxima_cuota'].saldo_pendiente():,.0f}"
-                            )
-                        else:
-                            siguiente_txt = 'Sin cuotas pendientes'
-                        cuerpo = (
-                            f'Hola {credito.cliente.nombre_completo},\n\n'
-                            f'Adjunto encontrará el comprobante de su pago por ${pago.monto:,.0f} '
-                            f'(cuota #{pago.numero_cuota}, crédito #{credito.id}).\n\n'
-                            f'Tipo de aplicación: {soporte_pago["tipo_pago"]}\n'
-                            f'Saldo pendiente de esa cuota: {saldo_cuota_txt}\n'
-                            f'Siguiente obligación sugerida: {siguiente_txt}\n'
-                            f'Saldo pendiente del crédito: ${credito.saldo_pendiente():,.0f}\n\n'
-                            f'Conserve este recibo para sus registros.\n\n'
-                            f'Atentamente,\nSistema de Créditos'
-                        )
-                        email = EmailMessage(
-                            asunto,
-                            cuerpo,
-                            getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
-                            [email_cliente],
-                        )
-                        email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
-                        email.send(fail_silently=True)
-                        messages.success(request, f'Se envió el comprobante por correo a {email_cliente}.')
-                    except Exception:
-                        messages.warning(request, 'No se pudo enviar el comprobante por correo; puede descargar el PDF en la confirmación.')
-                else:
-                    messages.info(request, 'El cliente no tiene correo registrado; descargue el recibo y entréguelo en mano.')
-                return redirect('confirmacion_pago', pago_id=pago.id)
-        else:
-            # Si hay errores, mostrarlos como mensajes
-            for error in form.non_field_errors():
-                messages.error(request, error)
-            
-            # Mostrar errores de campo específicos
-            for field, errors in form.errors.items():
-                if field == '__all__':
-                    for error in errors:
-                        messages.error(request, error)
-                else:
-                    field_label = form.fields.get(field, None)
-                    if field_label and hasattr(field_label, 'label'):
-                        label = field_label.label or field
-                    else:
-                        label = field
-                    for error in errors:
-                        messages.error(request, f'{label}: {error}')
-    else:
-        form = PagoForm()
-    
-    # Obtener información de créditos para mostrar en el template
-    creditos_info = []
-    for credito in Credito.objects.filter(estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']).exclude(estado='PAGADO'):
-        if credito.puede_recibir_pagos():
-            creditos_info.append({
-                'id': credito.id,
-                'cliente': credito.cliente.nombre_completo,
-                'monto_total': credito.monto,
-                'total_pagado': credito.total_pagado(),
-                'saldo_pendiente': credito.saldo_pendiente()
-            })
-    
-    return render(request, 'nuevo_pago.html', {
-        'form': form,
-        'creditos_info': creditos_info
-    })
-
-# Vistas para cambio de estado de créditos
-def _cliente_y_codeudor_tienen_habeas_data(cliente):
-    """Verifica que cliente y codeudor (si existe) tengan Habeas Data firmado."""
-    if not cliente.tiene_habeas_data_firmado():
-        return False, 'El cliente debe tener la autorización Habeas Data firmada antes de continuar.'
-    try:
-        codeudor = cliente.codeudor
-        if not codeudor.tiene_habeas_data_firmado():
-            return False, 'El codeudor debe tener la autorización Habeas Data firmada antes de continuar.'
-    except Codeudor.DoesNotExist:
-        pass
-    return True, None
-
-
-@login_required
-def aprobar_credito(request, credito_id):
-    """Aprobación de crédito vía POST."""
-    if not _usuario_puede_aprobar_credito(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        messages.error(request, 'Método no permitido para aprobar crédito.')
-        return redirect('creditos')
-    credito = get_object_or_404(Credito, id=credito_id)
-    
-    if credito.estado != 'SOLICITADO':
-        messages.error(request, f'El crédito #{credito.id} no está en estado SOLICITADO')
-        return redirect('creditos')
-    
-    ok, msg = _cliente_y_codeudor_tienen_habeas_data(credito.cliente)
-    if not ok:
-        messages.error(request, msg)
-        return redirect('creditos')
-    
-    credito.estado = 'APROBADO'
-    credito.fecha_aprobacion = timezone.now()
-    credito.save()
-    
-    # Generar cronograma al aprobar (para resumen y envío al desembolsar)
-    try:
-        credito.generar_cronograma()
-    except Exception:
-        pass  # no bloquear aprobación
-    
-    messages.success(
-        request,
-        f'¡Crédito #{credito.id} de {credito.cliente.nombre_completo} por ${credito.monto} APROBADO exitosamente!'
-    )
-    return redirect(reverse('creditos') + f'?resumen_credito={credito.id}')
-
-@login_required
-def rechazar_credito(request, credito_id):
-    if not _usuario_puede_aprobar_credito(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        messages.error(request, 'Método no permitido para rechazar crédito.')
-        return redirect('creditos')
-    credito = get_object_or_404(Credito, id=credito_id)
-    
-    if credito.estado != 'SOLICITADO':
-        messages.error(request, f'El crédito #{credito.id} no está en estado SOLICITADO')
-        return redirect('creditos')
-
-    # Si es un crédito creado por retanqueo, revertir: quitar el pago del crédito anterior y dejarlo vigente
-    if credito.credito_retanqueado_id:
-        ok_revertir, msg_revertir = revertir_retanqueo(credito.id)
-        if ok_revertir and msg_revertir:
-            messages.info(request, msg_revertir)
-        elif not ok_revertir:
-            messages.error(request, msg_revertir)
-            return redirect('creditos')
-    
-    credito.estado = 'RECHAZADO'
-    credito.save()
-    
-    messages.warning(
-        request, 
-        f'Crédito #{credito.id} de {credito.cliente.nombre_completo} RECHAZADO'
-    )
-    return redirect('creditos')
-
-@login_required
-def desembolsar_credito(request, credito_id):
-    if not _usuario_puede_aprobar_credito(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        messages.error(request, 'Método no permitido para desembolsar crédito.')
-        return redirect('creditos')
-    credito = get_object_or_404(Credito, id=credito_id)
-    
-    if credito.estado != 'APROBADO':
-        messages.error(request, f'El crédito #{credito.id} no está en estado APROBADO')
-        return redirect('creditos')
-    
-    ok, msg = _cliente_y_codeudor_tienen_habeas_data(credito.cliente)
-    if not ok:
-        messages.error(request, msg)
-        return redirect('creditos')
-    if not credito.puede_desembolsar_segun_firma():
-        if credito.credito_retanqueado_id:
-            messages.error(request, 'El documento de retanqueo debe estar firmado por el cliente (OTP) antes de desembolsar.')
-        elif credito.es_renovacion:
-            messages.error(request, 'El documento de renovación debe estar firmado por el cliente antes de desembolsar.')
-        else:
-            messages.error(request, 'El pagaré debe estar firmado por el cliente (y codeudor si aplica) antes de desembolsar.')
-        return redirect('creditos')
-
-    # Actualizar estado y fecha de desembolso
-    credito.estado = 'DESEMBOLSADO'
-    credito.fecha_desembolso = timezone.now()
-    credito.save()
-    
-    # Asegurar cronograma (ya se genera al aprobar; por si acaso)
-    if not credito.cronograma.exists():
-        try:
-            credito.generar_cronograma()
-        except Exception:
-            pass
-    total_cuotas = credito.cronograma.count()
-    primera_vencimiento = credito.cronograma.first().fecha_vencimiento.strftime('%d/%m/%Y') if credito.cronograma.exists() else '—'
-    
-    # Generar PDF resumen + cronograma y enviar por correo al cliente
-    email_enviado = False
-    email_cliente = (credito.cliente.email or '').strip()
-    if email_cliente:
-        try:
-            from django.core.mail import EmailMessage
-            from django.conf import settings
-            pdf_buffer = _generar_pdf_resumen_cronograma_bytes(credito)
-            nombre_pdf = f'resumen_cronograma_credito_{credito.id:04d}.pdf'
-            asunto = f'Su crédito #{credito.id} ha sido desembolsado - Resumen y cronograma de pagos'
-            cuerpo = (
-                f'Hola {credito.cliente.nombre_completo},\n\n'
-                f'Su crédito por ${credito.monto:,.0f} ha sido desembolsado.\n\n'
-                f'Adjunto encontrará el resumen del crédito y el cronograma de pagos '
-                f'({credito.cantidad_cuotas} cuotas de ${credito.valor_cuota:,.0f}). '
-                f'Primera cuota vence: {primera_vencimiento}.\n\n'
-                f'Conserve este documento para sus registros.\n\n'
-                f'Atentamente,\nSistema de Créditos'
-            )
-            email = EmailMessage(
-                asunto,
-                cuerpo,
-                getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
-                [email_cliente],
-            )
-            email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
-            email.send(fail_silently=True)
-            email_enviado = True
-        except Exception:
-            pass
-    
-    messages.success(
-        request,
-        f'¡Desembolso de ${credito.monto:,.2f} realizado exitosamente a {credito.cliente.nombre_completo}!'
-    )
-    messages.info(
-        request,
-        f'{total_cuotas} cuotas {credito.get_tipo_plazo_display().lower()}s de ${credito.valor_cuota:,.2f}. '
-        f'Primera cuota vence: {primera_vencimiento}.'
-    )
-    if email_enviado:
-        messages.success(request, f'Se envió el resumen y cronograma por correo a {email_cliente}.')
-    elif email_cliente:
-        messages.warning(request, 'No se pudo enviar el correo con el cronograma; puede descargar el PDF desde el listado.')
-    else:
-        messages.info(request, 'El cliente no tiene correo registrado; descargue el PDF y entréguelo en mano.')
-    
-    return redirect('creditos')
-
-# Vistas para Codeudores
-@login_required
-def detalle_cliente(request, cliente_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cliente = get_object_or_404(Cliente, id=cliente_id)
-    try:
-        codeudor = cliente.codeudor
-    except Codeudor.DoesNotExist:
-        codeudor = None
-    
-    creditos = cliente.credito_set.all().order_by('-fecha_solicitud')
-    creditos_con_pagare = [c for c in creditos if c.tiene_pagare_firmado()]
-    creditos_con_renovacion = [c for c in creditos if c.tiene_documento_renovacion_firmado()]
-    creditos_para_renovacion = [
-        c for c in creditos
-        if c.es_renovacion and c.estado in ('SOLICITADO', 'APROBADO') and not c.tiene_documento_renovacion_firmado()
-    ]
-    
-    context = {
-        'cliente': cliente,
-        'codeudor': codeudor,
-        'creditos': creditos,
-        'creditos_con_pagare': creditos_con_pagare,
-        'creditos_con_renovacion': creditos_con_renovacion,
-        'creditos_para_renovacion': creditos_para_renovacion,
-    }
-    return render(request, 'detalle_cliente.html', context)
-
-
-# ---------- Habeas Data (Ley 1581/2012) ----------
-def _get_json_or_post(request, key, default=None):
-    """Obtiene un valor de request.POST o del body JSON si Content-Type es application/json."""
-    if request.content_type and 'application/json' in request.content_type:
-        try:
-            data = json.loads(request.body)
-            return data.get(key, default)
-        except Exception:
-            return default
-    return request.POST.get(key, default)
-
-
-@login_required
-def solicitar_habeas_data(request):
-    """Genera OTP, envía correo si hay email; retorna JSON con otp (para contingencia WhatsApp), celular, message."""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    tipo = _get_json_or_post(request, 'tipo')
-    try:
-        objeto_id = int(_get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
-    if tipo not in ('cliente', 'codeudor'):
-        return JsonResponse({'success': False, 'message': 'Tipo inválido'}, status=400)
-    if tipo == 'cliente':
-        obj = Cliente.objects.filter(id=objeto_id).first()
-    else:
-        obj = Codeudor.objects.filter(id=objeto_id).first()
-    if not obj:
-        return JsonResponse({'success': False, 'message': 'No encontrado'}, status=404)
-    if tipo == 'cliente' and obj.tiene_habeas_data_firmado():
-        return JsonResponse({'success': False, 'message': 'El cliente ya tiene autorización Habeas Data firmada.'}, status=400)
-    if tipo == 'codeudor' and obj.tiene_habeas_data_firmado():
-        return JsonResponse({'success': False, 'message': 'El codeudor ya tiene autorización Habeas Data firmada.'}, status=400)
-    if tipo == 'codeudor' and not (getattr(obj, 'email', '') or '').strip():
-        return JsonResponse({
-            'success': False,
-            'message': 'El codeudor no tiene correo registrado. Actualice el correo para enviar y firmar Habeas Data.'
-        }, status=400)
-    otp_plain, email_enviado, celular, email_destino = solicitar_otp_habeas_data(tipo, objeto_id)
-    if not otp_plain:
-        return JsonResponse({'success': False, 'message': 'Error al generar código'}, status=500)
-    mensaje = f'Código generado. Válido por 15 minutos.'
-    if email_destino and email_enviado:
-        mensaje = f'Se envió un correo a {email_destino} con el código. Indique al titular que revise su bandeja e ingrese el código.'
-    elif not email_destino and celular:
-        mensaje = 'No hay correo registrado. Use "Enviar código por WhatsApp" para que el titular reciba el código.'
-    return JsonResponse({
-        'success': True,
-        'otp': otp_plain,
-        'celular': celular,
-        'message': mensaje,
-    })
-
-
-@login_required
-def validar_otp_habeas_data(request):
-    """Valida OTP, genera PDF, guarda en Cliente/Codeudor, envía correo con PDF. Retorna JSON."""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    tipo = _get_json_or_post(request, 'tipo')
-    try:
-        objeto_id = int(_get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
-    otp = (_get_json_or_post(request, 'otp') or '').strip()
-    if not otp or len(otp) != 6:
-        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
-    ok, error = validar_otp_y_firmar(tipo, objeto_id, otp)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'Autorización Habeas Data registrada correctamente.'})
-
-
-@login_required
-def regenerar_habeas_data(request):
-    """Regenera el PDF de Habeas Data con el formato actual (código único, disclaimer). POST JSON: tipo, id."""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    tipo = _get_json_or_post(request, 'tipo')
-    try:
-        objeto_id = int(_get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID inválido'}, status=400)
-    if tipo not in ('cliente', 'codeudor'):
-        return JsonResponse({'success': False, 'message': 'Tipo inválido'}, status=400)
-    ok, error = regenerar_pdf_habeas_data(tipo, objeto_id)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'PDF regenerado con el nuevo formato. Ya puede verlo o descargarlo.'})
-
-
-@login_required
-def descargar_habeas_data(request, tipo, objeto_id):
-    """Sirve el PDF de autorización Habeas Data del cliente o codeudor. ?inline=1 para vista previa en modal."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if tipo == 'cliente':
-        obj = get_object_or_404(Cliente, id=objeto_id)
-    else:
-        obj = get_object_or_404(Codeudor, id=objeto_id)
-    if not obj.documento_habeas_data:
-        return HttpResponse('No hay documento de autorización Habeas Data.', status=404)
-    try:
-        with obj.documento_habeas_data.open('rb') as f:
-            content = f.read()
-    except Exception:
-        return HttpResponse('Error al leer el documento.', status=500)
-    response = HttpResponse(content, content_type='application/pdf')
-    filename = f'autorizacion_habeas_data_{tipo}_{objeto_id}.pdf'
-    if request.GET.get('inline') == '1':
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        # Permitir vista previa en iframe del mismo sitio (modal)
-        response['X-Frame-Options'] = 'SAMEORIGIN'
-    else:
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
-
-
-# ---------- Pagaré electrónico ----------
-@login_required
-def solicitar_firma_pagare(request):
-    """Genera OTP para cliente y codeudor del crédito. POST JSON: credito_id."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    credito = Credito.objects.filter(id=credito_id).select_related('cliente').first()
-    if not credito:
-        return JsonResponse({'success': False, 'message': 'Crédito no encontrado.'}, status=404)
-    try:
-        codeudor = credito.cliente.codeudor
-    except Exception:
-        codeudor = None
-    if codeudor and not (getattr(codeudor, 'email', '') or '').strip():
-        return JsonResponse({
-            'success': False,
-            'message': 'El codeudor no tiene correo registrado. Actualice el correo para enviar OTP y firmar pagaré.'
-        }, status=400)
-    result = solicitar_otp_pagare(credito_id)
-    if not result.get('success'):
-        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
-    return JsonResponse(result)
-
-
-@login_required
-def validar_otp_pagare_view(request):
-    """Valida OTP del cliente o codeudor. POST JSON: credito_id, tipo_firmante, otp."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    tipo_firmante = _get_json_or_post(request, 'tipo_firmante')
-    if tipo_firmante not in ('cliente', 'codeudor'):
-        return JsonResponse({'success': False, 'message': 'Tipo de firmante inválido'}, status=400)
-    otp = (_get_json_or_post(request, 'otp') or '').strip()
-    if not otp or len(otp) != 6:
-        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
-    ok, error = validar_otp_pagare(credito_id, tipo_firmante, otp)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'Firma registrada.', 'pagare_completo': _credito_tiene_pagare_completo(credito_id)})
-
-
-def _credito_tiene_pagare_completo(credito_id):
-    c = Credito.objects.filter(id=credito_id).first()
-    return c.tiene_pagare_firmado() if c else False
-
-
-@login_required
-def regenerar_pagare(request):
-    """Regenera el PDF del pagaré con el formato actual (páginas independientes + anexo). POST JSON: credito_id."""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'message': 'No tiene permisos para esta operación.'}, status=403)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    ok, error = regenerar_pdf_pagare(credito_id)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'PDF del pagaré regenerado con el nuevo formato (páginas independientes y anexo de cédulas). Ya puede verlo o descargarlo.'})
-
-
-@login_required
-def descargar_pagare(request, credito_id):
-    """Sirve el PDF del pagaré del crédito. ?inline=1 para vista previa en modal."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return _forbidden_operacion(request)
-    if not credito.documento_pagare:
-        return HttpResponse('No hay documento de pagaré para este crédito.', status=404)
-    try:
-        with credito.documento_pagare.open('rb') as f:
-            content = f.read()
-    except Exception:
-        return HttpResponse('Error al leer el documento.', status=500)
-    response = HttpResponse(content, content_type='application/pdf')
-    filename = f'pagare_credito_{credito_id}.pdf'
-    if request.GET.get('inline') == '1':
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        response['X-Frame-Options'] = 'SAMEORIGIN'
-    else:
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
-
-
-# ---------- Renovación de crédito ----------
-@login_required
-def solicitar_firma_renovacion(request):
-    """Genera OTP para documento de renovación. POST JSON: credito_id."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    result = solicitar_otp_renovacion(credito_id)
-    if not result.get('success'):
-        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
-    return JsonResponse(result)
-
-
-@login_required
-def validar_otp_renovacion_view(request):
-    """Valida OTP de renovación. POST JSON: credito_id, otp."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    otp = (_get_json_or_post(request, 'otp') or '').strip()
-    if not otp or len(otp) != 6:
-        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
-    ok, error = validar_otp_renovacion(credito_id, otp)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'Documento de renovación firmado correctamente.'})
-
-
-@login_required
-def descargar_renovacion(request, credito_id):
-    """Sirve el PDF de renovación del crédito. ?inline=1 para vista previa."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return _forbidden_operacion(request)
-    if not credito.documento_renovacion:
-        return HttpResponse('No hay documento de renovación para este crédito.', status=404)
-    try:
-        with credito.documento_renovacion.open('rb') as f:
-            content = f.read()
-    except Exception:
-        return HttpResponse('Error al leer el documento.', status=500)
-    response = HttpResponse(content, content_type='application/pdf')
-    filename = f'renovacion_credito_{credito_id}.pdf'
-    if request.GET.get('inline') == '1':
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        response['X-Frame-Options'] = 'SAMEORIGIN'
-    else:
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
-
-
-# ---------- Documento de conformidad de retanqueo (OTP) ----------
-@login_required
-def solicitar_firma_retanqueo(request):
-    """Genera OTP para documento de retanqueo. POST JSON: credito_id."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    try:
-        result = solicitar_otp_retanqueo(credito_id)
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': f'Error al solicitar código: {str(e)}'}, status=500)
-    if not result.get('success'):
-        return JsonResponse({'success': False, 'message': result.get('message', 'Error')}, status=400)
-    return JsonResponse(result)
-
-
-@login_required
-def validar_otp_retanqueo_view(request):
-    """Valida OTP del documento de retanqueo. POST JSON: credito_id, otp."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
-    try:
-        credito_id = int(_get_json_or_post(request, 'credito_id') or _get_json_or_post(request, 'id') or 0)
-    except (TypeError, ValueError):
-        return JsonResponse({'success': False, 'message': 'ID de crédito inválido'}, status=400)
-    otp = (_get_json_or_post(request, 'otp') or '').strip()
-    if not otp or len(otp) != 6:
-        return JsonResponse({'success': False, 'message': 'Ingrese el código de 6 dígitos'}, status=400)
-    try:
-        ok, error = validar_otp_retanqueo(credito_id, otp)
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': f'Error al validar: {str(e)}'}, status=500)
-    if not ok:
-        return JsonResponse({'success': False, 'message': error}, status=400)
-    return JsonResponse({'success': True, 'message': 'Documento de retanqueo firmado correctamente.'})
-
-
-@login_required
-def descargar_retanqueo(request, credito_id):
-    """Sirve el PDF del documento de retanqueo del crédito. ?inline=1 para vista previa."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return _forbidden_operacion(request)
-    if not credito.documento_retanqueo:
-        return HttpResponse('No hay documento de retanqueo para este crédito.', status=404)
-    try:
-        with credito.documento_retanqueo.open('rb') as f:
-            content = f.read()
-    except Exception:
-        return HttpResponse('Error al leer el documento.', status=500)
-    response = HttpResponse(content, content_type='application/pdf')
-    filename = f'retanqueo_credito_{credito_id}.pdf'
-    if request.GET.get('inline') == '1':
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        response['X-Frame-Options'] = 'SAMEORIGIN'
-    else:
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
-
-
-@login_required
-def retanqueo_credito(request, credito_id):
-    """
-    Retanqueo: liquidar crédito anterior y crear nuevo.
-    GET: formulario con saldo a liquidar y monto de la nueva solicitud.
-    POST: ejecutar retanqueo y redirigir al nuevo crédito o a créditos.
-    """
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not credito.puede_retanquear():
-        messages.error(
-            request,
-            'Este crédito no puede retanquearse. Debe estar desembolsado o vencido y con saldo pendiente.'
-        )
-        return redirect('creditos')
-
-    saldo_a_liquidar = credito.saldo_a_liquidar()
-
-    if request.method == 'POST':
-        monto_str = request.POST.get('monto_nueva_solicitud', '').strip()
-        try:
-            monto_nueva = float(monto_str.replace(',', '.'))
-        except (ValueError, TypeError):
-            messages.error(request, 'Ingrese un monto válido para la nueva solicitud.')
-            return render(request, 'retanqueo_credito.html', {
-                'credito': credito,
-                'saldo_a_liquidar': saldo_a_liquidar,
-                'saldo_a_liquidar_js': float(saldo_a_liquidar),
-                'monto_nueva_solicitud': monto_str,
-            })
-        success, nuevo_credito, message = ejecutar_retanqueo(credito.id, monto_nueva)
-        if success:
-            messages.success(request, message)
-            return redirect('creditos')
-        messages.error(request, message)
-        return render(request, 'retanqueo_credito.html', {
-            'credito': credito,
-            'saldo_a_liquidar': saldo_a_liquidar,
-            'saldo_a_liquidar_js': float(saldo_a_liquidar),
-            'monto_nueva_solicitud': monto_str,
-        })
-
-    return render(request, 'retanqueo_credito.html', {
-        'credito': credito,
-        'saldo_a_liquidar': saldo_a_liquidar,
-        'saldo_a_liquidar_js': float(saldo_a_liquidar),
-    })
-
-
-@login_required
-def nuevo_codeudor(request, cliente_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cliente = get_object_or_404(Cliente, id=cliente_id)
-    
-    # Verificar si ya tiene codeudor
-    try:
-        cliente.codeudor
-        messages.error(request, f'El cliente {cliente.nombre_completo} ya tiene un codeudor asignado')
-        return redirect('detalle_cliente', cliente_id=cliente.id)
-    except Codeudor.DoesNotExist:
-        pass
-    
-    if request.method == 'POST':
-        form = CodeudorForm(request.POST, request.FILES, cliente=cliente)
-        if form.is_valid():
-            codeudor = form.save(commit=False)
-            codeudor.cliente = cliente
-            codeudor.save()
-            messages.success(request, f'Codeudor {codeudor.nombre_completo} creado exitosamente para {cliente.nombre_completo}')
-            return redirect('detalle_cliente', cliente_id=cliente.id)
-    else:
-        form = CodeudorForm(cliente=cliente)
-    
-    return render(request, 'nuevo_codeudor.html', {'form': form, 'cliente': cliente})
-
-@login_required
-def editar_codeudor(request, codeudor_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    codeudor = get_object_or_404(Codeudor, id=codeudor_id)
-    
-    if request.method == 'POST':
-        form = CodeudorForm(request.POST, request.FILES, instance=codeudor)
-        if form.is_valid():
-            form.save()
-            messages.success(request, f'Codeudor {codeudor.nombre_completo} actualizado exitosamente')
-            return redirect('detalle_cliente', cliente_id=codeudor.cliente.id)
-    else:
-        form = CodeudorForm(instance=codeudor)
-    
-    return render(request, 'editar_codeudor.html', {'form': form, 'codeudor': codeudor})
-
-@login_required
-def eliminar_codeudor(request, codeudor_id):
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    codeudor = get_object_or_404(Codeudor, id=codeudor_id)
-    cliente = codeudor.cliente
-    
-    if request.method == 'POST':
-        codeudor.delete()
-        messages.success(request, f'Codeudor {codeudor.nombre_completo} eliminado exitosamente')
-        return redirect('detalle_cliente', cliente_id=cliente.id)
-    
-    return render(request, 'confirmar_eliminar_codeudor.html', {'codeudor': codeudor})
-
-# API para búsqueda de clientes
-@login_required
-def buscar_cliente(request):
-    """Vista AJAX para buscar cliente por cédula"""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
-    cedula = request.GET.get('cedula', '').strip()
-    
-    if not cedula:
-        return JsonResponse({
-            'success': False,
-            'error': 'Cédula no proporcionada'
-        })
-    
-    try:
-        cliente = Cliente.objects.get(cedula=cedula, activo=True)
-        
-        # Obtener URL de la foto si existe
-        foto_rostro_url = None
-        if cliente.foto_rostro:
-            foto_rostro_url = cliente.foto_rostro.url
-        
-        return JsonResponse({
-            'success': True,
-            'cliente': {
-                'id': cliente.id,
-                'nombres': cliente.nombres,
-                'apellidos': cliente.apellidos,
-                'cedula': cliente.cedula,
-                'celular': cliente.celular,
-                'direccion': cliente.direccion,
-                'barrio': cliente.barrio,
-                'foto_rostro': foto_rostro_url,
-            }
-        })
-    except Cliente.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
-        })
-
-# Vista de confirmación de pago
-@login_required
-def confirmacion_pago(request, pago_id):
-    """Vista para mostrar confirmación de pago con opciones de descarga/envío"""
-    pago = get_object_or_404(Pago, id=pago_id)
-    if not _usuario_puede_ver_pago(request.user, pago):
-        return _forbidden_operacion(request)
-    credito = pago.credito
-    cliente = credito.cliente
-    
-    # Calcular información adicional de forma más robusta
-    try:
-        # Intentar usar cronograma si existe
-        if hasattr(credito, 'cronograma') and credito.cronograma.exists():
-            cuotas_pagadas = credito.cronograma.filter(estado__in=['PAGADO', 'PAGADA']).count()
-        else:
-            # Calcular basado en pagos y valor de cuota
-            total_pagado = credito.total_pagado()
-            valor_cuota = credito.valor_cuota if credito.valor_cuota > 0 else 1
-            cuotas_pagadas = int(total_pagado / valor_cuota)
-            
-        total_cuotas = credito.cantidad_cuotas if credito.cantidad_cuotas else 1
-        progreso_pago = (cuotas_pagadas / total_cuotas) * 100 if total_cuotas > 0 else 0
-        progreso_pago = min(100, max(0, progreso_pago))  # Limitar entre 0 y 100
-        
-    except Exception:
-        cuotas_pagadas = 0
-        total_cuotas = credito.cantidad_cuotas if credito.cantidad_cuotas else 1
-        progreso_pago = 0
-    
-    # Calcular próxima fecha de pago (estimada)
-    proxima_fecha_pago = None
-    if cuotas_pagadas < total_cuotas:
-        from datetime import timedelta
-        if credito.tipo_plazo == 'DIARIO':
-            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(days=1)
-        elif credito.tipo_plazo == 'SEMANAL':
-            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(weeks=1)
-        elif credito.tipo_plazo == 'QUINCENAL':
-            proxima_fecha_pago = pago.fecha_pago.date() + timedelta(days=15)
-        elif credito.tipo_plazo == 'MENSUAL':
-            fecha_pago = pago.fecha_pago.date()
-            mes = fecha_pago.month + 1
-            año = fecha_pago.year
-            if mes > 12:
-                mes = 1
-                año += 1
-            try:
-                proxima_fecha_pago = fecha_pago.replace(year=año, month=mes)
-            except ValueError:
-                # Manejar casos como 31 de marzo -> 30 de abril
-                from calendar import monthrange
-                ultimo_dia = monthrange(año, mes)[1]
-                proxima_fecha_pago = fecha_pago.replace(year=año, month=mes, day=min(fecha_pago.day, ultimo_dia))
-    
-    # Parámetros desde agenda (Registrar cobro): mostrar si se envió correo o si no hay email
-    email_enviado_param = request.GET.get('email_enviado') == '1'
-    sin_email_param = request.GET.get('sin_email') == '1'
-    url_recibo_pdf = request.build_absolute_uri(reverse('generar_recibo_pdf', args=[pago.id]))
-    agenda_cobrador_url = None
-    if credito.cobrador_id:
-        fecha_agenda = pago.fecha_pago.date().strftime('%Y-%m-%d')
-        agenda_cobrador_url = reverse('agenda_cobrador_especifico', args=[credito.cobrador_id]) + f'?fecha={fecha_agenda}'
-    
-    context = {
-        'pago': pago,
-        'credito': credito,
-        'cliente': cliente,
-        'cuotas_pagadas': cuotas_pagadas,
-        'total_cuotas': total_cuotas,
-        'progreso_pago': progreso_pago,
-        'proxima_fecha_pago': proxima_fecha_pago,
-        'credito_completado': credito.estado == 'PAGADO',
-        'email_enviado_param': email_enviado_param,
-        'sin_email_param': sin_email_param,
-        'url_recibo_pdf': url_recibo_pdf,
-        'agenda_cobrador_url': agenda_cobrador_url,
-    }
-    
-    return render(request, 'confirmacion_pago.html', context)
-
-# Vista para búsqueda AJAX de clientes en formulario de crédito
-@login_required
-def buscar_cliente_credito(request):
-    """Vista AJAX para buscar cliente por cédula en el formulario de crédito"""
-    if not _usuario_puede_registrar_cliente_credito(request.user):
-        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
-    cedula = request.GET.get('cedula', '').strip()
-    
-    if not cedula:
-        return JsonResponse({
-            'success': False,
-            'error': 'Debe proporcionar una cédula'
-        })
-    
-    try:
-        cliente = Cliente.objects.get(cedula=cedula, activo=True)
-        
-        # Preparar URL de la foto (si existe)
-        foto_url = None
-        if cliente.foto_rostro:
-            try:
-                foto_url = cliente.foto_rostro.url
-            except ValueError:
-                foto_url = None
-        
-        return JsonResponse({
-            'success': True,
-            'cliente': {
-                'id': cliente.id,
-                'nombre_completo': cliente.nombre_completo,
-                'cedula': cliente.cedula,
-                'celular': cliente.celular,
-                'direccion': cliente.direccion,
-                'foto_url': foto_url
-            }
-        })
-    except Cliente.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
-        })
-
-# Vista para obtener datos del crédito para el modal de aprobación
-@login_required
-def obtener_datos_credito(request, credito_id):
-    """Vista AJAX para obtener datos completos del crédito"""
-    try:
-        credito = get_object_or_404(Credito, id=credito_id)
-        if not _usuario_puede_ver_credito(request.user, credito):
-            return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este crédito.'}, status=403)
-        
-        # Calcular fechas del cronograma (simulado)
-        fechas_cronograma = []
-        if credito.cantidad_cuotas > 0:
-            fecha_base = timezone.now().date()
-            
-            for i in range(credito.cantidad_cuotas):
-                if credito.tipo_plazo == 'DIARIO':
-                    fecha_pago = fecha_base + timedelta(days=i+1)
-                elif credito.tipo_plazo == 'SEMANAL':
-                    fecha_pago = fecha_base + timedelta(weeks=i+1)
-                elif credito.tipo_plazo == 'QUINCENAL':
-                    fecha_pago = fecha_base + timedelta(days=(i+1)*15)
-                else:  # MENSUAL
-                    mes = fecha_base.month + (i + 1)
-                    año = fecha_base.year
-                    while mes > 12:
-                        mes -= 12
-                        año += 1
-                    
-                    try:
-                        fecha_pago = fecha_base.replace(year=año, month=mes)
-                    except ValueError:
-                        from calendar import monthrange
-                        ultimo_dia = monthrange(año, mes)[1]
-                        fecha_pago = fecha_base.replace(year=año, month=mes, day=min(fecha_base.day, ultimo_dia))
-                
-                fechas_cronograma.append({
-                    'cuota': i + 1,
-                    'fecha': fecha_pago.strftime('%d/%m/%Y'),
-                    'valor': float(credito.valor_cuota)
-                })
-        
-        return JsonResponse({
-            'success': True,
-            'credito': {
-                'id': credito.id,
-                'cliente': {
-                    'nombre_completo': credito.cliente.nombre_completo,
-                    'cedula': credito.cliente.cedula,
-                    'celular': credito.cliente.celular,
-                    'direccion': credito.cliente.direccion,
-                },
-                'monto': float(credito.monto),
-                'tasa_interes': float(credito.tasa_interes),
-                'tipo_plazo': credito.get_tipo_plazo_display(),
-                'cantidad_cuotas': credito.cantidad_cuotas,
-                'valor_cuota': float(credito.valor_cuota),
-                'monto_total': float(credito.monto_total),
-                'total_interes': float(credito.total_interes),
-                'fecha_solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y %H:%M'),
-                'descripcion_pago': credito.descripcion_pago,
-                'cronograma': fechas_cronograma
-            }
-        })
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        })
-
-
-@login_required
-def obtener_pagos_credito(request, credito_id):
-    """Devuelve los abonos (pagos) del crédito para mostrar en detalle del crédito."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este crédito.'}, status=403)
-    pagos = credito.pago_set.order_by('-fecha_pago')
-    lista = []
-    for p in pagos:
-        cobrado_por = None
-        if p.observaciones:
-            # "Cobro en campo por Juan Pérez" o "Cobro por María García" o "💰 Cobro por ..."
-            m = re.search(r'(?:Cobro\s+(?:en\s+campo\s+)?por|por)\s+([^\n]+?)(?:\n|$)', p.observaciones.strip(), re.IGNORECASE)
-            if m:
-                cobrado_por = m.group(1).strip()
-        lista.append({
-            'id': p.id,
-            'fecha_pago': p.fecha_pago.strftime('%d/%m/%Y %H:%M'),
-            'monto': float(p.monto),
-            'numero_cuota': p.numero_cuota,
-            'observaciones': (p.observaciones or '').strip() or None,
-            'cobrado_por': cobrado_por,
-        })
-    total_pagado = credito.total_pagado()
-    saldo_pendiente = credito.saldo_pendiente()
-    return JsonResponse({
-        'success': True,
-        'pagos': lista,
-        'total_pagado': float(total_pagado),
-        'saldo_pendiente': float(saldo_pendiente),
-        'monto_total_credito': float(credito.monto_total or credito.monto),
-    })
-
-
-def _generar_pdf_resumen_cronograma_bytes(credito):
-    """
-    Genera el PDF resumen del crédito + cronograma de pagos.
-    Usa el cronograma de la BD si existe (generado al aprobar); si no, calcula fechas.
-    Retorna BytesIO con el PDF listo para adjuntar o devolver como respuesta.
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=A4,
-        topMargin=0.5*inch,
-        bottomMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        rightMargin=0.5*inch
-    )
-    
-    # Estilos optimizados para menos espacio
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=14,
-        spaceAfter=12,
-        alignment=1,  # Centrado
-        textColor=colors.darkblue
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=11,
-        spaceAfter=8,
-        textColor=colors.darkblue
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=8,
-        spaceAfter=3
-    )
-    
-    # Contenido del PDF
-    story = []
-    
-    # Título principal compacto
-    story.append(Paragraph("SISTEMA DE CRÉDITOS - CRONOGRAMA DE PAGOS", title_style))
-    story.append(Spacer(1, 8))
-    
-    # Información del crédito (sin tasa de interés anual)
-    info_credito = [
-        ["Crédito N°:", f"#{credito.id:04d}", "Cliente:", credito.cliente.nombre_completo],
-        ["Cédula:", credito.cliente.cedula, "Celular:", credito.cliente.celular],
-        ["Fecha:", credito.fecha_solicitud.strftime('%d/%m/%Y'), "Modalidad:", credito.get_tipo_plazo_display()],
-        ["Monto:", f"${credito.monto:,.0f}", "Cuotas:", f"{credito.cantidad_cuotas}"],
-        ["Valor Cuota:", f"${credito.valor_cuota:,.0f}", "Total:", f"${credito.monto_total:,.0f}"]
-    ]
-    
-    info_table = Table(info_credito, colWidths=[1.2*inch, 1.8*inch, 1.2*inch, 1.8*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BACKGROUND', (0, 0), (0, -1), colors.darkblue),
-        ('BACKGROUND', (2, 0), (2, -1), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
-        ('TEXTCOLOR', (2, 0), (2, -1), colors.white),
-    ]))
-    
-    story.append(info_table)
-    story.append(Spacer(1, 10))
-    
-    # Cronograma de pagos
-    story.append(Paragraph("CRONOGRAMA DE PAGOS", subtitle_style))
-    
-    cronograma_data = [['Cuota N°', 'Fecha de Pago', 'Valor Cuota', 'Saldo Pendiente']]
-    cuotas_bd = credito.cronograma.all().order_by('numero_cuota')
-    
-    if cuotas_bd.exists():
-        saldo = float(credito.monto_total or credito.monto)
-        for c in cuotas_bd:
-            saldo -= float(c.monto_cuota)
-            cronograma_data.append([
-                str(c.numero_cuota),
-                c.fecha_vencimiento.strftime('%d/%m/%Y'),
-                f"${c.monto_cuota:,.0f}",
-                f"${max(0, saldo):,.0f}"
-            ])
-    else:
-        fecha_base = timezone.now().date()
-        saldo_pendiente = float(credito.monto_total or credito.monto)
-        for i in range(credito.cantidad_cuotas):
-            if credito.tipo_plazo == 'DIARIO':
-                fecha_pago = fecha_base + timedelta(days=i+1)
-            elif credito.tipo_plazo == 'SEMANAL':
-                fecha_pago = fecha_base + timedelta(weeks=i+1)
-            elif credito.tipo_plazo == 'QUINCENAL':
-                fecha_pago = fecha_base + timedelta(days=(i+1)*15)
-            else:
-                mes = fecha_base.month + (i + 1)
-                año = fecha_base.year
-                while mes > 12:
-                    mes -= 12
-                    año += 1
-                try:
-                    fecha_pago = fecha_base.replace(year=año, month=mes)
-                except ValueError:
-                    from calendar import monthrange
-                    ultimo_dia = monthrange(año, mes)[1]
-                    fecha_pago = fecha_base.replace(year=año, month=mes, day=min(fecha_base.day, ultimo_dia))
-            saldo_pendiente -= float(credito.valor_cuota)
-            cronograma_data.append([
-                f"{i+1}",
-                fecha_pago.strftime('%d/%m/%Y'),
-                f"${credito.valor_cuota:,.0f}",
-                f"${max(0, saldo_pendiente):,.0f}"
-            ])
-    
-    # Tabla del cronograma optimizada
-    cronograma_table = Table(cronograma_data, colWidths=[0.8*inch, 1.2*inch, 1.2*inch, 1.3*inch])
-    cronograma_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-    
-    story.append(cronograma_table)
-    story.append(Spacer(1, 10))
-    
-    # Información compacta de contacto y nota final
-    contacto_texto = (
-        "<b>CONTACTO:</b> Tel: +57 (XXX) XXX-XXXX | Email: creditos@sistemafinanciero.com | "
-        "Dirección: Calle XX #XX-XX, Ciudad<br/>"
-        "<b>NOTA:</b> Cronograma válido desde el desembolso. "
-        f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-    )
-    
-    story.append(Paragraph(contacto_texto, normal_style))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
-@login_required
-def generar_pdf_cronograma(request, credito_id):
-    """Genera y descarga el PDF resumen + cronograma del crédito."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return _forbidden_operacion(request)
-    try:
-        buffer = _generar_pdf_resumen_cronograma_bytes(credito)
-    except Exception:
-        return HttpResponse('Error al generar el PDF.', status=500)
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="resumen_cronograma_credito_{credito.id:04d}.pdf"'
-    return response
-
-
-@login_required
-def resumen_credito_json(request, credito_id):
-    """Devuelve JSON con resumen del crédito y cronograma para el modal tras aprobar."""
-    credito = get_object_or_404(Credito, id=credito_id)
-    if not _usuario_puede_ver_credito(request.user, credito):
-        return JsonResponse({'success': False, 'message': 'No tiene permisos para ver este crédito.'}, status=403)
-    if credito.estado != 'APROBADO' and credito.estado != 'DESEMBOLSADO':
-        return JsonResponse({'success': False, 'message': 'Crédito no disponible'}, status=400)
-    if not credito.cronograma.exists():
-        try:
-            credito.generar_cronograma()
-        except Exception:
-            pass
-    cliente = credito.cliente
-    cuotas = list(
-        credito.cronograma.all().order_by('numero_cuota').values(
-            'numero_cuota', 'fecha_vencimiento', 'monto_cuota'
-        )
-    )
-    for c in cuotas:
-        c['fecha_vencimiento'] = c['fecha_vencimiento'].strftime('%d/%m/%Y')
-        c['monto_cuota'] = float(c['monto_cuota'])
-    return JsonResponse({
-        'success': True,
-        'cliente': {
-            'nombre': cliente.nombre_completo,
-            'cedula': cliente.cedula or '',
-            'celular': cliente.celular or '',
-            'email': cliente.email or '',
-        },
-        'credito': {
-            'id': credito.id,
-            'monto': float(credito.monto),
-            'monto_total': float(credito.monto_total or credito.monto),
-            'cantidad_cuotas': credito.cantidad_cuotas,
-            'valor_cuota': float(credito.valor_cuota),
-            'tipo_plazo': credito.get_tipo_plazo_display(),
-            'fecha_solicitud': credito.fecha_solicitud.strftime('%d/%m/%Y') if credito.fecha_solicitud else '',
-        },
-        'cronograma': cuotas,
-    })
-
-
-# Vistas adicionales para gestión de pagos
-@login_required
-def detalle_pago(request, pago_id):
-    """Vista AJAX para obtener detalles de un pago"""
-    try:
-        pago = get_object_or_404(Pago, id=pago_id)
-        if not _usuario_puede_ver_pago(request.user, pago):
-            return JsonResponse({'success': False, 'error': 'No tiene permisos para ver este pago.'}, status=403)
-        
-        return JsonResponse({
-            'success': True,
-            'pago': {
-                'id': pago.id,
-                'monto': float(pago.monto),
-                'numero_cuota': pago.numero_cuota,
-                'fecha_pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M'),
-                'observaciones': pago.observaciones or 'Sin observaciones',
-                'credito': {
-                    'id': pago.credito.id,
-                    'monto_total': float(pago.credito.monto_total),
-                    'cliente': {
-                        'nombre_completo': pago.credito.cliente.nombre_completo,
-                        'cedula': pago.credito.cliente.cedula,
-                        'celular': pago.credito.cliente.celular,
-                        'direccion': pago.credito.cliente.direccion,
-                    }
-                }
-            }
-        })
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        })
-
-def _generar_recibo_pdf_bytes(pago):
-    """Genera el PDF del recibo de pago en memoria. Retorna BytesIO."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=A4,
-        topMargin=0.5*inch,
-        bottomMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        rightMargin=0.5*inch
-    )
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=15,
-        alignment=1,  # Centrado
-        textColor=colors.darkblue
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=12,
-        spaceAfter=10,
-        textColor=colors.darkblue
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=9,
-        spaceAfter=4
-    )
-    
-    # Contenido del PDF
-    story = []
-    
-    # Título principal
-    story.append(Paragraph("RECIBO DE PAGO - SISTEMA DE CRÉDITOS", title_style))
-    story.append(Spacer(1, 10))
-    
-    # Información del recibo
-    info_recibo = [
-        ["N° Recibo:", f"#{pago.id:05d}", "Fecha:", pago.fecha_pago.strftime('%d/%m/%Y %H:%M')],
-        ["Cliente:", pago.credito.cliente.nombre_completo, "Cédula:", pago.credito.cliente.cedula],
-        ["Crédito N°:", f"#{pago.credito.id:04d}", "Cuota N°:", f"{pago.numero_cuota}"],
-    ]
-    
-    info_table = Table(info_recibo, colWidths=[1.2*inch, 2*inch, 1.2*inch, 1.8*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BACKGROUND', (0, 0), (0, -1), colors.darkblue),
-        ('BACKGROUND', (2, 0), (2, -1), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
-        ('TEXTCOLOR', (2, 0), (2, -1), colors.white),
-    ]))
-    
-    story.append(info_table)
-    story.append(Spacer(1, 20))
-    
-    soporte = _resumen_soporte_pago(pago)
-    saldo_cuota = soporte['saldo_cuota']
-    tipo_pago = soporte['tipo_pago']
-    proxima_cuota = soporte['proxima_cuota']
-
-    # Detalle del pago
-    story.append(Paragraph("DETALLE DEL PAGO", subtitle_style))
-    
-    detalle_pago = [
-        ["Concepto", "Monto"],
-        [f"Cuota #{pago.numero_cuota} del Crédito #{pago.credito.id:04d}", f"${pago.monto:,.0f}"],
-        ["Tipo de aplicación", tipo_pago],
-        ["", ""],
-        ["TOTAL PAGADO", f"${pago.monto:,.0f}"]
-    ]
-    
-    # Calcular información del crédito
-    cuotas_pagadas = pago.credito.cronograma.filter(estado__in=['PAGADO', 'PAGADA']).count()
-    progreso = (cuotas_pagadas / pago.credito.cantidad_cuotas) * 100
-    
-    detalle_table = Table(detalle_pago, colWidths=[4*inch, 2*inch])
-    detalle_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, -1), (-1, -1), 12),
-    ]))
-    
-    story.append(detalle_table)
-    story.append(Spacer(1, 15))
-    
-    # Estado del crédito
-    story.append(Paragraph("ESTADO DEL CRÉDITO", subtitle_style))
-    
-    estado_credito = [
-        ["Descripción", "Valor"],
-        ["Monto Total del Crédito", f"${pago.credito.monto_total:,.0f}"],
-        ["Total Pagado hasta la fecha", f"${pago.credito.total_pagado():,.0f}"],
-        ["Saldo Pendiente", f"${pago.credito.saldo_pendiente():,.0f}"],
-        ["Saldo de la cuota actual", f"${saldo_cuota:,.0f}" if saldo_cuota is not None else "N/A"],
-        ["Cuotas Pagadas", f"{cuotas_pagadas} de {pago.credito.cantidad_cuotas}"],
-        ["Progreso del Pago", f"{progreso:.1f}%"],
-        ["Modalidad de Pago", pago.credito.get_tipo_plazo_display()],
-        ["Valor por Cuota", f"${pago.credito.valor_cuota:,.0f}"]
-    ]
-    
-    estado_table = Table(estado_credito, colWidths=[3*inch, 2.5*inch])
-    estado_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-    
-    story.append(estado_table)
-    story.append(Spacer(1, 15))
-    
-    # Próximo pago (si no está completo)
-    if pago.credito.estado != 'PAGADO' and proxima_cuota:
-        # Calcular próxima fecha estimada según modalidad del crédito
-        if pago.credito.tipo_plazo == 'DIARIO':
-            proxima_fecha = pago.fecha_pago.date() + timedelta(days=1)
-        elif pago.credito.tipo_plazo == 'SEMANAL':
-            proxima_fecha = pago.fecha_pago.date() + timedelta(weeks=1)
-        elif pago.credito.tipo_plazo == 'QUINCENAL':
-            proxima_fecha = pago.fecha_pago.date() + timedelta(days=15)
-        else:  # MENSUAL
-            fecha_pago = pago.fecha_pago.date()
-            mes = fecha_pago.month + 1
-            año = fecha_pago.year
-            if mes > 12:
-                mes = 1
-                año += 1
-            try:
-                proxima_fecha = fecha_pago.replace(year=año, month=mes)
-            except ValueError:
-                from calendar import monthrange
-                ultimo_dia = monthrange(año, mes)[1]
-                proxima_fecha = fecha_pago.replace(year=año, month=mes, day=min(fecha_pago.day, ultimo_dia))
-        
-        story.append(Paragraph("PRÓXIMO PAGO", subtitle_style))
-        proximo_texto = (
-            f"<b>Cuota #{proxima_cuota.numero_cuota}:</b> ${proxima_cuota.saldo_pendiente():,.0f}<br/>"
-            f"<b>Fecha Estimada:</b> {proxima_fecha.strftime('%d/%m/%Y')}<br/>"
-            f"<b>Modalidad:</b> {pago.credito.get_tipo_plazo_display()}"
-        )
-        story.append(Paragraph(proximo_texto, normal_style))
-        story.append(Spacer(1, 15))
-    
-    # Observaciones
-    if pago.observaciones:
-        story.append(Paragraph("OBSERVACIONES", subtitle_style))
-        story.append(Paragraph(pago.observaciones, normal_style))
-        story.append(Spacer(1, 15))
-    
-    # Información de contacto y nota
-    contacto_texto = (
-        "<b>CONTACTO:</b> Tel: +57 (XXX) XXX-XXXX | Email: creditos@sistemafinanciero.com<br/>"
-        "<b>NOTA:</b> Conserve este recibo como comprobante de pago. "
-        f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-    )
-    
-    story.append(Paragraph(contacto_texto, normal_style))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
-@login_required
-def generar_recibo_pdf(request, pago_id):
-    """Genera y descarga PDF del recibo de pago."""
-    pago = get_object_or_404(Pago, id=pago_id)
-    if not _usuario_puede_ver_pago(request.user, pago):
-        return _forbidden_operacion(request)
-    try:
-        buffer = _generar_recibo_pdf_bytes(pago)
-    except Exception:
-        return HttpResponse('Error al generar el recibo.', status=500)
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="recibo_pago_{pago.id:05d}.pdf"'
-    return response
-
-
-# Vista AJAX para buscar créditos de un cliente en formulario de pago
-@login_required
-def buscar_creditos_cliente(request):
-    """Vista AJAX para buscar créditos de un cliente por cédula. Solo devuelve créditos con saldo pendiente > 0."""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
-    cedula = request.GET.get('cedula', '').strip()
-    
-    if not cedula:
-        return JsonResponse({
-            'success': False,
-            'error': 'Debe proporcionar una cédula'
-        })
-    
-    try:
-        cliente = Cliente.objects.get(cedula=cedula, activo=True)
-        
-        # Traer créditos en estado vigente (no PAGADO ni RECHAZADO)
-        candidatos = Credito.objects.filter(
-            cliente=cliente,
-            estado__in=['APROBADO', 'DESEMBOLSADO', 'VENCIDO']
-        )
-        
-        # Solo incluir créditos con saldo pendiente "real" (> 1 peso).
-        # Saldos por redondeo (ej. $0,02) se consideran pagados: se marcan PAGADO y no se muestran.
-        from decimal import Decimal
-        umbral_cerrado = Decimal('1')  # menos de 1 peso = considerado cerrado por redondeo
-        creditos = []
-        for credito in candidatos:
-            if credito.estado == 'PAGADO':
-                continue
-            saldo = credito.saldo_pendiente()
-            if saldo <= 0 or saldo < umbral_cerrado:
-                if credito.estado != 'PAGADO':
-                    credito.estado = 'PAGADO'
-                    credito.save(update_fields=['estado'])
-                continue
-            creditos.append(credito)
-        
-        if not creditos:
-            return JsonResponse({
-                'success': False,
-                'error': f'El cliente {cliente.nombre_completo} no tiene créditos con saldo pendiente para registrar pagos'
-            })
-        
-        # Preparar URL de la foto (si existe)
-        foto_url = None
-        if cliente.foto_rostro:
-            try:
-                foto_url = cliente.foto_rostro.url
-            except ValueError:
-                foto_url = None
-        
-        # Preparar lista de créditos (solo los que pueden recibir pagos)
-        creditos_data = []
-        for credito in creditos:
-            proxima_cuota = credito.cronograma.filter(
-                estado__in=['PENDIENTE', 'PARCIAL']
-            ).order_by('numero_cuota').first()
-            if proxima_cuota:
-                numero_cuota_sugerida = proxima_cuota.numero_cuota
-                monto_sugerido = proxima_cuota.saldo_pendiente()
-            else:
-                numero_cuota_sugerida = 1
-                monto_sugerido = credito.valor_cuota if credito.valor_cuota else credito.saldo_pendiente()
-            cuotas_pagadas = credito.cronograma.filter(estado__in=['PAGADO', 'PAGADA']).count() if credito.cronograma.exists() else 0
-            creditos_data.append({
-                'id': credito.id,
-                'monto_total': float(credito.monto_total),
-                'saldo_pendiente': float(credito.saldo_pendiente()),
-                'total_pagado': float(credito.total_pagado()),
-                'estado': credito.get_estado_display(),
-                'fecha_desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else 'N/A',
-                'tipo_plazo': credito.get_tipo_plazo_display(),
-                'cantidad_cuotas': credito.cantidad_cuotas,
-                'valor_cuota': float(credito.valor_cuota),
-                'cuotas_pagadas': cuotas_pagadas,
-                'numero_cuota_sugerida': numero_cuota_sugerida,
-                'monto_sugerido': float(monto_sugerido),
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'cliente': {
-                'id': cliente.id,
-                'nombre_completo': cliente.nombre_completo,
-                'cedula': cliente.cedula,
-                'celular': cliente.celular,
-                'direccion': cliente.direccion,
-                'foto_url': foto_url
-            },
-            'creditos': creditos_data
-        })
-        
-    except Cliente.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': f'No se encontró un cliente activo con cédula "{cedula}"'
-        })
-
-# ========================================
-# VISTAS PARA COBRADORES Y RUTAS
-# ========================================
-
-# Vista principal del módulo de cobradores
-@login_required
-def cobradores(request):
-    """Lista principal de cobradores"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cobradores = Cobrador.objects.all().order_by('nombres', 'apellidos')
-    
-    # Estadísticas básicas
-    total_cobradores = cobradores.count()
-    cobradores_activos = cobradores.filter(activo=True).count()
-    
-    context = {
-        'cobradores': cobradores,
-        'total_cobradores': total_cobradores,
-        'cobradores_activos': cobradores_activos,
-    }
-    
-    return render(request, 'cobradores/lista_cobradores.html', context)
-
-# CRUD Cobradores
-@login_required
-def nuevo_cobrador(request):
-    """Crear nuevo cobrador"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from .forms import CobradorForm
-    
-    if request.method == 'POST':
-        form = CobradorForm(request.POST)
-        if form.is_valid():
-            cobrador = form.save()
-            messages.success(request, f'Cobrador {cobrador.nombre_completo} creado exitosamente')
-            return redirect('detalle_cobrador', cobrador_id=cobrador.id)
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = CobradorForm()
-    
-    return render(request, 'cobradores/nuevo_cobrador.html', {'form': form})
-
-@login_required
-def detalle_cobrador(request, cobrador_id):
-    """Ver detalle completo de un cobrador"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
-    
-    # Estadísticas del cobrador
-    creditos_asignados = cobrador.creditos_activos()
-    monto_por_cobrar_hoy = cobrador.monto_por_cobrar_hoy()
-    creditos_hoy = cobrador.creditos_por_cobrar_hoy()
-    
-    # Rutas asignadas
-    rutas = cobrador.rutas.all()
-    
-    context = {
-        'cobrador': cobrador,
-        'creditos_asignados': creditos_asignados,
-        'monto_por_cobrar_hoy': monto_por_cobrar_hoy,
-        'creditos_hoy': creditos_hoy,
-        'rutas': rutas,
-    }
-    
-    return render(request, 'cobradores/detalle_cobrador.html', context)
-
-@login_required
-def editar_cobrador(request, cobrador_id):
-    """Editar un cobrador existente"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from .forms import CobradorForm
-    
-    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
-    
-    if request.method == 'POST':
-        form = CobradorForm(request.POST, instance=cobrador)
-        if form.is_valid():
-            cobrador_actualizado = form.save()
-            messages.success(request, f'Cobrador {cobrador_actualizado.nombre_completo} actualizado exitosamente')
-            return redirect('detalle_cobrador', cobrador_id=cobrador.id)
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = CobradorForm(instance=cobrador)
-    
-    return render(request, 'cobradores/editar_cobrador.html', {
-        'form': form,
-        'cobrador': cobrador
-    })
-
-# Vista principal del módulo de rutas
-@login_required
-def rutas(request):
-    """Lista principal de rutas"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    rutas = Ruta.objects.all().order_by('nombre')
-    
-    # Estadísticas básicas
-    total_rutas = rutas.count()
-    rutas_activas = rutas.filter(activa=True).count()
-    
-    context = {
-        'rutas': rutas,
-        'total_rutas': total_rutas,
-        'rutas_activas': rutas_activas,
-    }
-    
-    return render(request, 'cobradores/lista_rutas.html', context)
-
-# CRUD Rutas
-@login_required
-def nueva_ruta(request):
-    """Crear nueva ruta"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from .forms import RutaForm
-    
-    if request.method == 'POST':
-        form = RutaForm(request.POST)
-        if form.is_valid():
-            ruta = form.save()
-            messages.success(request, f'Ruta "{ruta.nombre}" creada exitosamente')
-            return redirect('detalle_ruta', ruta_id=ruta.id)
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = RutaForm()
-    
-    return render(request, 'cobradores/nueva_ruta.html', {'form': form})
-
-@login_required
-def detalle_ruta(request, ruta_id):
-    """Ver detalle completo de una ruta"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    ruta = get_object_or_404(Ruta, id=ruta_id)
-    
-    # Estadísticas de la ruta
-    cobradores_asignados = ruta.cobradores.all()
-    total_clientes = ruta.total_clientes()
-    creditos_activos = ruta.total_creditos_activos()
-    
-    context = {
-        'ruta': ruta,
-        'cobradores_asignados': cobradores_asignados,
-        'total_clientes': total_clientes,
-        'creditos_activos': creditos_activos,
-        'barrios_lista': ruta.get_barrios_lista(),
-    }
-    
-    return render(request, 'cobradores/detalle_ruta.html', context)
-
-@login_required
-def editar_ruta(request, ruta_id):
-    """Editar una ruta existente"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from .forms import RutaForm
-    
-    ruta = get_object_or_404(Ruta, id=ruta_id)
-    
-    if request.method == 'POST':
-        form = RutaForm(request.POST, instance=ruta)
-        if form.is_valid():
-            ruta_actualizada = form.save()
-            messages.success(request, f'Ruta "{ruta_actualizada.nombre}" actualizada exitosamente')
-            return redirect('detalle_ruta', ruta_id=ruta.id)
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = RutaForm(instance=ruta)
-    
-    return render(request, 'cobradores/editar_ruta.html', {
-        'form': form,
-        'ruta': ruta
-    })
-
-# Dashboard de gestión diaria de cobros
-@login_required
-def gestion_diaria_cobros(request):
-    """Dashboard de Control de Cobranza Diaria - Vista Administrador"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    import logging
-    logger = logging.getLogger(__name__)
-    from datetime import date, timedelta
-    from django.db.models import Sum, Count, Q
-    from decimal import Decimal
-    
-    hoy = date.today()
-    
-    # ===== OBTENER TODOS LOS PAGOS DEL DÍA =====
-    pagos_recibidos_hoy = Pago.objects.filter(fecha_pago__date=hoy)
-    monto_recaudado_hoy = pagos_recibidos_hoy.aggregate(total=Sum('monto'))['total'] or Decimal('0')
-    total_pagos_hoy = pagos_recibidos_hoy.count()
-    
-    # ===== LISTA DE CRÉDITOS ACTIVOS PARA GESTIÓN =====
-    # Todos los créditos activos (no se limita solo a los que vencen hoy)
-    creditos_activos = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO']
-    ).select_related('cliente', 'cobrador').order_by('-dias_mora', 'fecha_vencimiento')
-    
-    # Total de la cartera activa (todos los créditos pendientes)
-    try:
-        total_cartera_activa = sum(
-            (credito.saldo_pendiente() if hasattr(credito, 'saldo_pendiente') else 0)
-            for credito in creditos_activos
-        )
-    except Exception as e:
-        logger.warning('Error sumando cartera activa: %s', e)
-        total_cartera_activa = 0
-    
-    # Créditos que requieren gestión urgente (en mora o que vencen hoy)
-    creditos_urgentes = creditos_activos.filter(
-        Q(fecha_vencimiento__lte=hoy, fecha_vencimiento__isnull=False) | Q(dias_mora__gt=0)
-    )
-    
-    # Total a gestionar (créditos urgentes)
-    try:
-        total_a_gestionar = sum(
-            (credito.saldo_pendiente() if hasattr(credito, 'saldo_pendiente') else 0)
-            for credito in creditos_urgentes
-        )
-    except Exception as e:
-        logger.warning('Error sumando total a gestionar: %s', e)
-        total_a_gestionar = 0
-    
-    # Convertir a Decimal
-    total_cartera_activa = Decimal(str(total_cartera_activa)) if total_cartera_activa else Decimal('0')
-    total_a_gestionar = Decimal(str(total_a_gestionar)) if total_a_gestionar else Decimal('0')
-    monto_recaudado_hoy = Decimal(str(monto_recaudado_hoy)) if monto_recaudado_hoy else Decimal('0')
-    
-    # ===== MÉTRICAS PRINCIPALES =====
-    # Cobradores activos
-    cobradores_activos = Cobrador.objects.filter(activo=True).count()
-    
-    # Créditos que han recibido pago hoy
-    creditos_ids_pagados_hoy = set(pagos_recibidos_hoy.values_list('credito_id', flat=True))
-    
-    # Créditos urgentes sin pago hoy
-    creditos_sin_pago = creditos_urgentes.exclude(id__in=creditos_ids_pagados_hoy).count()
-    
-    # Meta diaria (ejemplo: 10% de la cartera activa)
-    meta_diaria = total_cartera_activa * Decimal('0.10')
-    try:
-        porcentaje_meta = float(monto_recaudado_hoy / meta_diaria * 100) if meta_diaria and float(meta_diaria) > 0 else 0
-    except (TypeError, ZeroDivisionError, ValueError):
-        porcentaje_meta = 0
-    
-    # ===== PREPARAR DATOS DE LA TABLA PRINCIPAL (SOLO CRÉDITOS URGENTES) =====
-    tareas_cobro = []
-    for credito in creditos_urgentes:
-        try:
-            if getattr(credito, 'cliente', None) is None:
-                continue
-        except Exception:
-            continue
-        # Verificar si ya fue pagado hoy
-        pago_hoy = pagos_recibidos_hoy.filter(credito=credito).first()
-        
-        estado_pago = 'PAGADO' if pago_hoy else 'PENDIENTE'
-        monto_pagado = pago_hoy.monto if pago_hoy else 0
-        try:
-            hora_pago = pago_hoy.fecha_pago.time() if pago_hoy and getattr(pago_hoy, 'fecha_pago', None) else None
-        except (AttributeError, ValueError):
-            hora_pago = None
-        
-        # Determinar prioridad (dias_mora puede ser None en datos legacy)
-        dias_mora = getattr(credito, 'dias_mora', 0) or 0
-        if dias_mora > 90:
-            prioridad = 'CRITICA'
-            color_prioridad = 'danger'
-        elif dias_mora > 30:
-            prioridad = 'ALTA'
-            color_prioridad = 'warning'
-        elif dias_mora > 0:
-            prioridad = 'MEDIA'
-            color_prioridad = 'info'
-        else:
-            prioridad = 'NORMAL'
-            color_prioridad = 'success'
-        
-        try:
-            monto_a_cobrar = credito.saldo_pendiente()
-        except Exception:
-            monto_a_cobrar = Decimal('0')
-        
-        tareas_cobro.append({
-            'credito': credito,
-            'cliente': credito.cliente,
-            'cobrador': getattr(credito, 'cobrador', None),
-            'monto_a_cobrar': monto_a_cobrar,
-            'estado_pago': estado_pago,
-            'monto_pagado': monto_pagado,
-            'hora_pago': hora_pago,
-            'prioridad': prioridad,
-            'color_prioridad': color_prioridad,
-            'dias_mora': dias_mora,
-        })
-    
-    # ===== ESTADÍSTICAS POR COBRADOR =====
-    resumen_cobradores = []
-    total_creditos_pendientes_por_cobradores = 0
-    
-    for cobrador in Cobrador.objects.filter(activo=True):
-        # Créditos urgentes asignados a este cobrador
-        creditos_asignados = [t for t in tareas_cobro if t['cobrador'] == cobrador]
-        pagos_cobrador = [t for t in creditos_asignados if t['estado_pago'] == 'PAGADO']
-        pendientes_cobrador = [t for t in creditos_asignados if t['estado_pago'] == 'PENDIENTE']
-        
-        # Contar todos los créditos activos del cobrador (no solo urgentes)
-        todos_creditos_cobrador = Credito.objects.filter(
-            cobrador=cobrador, 
-            estado__in=['DESEMBOLSADO', 'VENCIDO']
-        ).count()
-        
-        monto_asignado = sum([t['monto_a_cobrar'] for t in creditos_asignados])
-        monto_recaudado = sum([t['monto_pagado'] for t in pagos_cobrador])
-        
-        # Convertir a Decimal para evitar errores de tipo
-        monto_asignado = Decimal(str(monto_asignado)) if monto_asignado else Decimal('0')
-        monto_recaudado = Decimal(str(monto_recaudado)) if monto_recaudado else Decimal('0')
-        
-        if monto_asignado > 0 or monto_recaudado > 0 or todos_creditos_cobrador > 0:
-            total_creditos_pendientes_por_cobradores += todos_creditos_cobrador
-            resumen_cobradores.append({
-                'cobrador': cobrador,
-                'creditos_asignados': len(creditos_asignados),  # Solo urgentes
-                'creditos_cobrados': len(pagos_cobrador),
-                'creditos_pendientes': len(pendientes_cobrador),  # Urgentes pendientes
-                'total_creditos_activos': todos_creditos_cobrador,  # Todos los créditos
-                'monto_asignado': monto_asignado,
-                'monto_recaudado': monto_recaudado,
-                'efectividad': float(monto_recaudado / monto_asignado * 100) if monto_asignado > 0 else 0,
-            })
-    
-    # ===== COMPARACIÓN CON DÍA ANTERIOR =====
-    ayer = hoy - timedelta(days=1)
-    monto_ayer = Pago.objects.filter(fecha_pago__date=ayer).aggregate(total=Sum('monto'))['total'] or Decimal('0')
-    monto_ayer = Decimal(str(monto_ayer)) if monto_ayer else Decimal('0')
-    variacion_diaria = float((monto_recaudado_hoy - monto_ayer) / monto_ayer * 100) if monto_ayer > 0 else 0
-    
-    # ===== RECAUDADO HOY POR COBRADOR (real: pesos, cuotas, créditos con pago) =====
-    recaudado_hoy_por_cobrador = []
-    try:
-        for cobrador in Cobrador.objects.filter(activo=True):
-            pagos_hoy_cobrador = Pago.objects.filter(
-                credito__cobrador=cobrador,
-                fecha_pago__date=hoy
-            )
-            monto_hoy = pagos_hoy_cobrador.aggregate(total=Sum('monto'))['total'] or Decimal('0')
-            monto_hoy = Decimal(str(monto_hoy)) if monto_hoy else Decimal('0')
-            cantidad_pagos_hoy = pagos_hoy_cobrador.count()
-            creditos_con_pago_hoy = pagos_hoy_cobrador.values('credito').distinct().count()
-            meta_cobrador = getattr(cobrador, 'meta_diaria', None) or Decimal('0')
-            try:
-                pct_meta = round(float(monto_hoy / meta_cobrador * 100), 0) if meta_cobrador and float(meta_cobrador) > 0 else None
-            except (TypeError, ZeroDivisionError, ValueError):
-                pct_meta = None
-            recaudado_hoy_por_cobrador.append({
-                'cobrador': cobrador,
-                'monto_recaudado_hoy': monto_hoy,
-                'cuotas_cobradas_hoy': cantidad_pagos_hoy,
-                'creditos_con_pago_hoy': creditos_con_pago_hoy,
-                'porcentaje_meta': pct_meta,
-            })
-        recaudado_hoy_por_cobrador.sort(key=lambda x: x['monto_recaudado_hoy'], reverse=True)
-    except Exception as e:
-        logger.exception('Error en recaudado_hoy_por_cobrador: %s', e)
-        recaudado_hoy_por_cobrador = []
-    
-    context = {
-        'fecha_hoy': hoy,
-        # Métricas principales
-        'total_a_cobrar_hoy': total_a_gestionar,  # Ahora muestra solo créditos urgentes
-        'total_cartera_activa': total_cartera_activa,  # Nueva métrica
-        'monto_recaudado_hoy': monto_recaudado_hoy,
-        'cobradores_activos': cobradores_activos,
-        'clientes_pendientes': creditos_sin_pago,
-        'total_pagos_hoy': total_pagos_hoy,
-        'meta_diaria': meta_diaria,
-        'porcentaje_meta': porcentaje_meta,
-        # Tabla principal
-        'tareas_cobro': tareas_cobro,
-        'total_tareas': len(tareas_cobro),
-        # Resumen por cobrador
-        'resumen_cobradores': resumen_cobradores,
-        'total_creditos_por_cobradores': total_creditos_pendientes_por_cobradores,
-        # Comparaciones
-        'monto_ayer': monto_ayer,
-        'variacion_diaria': variacion_diaria,
-        # Recaudado hoy por cobrador (pesos, cuotas, créditos con pago)
-        'recaudado_hoy_por_cobrador': recaudado_hoy_por_cobrador,
-    }
-    
-    return render(request, 'cobradores/gestion_diaria.html', context)
-
-# Reportes de recaudación por cobrador
-# ========================================
-# VISTAS PARA GESTIÓN DE CARTERA
-# ========================================
-
-@login_required
-def gestion_cartera(request):
-    """Vista principal de gestión de cartera - Calcula datos reales"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, timedelta
-    from django.db.models import Sum, Count, Avg
-    from decimal import Decimal
-    
-    hoy = date.today()
-    
-    # ===== CALCULAR MÉTRICAS REALES DESDE LA BASE DE DATOS =====
-    
-    # Todos los créditos activos
-    creditos_activos = Credito.objects.filter(estado__in=['DESEMBOLSADO', 'VENCIDO'])
-    
-    # Cartera total (suma de saldos pendientes)
-    cartera_total = sum([credito.saldo_pendiente() for credito in creditos_activos]) or Decimal('0')
-    cartera_total = Decimal(str(cartera_total))
-    
-    # Créditos por estado
-    creditos_al_dia = creditos_activos.filter(dias_mora=0)
-    creditos_en_mora = creditos_activos.filter(dias_mora__gt=0)
-    
-    # Cartera al día y vencida
-    cartera_al_dia_monto = sum([credito.saldo_pendiente() for credito in creditos_al_dia]) or Decimal('0')
-    cartera_vencida_monto = sum([credito.saldo_pendiente() for credito in creditos_en_mora]) or Decimal('0')
-    
-    cartera_al_dia_monto = Decimal(str(cartera_al_dia_monto))
-    cartera_vencida_monto = Decimal(str(cartera_vencida_monto))
-    
-    # Porcentaje de cartera vencida
-    porcentaje_cartera_vencida = float(cartera_vencida_monto / cartera_total * 100) if cartera_total > 0 else 0
-    
-    # Créditos por rango de mora
-    creditos_mora_temprana = creditos_activos.filter(dias_mora__range=(1, 30))
-    creditos_mora_alta = creditos_activos.filter(dias_mora__range=(31, 90))
-    creditos_mora_critica = creditos_activos.filter(dias_mora__gt=90)
-    
-    # Pagos del día
-    pagos_del_dia = Pago.objects.filter(fecha_pago__date=hoy)
-    monto_pagos_del_dia = pagos_del_dia.aggregate(total=Sum('monto'))['total'] or Decimal('0')
-    
-    # Meta diaria (ejemplo: 5% de la cartera total)
-    meta_cobranza_diaria = cartera_total * Decimal('0.05')
-    porcentaje_cumplimiento_meta = float(monto_pagos_del_dia / meta_cobranza_diaria * 100) if meta_cobranza_diaria > 0 else 0
-    
-    # Días de mora promedio
-    dias_mora_promedio = creditos_en_mora.aggregate(promedio=Avg('dias_mora'))['promedio'] or 0
-    
-    # Crear objeto con datos reales
-    analisis_hoy = type('AnalisisBasico', (), {
-        'cartera_total': float(cartera_total),
-        'cartera_al_dia': float(cartera_al_dia_monto),
-        'cartera_vencida': float(cartera_vencida_monto),
-        'porcentaje_cartera_vencida': porcentaje_cartera_vencida,
-        'creditos_al_dia': creditos_al_dia.count(),
-        'creditos_mora_temprana': creditos_mora_temprana.count(),
-        'creditos_mora_alta': creditos_mora_alta.count(),
-        'creditos_mora_critica': creditos_mora_critica.count(),
-        'pagos_del_dia': float(monto_pagos_del_dia),
-        'meta_cobranza_diaria': float(meta_cobranza_diaria),
-        'porcentaje_cumplimiento_meta': porcentaje_cumplimiento_meta,
-        'dias_mora_promedio': float(dias_mora_promedio or 0),
-    })()
-    
-    # Usar las variables ya calculadas arriba (no recalcular)
-    
-    # Créditos más críticos (por días de mora)
-    creditos_criticos = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO'],
-        dias_mora__gt=0
-    ).order_by('-dias_mora')[:10]
-    
-    # Evolución de cartera - lista vacía por ahora para evitar errores
-    analisis_historico = []
-    
-    context = {
-        'analisis_hoy': analisis_hoy,
-        'creditos_al_dia': creditos_al_dia,
-        'creditos_mora_temp': creditos_mora_temprana,
-        'creditos_mora_alta': creditos_mora_alta,
-        'creditos_mora_critica': creditos_mora_critica,
-        'creditos_criticos': creditos_criticos,
-        'analisis_historico': analisis_historico,
-    }
-    
-    return render(request, 'cartera/gestion_cartera.html', context)
-
-
-@login_required
-def resumen_dinero(request):
-    """Resumen del dinero: desembolsado, cobrado, saldo en cartera. Ecuación de conciliación."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from decimal import Decimal
-    from django.db.models import Sum
-
-    # Créditos que alguna vez fueron desembolsados (tienen fecha_desembolso)
-    creditos_desembolsados = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO', 'PAGADO'],
-        fecha_desembolso__isnull=False
-    )
-    total_desembolsado = creditos_desembolsados.aggregate(t=Sum('monto'))['t'] or Decimal('0')
-    total_desembolsado = Decimal(str(total_desembolsado))
-
-    # Total cobrado histórico (todos los pagos)
-    total_cobrado_raw = Pago.objects.aggregate(t=Sum('monto'))['t'] or Decimal('0')
-    total_cobrado = Decimal(str(total_cobrado_raw))
-
-    # Saldo en cartera = suma de saldo_pendiente() de créditos con saldo > 0
-    creditos_con_saldo = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO']
-    )
-    saldo_cartera = sum(c.saldo_pendiente() for c in creditos_con_saldo)
-    if not isinstance(saldo_cartera, Decimal):
-        saldo_cartera = Decimal(str(saldo_cartera))
-
-    # Ecuación: desembolsado ≈ cobrado + saldo (puede haber pequeña diferencia por redondeos)
-    diferencia = total_desembolsado - (total_cobrado + saldo_cartera)
-    # Tolerancia 1 peso por posibles redondeos
-    cuadra = abs(diferencia) <= Decimal('1')
-    if not isinstance(diferencia, Decimal):
-        diferencia = Decimal(str(diferencia))
-
-    context = {
-        'total_desembolsado': total_desembolsado,
-        'total_cobrado': total_cobrado,
-        'saldo_cartera': saldo_cartera,
-        'diferencia': diferencia,
-        'cuadra': cuadra,
-    }
-    return render(request, 'cartera/resumen_dinero.html', context)
-
-
-@login_required
-def cartera_vencida(request):
-    """Vista de cartera vencida con filtros"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.db.models import Q
-    from django.core.paginator import Paginator
-    
-    # Filtros
-    estado_mora = request.GET.get('estado_mora', '')
-    dias_mora_min = request.GET.get('dias_mora_min', '')
-    cobrador_id = request.GET.get('cobrador_id', '')
-    cliente_id = request.GET.get('cliente_id', '')
-    
-    # Base query
-    creditos_vencidos_list = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO'],
-        dias_mora__gt=0
-    ).select_related('cliente', 'cobrador')
-    
-    # Aplicar filtros
-    if estado_mora:
-        creditos_vencidos_list = creditos_vencidos_list.filter(estado_mora=estado_mora)
-    
-    if dias_mora_min:
-        try:
-            dias_min = int(dias_mora_min)
-            creditos_vencidos_list = creditos_vencidos_list.filter(dias_mora__gte=dias_min)
-        except ValueError:
-            pass
-    
-    if cobrador_id:
-        try:
-            cobrador_id = int(cobrador_id)
-            creditos_vencidos_list = creditos_vencidos_list.filter(cobrador_id=cobrador_id)
-        except ValueError:
-            pass
-    
-    cliente_filtro = None
-    if cliente_id:
-        try:
-            creditos_vencidos_list = creditos_vencidos_list.filter(cliente_id=int(cliente_id))
-            cliente_filtro = Cliente.objects.filter(id=int(cliente_id)).first()
-        except ValueError:
-            pass
-    
-    # Ordenar por días de mora descendente
-    creditos_vencidos_list = creditos_vencidos_list.order_by('-dias_mora')
-    
-    # Paginación configurable
-    per_page_str = request.GET.get('per_page', '10').strip()
-    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
-    paginator = Paginator(creditos_vencidos_list, per_page)
-    page_number = request.GET.get('page')
-    creditos_vencidos = paginator.get_page(page_number)
-    
-    # Para los filtros en el template
-    cobradores = Cobrador.objects.filter(activo=True)
-    
-    context = {
-        'creditos_vencidos': creditos_vencidos,
-        'cobradores': cobradores,
-        'estado_mora': estado_mora,
-        'dias_mora_min': dias_mora_min,
-        'cobrador_id': cobrador_id,
-        'cliente_id': cliente_id,
-        'cliente_filtro': cliente_filtro,
-        'per_page': per_page,
-    }
-    
-    return render(request, 'cartera/cartera_vencida.html', context)
-
-
-@login_required
-def clientes_en_mora(request):
-    """Listado de clientes que tienen al menos un crédito en mora (agrupado por cliente)."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from collections import defaultdict
-    from decimal import Decimal
-
-    # Filtros (mismos que cartera_vencida)
-    estado_mora = request.GET.get('estado_mora', '')
-    dias_mora_min = request.GET.get('dias_mora_min', '')
-    cobrador_id = request.GET.get('cobrador_id', '')
-
-    creditos_mora = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO'],
-        dias_mora__gt=0
-    ).select_related('cliente', 'cobrador')
-
-    if estado_mora:
-        creditos_mora = creditos_mora.filter(estado_mora=estado_mora)
-    if dias_mora_min:
-        try:
-            creditos_mora = creditos_mora.filter(dias_mora__gte=int(dias_mora_min))
-        except ValueError:
-            pass
-    if cobrador_id:
-        try:
-            creditos_mora = creditos_mora.filter(cobrador_id=int(cobrador_id))
-        except ValueError:
-            pass
-
-    creditos_mora = creditos_mora.order_by('cliente__apellidos', 'cliente__nombres', '-dias_mora')
-
-    # Agrupar por cliente
-    por_cliente = defaultdict(lambda: {'cliente': None, 'creditos': [], 'saldo_total': Decimal('0'), 'max_dias_mora': 0})
-    for c in creditos_mora:
-        por_cliente[c.cliente_id]['cliente'] = c.cliente
-        por_cliente[c.cliente_id]['creditos'].append(c)
-        por_cliente[c.cliente_id]['saldo_total'] += c.saldo_pendiente()
-        por_cliente[c.cliente_id]['max_dias_mora'] = max(
-            por_cliente[c.cliente_id]['max_dias_mora'],
-            c.dias_mora or 0
-        )
-
-    # Lista ordenada por días de mora (mayor primero)
-    lista_clientes = sorted(
-        por_cliente.values(),
-        key=lambda x: (-x['max_dias_mora'], x['cliente'].apellidos or '', x['cliente'].nombres or '')
-    )
-
-    cobradores = Cobrador.objects.filter(activo=True)
-
-    context = {
-        'lista_clientes': lista_clientes,
-        'cobradores': cobradores,
-        'estado_mora': estado_mora,
-        'dias_mora_min': dias_mora_min,
-        'cobrador_id': cobrador_id,
-        'total_clientes': len(lista_clientes),
-    }
-    return render(request, 'cartera/clientes_en_mora.html', context)
-
-
-# ========================================
-# VISTAS PARA GESTIÓN DE USUARIOS
-# ========================================
-
-@login_required
-def lista_usuarios(request):
-    """Lista todos los usuarios del sistema"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.core.paginator import Paginator
-    
-    usuarios = User.objects.all().order_by('-date_joined')
-    roles_por_usuario = {u.id: _rol_usuario(u) for u in usuarios}
-    cobradores_por_usuario = {
-        c.usuario_id: c.nombre_completo for c in Cobrador.objects.filter(usuario__isnull=False)
-    }
-    
-    # Paginación configurable
-    per_page_str = request.GET.get('per_page', '10').strip()
-    per_page = int(per_page_str) if per_page_str.isdigit() and int(per_page_str) in (10, 15, 25, 50) else 10
-    paginator = Paginator(usuarios, per_page)
-    page_number = request.GET.get('page')
-    usuarios_paginados = paginator.get_page(page_number)
-    usuarios_rows = [
-        {
-            'usuario': u,
-            'rol': roles_por_usuario.get(u.id, ROLE_OPERADOR),
-            'cobrador': cobradores_por_usuario.get(u.id, ''),
-        }
-        for u in usuarios_paginados
-    ]
-    
-    context = {
-        'usuarios': usuarios_paginados,
-        'usuarios_rows': usuarios_rows,
-        'total_usuarios': usuarios.count(),
-        'per_page': per_page,
-    }
-    
-    return render(request, 'usuarios/lista_usuarios.html', context)
-
-@login_required
-def nuevo_usuario(request):
-    """Crear nuevo usuario"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.contrib.auth.forms import UserCreationForm
-    from django import forms
-
-    class UsuarioForm(UserCreationForm):
-        email = forms.EmailField(required=True, label='Email')
-        first_name = forms.CharField(max_length=30, required=True, label='Nombre')
-        last_name = forms.CharField(max_length=30, required=True, label='Apellido')
-        rol = forms.ChoiceField(choices=ROLES_FORM, required=True, label='Rol del usuario')
-        cobrador = forms.ModelChoiceField(
-            queryset=Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos'),
-            required=False,
-            label='Vincular a cobrador existente',
-            empty_label='-- Sin vincular --'
-        )
-        
-        class Meta:
-            model = User
-            fields = ('username', 'email', 'first_name', 'last_name', 'password1', 'password2', 'rol', 'cobrador')
-            labels = {
-                'username': 'Nombre de usuario',
-            }
-            help_texts = {
-                'username': 'Requerido. 150 caracteres o menos. Solo letras, dígitos y @/./+/-/_ permitidos.',
-            }
-        
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            self.fields['password1'].label = 'Contraseña'
-            self.fields['password2'].label = 'Confirmar contraseña'
-            self.fields['password1'].help_text = (
-                'Tu contraseña debe tener al menos 8 caracteres, '
-                'no puede ser demasiado común y no puede ser completamente numérica.'
-            )
-            self.fields['password2'].help_text = 'Ingresa la misma contraseña para verificación.'
-            
-            # Agregar clases CSS
-            for field_name, field in self.fields.items():
-                if field_name not in ('rol', 'cobrador'):
-                    field.widget.attrs.update({
-                        'class': 'form-control',
-                        'placeholder': field.label
-                    })
-                else:
-                    field.widget.attrs.update({'class': 'form-select'})
-            # Estandar visual de captura
-            self.fields['first_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
-            self.fields['last_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
-            self.fields['email'].widget.attrs.update({'style': 'text-transform: lowercase;'})
-
-        def clean(self):
-            cleaned = super().clean()
-            if cleaned.get('first_name'):
-                cleaned['first_name'] = str(cleaned['first_name']).strip().upper()
-            if cleaned.get('last_name'):
-                cleaned['last_name'] = str(cleaned['last_name']).strip().upper()
-            if cleaned.get('email'):
-                cleaned['email'] = str(cleaned['email']).strip().lower()
-            rol = cleaned.get('rol')
-            cobrador = cleaned.get('cobrador')
-            if rol == ROLE_COBRADOR and not cobrador:
-                self.add_error('cobrador', 'Para rol cobrador debe seleccionar un cobrador existente.')
-            if rol != ROLE_COBRADOR and cobrador:
-                self.add_error('cobrador', 'Solo puede vincular cobrador cuando el rol es cobrador.')
-            if cobrador and cobrador.usuario_id:
-                self.add_error('cobrador', f'El cobrador {cobrador.nombre_completo} ya está vinculado a otro usuario.')
-            return cleaned
-    
-    if request.method == 'POST':
-        form = UsuarioForm(request.POST)
-        if form.is_valid():
-            usuario = form.save()
-            rol = form.cleaned_data['rol']
-            cobrador = form.cleaned_data.get('cobrador')
-            _asignar_rol_usuario(usuario, rol)
-            usuario.save()
-            if cobrador:
-                cobrador.usuario = usuario
-                cobrador.save(update_fields=['usuario'])
-            messages.success(request, f'Usuario "{usuario.username}" creado exitosamente')
-            return redirect('lista_usuarios')
-    else:
-        form = UsuarioForm()
-    
-    return render(request, 'usuarios/nuevo_usuario.html', {'form': form})
-
-@login_required
-def editar_usuario(request, user_id):
-    """Editar usuario existente"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django import forms
-    
-    usuario = get_object_or_404(User, id=user_id)
-    class EditarUsuarioForm(forms.ModelForm):
-        rol = forms.ChoiceField(
-            choices=ROLES_FORM,
-            required=True,
-            label='Rol del usuario'
-        )
-        cobrador = forms.ModelChoiceField(
-            queryset=Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos'),
-            required=False,
-            label='Vincular a cobrador existente',
-            empty_label='-- Sin vincular --'
-        )
-
-        class Meta:
-            model = User
-            fields = ['username', 'email', 'first_name', 'last_name', 'is_active']
-            labels = {
-                'username': 'Nombre de usuario',
-                'email': 'Email',
-                'first_name': 'Nombre',
-                'last_name': 'Apellido', 
-                'is_active': 'Usuario activo',
-            }
-        
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            self.fields['rol'].initial = _rol_usuario(self.instance)
-            self.fields['cobrador'].initial = Cobrador.objects.filter(usuario=self.instance).first()
-            # Agregar clases CSS
-            for field_name, field in self.fields.items():
-                if field_name not in ['is_active', 'rol', 'cobrador']:
-                    field.widget.attrs.update({
-                        'class': 'form-control',
-                        'placeholder': field.label
-                    })
-                elif field_name in ['rol', 'cobrador']:
-                    field.widget.attrs.update({'class': 'form-select'})
-                else:
-                    field.widget.attrs.update({'class': 'form-check-input'})
-            # Estandar visual de captura
-            self.fields['first_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
-            self.fields['last_name'].widget.attrs.update({'style': 'text-transform: uppercase;'})
-            self.fields['email'].widget.attrs.update({'style': 'text-transform: lowercase;'})
-
-        def clean(self):
-            cleaned = super().clean()
-            if cleaned.get('first_name'):
-                cleaned['first_name'] = str(cleaned['first_name']).strip().upper()
-            if cleaned.get('last_name'):
-                cleaned['last_name'] = str(cleaned['last_name']).strip().upper()
-            if cleaned.get('email'):
-                cleaned['email'] = str(cleaned['email']).strip().lower()
-            rol = cleaned.get('rol')
-            cobrador = cleaned.get('cobrador')
-            if rol == ROLE_COBRADOR and not cobrador:
-                self.add_error('cobrador', 'Para rol cobrador debe seleccionar un cobrador existente.')
-            if rol != ROLE_COBRADOR and cobrador:
-                self.add_error('cobrador', 'Solo puede vincular cobrador cuando el rol es cobrador.')
-            if cobrador and cobrador.usuario_id and cobrador.usuario_id != self.instance.id:
-                self.add_error('cobrador', f'El cobrador {cobrador.nombre_completo} ya está vinculado a otro usuario.')
-            return cleaned
-    
-    if request.method == 'POST':
-        form = EditarUsuarioForm(request.POST, instance=usuario)
-        if form.is_valid():
-            usuario = form.save()
-            rol = form.cleaned_data['rol']
-            cobrador_seleccionado = form.cleaned_data.get('cobrador')
-            _asignar_rol_usuario(usuario, rol)
-            usuario.save()
-
-            # Desvincular cobrador previo (si existe y cambió)
-            Cobrador.objects.filter(usuario=usuario).exclude(
-                id=cobrador_seleccionado.id if cobrador_seleccionado else None
-            ).update(usuario=None)
-
-            if cobrador_seleccionado:
-                cobrador_seleccionado.usuario = usuario
-                cobrador_seleccionado.save(update_fields=['usuario'])
-
-            messages.success(request, f'Usuario "{usuario.username}" actualizado exitosamente')
-            return redirect('lista_usuarios')
-    else:
-        form = EditarUsuarioForm(instance=usuario)
-    
-    return render(request, 'usuarios/editar_usuario.html', {
-        'form': form, 
-        'usuario': usuario
-    })
-
-@login_required
-def eliminar_usuario(request, user_id):
-    """Eliminar usuario"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.contrib.auth.models import User
-    
-    usuario = get_object_or_404(User, id=user_id)
-    
-    # No permitir eliminar al usuario actual
-    if usuario == request.user:
-        messages.error(request, 'No puedes eliminar tu propio usuario')
-        return redirect('lista_usuarios')
-    
-    if request.method == 'POST':
-        username = usuario.username
-        usuario.delete()
-        messages.success(request, f'Usuario "{username}" eliminado exitosamente')
-        return redirect('lista_usuarios')
-    
-    return render(request, 'usuarios/confirmar_eliminar_usuario.html', {
-        'usuario': usuario
-    })
-
-@login_required
-def cambiar_password_usuario(request, user_id):
-    """Cambiar contraseña de usuario"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.contrib.auth.models import User
-    from django.contrib.auth.forms import SetPasswordForm
-    
-    usuario = get_object_or_404(User, id=user_id)
-    
-    if request.method == 'POST':
-        form = SetPasswordForm(usuario, request.POST)
-        if form.is_valid():
-            form.save()
-            messages.success(request, f'Contraseña de "{usuario.username}" cambiada exitosamente')
-            return redirect('lista_usuarios')
-    else:
-        form = SetPasswordForm(usuario)
-    
-    return render(request, 'usuarios/cambiar_password.html', {
-        'form': form,
-        'usuario': usuario
-    })
-
-@login_required
-def actualizar_cartera(request):
-    """Actualiza el estado de cartera de todos los créditos"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method == 'POST':
-        # Actualizar todos los créditos activos
-        creditos_activos = Credito.objects.filter(estado__in=['DESEMBOLSADO', 'VENCIDO'])
-        cantidad_actualizados = 0
-        
-        for credito in creditos_activos:
-            credito.actualizar_estado_cartera()
-            cantidad_actualizados += 1
-        
-        # Generar nuevo análisis
-        from .models import CarteraAnalisis
-        CarteraAnalisis.generar_analisis_diario()
-        
-        messages.success(request, f'Se actualizó el estado de cartera de {cantidad_actualizados} créditos.')
-    
-    return redirect('gestion_cartera')
-
-@login_required
-def exportar_cartera_excel(request):
-    """Exporta la cartera vencida a un archivo Excel"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from django.http import HttpResponse
-    from django.db.models import Q
-    import pandas as pd
-    from datetime import datetime
-    import io
-    
-    # Aplicar los mismos filtros que en cartera_vencida
-    estado_mora = request.GET.get('estado_mora', '')
-    dias_mora_min = request.GET.get('dias_mora_min', '')
-    cobrador_id = request.GET.get('cobrador_id', '')
-    
-    # Base query
-    creditos_vencidos = Credito.objects.filter(
-        estado__in=['DESEMBOLSADO', 'VENCIDO'],
-        dias_mora__gt=0
-    ).select_related('cliente', 'cobrador')
-    
-    # Aplicar filtros
-    if estado_mora:
-        creditos_vencidos = creditos_vencidos.filter(estado_mora=estado_mora)
-    
-    if dias_mora_min:
-        try:
-            dias_min = int(dias_mora_min)
-            creditos_vencidos = creditos_vencidos.filter(dias_mora__gte=dias_min)
-        except ValueError:
-            pass
-    
-    if cobrador_id:
-        try:
-            cobrador_id = int(cobrador_id)
-            creditos_vencidos = creditos_vencidos.filter(cobrador_id=cobrador_id)
-        except ValueError:
-            pass
-    
-    # Ordenar por días de mora descendente
-    creditos_vencidos = creditos_vencidos.order_by('-dias_mora')
-    
-    # Preparar datos para Excel
-    data = []
-    for credito in creditos_vencidos:
-        data.append({
-            'ID Crédito': credito.id,
-            'Cliente': credito.cliente.nombre_completo,
-            'Cédula': credito.cliente.cedula,
-            'Teléfono': credito.cliente.celular,
-            'Dirección': credito.cliente.direccion,
-            'Barrio': credito.cliente.barrio,
-            'Monto Original': float(credito.monto),
-            'Monto Total': float(credito.monto_total) if credito.monto_total else float(credito.monto),
-            'Saldo Pendiente': float(credito.saldo_pendiente()),
-            'Total Pagado': float(credito.total_pagado()),
-            'Días Mora': credito.dias_mora,
-            'Estado Mora': credito.get_estado_mora_display(),
-            'Interés Moratorio': float(credito.interes_moratorio),
-            'Tasa Mora (%)': float(credito.tasa_mora),
-            'Tipo Plazo': credito.get_tipo_plazo_display(),
-            'Cantidad Cuotas': credito.cantidad_cuotas,
-            'Cobrador': credito.cobrador.nombre_completo if credito.cobrador else 'Sin asignar',
-            'Teléfono Cobrador': credito.cobrador.celular if credito.cobrador else '',
-            'Fecha Desembolso': credito.fecha_desembolso.strftime('%d/%m/%Y') if credito.fecha_desembolso else '',
-            'Estado Crédito': credito.get_estado_display()
-        })
-    
-    # Crear DataFrame
-    df = pd.DataFrame(data)
-    
-    # Crear archivo Excel
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # Hoja principal con datos
-        df.to_excel(writer, sheet_name='Cartera Vencida', index=False)
-        
-        # Obtener la hoja para formatear
-        worksheet = writer.sheets['Cartera Vencida']
-        
-        # Ajustar ancho de columnas
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        # Agregar hoja de resúmenes
-        if data:
-            resumen_data = []
-            total_creditos = len(data)
-            total_saldo = sum([item['Saldo Pendiente'] for item in data])
-            total_intereses = sum([item['Interés Moratorio'] for item in data])
-            mora_promedio = sum([item['Días Mora'] for item in data]) / total_creditos if total_creditos > 0 else 0
-            
-            resumen_data.append(['RESUMEN DE CARTERA VENCIDA', ''])
-            resumen_data.append(['Fecha del Reporte', datetime.now().strftime('%d/%m/%Y %H:%M')])
-            resumen_data.append(['', ''])
-            resumen_data.append(['Total Créditos Vencidos', total_creditos])
-            resumen_data.append(['Saldo Total Vencido', f'${total_saldo:,.2f}'])
-            resumen_data.append(['Intereses Moratorios', f'${total_intereses:,.2f}'])
-            resumen_data.append(['Días Mora Promedio', f'{mora_promedio:.1f}'])
-            resumen_data.append(['', ''])
-            
-            # Por estado de mora
-            estados = {}
-            for item in data:
-                estado = item['Estado Mora']
-                if estado not in estados:
-                    estados[estado] = 0
-                estados[estado] += 1
-            
-            resumen_data.append(['DISTRIBUCIÓN POR ESTADO DE MORA', ''])
-            for estado, cantidad in estados.items():
-                resumen_data.append([estado, cantidad])
-            
-            # Crear hoja de resumen
-            df_resumen = pd.DataFrame(resumen_data, columns=['Concepto', 'Valor'])
-            df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
-    
-    output.seek(0)
-    
-    # Preparar respuesta
-    filename = f'cartera_vencida_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
-
-@login_required
-def kpis_cobradores(request):
-    """Vista detallada de KPIs por cobrador"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, timedelta
-    from django.db.models import Q, Sum, Count, Avg, Max, Min
-    from .models import TareaCobro, CarteraAnalisis
-    
-    # Parámetros de filtrado
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    cobrador_id = request.GET.get('cobrador_id')
-    
-    # Fechas por defecto (últimos 30 días)
-    if not fecha_desde:
-        fecha_desde = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
-    if not fecha_hasta:
-        fecha_hasta = date.today().strftime('%Y-%m-%d')
-    
-    # Convertir a objetos date
-    from datetime import datetime
-    fecha_inicio = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    fecha_fin = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-    dias_periodo = (fecha_fin - fecha_inicio).days + 1
-    
-    # Obtener todos los cobradores activos
-    cobradores_query = Cobrador.objects.filter(activo=True)
-    if cobrador_id:
-        cobradores_query = cobradores_query.filter(id=cobrador_id)
-    cobradores = cobradores_query.order_by('nombres', 'apellidos')
-    
-    # Calcular KPIs por cobrador
-    datos_cobradores = []
-    
-    for cobrador in cobradores:
-        # KPIs de Recaudación
-        pagos_cobrador = Pago.objects.filter(
-            credito__cobrador=cobrador,
-            fecha_pago__date__gte=fecha_inicio,
-            fecha_pago__date__lte=fecha_fin
-        )
-        
-        total_recaudado = pagos_cobrador.aggregate(Sum('monto'))['monto__sum'] or 0
-        cantidad_pagos = pagos_cobrador.count()
-        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
-        
-        # KPIs de Tareas de Cobro
-        tareas_cobrador = TareaCobro.objects.filter(
-            cobrador=cobrador,
-            fecha_asignacion__gte=fecha_inicio,
-            fecha_asignacion__lte=fecha_fin
-        )
-        
-        total_tareas = tareas_cobrador.count()
-        tareas_cobradas = tareas_cobrador.filter(estado='COBRADO').count()
-        tareas_pendientes = tareas_cobrador.filter(estado='PENDIENTE').count()
-        tareas_no_encontrado = tareas_cobrador.filter(estado='NO_ENCONTRADO').count()
-        tareas_reprogramadas = tareas_cobrador.filter(estado='REPROGRAMADO').count()
-        
-        # Efectividad de cobro
-        efectividad_cobro = (tareas_cobradas / total_tareas * 100) if total_tareas > 0 else 0
-        
-        # KPIs de Cartera Asignada
-        creditos_asignados = Credito.objects.filter(cobrador=cobrador)
-        cartera_total_cobrador = creditos_asignados.aggregate(Sum('monto_total'))['monto_total__sum'] or 0
-        creditos_vencidos_cobrador = creditos_asignados.filter(dias_mora__gt=0).count()
-        creditos_al_dia_cobrador = creditos_asignados.filter(dias_mora=0).count()
-        
-        # Mora promedio de la cartera del cobrador
-        mora_promedio = creditos_asignados.filter(dias_mora__gt=0).aggregate(
-            Avg('dias_mora')
-        )['dias_mora__avg'] or 0
-        
-        # Meta diaria y cumplimiento
-        meta_periodo = cobrador.meta_diaria * dias_periodo if cobrador.meta_diaria else 0
-        cumplimiento_meta = (total_recaudado / meta_periodo * 100) if meta_periodo > 0 else 0
-        
-        # Productividad diaria
-        productividad_diaria = total_recaudado / dias_periodo if dias_periodo > 0 else 0
-        tareas_diaria_promedio = total_tareas / dias_periodo if dias_periodo > 0 else 0
-        
-        # Tasa de contacto efectivo
-        tareas_con_contacto = tareas_cobrador.exclude(estado='NO_ENCONTRADO').count()
-        tasa_contacto = (tareas_con_contacto / total_tareas * 100) if total_tareas > 0 else 0
-        
-        # Calificación general (score)
-        score = 0
-        if efectividad_cobro >= 80: score += 25
-        elif efectividad_cobro >= 60: score += 20
-        elif efectividad_cobro >= 40: score += 15
-        elif efectividad_cobro >= 20: score += 10
-        
-        if cumplimiento_meta >= 100: score += 25
-        elif cumplimiento_meta >= 80: score += 20
-        elif cumplimiento_meta >= 60: score += 15
-        elif cumplimiento_meta >= 40: score += 10
-        
-        if tasa_contacto >= 85: score += 25
-        elif tasa_contacto >= 70: score += 20
-        elif tasa_contacto >= 55: score += 15
-        elif tasa_contacto >= 40: score += 10
-        
-        if mora_promedio <= 15: score += 25
-        elif mora_promedio <= 30: score += 20
-        elif mora_promedio <= 45: score += 15
-        elif mora_promedio <= 60: score += 10
-        
-        # Determinar nivel de rendimiento
-        if score >= 90:
-            nivel_rendimiento = 'EXCELENTE'
-            color_rendimiento = 'success'
-        elif score >= 70:
-            nivel_rendimiento = 'BUENO'
-            color_rendimiento = 'primary'
-        elif score >= 50:
-            nivel_rendimiento = 'REGULAR'
-            color_rendimiento = 'warning'
-        else:
-            nivel_rendimiento = 'NECESITA MEJORA'
-            color_rendimiento = 'danger'
-        
-        datos_cobradores.append({
-            'cobrador': cobrador,
-            'total_recaudado': total_recaudado,
-            'cantidad_pagos': cantidad_pagos,
-            'promedio_pago': promedio_pago,
-            'total_tareas': total_tareas,
-            'tareas_cobradas': tareas_cobradas,
-            'tareas_pendientes': tareas_pendientes,
-            'tareas_no_encontrado': tareas_no_encontrado,
-            'tareas_reprogramadas': tareas_reprogramadas,
-            'efectividad_cobro': efectividad_cobro,
-            'cartera_total_cobrador': cartera_total_cobrador,
-            'creditos_vencidos_cobrador': creditos_vencidos_cobrador,
-            'creditos_al_dia_cobrador': creditos_al_dia_cobrador,
-            'mora_promedio': mora_promedio,
-            'meta_periodo': meta_periodo,
-            'cumplimiento_meta': cumplimiento_meta,
-            'productividad_diaria': productividad_diaria,
-            'tareas_diaria_promedio': tareas_diaria_promedio,
-            'tasa_contacto': tasa_contacto,
-            'score': score,
-            'nivel_rendimiento': nivel_rendimiento,
-            'color_rendimiento': color_rendimiento,
-        })
-    
-    # Ordenar por score descendente
-    datos_cobradores.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Calcular promedios generales
-    if datos_cobradores:
-        promedio_efectividad = sum([d['efectividad_cobro'] for d in datos_cobradores]) / len(datos_cobradores)
-        promedio_cumplimiento = sum([d['cumplimiento_meta'] for d in datos_cobradores]) / len(datos_cobradores)
-        promedio_contacto = sum([d['tasa_contacto'] for d in datos_cobradores]) / len(datos_cobradores)
-        total_recaudado_general = sum([d['total_recaudado'] for d in datos_cobradores])
-        total_tareas_general = sum([d['total_tareas'] for d in datos_cobradores])
-    else:
-        promedio_efectividad = promedio_cumplimiento = promedio_contacto = 0
-        total_recaudado_general = total_tareas_general = 0
-    
-    context = {
-        'datos_cobradores': datos_cobradores,
-        'cobradores_todos': Cobrador.objects.filter(activo=True),
-        'fecha_desde': fecha_desde,
-        'fecha_hasta': fecha_hasta,
-        'cobrador_id': int(cobrador_id) if cobrador_id else None,
-        'dias_periodo': dias_periodo,
-        'promedio_efectividad': promedio_efectividad,
-        'promedio_cumplimiento': promedio_cumplimiento,
-        'promedio_contacto': promedio_contacto,
-        'total_recaudado_general': total_recaudado_general,
-        'total_tareas_general': total_tareas_general,
-    }
-    
-    return render(request, 'cartera/kpis_cobradores.html', context)
-
-# ========================================
-# SISTEMA DE TAREAS DE COBRO DIARIAS
-# ========================================
-
-@login_required
-def acceso_cobrador(request):
-    """Vista de acceso optimizada para cobradores móviles"""
-    if _usuario_admin_operativo(request.user):
-        return render(request, 'tareas/acceso_cobrador.html')
-    cobrador = _usuario_cobrador_activo(request.user)
-    if cobrador:
-        return redirect('agenda_cobrador_especifico', cobrador_id=cobrador.id)
-    return _forbidden_operacion(request)
-
-@login_required
-def agenda_cobrador(request, cobrador_id=None):
-    """Vista de agenda diaria para cobradores"""
-    from datetime import date, timedelta
-    from django.db.models import Count, Sum
-    from .models import TareaCobro
-
-    es_admin = _usuario_admin_operativo(request.user)
-    cobrador_usuario = _usuario_cobrador_activo(request.user)
-
-    # Reglas de acceso:
-    # - Admin: puede ver selector o cualquier agenda.
-    # - Cobrador: solo su propia agenda, incluso si manipula cobrador_id por URL.
-    if es_admin:
-        if not cobrador_id:
-            cobradores = Cobrador.objects.filter(activo=True)
-            return render(request, 'tareas/selector_cobrador.html', {
-                'cobradores': cobradores
-            })
-        cobrador = get_object_or_404(Cobrador, id=cobrador_id, activo=True)
-    else:
-        if not cobrador_usuario:
-            return _forbidden_operacion(request)
-        if cobrador_id and int(cobrador_id) != cobrador_usuario.id:
-            return _forbidden_operacion(request, 'No tiene permisos para ver la agenda de otro cobrador.')
-        cobrador = cobrador_usuario
-    
-    # Fecha a consultar (por defecto hoy)
-    fecha_str = request.GET.get('fecha')
-    if fecha_str:
-        try:
-            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha = date.today()
-    else:
-        fecha = date.today()
-    
-    # Saneo preventivo: cancelar tareas abiertas cuya cuota ya está pagada.
-    cuotas_pagadas_estado = ['PAGADA', 'PAGADO']
-    tareas_huerfanas = TareaCobro.objects.filter(
-        cobrador=cobrador,
-        fecha_asignacion=fecha,
-        estado__in=['PENDIENTE', 'EN_PROCESO', 'NO_ENCONTRADO', 'NO_ESTABA', 'NO_PUDO_PAGAR', 'REPROGRAMADO'],
-        cuota__estado__in=cuotas_pagadas_estado
-    ).select_related('cuota')
-    cuotas_huerfanas_ids = set(tareas_huerfanas.values_list('cuota_id', flat=True))
-    if cuotas_huerfanas_ids:
-        for cuota in CronogramaPago.objects.filter(id__in=cuotas_huerfanas_ids):
-            _cancelar_tareas_abiertas_de_cuota(cuota)
-
-    # Obtener tareas del cobrador para la fecha (sin canceladas)
-    tareas = TareaCobro.objects.filter(
-        cobrador=cobrador,
-        fecha_asignacion=fecha
-    ).exclude(
-        estado='CANCELADO'
-    ).select_related(
-        'cuota__credito__cliente'
-    ).order_by('orden_visita', 'prioridad')
-
-    # Red de seguridad operativa:
-    # Si hoy no hay tareas para el cobrador, intentar generar automáticamente una vez.
-    # La generación usa deduplicación por cuota/fecha, evitando tareas duplicadas.
-    if fecha == date.today() and not tareas.exists():
-        tiene_cuotas_hoy = CronogramaPago.objects.filter(
-            credito__cobrador=cobrador,
-            estado__in=['PENDIENTE', 'PARCIAL'],
-            credito__estado__in=['DESEMBOLSADO', 'VENCIDO'],
-            fecha_vencimiento=fecha
-        ).exists()
-        tiene_reprogramadas_hoy = TareaCobro.objects.filter(
-            cobrador=cobrador,
-            fecha_reprogramacion=fecha
-        ).exists()
-        if tiene_cuotas_hoy or tiene_reprogramadas_hoy:
-            TareaCobro.generar_tareas_diarias(fecha, verbose=False)
-            tareas = TareaCobro.objects.filter(
-                cobrador=cobrador,
-                fecha_asignacion=fecha
-            ).exclude(
-                estado='CANCELADO'
-            ).select_related(
-                'cuota__credito__cliente'
-            ).order_by('orden_visita', 'prioridad')
-            if tareas.exists():
-                messages.info(
-                    request,
-                    'Se generaron automáticamente las tareas del día para evitar omisiones operativas.'
-                )
-    
-    # Estadísticas del día
-    total_tareas = tareas.count()
-    tareas_completadas = tareas.filter(estado='COBRADO').count()
-    monto_total_cobrar = sum(tarea.monto_a_cobrar for tarea in tareas)
-    monto_cobrado = tareas.filter(estado='COBRADO').aggregate(
-        total=Sum('monto_cobrado')
-    )['total'] or 0
-    
-    porcentaje_completado = (tareas_completadas / total_tareas * 100) if total_tareas > 0 else 0
-    
-    # Agrupar tareas por estado para estadísticas
-    tareas_por_estado = tareas.values('estado').annotate(cantidad=Count('id'))
-    estadisticas_estado = {item['estado']: item['cantidad'] for item in tareas_por_estado}
-
-    # Enriquecer tarjetas: total pendiente del cliente en el día (para priorización en móvil)
-    tareas_list = list(tareas)
-    total_cliente_hoy = {}
-    cuotas_cliente_hoy = {}
-    for tarea in tareas_list:
-        if tarea.estado == 'COBRADO':
-            continue
-        saldo_tarea = tarea.monto_a_cobrar
-        if saldo_tarea <= 0:
-            continue
-        cliente_id = tarea.cuota.credito.cliente_id
-        total_cliente_hoy[cliente_id] = total_cliente_hoy.get(cliente_id, 0) + saldo_tarea
-        cuotas_cliente_hoy[cliente_id] = cuotas_cliente_hoy.get(cliente_id, 0) + 1
-
-    for tarea in tareas_list:
-        cliente_id = tarea.cuota.credito.cliente_id
-        tarea.total_cliente_hoy = total_cliente_hoy.get(cliente_id, 0)
-        tarea.cuotas_cliente_hoy = cuotas_cliente_hoy.get(cliente_id, 0)
-    
-    # Fechas para navegación (anterior/siguiente día)
-    fecha_anterior = (fecha - timedelta(days=1)).strftime('%Y-%m-%d')
-    fecha_siguiente = (fecha + timedelta(days=1)).strftime('%Y-%m-%d')
-    es_hoy = (fecha == date.today())
-    
-    # Agrupar visualmente por cliente para evitar doble gestión (parcial + cuota del día).
-    grupos = []
-    tareas_por_cliente = {}
-    for tarea in tareas:
-        cliente_id = tarea.cuota.credito.cliente_id
-        tareas_por_cliente.setdefault(cliente_id, []).append(tarea)
-
-    for _, tareas_cliente in tareas_por_cliente.items():
-        tareas_cliente.sort(key=lambda t: (t.cuota.fecha_vencimiento, t.cuota.numero_cuota))
-        principal = tareas_cliente[0]
-        total_cliente = sum((t.monto_a_cobrar for t in tareas_cliente if t.estado != 'COBRADO'), Decimal('0'))
-        cuotas_pendientes = [t.cuota.numero_cuota for t in tareas_cliente if t.estado != 'COBRADO']
-        if not cuotas_pendientes:
-            cuotas_pendientes = [t.cuota.numero_cuota for t in tareas_cliente]
-        estado_grupo = 'COBRADO' if all(t.estado == 'COBRADO' for t in tareas_cliente) else 'PENDIENTE'
-        color_estado = 'success' if estado_grupo == 'COBRADO' else 'secondary'
-        prioridad_grupo = 'ALTA' if any(t.prioridad == 'ALTA' for t in tareas_cliente) else ('MEDIA' if any(t.prioridad == 'MEDIA' for t in tareas_cliente) else 'BAJA')
-
-        grupos.append({
-            'id': principal.id,
-            'task_ids': [t.id for t in tareas_cliente],
-            'cliente_nombre': principal.cuota.credito.cliente.nombre_completo,
-            'cliente_celular': principal.cuota.credito.cliente.celular,
-            'cliente_direccion': principal.cuota.credito.cliente.direccion,
-            'monto_a_cobrar': total_cliente if total_cliente > 0 else principal.monto_a_cobrar,
-            'cuotas_resumen': ', '.join([str(n) for n in cuotas_pendientes]),
-            'cuota_referencia': cuotas_pendientes[0] if cuotas_pendientes else principal.cuota.numero_cuota,
-            'cuotas_count': len(cuotas_pendientes),
-            'estado': estado_grupo,
-            'estado_display': 'Cobrado' if estado_grupo == 'COBRADO' else 'Pendiente',
-            'color_estado': color_estado,
-            'prioridad': prioridad_grupo,
-            'intentos_cobro': sum((t.intentos_cobro for t in tareas_cliente)),
-            'observaciones': principal.observaciones,
-            'puede_cobrar': any(t.estado != 'COBRADO' for t in tareas_cliente),
-        })
-
-    context = {
-        'cobrador': cobrador,
-        'fecha': fecha,
-        'fecha_anterior': fecha_anterior,
-        'fecha_siguiente': fecha_siguiente,
-        'es_hoy': es_hoy,
-        'tareas': grupos,
-        'total_tareas': total_tareas,
-        'tareas_completadas': tareas_completadas,
-        'monto_total_cobrar': monto_total_cobrar,
-        'monto_cobrado': monto_cobrado,
-        'porcentaje_completado': porcentaje_completado,
-        'estadisticas_estado': estadisticas_estado,
-        'puede_editar': request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == cobrador)
-    }
-    
-    return render(request, 'tareas/agenda_cobrador.html', context)
-
-@login_required
-def procesar_cobro_completo(request, tarea_id):
-    """Vista para procesar cobro completo - MISMA LÓGICA que nuevo_pago"""
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Método no permitido'})
-    
-    try:
-        tarea = get_object_or_404(TareaCobro, id=tarea_id)
-        
-        # Verificar permisos
-        if not (request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == tarea.cobrador)):
-            return JsonResponse({'success': False, 'error': 'Sin permisos'})
-        
-        # Obtener datos del formulario
-        monto_cobrado = request.POST.get('monto_recibido')
-        observaciones = request.POST.get('observaciones', '')
-        latitud = request.POST.get('latitud')
-        longitud = request.POST.get('longitud')
-        
-        if not monto_cobrado:
-            return JsonResponse({'success': False, 'error': 'Debe especificar el monto cobrado'})
-        
-        # Limpiar el monto de forma más inteligente
-        monto_str = str(monto_cobrado).strip()
-        
-        # Si tiene coma como último separador (formato europeo), rechazar
-        if ',' in monto_str and monto_str.rindex(',') > monto_str.rindex('.') if '.' in monto_str else True:
-            # Verificar si es formato europeo (coma decimal)
-            parts_comma = monto_str.split(',')
-            if len(parts_comma) == 2 and len(parts_comma[1]) <= 2 and '.' not in parts_comma[1]:
-                return JsonResponse({
-                    'success': False, 
-                    'error': f'Use punto (.) como separador decimal, no coma (,). Ejemplo: {monto_str.replace(",", ".")}'
-                })
-        
-        # Limpiar comas de miles y espacios, pero conservar punto decimal
-        monto_limpio = monto_str.replace(' ', '')  # Quitar espacios
-        # Solo quitar comas si están en posición de miles (no al final)
-        if ',' in monto_limpio:
-            # Si hay punto, las comas antes del punto son separadores de miles
-            if '.' in monto_limpio:
-                parte_entera, parte_decimal = monto_limpio.split('.', 1)
-                parte_entera = parte_entera.replace(',', '')
-                monto_limpio = f"{parte_entera}.{parte_decimal}"
-            else:
-                # Si no hay punto, solo quitar comas de miles (no al final)
-                if not monto_limpio.endswith(',') and len(monto_limpio.split(',')[-1]) >= 3:
-                    monto_limpio = monto_limpio.replace(',', '')
-        
-        # Validación directa con Decimal (más preciso)
-        try:
-            from decimal import Decimal, InvalidOperation
-            monto_decimal = Decimal(monto_limpio)
-            
-            if monto_decimal <= Decimal('0'):
-                return JsonResponse({'success': False, 'error': 'El monto debe ser mayor que cero'})
-                
-            # Validar que no sea un monto absurdamente pequeño o grande para pesos colombianos
-            # Permitir montos desde $50 para casos excepcionales (pagos parciales, etc.)
-            if monto_decimal < Decimal('50'):  # Menos de $50 COP
-                return JsonResponse({
-                    'success': False, 
-                    'error': f'El monto ${monto_decimal} parece muy bajo para un pago en pesos colombianos.'
-                })
-            
-            if monto_decimal > Decimal('50000000'):  # Más de $50 millones COP
-                return JsonResponse({
-                    'success': False,
-                    'error': f'El monto ${monto_decimal} parece muy alto. Verifique el valor.'
-                })
-                
-        except (ValueError, InvalidOperation):
-            return JsonResponse({'success': False, 'error': f'Monto inválido: "{monto_cobrado}". Use solo números y punto decimal.'})
-        
-        from decimal import Decimal
-        
-        # Cobro agrupado por cliente/día: aplicar primero a cuotas más antiguas.
-        tareas_cliente = TareaCobro.objects.filter(
-            cobrador=tarea.cobrador,
-            fecha_asignacion=tarea.fecha_asignacion,
-            cuota__credito__cliente=tarea.cuota.credito.cliente
-        ).exclude(estado='COBRADO').select_related('cuota', 'cuota__credito').order_by(
-            'cuota__fecha_vencimiento', 'cuota__numero_cuota'
-        )
-        saldo_total_cliente = sum((t.cuota.saldo_pendiente() for t in tareas_cliente), Decimal('0'))
-        if monto_decimal > saldo_total_cliente:
-            return JsonResponse({
-                'success': False,
-                'error': f'El monto (${monto_decimal:,.0f}) supera el saldo pendiente total del cliente (${saldo_total_cliente:,.0f}).'
-            })
-        
-        pagos_creados = []
-        restante = monto_decimal
-        fecha_manana = timezone.now().date() + timedelta(days=1)
-        for t in tareas_cliente:
-            if restante <= 0:
-                break
-            saldo_cuota = t.cuota.saldo_pendiente()
-            if saldo_cuota <= 0:
-                continue
-            aplicado = min(restante, saldo_cuota)
-
-            pago = Pago.objects.create(
-                credito=t.cuota.credito,
-                cuota=t.cuota,
-                monto=aplicado,
-                numero_cuota=t.cuota.numero_cuota,
-                observaciones=f"📱 Cobro agrupado por {t.cobrador.nombre_completo}\n{observaciones}".strip()
-            )
-            pagos_creados.append(pago)
-
-            t.cuota.monto_pagado += aplicado
-            if t.cuota.monto_pagado >= t.cuota.monto_cuota:
-                t.cuota.monto_pagado = t.cuota.monto_cuota
-                t.cuota.estado = 'PAGADA'
-                t.cuota.fecha_pago = timezone.now().date()
-                t.estado = 'COBRADO'
-                t.fecha_reprogramacion = None
-            else:
-                t.cuota.estado = 'PARCIAL'
-                t.estado = 'REPROGRAMADO'
-                t.fecha_reprogramacion = fecha_manana
-
-            t.cuota.save()
-
-            t.fecha_visita = timezone.now()
-            t.monto_cobrado = aplicado
-            t.observaciones = observaciones
-            if latitud:
-                t.latitud = float(latitud)
-            if longitud:
-                t.longitud = float(longitud)
-            t.usuario_ultima_accion = request.user
-            t.save()
-
-            TareaCobroLog.objects.create(
-                tarea=t,
-                usuario=request.user,
-                accion='COBRADO' if t.estado == 'COBRADO' else 'REPROGRAMADO',
-                observaciones=observaciones,
-                monto_registrado=aplicado,
-            )
-
-            credito_tmp = t.cuota.credito
-            if credito_tmp.esta_al_dia():
-                credito_tmp.estado = 'PAGADO'
-                credito_tmp.save()
-
-            restante -= aplicado
-
-        if not pagos_creados:
-            return JsonResponse({'success': False, 'error': 'No se pudo aplicar el pago a cuotas pendientes del cliente.'})
-        pago = pagos_creados[-1]
-        
-        # Enviar comprobante por correo (del último pago aplicado) si hay email
-        credito = pago.credito
-        cliente = credito.cliente
-        email_cliente = (cliente.email or '').strip()
-        email_enviado = False
-        if email_cliente:
-            try:
-                from django.core.mail import EmailMessage
-                from django.conf import settings
-                pdf_buffer = _generar_recibo_pdf_bytes(pago)
-                nombre_pdf = f'recibo_pago_{pago.id:05d}.pdf'
-                asunto = f'Comprobante de pago #{pago.id:05d} - Crédito #{credito.id}'
-                soporte_pago = _resumen_soporte_pago(pago)
-                saldo_cuota_txt = (
-                    f"${soporte_pago['saldo_cuota']:,.0f}"
-                    if soporte_pago['saldo_cuota'] is not None else 'N/A'
-                )
-                if soporte_pago['proxima_cuota']:
-                    siguiente_txt = (
-                        f"Cuota #{soporte_pago['proxima_cuota'].numero_cuota} "
-                        f"por ${soporte_pago['proxima_cuota'].saldo_pendiente():,.0f}"
-                    )
-                else:
-                    siguiente_txt = 'Sin cuotas pendientes'
-                cuerpo = (
-                    f'Hola {cliente.nombre_completo},\n\n'
-                    f'Adjunto encontrará el comprobante de su pago por ${pago.monto:,.0f} '
-                    f'(cuota #{pago.numero_cuota}, crédito #{credito.id}).\n\n'
-                    f'Tipo de aplicación: {soporte_pago["tipo_pago"]}\n'
-                    f'Saldo pendiente de esa cuota: {saldo_cuota_txt}\n'
-                    f'Siguiente obligación sugerida: {siguiente_txt}\n'
-                    f'Saldo pendiente del crédito: ${credito.saldo_pendiente():,.0f}\n\n'
-                    f'Conserve este recibo para sus registros.\n\n'
-                    f'Atentamente,\nSistema de Créditos'
-                )
-                email = EmailMessage(
-                    asunto,
-                    cuerpo,
-                    getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@creditos.local'),
-                    [email_cliente],
-                )
-                email.attach(nombre_pdf, pdf_buffer.getvalue(), 'application/pdf')
-                email.send(fail_silently=True)
-                email_enviado = True
-            except Exception:
-                pass
-        
-        # 🎯 REDIRIGIR AL MISMO FLUJO QUE nuevo_pago
-        return JsonResponse({
-            'success': True,
-            'mensaje': f'Cobro aplicado correctamente. Se registraron {len(pagos_creados)} pago(s) para el cliente.',
-            'pago_id': pago.id,
-            'redirect_url': f'/confirmacion-pago/{pago.id}/',
-            'email_enviado': email_enviado,
-            'tiene_email': bool(email_cliente),
-            'es_parcial': any(t.estado == 'REPROGRAMADO' for t in tareas_cliente),
-            'fecha_reprogramacion': fecha_manana.strftime('%Y-%m-%d') if any(t.estado == 'REPROGRAMADO' for t in tareas_cliente) else None,
-        })
-        
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': f'Error: {str(e)}'
-        })
-
-@login_required
-def actualizar_tarea(request, tarea_id):
-    """Vista AJAX para actualizar estado de una tarea"""
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Método no permitido'})
-    
-    try:
-        tarea = get_object_or_404(TareaCobro, id=tarea_id)
-        
-        # Verificar permisos
-        if not (request.user.is_staff or (hasattr(request.user, 'cobrador') and request.user.cobrador == tarea.cobrador)):
-            return JsonResponse({'success': False, 'error': 'Sin permisos'})
-        
-        nuevo_estado = request.POST.get('estado')
-        observaciones = request.POST.get('observaciones', '')
-        motivo_reprogramacion = request.POST.get('motivo_reprogramacion', '').strip()
-        if nuevo_estado == 'REPROGRAMADO' and motivo_reprogramacion:
-            observaciones = motivo_reprogramacion  # guardar motivo también en observaciones
-        monto_cobrado = request.POST.get('monto_cobrado')
-        latitud = request.POST.get('latitud')
-        longitud = request.POST.get('longitud')
-        fecha_reprogramacion = request.POST.get('fecha_reprogramacion')
-        
-        if nuevo_estado == 'COBRADO':
-            if not monto_cobrado:
-                return JsonResponse({'success': False, 'error': 'Debe especificar el monto cobrado'})
-            
-            try:
-                # Usar el mismo manejo robusto de Decimal
-                from decimal import Decimal, InvalidOperation
-                
-                # Limpiar el monto de forma inteligente (misma lógica que procesar_cobro_completo)
-                monto_str = str(monto_cobrado).strip()
-                
-                # Verificar formato europeo (coma decimal)
-                if ',' in monto_str:
-                    parts_comma = monto_str.split(',')
-                    if len(parts_comma) == 2 and len(parts_comma[1]) <= 2 and '.' not in parts_comma[1]:
-                        return JsonResponse({
-                            'success': False, 
-                            'error': f'Use punto (.) como separador decimal. Ejemplo: {monto_str.replace(",", ".")}'
-                        })
-                
-                # Limpiar comas de miles pero conservar punto decimal
-                monto_limpio = monto_str.replace(' ', '')
-                if ',' in monto_limpio:
-                    if '.' in monto_limpio:
-                        parte_entera, parte_decimal = monto_limpio.split('.', 1)
-                        parte_entera = parte_entera.replace(',', '')
-                        monto_limpio = f"{parte_entera}.{parte_decimal}"
-                    else:
-                        if not monto_limpio.endswith(',') and len(monto_limpio.split(',')[-1]) >= 3:
-                            monto_limpio = monto_limpio.replace(',', '')
-                
-                monto_decimal = Decimal(monto_limpio)
-                
-                # Validaciones de rango para pesos colombianos
-                if monto_decimal <= Decimal('0'):
-                    return JsonResponse({'success': False, 'error': 'El monto debe ser mayor que cero'})
-                
-                # Permitir montos desde $50 para casos excepcionales
-                if monto_decimal < Decimal('50'):
-                    return JsonResponse({
-                        'success': False, 
-                        'error': f'El monto ${monto_decimal} parece muy bajo para un pago en pesos colombianos.'
-                    })
-                
-                if monto_decimal > Decimal('50000000'):
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'El monto ${monto_decimal} parece muy alto. Verifique el valor.'
-                    })
-                
-                # Validar que no supere el saldo pendiente del crédito
-                credito = tarea.credito
-                monto_total_credito = credito.monto_total or credito.monto
-                total_ya_pagado = credito.total_pagado()
-                saldo_pend = monto_total_credito - total_ya_pagado
-                if monto_decimal > saldo_pend:
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'El monto (${monto_decimal:,.0f}) supera el saldo pendiente del crédito (${saldo_pend:,.0f}).'
-                    })
-                
-                lat = float(latitud) if latitud else None
-                lng = float(longitud) if longitud else None
-                
-                # 🎆 MAGIA: Marcar tarea Y crear pago automáticamente
-                pago_creado = tarea.marcar_como_cobrado(monto_decimal, observaciones, lat, lng)
-                
-            except (ValueError, InvalidOperation):
-                return JsonResponse({'success': False, 'error': f'Monto inválido: "{monto_cobrado}". Use solo números y punto decimal.'})
-        else:
-            fecha_reprog = None
-            if fecha_reprogramacion:
-                try:
-                    fecha_reprog = datetime.strptime(fecha_reprogramacion, '%Y-%m-%d').date()
-                except ValueError:
-                    pass
-            
-            tarea.cambiar_estado(nuevo_estado, observaciones, fecha_reprog, motivo_reprogramacion)
-        
-        # Auditoría: quién realizó la acción y log
-        tarea.usuario_ultima_accion = request.user
-        tarea.save(update_fields=['usuario_ultima_accion'])
-        acciones_permitidas = [c[0] for c in TareaCobroLog.ACCIONES]
-        estado_final = tarea.estado
-        log_accion = estado_final if estado_final in acciones_permitidas else 'NO_ENCONTRADO'
-        monto_log = None
-        if 'pago_creado' in locals():
-            monto_log = getattr(pago_creado, 'monto', None)
-        TareaCobroLog.objects.create(
-            tarea=tarea,
-            usuario=request.user,
-            accion=log_accion,
-            observaciones=observaciones,
-            motivo_reprogramacion=motivo_reprogramacion[:255] if motivo_reprogramacion else '',
-            monto_registrado=monto_log,
-        )
-        
-        # Preparar respuesta base
-        response_data = {
-            'success': True,
-            'tarea': {
-                'id': tarea.id,
-                'estado': tarea.estado,
-                'estado_display': tarea.get_estado_display(),
-                'color_estado': tarea.color_estado,
-                'monto_cobrado': float(tarea.monto_cobrado) if tarea.monto_cobrado else 0,
-                'observaciones': tarea.observaciones,
-                'fecha_visita': tarea.fecha_visita.strftime('%H:%M') if tarea.fecha_visita else None
-            }
-        }
-        
-        # Si se creó un pago, incluir información del pago
-        if 'pago_creado' in locals():
-            response_data['pago'] = {
-                'id': pago_creado.id,
-                'monto': float(pago_creado.monto),
-                'fecha': pago_creado.fecha_pago.strftime('%d/%m/%Y %H:%M'),
-                'cliente': tarea.credito.cliente.nombre_completo,
-                'cuota': tarea.cuota.numero_cuota,
-                'mensaje': (
-                    f'✅ Pago parcial de ${pago_creado.monto:,.0f} registrado. '
-                    f'Reprogramado para {tarea.fecha_reprogramacion.strftime("%d/%m/%Y")}.'
-                    if tarea.estado == 'REPROGRAMADO' and tarea.fecha_reprogramacion
-                    else f'✅ Pago de ${pago_creado.monto:,.0f} registrado exitosamente'
-                )
-            }
-        
-        return JsonResponse(response_data)
-        
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-@login_required
-def panel_supervisor(request):
-    """Panel de supervisor para ver progreso de todos los cobradores"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, timedelta
-    from django.db.models import Count, Sum, Avg, Q
-    from .models import TareaCobro
-    
-    # Fecha a consultar (por defecto hoy)
-    fecha_str = request.GET.get('fecha')
-    if fecha_str:
-        try:
-            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha = date.today()
-    else:
-        fecha = date.today()
-    
-    # Filtro por estado (opcional): PENDIENTE, COBRADO, NO_ENCONTRADO, REPROGRAMADO, etc.
-    filtro_estado = request.GET.get('filtro_estado', '').strip()
-    estados_validos = [e[0] for e in TareaCobro.ESTADOS]
-    
-    # Obtener todos los cobradores activos
-    cobradores = Cobrador.objects.filter(activo=True)
-    
-    # Datos por cobrador
-    datos_cobradores = []
-    total_general_tareas = 0
-    total_general_cobradas = 0
-    total_general_monto = 0
-    
-    for cobrador in cobradores:
-        tareas = TareaCobro.objects.filter(
-            cobrador=cobrador,
-            fecha_asignacion=fecha
-        ).select_related('cuota__credito__cliente')
-        if filtro_estado and filtro_estado in estados_validos:
-            tareas = tareas.filter(estado=filtro_estado)
-        
-        total_tareas = tareas.count()
-        tareas_cobradas = tareas.filter(estado='COBRADO').count()
-        monto_cobrado = tareas.filter(estado='COBRADO').aggregate(
-            total=Sum('monto_cobrado')
-        )['total'] or 0
-        
-        porcentaje = (tareas_cobradas / total_tareas * 100) if total_tareas > 0 else 0
-        
-        # Últimas tareas actualizadas
-        ultimas_tareas = tareas.exclude(estado='PENDIENTE').order_by('-fecha_visita')[:3]
-        
-        rutas_qs = cobrador.rutas.all()
-        meta_diaria = cobrador.meta_diaria or 0
-        porcentaje_meta = round(float(monto_cobrado / meta_diaria * 100), 0) if meta_diaria and float(meta_diaria) > 0 else None
-        datos_cobradores.append({
-            'cobrador': cobrador,
-            'total_tareas': total_tareas,
-            'tareas_cobradas': tareas_cobradas,
-            'tareas_pendientes': total_tareas - tareas_cobradas,
-            'monto_cobrado': monto_cobrado,
-            'porcentaje': porcentaje,
-            'ultimas_tareas': ultimas_tareas,
-            'rutas': rutas_qs,
-            'sin_rutas': not rutas_qs.exists(),
-            'meta_diaria': meta_diaria,
-            'porcentaje_meta': porcentaje_meta,
-        })
-        
-        total_general_tareas += total_tareas
-        total_general_cobradas += tareas_cobradas
-        total_general_monto += monto_cobrado
-    
-    # Ordenar por porcentaje de completado (mayor a menor)
-    datos_cobradores.sort(key=lambda x: x['porcentaje'], reverse=True)
-    
-    # Estadísticas generales
-    porcentaje_general = (total_general_cobradas / total_general_tareas * 100) if total_general_tareas > 0 else 0
-    
-    # Tareas por estado (todas, sin filtrar para mostrar totales por estado)
-    todas_tareas = TareaCobro.objects.filter(fecha_asignacion=fecha)
-    estadisticas_estado = todas_tareas.values('estado').annotate(cantidad=Count('id'))
-    # Lista detallada dinámica (se recalcula en cada carga y refleja pagos/cambios del día).
-    tareas_detalle_qs = todas_tareas.exclude(estado='CANCELADO').select_related(
-        'cobrador', 'cuota__credito__cliente'
-    ).order_by('cobrador__nombres', 'cobrador__apellidos', 'orden_visita', 'id')
-    if filtro_estado and filtro_estado in estados_validos:
-        tareas_detalle_qs = tareas_detalle_qs.filter(estado=filtro_estado)
-    tareas_detalle = []
-    for t in tareas_detalle_qs:
-        tareas_detalle.append({
-            'cobrador': t.cobrador.nombre_completo,
-            'cliente': t.cuota.credito.cliente.nombre_completo,
-            'cuota_numero': t.cuota.numero_cuota,
-            'fecha_vencimiento': t.cuota.fecha_vencimiento,
-            'estado_tarea': t.estado,
-            'estado_tarea_display': t.get_estado_display(),
-            'estado_cuota': t.cuota.estado,
-            'estado_cuota_display': t.cuota.get_estado_display(),
-            'monto_pendiente': t.cuota.saldo_pendiente(),
-        })
-    
-    # Fechas anterior/siguiente para navegación (Django template no tiene add days)
-    fecha_anterior = (fecha - timedelta(days=1)).strftime('%Y-%m-%d')
-    fecha_siguiente = (fecha + timedelta(days=1)).strftime('%Y-%m-%d')
-    
-    # Alertas: pendientes al cierre, reprogramadas sin fecha o con fecha pasada, meta no cumplida
-    hoy = date.today()
-    alertas_pendientes_hoy = 0
-    if fecha == hoy:
-        alertas_pendientes_hoy = TareaCobro.objects.filter(
-            fecha_asignacion=fecha, estado='PENDIENTE'
-        ).count()
-    reprogramadas_problema = TareaCobro.objects.filter(
-        estado='REPROGRAMADO'
-    ).filter(
-        Q(fecha_reprogramacion__isnull=True) | Q(fecha_reprogramacion__lt=hoy)
-    ).count()
-    alertas_meta_bajo = []
-    for d in datos_cobradores:
-        if d['meta_diaria'] and float(d['meta_diaria']) > 0 and d['porcentaje_meta'] is not None and d['porcentaje_meta'] < 70:
-            alertas_meta_bajo.append({'cobrador': d['cobrador'], 'porcentaje_meta': d['porcentaje_meta']})
-    
-    context = {
-        'fecha': fecha,
-        'today': hoy,
-        'filtro_estado': filtro_estado,
-        'estados_tarea': TareaCobro.ESTADOS,
-        'fecha_anterior': fecha_anterior,
-        'fecha_siguiente': fecha_siguiente,
-        'datos_cobradores': datos_cobradores,
-        'total_general_tareas': total_general_tareas,
-        'total_general_cobradas': total_general_cobradas,
-        'total_general_monto': total_general_monto,
-        'porcentaje_general': porcentaje_general,
-        'estadisticas_estado': {item['estado']: item['cantidad'] for item in estadisticas_estado},
-        'tareas_detalle': tareas_detalle,
-        'alertas_pendientes_hoy': alertas_pendientes_hoy,
-        'alertas_reprogramadas_problema': reprogramadas_problema,
-        'alertas_meta_bajo': alertas_meta_bajo,
-    }
-    
-    return render(request, 'tareas/panel_supervisor.html', context)
-
-@login_required
-def generar_tareas_diarias(request):
-    """Vista para generar tareas diarias manualmente"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    if request.method == 'POST':
-        fecha_str = request.POST.get('fecha')
-        try:
-            if fecha_str:
-                fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-            else:
-                fecha = date.today()
-            
-            from .models import TareaCobro
-            tareas_creadas = TareaCobro.generar_tareas_diarias(fecha)
-            
-            messages.success(request, f'Se generaron {tareas_creadas} tareas para {fecha.strftime("%d/%m/%Y")}')
-            
-        except Exception as e:
-            messages.error(request, f'Error al generar tareas: {str(e)}')
-    
-    return redirect('panel_supervisor')
-
-
-# ========================================
-# CIERRE DE COBRO DIARIO
-# ========================================
-
-@login_required
-def cierre_cobro_diario(request):
-    """Lista cobradores activos y para la fecha elegida: lo que debían entregar y estado de cierre."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date
-    from django.db.models import Sum
-    from decimal import Decimal
-
-    fecha_str = request.GET.get('fecha')
-    if fecha_str:
-        try:
-            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha = date.today()
-    else:
-        fecha = date.today()
-
-    cobradores = Cobrador.objects.filter(activo=True)
-    filas = []
-    for cobrador in cobradores:
-        pagos_dia = Pago.objects.filter(
-            credito__cobrador=cobrador,
-            fecha_pago__date=fecha
-        )
-        monto_esperado = pagos_dia.aggregate(Sum('monto'))['monto__sum'] or 0
-        cantidad_pagos = pagos_dia.count()
-        cierre = CierreCobroDiario.objects.filter(cobrador=cobrador, fecha=fecha).first()
-        estado_arqueo = 'PENDIENTE'
-        if cierre and cierre.monto_recibido is not None and cierre.diferencia is not None:
-            diferencia_ajustada = cierre.diferencia
-            # Tolerancia de 1 peso para evitar "faltante/sobrante" por centavos residuales.
-            if abs(diferencia_ajustada) < Decimal('1'):
-                diferencia_ajustada = Decimal('0')
-            if diferencia_ajustada == 0:
-                estado_arqueo = 'EXACTO'
-            elif diferencia_ajustada > 0:
-                estado_arqueo = 'SOBRANTE'
-            else:
-                estado_arqueo = 'FALTANTE'
-        filas.append({
-            'cobrador': cobrador,
-            'fecha': fecha,
-            'monto_esperado': monto_esperado,
-            'cantidad_pagos': cantidad_pagos,
-            'cierre': cierre,
-            'cerrado': cierre is not None,
-            'estado_arqueo': estado_arqueo,
-        })
-    # Ordenar por monto esperado descendente (los que más cobraron primero)
-    filas.sort(key=lambda x: (-float(x['monto_esperado']), x['cobrador'].apellidos or ''))
-
-    # Historial de cierres (últimos 30 días)
-    historial = CierreCobroDiario.objects.select_related('cobrador', 'cerrado_por').order_by('-fecha', '-fecha_cierre')[:50]
-
-    context = {
-        'fecha': fecha,
-        'filas': filas,
-        'historial': historial,
-    }
-    return render(request, 'cobranza/cierre_cobro_diario.html', context)
-
-
-@login_required
-def resumen_cierre_cobrador(request, cobrador_id):
-    """Detalle de lo que cobró un cobrador en una fecha: listado de pagos y opción de cerrar con arqueo."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date
-    from django.db.models import Sum
-
-    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
-    fecha_str = request.GET.get('fecha') or request.POST.get('fecha')
-    if fecha_str:
-        try:
-            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha = date.today()
-    else:
-        fecha = date.today()
-
-    pagos = Pago.objects.filter(
-        credito__cobrador=cobrador,
-        fecha_pago__date=fecha
-    ).select_related('credito__cliente').order_by('fecha_pago')
-    monto_esperado = pagos.aggregate(Sum('monto'))['monto__sum'] or 0
-    cierre = CierreCobroDiario.objects.filter(cobrador=cobrador, fecha=fecha).first()
-
-    context = {
-        'cobrador': cobrador,
-        'fecha': fecha,
-        'pagos': pagos,
-        'monto_esperado': monto_esperado,
-        'cantidad_pagos': pagos.count(),
-        'cierre': cierre,
-    }
-    return render(request, 'cobranza/resumen_cierre_cobrador.html', context)
-
-
-@login_required
-def cerrar_cobro_cobrador(request):
-    """POST: registra el cierre (monto recibido) y calcula diferencia (arqueo)."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, datetime
-    from decimal import Decimal, InvalidOperation
-    from django.db.models import Sum
-
-    if request.method != 'POST':
-        return redirect('cierre_cobro_diario')
-    cobrador_id = request.POST.get('cobrador_id')
-    fecha_str = request.POST.get('fecha')
-    monto_recibido_str = request.POST.get('monto_recibido', '').strip()
-    observaciones = request.POST.get('observaciones', '').strip()
-    if not cobrador_id or not fecha_str:
-        messages.error(request, 'Faltan datos (cobrador o fecha).')
-        return redirect('cierre_cobro_diario')
-    cobrador = get_object_or_404(Cobrador, id=cobrador_id)
-    try:
-        fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-    except ValueError:
-        fecha = date.today()
-    monto_esperado = Pago.objects.filter(
-        credito__cobrador=cobrador,
-        fecha_pago__date=fecha
-    ).aggregate(Sum('monto'))['monto__sum'] or Decimal('0')
-    cantidad_pagos = Pago.objects.filter(credito__cobrador=cobrador, fecha_pago__date=fecha).count()
-    def _parse_monto_cierre(valor_raw):
-        if valor_raw is None:
-            return None
-        txt = str(valor_raw).strip().replace(' ', '')
-        if not txt:
-            return None
-        # Soporta formatos: 500000 | 500.000 | 500,000 | 500000.50 | 500000,50
-        if ',' in txt and '.' in txt:
-            # Si ambos existen, asumir comas como miles
-            txt = txt.replace(',', '')
-        elif ',' in txt and '.' not in txt:
-            parts = txt.split(',')
-            if len(parts) == 2 and len(parts[1]) <= 2:
-                txt = parts[0] + '.' + parts[1]  # coma decimal
-            else:
-                txt = txt.replace(',', '')  # comas de miles
-        elif '.' in txt:
-            parts = txt.split('.')
-            # Si hay más de un punto, o el sufijo parece miles (3 dígitos), limpiar miles
-            if len(parts) > 2 or (len(parts) == 2 and len(parts[1]) == 3):
-                txt = txt.replace('.', '')
-        return Decimal(txt)
-
-    monto_recibido = None
-    if monto_recibido_str:
-        try:
-            monto_recibido = _parse_monto_cierre(monto_recibido_str)
-        except (InvalidOperation, ValueError):
-            messages.error(request, 'Monto recibido inválido. Use formato numérico válido (ej: 500000 o 500.000).')
-            return redirect(f"{reverse('resumen_cierre_cobrador', args=[cobrador.id])}?fecha={fecha.strftime('%Y-%m-%d')}")
-    diferencia = None
-    if monto_recibido is not None:
-        diferencia = monto_recibido - monto_esperado
-        # Normalizar diferencias menores a 1 peso por redondeos de centavos.
-        if abs(diferencia) < Decimal('1'):
-            diferencia = Decimal('0')
-    cierre, created = CierreCobroDiario.objects.update_or_create(
-        cobrador=cobrador,
-        fecha=fecha,
-        defaults={
-            'monto_esperado': monto_esperado,
-            'cantidad_pagos': cantidad_pagos,
-            'monto_recibido': monto_recibido,
-            'diferencia': diferencia,
-            'cerrado_por': request.user,
-            'observaciones': observaciones,
-        }
-    )
-    if created:
-        messages.success(request, f'Cierre registrado para {cobrador.nombre_completo} - {fecha.strftime("%d/%m/%Y")}.')
-    else:
-        messages.success(request, f'Cierre actualizado para {cobrador.nombre_completo}.')
-    return redirect(f"{reverse('cierre_cobro_diario')}?fecha={fecha.strftime('%Y-%m-%d')}")
-
-
-# ========================================
-# REPORTES DE RECAUDACIÓN
-# ========================================
-
-@login_required
-def recaudacion_cobradores(request):
-    """Vista para mostrar reportes de recaudación por cobrador"""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, timedelta
-    from django.db.models import Q, Sum, Count, Avg
-    
-    # Parámetros de filtrado
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    cobrador_id = request.GET.get('cobrador_id')
-    
-    # Fechas por defecto (día actual)
-    if not fecha_desde:
-        fecha_desde = date.today().strftime('%Y-%m-%d')
-    if not fecha_hasta:
-        fecha_hasta = date.today().strftime('%Y-%m-%d')
-    
-    # Parsear a date para filtros consistentes
-    from datetime import datetime as dt
-    try:
-        fecha_inicio = dt.strptime(fecha_desde, '%Y-%m-%d').date()
-    except (ValueError, TypeError):
-        fecha_inicio = date.today()
-    try:
-        fecha_fin = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
-    except (ValueError, TypeError):
-        fecha_fin = date.today()
-    
-    filtros_pagos = Q(fecha_pago__date__gte=fecha_inicio) & Q(fecha_pago__date__lte=fecha_fin)
-    
-    # Si se especifica un cobrador, filtrar solo ese
-    if cobrador_id:
-        filtros_pagos &= Q(credito__cobrador_id=cobrador_id)
-    
-    # Obtener todos los cobradores activos
-    cobradores = Cobrador.objects.filter(activo=True).order_by('nombres', 'apellidos')
-    
-    # Datos de recaudación por cobrador
-    datos_recaudacion = []
-    total_general_recaudado = 0
-    total_general_pagos = 0
-    
-    for cobrador in cobradores:
-        # Pagos del cobrador en el período
-        pagos_cobrador = Pago.objects.filter(
-            filtros_pagos & Q(credito__cobrador=cobrador)
-        )
-        
-        # Estadísticas del cobrador
-        total_recaudado = pagos_cobrador.aggregate(Sum('monto'))['monto__sum'] or 0
-        cantidad_pagos = pagos_cobrador.count()
-        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
-        
-        # Créditos únicos gestionados
-        creditos_gestionados = pagos_cobrador.values('credito').distinct().count()
-        
-        # Cumplimiento de meta (si tiene meta diaria)
-        cumplimiento_meta = 0
-        if cobrador.meta_diaria and cobrador.meta_diaria > 0:
-            dias_periodo = (fecha_fin - fecha_inicio).days + 1
-            meta_periodo = cobrador.meta_diaria * dias_periodo
-            cumplimiento_meta = (total_recaudado / meta_periodo * 100) if meta_periodo > 0 else 0
-        
-        # Solo incluir cobradores que tienen actividad o siempre mostrar todos
-        if total_recaudado > 0 or not cobrador_id:  # Mostrar todos si no hay filtro específico
-            datos_recaudacion.append({
-                'cobrador': cobrador,
-                'total_recaudado': total_recaudado,
-                'cantidad_pagos': cantidad_pagos,
-                'promedio_pago': promedio_pago,
-                'creditos_gestionados': creditos_gestionados,
-                'cumplimiento_meta': cumplimiento_meta,
-                'pagos': pagos_cobrador.order_by('-fecha_pago')[:5],  # Últimos 5 pagos
-            })
-        
-        total_general_recaudado += total_recaudado
-        total_general_pagos += cantidad_pagos
-    
-    # Ordenar por total recaudado (mayor a menor)
-    datos_recaudacion.sort(key=lambda x: x['total_recaudado'], reverse=True)
-    
-    # Estadísticas generales
-    promedio_general = total_general_recaudado / total_general_pagos if total_general_pagos > 0 else 0
-    
-    # Top performers
-    top_recaudadores = datos_recaudacion[:3]  # Top 3
-    
-    context = {
-        'datos_recaudacion': datos_recaudacion,
-        'cobradores': cobradores,
-        'fecha_desde': fecha_desde,
-        'fecha_hasta': fecha_hasta,
-        'cobrador_id': int(cobrador_id) if cobrador_id else None,
-        'total_general_recaudado': total_general_recaudado,
-        'total_general_pagos': total_general_pagos,
-        'promedio_general': promedio_general,
-        'top_recaudadores': top_recaudadores,
-    }
-    
-    return render(request, 'cobradores/recaudacion_cobradores.html', context)
-
-
-@login_required
-def exportar_recaudacion_excel(request):
-    """Exporta el reporte de recaudación (mismo filtro que recaudacion_cobradores) a Excel."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date
-    from datetime import datetime as dt
-    from django.db.models import Q, Sum
-    import pandas as pd
-    import io
-
-    fecha_desde = request.GET.get('fecha_desde') or date.today().strftime('%Y-%m-%d')
-    fecha_hasta = request.GET.get('fecha_hasta') or date.today().strftime('%Y-%m-%d')
-    cobrador_id = request.GET.get('cobrador_id')
-    try:
-        fecha_inicio = dt.strptime(fecha_desde, '%Y-%m-%d').date()
-        fecha_fin = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
-    except (ValueError, TypeError):
-        fecha_inicio = date.today()
-        fecha_fin = date.today()
-
-    filtros = Q(fecha_pago__date__gte=fecha_inicio) & Q(fecha_pago__date__lte=fecha_fin)
-    if cobrador_id:
-        try:
-            filtros &= Q(credito__cobrador_id=int(cobrador_id))
-        except ValueError:
-            pass
-
-    pagos = Pago.objects.filter(filtros).select_related(
-        'credito__cliente', 'credito__cobrador'
-    ).order_by('-fecha_pago')
-
-    # Hoja 1: Resumen por cobrador
-    cobradores_activos = Cobrador.objects.filter(activo=True)
-    resumen = []
-    for c in cobradores_activos:
-        qs = pagos.filter(credito__cobrador=c)
-        total = qs.aggregate(Sum('monto'))['monto__sum'] or 0
-        cnt = qs.count()
-        if cnt == 0 and cobrador_id:
-            continue
-        meta_per = 0
-        if c.meta_diaria and (fecha_fin - fecha_inicio).days >= 0:
-            dias = (fecha_fin - fecha_inicio).days + 1
-            meta_per = round(float(total / (float(c.meta_diaria) * dias) * 100), 1) if c.meta_diaria else 0
-        resumen.append({
-            'Cobrador': c.nombre_completo,
-            'Total recaudado': float(total),
-            'Cantidad pagos': cnt,
-            'Cumplimiento meta (%)': meta_per,
-        })
-    df_resumen = pd.DataFrame(resumen)
-
-    # Hoja 2: Detalle de pagos
-    detalle = []
-    for p in pagos[:2000]:
-        detalle.append({
-            'Fecha': p.fecha_pago.strftime('%d/%m/%Y %H:%M'),
-            'Cobrador': p.credito.cobrador.nombre_completo if p.credito.cobrador else '',
-            'Cliente': p.credito.cliente.nombre_completo,
-            'Cédula': p.credito.cliente.cedula,
-            'Crédito ID': p.credito_id,
-            'Cuota': p.numero_cuota,
-            'Monto': float(p.monto),
-        })
-    df_detalle = pd.DataFrame(detalle)
-
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_resumen.to_excel(writer, sheet_name='Resumen por cobrador', index=False)
-        df_detalle.to_excel(writer, sheet_name='Detalle pagos', index=False)
-    output.seek(0)
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = (
-        f'attachment; filename="recaudacion_{fecha_desde}_{fecha_hasta}.xlsx"'
-    )
-    return response
-
-
-@login_required
-def reporte_tareas_pendientes(request):
-    """Lista tareas en estado PENDIENTE con fecha de asignación ya pasada (sin gestionar a tiempo)."""
-    if not _usuario_admin_operativo(request.user):
-        return _forbidden_operacion(request)
-    from datetime import date, timedelta
-    from django.db.models import Q, Count
-
-    dias_atraso = request.GET.get('dias', '1')
-    try:
-        dias_atraso = max(0, int(dias_atraso))
-    except ValueError:
-        dias_atraso = 1
-    cobrador_id = request.GET.get('cobrador_id', '').strip()
-    fecha_limite = date.today() - timedelta(days=dias_atraso)
-
-    tareas_qs = TareaCobro.objects.filter(
-        estado='PENDIENTE',
-        fecha_asignacion__lte=fecha_limite,
-    ).select_related('cobrador', 'cuota__credito__cliente').order_by('fecha_asignacion', 'cobrador')
-
-    if cobrador_id:
-        try:
-            tareas_qs = tareas_qs.filter(cobrador_id=int(cobrador_id))
-        except ValueError:
-            pass
-
-    tareas = list(tareas_qs[:500])
-    cobradores = Cobrador.objects.filter(activo=True)
-
-    # Resumen por cobrador
-    por_cobrador = tareas_qs.values('cobrador__nombres', 'cobrador__apellidos', 'cobrador_id').annotate(
-        total=Count('id')
-    ).order_by('-total')
-
-    export = request.GET.get('export') == 'xlsx'
-    if export:
-        import pandas as pd
-        import io
-        rows = []
-        for t in tareas_qs[:2000]:
-            rows.append({
-                'Fecha asignación': t.fecha_asignacion.strftime('%d/%m/%Y'),
-                'Cobrador': t.cobrador.nombre_completo,
-                'Cliente': t.cliente.nombre_completo,
-                'Crédito': t.credito.id,
-                'Cuota': t.cuota.numero_cuota,
-                'Monto a cobrar': float(t.monto_a_cobrar) if t.monto_a_cobrar else 0,
-                'Días atraso': (date.today() - t.fecha_asignacion).days,
-            })
-        df = pd.DataFrame(rows)
-        output = io.BytesIO()
-        df.to_excel(output, engine='openpyxl', index=False)
-        output.seek(0)
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-        response['Content-Disposition'] = 'attachment; filename="tareas_pendientes_sin_gestionar.xlsx"'
-        return response
-
-    context = {
-        'tareas': tareas,
-        'cobradores': cobradores,
-        'dias_atraso': dias_atraso,
-        'cobrador_id': int(cobrador_id) if cobrador_id else None,
-        'fecha_limite': fecha_limite,
-        'por_cobrador': por_cobrador,
-        'total': len(tareas),
-    }
-    return render(request, 'tareas/reporte_tareas_pendientes.html', context)
-
-
-# Vista AJAX para obtener detalles de pagos por cobrador
-@login_required
-def detalles_pagos_cobrador(request, cobrador_id):
-    """Vista AJAX que devuelve detalles completos de pagos de un cobrador"""
-    if not _usuario_admin_operativo(request.user):
-        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación.'}, status=403)
-    try:
-        cobrador = get_object_or_404(Cobrador, id=cobrador_id)
-        
-        # Parámetros de filtrado
-        fecha_desde = request.GET.get('fecha_desde')
-        fecha_hasta = request.GET.get('fecha_hasta')
-        buscar = request.GET.get('buscar', '').strip()
-        
-        # Fechas por defecto (día actual)
-        if not fecha_desde:
-            fecha_desde = date.today().strftime('%Y-%m-%d')
-        if not fecha_hasta:
-            fecha_hasta = date.today().strftime('%Y-%m-%d')
-        try:
-            from datetime import datetime as dt
-            fecha_inicio_ajax = dt.strptime(fecha_desde, '%Y-%m-%d').date()
-            fecha_fin_ajax = dt.strptime(fecha_hasta, '%Y-%m-%d').date()
-        except (ValueError, TypeError):
-            fecha_inicio_ajax = date.today()
-            fecha_fin_ajax = date.today()
-        
-        # Filtrar pagos del cobrador
-        pagos = Pago.objects.filter(
-            credito__cobrador=cobrador,
-            fecha_pago__date__gte=fecha_inicio_ajax,
-            fecha_pago__date__lte=fecha_fin_ajax
-        ).select_related(
-            'credito__cliente'
-        ).order_by('-fecha_pago')
-        
-        # Filtro de búsqueda por nombre de cliente
-        if buscar:
-            pagos = pagos.filter(
-                Q(credito__cliente__nombres__icontains=buscar) |
-                Q(credito__cliente__apellidos__icontains=buscar) |
-                Q(credito__cliente__cedula__icontains=buscar)
-            )
-        
-        # Estadísticas del período
-        total_recaudado = pagos.aggregate(Sum('monto'))['monto__sum'] or 0
-        cantidad_pagos = pagos.count()
-        promedio_pago = total_recaudado / cantidad_pagos if cantidad_pagos > 0 else 0
-        creditos_unicos = pagos.values('credito').distinct().count()
-        
-        # Convertir pagos a lista de diccionarios
-        pagos_data = []
-        for pago in pagos[:50]:  # Limitar a 50 para rendimiento
-            pagos_data.append({
-                'id': pago.id,
-                'fecha_pago': pago.fecha_pago.strftime('%d/%m/%Y %H:%M'),
-                'fecha_pago_corta': pago.fecha_pago.strftime('%d/%m/%Y'),
-                'hora_pago': pago.fecha_pago.strftime('%H:%M'),
-                'monto': float(pago.monto),
-                'numero_cuota': pago.numero_cuota,
-                'observaciones': pago.observaciones or '',
-                'cliente': {
-                    'id': pago.credito.cliente.id,
-                    'nombre_completo': pago.credito.cliente.nombre_completo,
-                    'nombres': pago.credito.cliente.nombres,
-                    'apellidos': pago.credito.cliente.apellidos,
-                    'cedula': pago.credito.cliente.cedula,
-                    'celular': pago.credito.cliente.celular,
-                    'direccion': pago.credito.cliente.direccion,
-                    'barrio': pago.credito.cliente.barrio,
-                },
-                'credito': {
-                    'id': pago.credito.id,
-                    'monto_total': float(pago.credito.monto),
-                    'estado': pago.credito.get_estado_display(),
-                    'tasa_interes': float(pago.credito.tasa_interes),
-                    'cantidad_cuotas': pago.credito.cantidad_cuotas,
-                    'tipo_plazo': pago.credito.get_tipo_plazo_display() if hasattr(pago.credito, 'tipo_plazo') else 'N/A',
-                }
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'cobrador': {
-                'id': cobrador.id,
-                'nombre': cobrador.nombre_completo,
-                'meta_diaria': float(cobrador.meta_diaria) if cobrador.meta_diaria else 0,
-                'comision_porcentaje': float(cobrador.comision_porcentaje) if cobrador.comision_porcentaje else 0,
-            },
-            'estadisticas': {
-                'total_recaudado': float(total_recaudado),
-                'cantidad_pagos': cantidad_pagos,
-                'promedio_pago': float(promedio_pago),
-                'creditos_unicos': creditos_unicos,
-                'fecha_desde': fecha_desde,
-                'fecha_hasta': fecha_hasta,
-            },
-            'pagos': pagos_data,
-            'tiene_mas_pagos': pagos.count() > 50,
-        })
-        
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': f'Error al cargar los datos: {str(e)}'
-        })